@@ -30,6 +30,7 @@ from openpyxl.styles import Color, Style, PatternFill, Font, colors
 from django.utils.translation import ugettext_lazy as _
 from django.utils import timezone
 
+from assessments.business.score_encoding_list import ScoreEncodingResolver
 from base import models as mdl
 from base.models.enums import exam_enrollment_justification_type
 
@@ -43,7 +44,8 @@ JUSTIFICATION_ALIASES = {
 }
 
 
-def export_xls(exam_enrollments):
+def export_xls(exam_enrollments, resolver=None):
+    resolver = resolver or ScoreEncodingResolver()
     workbook = Workbook()
     worksheet = workbook.active
 
@@ -64,7 +66,7 @@ def export_xls(exam_enrollments):
         student = exam_enroll.learning_unit_enrollment.student
         offer = exam_enroll.learning_unit_enrollment.offer
         person = mdl.person.find_by_id(student.person.id)
-        end_date = __get_session_exam_deadline(exam_enroll)
+        end_date = __get_session_exam_deadline(exam_enroll, resolver)
 
         score = None
         if exam_enroll.score_final is not None:
@@ -177,13 +179,7 @@ def justification_other_values():
                        _('justified_absence_export_legend'))
 
 
-def __get_session_exam_deadline(exam_enroll):
+def __get_session_exam_deadline(exam_enroll, resolver):
     date_format = str(_('date_format'))
-    deadline = None
-
-    session_exam_deadline = mdl.exam_enrollment.get_session_exam_deadline(exam_enroll)
-    if session_exam_deadline:
-        deadline = session_exam_deadline.deadline_tutor_computed if session_exam_deadline.deadline_tutor_computed else\
-                   session_exam_deadline.deadline
-
+    deadline = resolver.get_deadline(exam_enroll)
     return deadline.strftime(date_format) if deadline else "-"
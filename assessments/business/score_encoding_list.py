@@ -24,15 +24,20 @@
 #
 ##############################################################################
 import copy
+from collections import OrderedDict
 from decimal import Decimal, Context, Inexact
 import unicodedata
 
 from django.db import transaction
 
+from assessments.business import score_encoding_progress
 from base.models import academic_year, session_exam_calendar, exam_enrollment, program_manager, tutor, offer_year, \
                         learning_unit_year
 from base.models.enums import exam_enrollment_justification_type
 
+# The foreign keys are never changed by the score encoding, so their (one query per field) validation is skipped
+EXCLUDED_FIELDS_FROM_VALIDATION = ['session_exam', 'learning_unit_enrollment']
+
 
 def get_scores_encoding_list(user, **kwargs):
     current_academic_year = academic_year.current_academic_year()
@@ -72,32 +77,33 @@ def get_scores_encoding_list(user, **kwargs):
         enrollments = enrollments.filter(id__in=enrollments_ids)
 
     # Append deadline/deadline_tutor for each exam enrollments
-    enrollments = _append_session_exam_deadline(list(enrollments))
+    resolver = ScoreEncodingResolver()
+    enrollments = _append_session_exam_deadline(list(enrollments), resolver)
     enrollments = sort_encodings(enrollments)
 
     return ScoresEncodingList(**{
         'academic_year': current_academic_year,
         'number_session': current_number_session,
         'learning_unit_year': learning_unit_year.get_by_id(learning_unit_year_id) if learning_unit_year_id else None,
-        'enrollments': enrollments
+        'enrollments': enrollments,
+        'resolver': resolver
     })
 
 
-def _append_session_exam_deadline(enrollments):
+def _append_session_exam_deadline(enrollments, resolver=None):
+    resolver = resolver or ScoreEncodingResolver()
     for enrollment in enrollments:
-        enrollment.deadline = exam_enrollment.get_deadline(enrollment)
-        enrollment.deadline_reached = exam_enrollment.is_deadline_reached(enrollment)
-        enrollment.deadline_tutor_reached = exam_enrollment.is_deadline_tutor_reached(enrollment)
+        enrollment.deadline = resolver.get_deadline(enrollment)
+        enrollment.deadline_reached = resolver.is_deadline_reached(enrollment)
+        enrollment.deadline_tutor_reached = resolver.is_deadline_tutor_reached(enrollment)
     return enrollments
 
 
 def filter_without_closed_exam_enrollments(scores_encoding_list, is_program_manager=True):
-    if is_program_manager:
-        scores_encoding_list.enrollments = [enrollment for enrollment in scores_encoding_list.enrollments
-                                            if not exam_enrollment.is_deadline_reached(enrollment)]
-    else:
-        scores_encoding_list.enrollments = [enrollment for enrollment in scores_encoding_list.enrollments
-                                            if not exam_enrollment.is_deadline_tutor_reached(enrollment)]
+    scores_encoding_list.enrollments = [
+        enrollment for enrollment in scores_encoding_list.enrollments
+        if not is_deadline_reached(enrollment, is_program_manager, resolver=scores_encoding_list.resolver)
+    ]
     return scores_encoding_list
 
 
@@ -118,12 +124,45 @@ def find_related_learning_unit_years(scores_encoding_list):
 
 def update_enrollments(scores_encoding_list, user):
     is_program_manager = program_manager.is_program_manager(user)
+    updated_enrollments, errors = bulk_update_enrollments(scores_encoding_list.enrollments, user, is_program_manager)
+    if errors:
+        # Report the first invalid enrollment of the list, as the encoding forms display only one error
+        raise next(iter(errors.values()))
+    return updated_enrollments
+
+
+def bulk_update_enrollments(enrollments, user, is_program_manager=None, resolver=None):
+    """
+    Validate all the enrollments in memory, then save the changed ones in a single transaction.
+    :return: A tuple (list of updated enrollments, OrderedDict of errors by position of the enrollment in the list)
+    """
+    if is_program_manager is None:
+        is_program_manager = program_manager.is_program_manager(user)
+    resolver = resolver or ScoreEncodingResolver()
+
     updated_enrollments = []
-    for enrollment in scores_encoding_list.enrollments:
-        enrollment_updated = update_enrollment(enrollment, user, is_program_manager)
+    errors = OrderedDict()
+    for index, enrollment in enumerate(enrollments):
+        try:
+            enrollment_updated = _get_enrollment_updated(enrollment, is_program_manager, resolver)
+        except Exception as e:
+            errors[index] = e
+            continue
         if enrollment_updated:
             updated_enrollments.append(enrollment_updated)
-    return updated_enrollments
+
+    save_enrollments(updated_enrollments, user, with_historic=is_program_manager)
+    return updated_enrollments, errors
+
+
+def save_enrollments(enrollments, user, with_historic):
+    if not enrollments:
+        return
+    with transaction.atomic():
+        exam_enrollment.bulk_update_scores_and_justifications(enrollments)
+        if with_historic:
+            exam_enrollment.bulk_create_exam_enrollment_historic(user, enrollments)
+    score_encoding_progress.invalidate_progress(enrollments)
 
 
 def assign_encoded_to_reencoded_enrollments(scores_encoding_list):
@@ -132,7 +171,7 @@ def assign_encoded_to_reencoded_enrollments(scores_encoding_list):
         enrollment = clean_score_and_justification(enrollment)
         enrollment.score_reencoded = enrollment.score_encoded
         enrollment.justification_reencoded = enrollment.justification_encoded
-        enrollment.full_clean()
+        enrollment.full_clean(exclude=EXCLUDED_FIELDS_FROM_VALIDATION)
         scores_encoding_list_assigned.append(enrollment)
 
     scores_encoding_list.enrollments = scores_encoding_list_assigned
@@ -140,21 +179,18 @@ def assign_encoded_to_reencoded_enrollments(scores_encoding_list):
 
 
 def update_enrollment(enrollment, user, is_program_manager=None):
-    if is_program_manager is None:
-        is_program_manager = program_manager.is_program_manager(user)
+    updated_enrollments, errors = bulk_update_enrollments([enrollment], user, is_program_manager)
+    if errors:
+        raise errors[0]
+    return updated_enrollments[0] if updated_enrollments else None
+
 
+def _get_enrollment_updated(enrollment, is_program_manager, resolver=None):
     enrollment = clean_score_and_justification(enrollment)
 
-    if can_modify_exam_enrollment(enrollment, is_program_manager) and \
+    if can_modify_exam_enrollment(enrollment, is_program_manager, resolver) and \
             is_enrollment_changed(enrollment, is_program_manager):
-
-        with transaction.atomic():
-            enrollment_updated = set_score_and_justification(enrollment, is_program_manager)
-
-            if is_program_manager:
-                exam_enrollment.create_exam_enrollment_historic(user, enrollment)
-
-            return enrollment_updated
+        return set_score_and_justification(enrollment, is_program_manager)
     return None
 
 
@@ -169,7 +205,7 @@ def clean_score_and_justification(enrollment):
     if enrollment.justification_encoded == exam_enrollment_justification_type.SCORE_MISSING:
         justification_clean = score_clean = None
 
-    enrollment_cleaned = copy.deepcopy(enrollment)
+    enrollment_cleaned = copy.copy(enrollment)
     enrollment_cleaned.score_encoded = score_clean
     enrollment_cleaned.justification_encoded = justification_clean
     return enrollment_cleaned
@@ -213,20 +249,21 @@ def is_enrollment_changed(enrollment, is_program_manager):
                (enrollment.score_draft != enrollment.score_encoded)
 
 
-def can_modify_exam_enrollment(enrollment, is_program_manager):
+def can_modify_exam_enrollment(enrollment, is_program_manager, resolver=None):
     if is_program_manager:
-        return not is_deadline_reached(enrollment)
+        return not is_deadline_reached(enrollment, resolver=resolver)
 
-    return not is_deadline_reached(enrollment, False) and \
+    return not is_deadline_reached(enrollment, False, resolver) and \
            not enrollment.score_final and not enrollment.justification_final and \
            enrollment.justification_encoded != exam_enrollment_justification_type.ABSENCE_JUSTIFIED
 
 
-def is_deadline_reached(enrollment, is_program_manager=True):
+def is_deadline_reached(enrollment, is_program_manager=True, resolver=None):
+    resolver = resolver or ScoreEncodingResolver()
     if is_program_manager:
-        return exam_enrollment.is_deadline_reached(enrollment)
+        return resolver.is_deadline_reached(enrollment)
     else:
-        return exam_enrollment.is_deadline_tutor_reached(enrollment)
+        return resolver.is_deadline_tutor_reached(enrollment)
 
 
 def set_score_and_justification(enrollment, is_program_manager):
@@ -239,8 +276,7 @@ def set_score_and_justification(enrollment, is_program_manager):
         enrollment.justification_final = enrollment.justification_encoded
 
     #Validation
-    enrollment.full_clean()
-    enrollment.save()
+    enrollment.full_clean(exclude=EXCLUDED_FIELDS_FROM_VALIDATION)
 
     return enrollment
 
@@ -251,6 +287,7 @@ class ScoresEncodingList:
         self.number_session = kwargs.get('number_session')
         self.learning_unit_year = kwargs.get('learning_unit_year')
         self.enrollments = kwargs.get('enrollments')
+        self.resolver = kwargs.get('resolver') or ScoreEncodingResolver()
 
     @property
     def progress_int(self):
@@ -269,6 +306,43 @@ class ScoresEncodingList:
         return list(filter(lambda e: e.is_final, self.enrollments))
 
 
+class ScoreEncodingResolver:
+    """
+    Resolve the deadlines and the deliberation dates needed by a score encoding request only once.
+    The session exam deadlines are memoized by (offer enrollment, number session) and the deliberation
+    dates by (number session, offer year), so a resolver must not outlive the request which created it.
+    """
+    def __init__(self):
+        self._session_exam_deadlines = {}
+        self._deliberation_dates = {}
+
+    def get_session_exam_deadline(self, enrollment):
+        key = (enrollment.learning_unit_enrollment.offer_enrollment_id, enrollment.session_exam.number_session)
+        if key not in self._session_exam_deadlines:
+            self._session_exam_deadlines[key] = exam_enrollment.get_session_exam_deadline(enrollment)
+        return self._session_exam_deadlines[key]
+
+    def get_deadline(self, enrollment):
+        exam_deadline = self.get_session_exam_deadline(enrollment)
+        if exam_deadline:
+            return exam_deadline.deadline_tutor_computed or exam_deadline.deadline
+        return None
+
+    def is_deadline_reached(self, enrollment):
+        exam_deadline = self.get_session_exam_deadline(enrollment)
+        return exam_deadline.is_deadline_reached if exam_deadline else False
+
+    def is_deadline_tutor_reached(self, enrollment):
+        exam_deadline = self.get_session_exam_deadline(enrollment)
+        return exam_deadline.is_deadline_tutor_reached if exam_deadline else False
+
+    def get_deliberation_date(self, number_session, off_year):
+        key = (number_session, off_year.id)
+        if key not in self._deliberation_dates:
+            self._deliberation_dates[key] = session_exam_calendar.find_deliberation_date(number_session, off_year)
+        return self._deliberation_dates[key]
+
+
 def sort_encodings(exam_enrollments):
     """
     Sort the list by
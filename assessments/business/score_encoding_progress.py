@@ -23,18 +23,103 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-from base.models import offer_year, exam_enrollment, tutor
+import logging
+
+from django.conf import settings
+
+from base.models import offer_year, exam_enrollment, tutor, program_manager
+from base.utils.cache import get_shared_cache
 from attribution.models import attribution
 
+PREFIX_PROGRESS_CACHE_KEY = 'score_encoding_progress'
+# The exam enrollments are also synchronized from outside OSIS: the timeout bounds the time to take them into account
+PROGRESS_CACHE_TIMEOUT = 300
 
-def get_scores_encoding_progress(user, offer_year_id, number_session, academic_year, learning_unit_year_ids=None):
-    queryset = exam_enrollment.get_progress_by_learning_unit_years_and_offer_years(user=user,
-                                                                                   offer_year_id=offer_year_id,
-                                                                                   session_exam_number=number_session,
-                                                                                   academic_year=academic_year,
-                                                                                   learning_unit_year_ids=learning_unit_year_ids)
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
 
-    return _sort_by_acronym([ScoreEncodingProgress(**row) for row in list(queryset)])
+
+def get_scores_encoding_progress(user, offer_year_id, number_session, academic_year, learning_unit_year_ids=None):
+    if program_manager.is_program_manager(user):
+        offer_year_ids = [getattr(offer_year_id, 'pk', offer_year_id)] if offer_year_id else \
+                         list(offer_year.find_by_user(user).values_list('id', flat=True))
+        rows = get_progress_rows_by_offer_years(offer_year_ids, number_session, academic_year)
+        if learning_unit_year_ids is not None:
+            learning_unit_year_ids = set(learning_unit_year_ids)
+            rows = [row for row in rows
+                    if row['learning_unit_enrollment__learning_unit_year'] in learning_unit_year_ids]
+    else:
+        rows = exam_enrollment.get_progress_by_learning_unit_years_and_offer_years(
+            user=user,
+            offer_year_id=offer_year_id,
+            session_exam_number=number_session,
+            academic_year=academic_year,
+            learning_unit_year_ids=learning_unit_year_ids
+        )
+
+    return _sort_by_acronym([ScoreEncodingProgress(**row) for row in list(rows)])
+
+
+def get_progress_rows_by_offer_years(offer_year_ids, number_session, academic_year):
+    """
+    Return the progress rows (see exam_enrollment.get_progress_by_offer_years) of the offer years.
+    The rows are kept in the shared cache by offer year and only the offer years missing in cache are aggregated.
+    Nothing is cached without a shared cache backend, since the invalidation would not reach the other workers.
+    """
+    keys_by_offer_year_id = {offer_year_id: _get_progress_cache_key(academic_year.id, number_session, offer_year_id)
+                             for offer_year_id in offer_year_ids}
+    rows_by_key = _get_many_from_cache(keys_by_offer_year_id.values())
+
+    missing_offer_year_ids = [offer_year_id for offer_year_id, key in keys_by_offer_year_id.items()
+                              if key not in rows_by_key]
+    if missing_offer_year_ids:
+        rows_computed = {keys_by_offer_year_id[offer_year_id]: [] for offer_year_id in missing_offer_year_ids}
+        for row in exam_enrollment.get_progress_by_offer_years(number_session, academic_year,
+                                                               missing_offer_year_ids):
+            key = keys_by_offer_year_id[row['learning_unit_enrollment__offer_enrollment__offer_year']]
+            rows_computed[key].append(row)
+        _set_many_in_cache(rows_computed)
+        rows_by_key.update(rows_computed)
+
+    return [row for key in keys_by_offer_year_id.values() for row in rows_by_key[key]]
+
+
+def invalidate_progress(enrollments):
+    """Remove from cache the progress of the offer years of the enrollments which have been saved"""
+    keys = {_get_progress_cache_key(enrollment.learning_unit_enrollment.learning_unit_year.academic_year_id,
+                                    enrollment.session_exam.number_session,
+                                    enrollment.learning_unit_enrollment.offer_enrollment.offer_year_id)
+            for enrollment in enrollments}
+    shared_cache = get_shared_cache()
+    if keys and shared_cache is not None:
+        try:
+            shared_cache.delete_many(list(keys))
+        except Exception:
+            logger.exception('An error occurred with cache system')
+
+
+def _get_progress_cache_key(academic_year_id, number_session, offer_year_id):
+    return "_".join([PREFIX_PROGRESS_CACHE_KEY, str(academic_year_id), str(number_session), str(offer_year_id)])
+
+
+def _get_many_from_cache(keys):
+    shared_cache = get_shared_cache()
+    if shared_cache is None:
+        return {}
+    try:
+        return shared_cache.get_many(list(keys))
+    except Exception:
+        logger.exception('An error occurred with cache system')
+        return {}
+
+
+def _set_many_in_cache(values_by_key):
+    shared_cache = get_shared_cache()
+    if shared_cache is None:
+        return
+    try:
+        shared_cache.set_many(values_by_key, timeout=PROGRESS_CACHE_TIMEOUT)
+    except Exception:
+        logger.exception('An error occurred with cache system')
 
 
 def find_related_offer_years(score_encoding_progress_list):
@@ -23,16 +23,33 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-from django.utils import timezone
+import hashlib
+import logging
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone, translation
 from django.utils.translation import ugettext as _
 from attribution.models import attribution
-from base.models import entity as entity_model, entity_version as entity_version, person_address, session_exam_calendar, offer_year_entity
-from base.models.exam_enrollment import justification_label_authorized, get_deadline
-from assessments.business.score_encoding_list import sort_encodings
+from base.models import entity as entity_model, entity_version as entity_version, person_address, offer_year_entity, \
+    exam_enrollment as exam_enrollment_model
+from base.models.exam_enrollment import justification_label_authorized
+from assessments.business.score_encoding_list import sort_encodings, ScoreEncodingResolver
 from assessments.models import score_sheet_address
 from assessments.models.enums.score_sheet_address_choices import *
 from base.business import entity_version as entity_version_business
 from base.models.enums.person_address_type import PersonAddressType
+from base.utils.cache import cache, get_generation, bump_generation
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+PREFIX_SCORES_SHEETS_CACHE_KEY = 'scores_sheets_data'
+SCORES_SHEETS_CACHE_TIMEOUT = 60
+# The parts of the scores sheets are invalidated by the changes of the exam enrollments, the deadlines,
+# the deliberation dates, the addresses and the attributions. The timeout bounds the staleness of the other data
+# (names of the students, entity addresses...).
+PREFIX_SCORES_SHEET_PART_CACHE_KEY = 'scores_sheet_part'
+SCORES_SHEET_PART_CACHE_TIMEOUT = 3600
 
 
 def get_score_sheet_address(off_year):
@@ -99,8 +116,46 @@ def get_entity_version_choices(offer_year):
     return set(entity_versions + [entity_version.get_last_version(ent.parent) for ent in entity_versions])
 
 
-def scores_sheet_data(exam_enrollments, tutor=None):
-    date_format = str(_('date_format'))
+def get_scores_sheet_data_by_tutor(tutor, number_session, academic_yr):
+    """
+    Return the scores sheets data of all the exam enrollments of the tutor, from a short-lived cache.
+    The cache key contains the last change of the exam enrollments, so an encoded score is visible immediately.
+    """
+    exam_enrollments = exam_enrollment_model.find_for_score_encodings(number_session, tutor=tutor,
+                                                                      academic_year=academic_yr)
+    last_changes = exam_enrollments.aggregate(last_changed=Max('changed'), count=Count('id'))
+    key = _get_scores_sheets_cache_key(tutor, number_session, academic_yr, last_changes)
+    data = _get_scores_sheets_from_cache(key)
+    if data is None:
+        data = scores_sheet_data(list(exam_enrollments), tutor=tutor)
+        _set_scores_sheets_in_cache(key, data)
+    return data
+
+
+def _get_scores_sheets_cache_key(tutor, number_session, academic_yr, last_changes):
+    last_changed = last_changes['last_changed'].isoformat() if last_changes['last_changed'] else ''
+    return "_".join([PREFIX_SCORES_SHEETS_CACHE_KEY, str(tutor.id), str(number_session), str(academic_yr.id),
+                     last_changed, str(last_changes['count'])])
+
+
+def _get_scores_sheets_from_cache(key):
+    try:
+        return cache.get(key)
+    except Exception:
+        logger.exception('An error occurred with cache system')
+        return None
+
+
+def _set_scores_sheets_in_cache(key, data):
+    try:
+        cache.set(key, data, timeout=SCORES_SHEETS_CACHE_TIMEOUT)
+    except Exception:
+        logger.exception('An error occurred with cache system')
+
+
+def scores_sheet_data(exam_enrollments, tutor=None, resolver=None):
+    resolver = resolver or ScoreEncodingResolver()
+    addresses_by_offer_year = {}
     exam_enrollments = sort_encodings(exam_enrollments)
     data = {'tutor_global_id': tutor.person.global_id if tutor else ''}
     now = timezone.now()
@@ -116,34 +171,14 @@ def scores_sheet_data(exam_enrollments, tutor=None):
     learning_unit_years = []
     for exam_enrollments in enrollments_by_learn_unit.values():
         # exam_enrollments contains all ExamEnrollment for a learningUnitYear
-        learn_unit_year_dict = {}
         # We can take the first element of the list 'exam_enrollments' to get the learning_unit_yr
         # because all exam_enrollments have the same learningUnitYear
         learning_unit_yr = exam_enrollments[0].session_exam.learning_unit_year
-        scores_responsible = attribution.find_responsible(learning_unit_yr.id)
-        scores_responsible_address = None
-        person = None
-        if scores_responsible:
-            person = scores_responsible.person
-            scores_responsible_address = person_address.get_by_label(scores_responsible.person,
-                                                                     PersonAddressType.PROFESSIONAL.value)
-
-        learn_unit_year_dict['academic_year'] = str(learning_unit_yr.academic_year)
-
-        learn_unit_year_dict['scores_responsible'] = {
-            'first_name': person.first_name if person and person.first_name else '',
-            'last_name': person.last_name if person and person.last_name else ''}
-
-        learn_unit_year_dict['scores_responsible']['address'] = {'location': scores_responsible_address.location
-                                                                 if scores_responsible_address else '',
-                                                                 'postal_code': scores_responsible_address.postal_code
-                                                                 if scores_responsible_address else '',
-                                                                 'city': scores_responsible_address.city
-                                                                 if scores_responsible_address else ''}
-        learn_unit_year_dict['session_number'] = exam_enrollments[0].session_exam.number_session
-        learn_unit_year_dict['acronym'] = learning_unit_yr.acronym
-        learn_unit_year_dict['title'] = learning_unit_yr.complete_title
-        learn_unit_year_dict['decimal_scores'] = learning_unit_yr.decimal_scores
+        number_session = exam_enrollments[0].session_exam.number_session
+        learn_unit_year_dict = _get_from_scores_sheet_cache(
+            _get_learning_unit_year_part_key(learning_unit_yr, number_session),
+            lambda: _get_learning_unit_year_part(learning_unit_yr, number_session)
+        )
 
         programs = []
 
@@ -157,51 +192,154 @@ def scores_sheet_data(exam_enrollments, tutor=None):
                 enrollments_by_program[key].append(exam_enroll)
 
         for list_enrollments in enrollments_by_program.values():  # exam_enrollments by OfferYear
-            exam_enrollment = list_enrollments[0]
-            off_year = exam_enrollment.learning_unit_enrollment.offer_enrollment.offer_year
-            number_session = exam_enrollment.session_exam.number_session
-            deliberation_date = session_exam_calendar.find_deliberation_date(number_session, off_year)
-            if deliberation_date:
-                deliberation_date = deliberation_date.strftime(date_format)
-            else:
-                deliberation_date = _('not_passed')
-
-            program = {'acronym': exam_enrollment.learning_unit_enrollment.offer_enrollment.offer_year.acronym,
-                       'deliberation_date': deliberation_date,
-                       'address': _get_serialized_address(off_year)}
-            enrollments = []
-            for exam_enrol in list_enrollments:
-                student = exam_enrol.learning_unit_enrollment.student
-                score = ''
-                if exam_enrol.score_final is not None:
-                    if learning_unit_yr.decimal_scores:
-                        score = str(exam_enrol.score_final)
-                    else:
-                        score = str(int(exam_enrol.score_final))
-
-                # Compute deadline score encoding
-                deadline = get_deadline(exam_enrol)
-                if deadline:
-                    deadline = deadline.strftime(date_format)
-
-                enrollments.append({
-                    "registration_id": student.registration_id,
-                    "last_name": student.person.last_name,
-                    "first_name": student.person.first_name,
-                    "score": score,
-                    "justification": _(exam_enrol.justification_final) if exam_enrol.justification_final else '',
-                    "deadline": deadline if deadline else ''
-                })
-            program['enrollments'] = enrollments
-            programs.append(program)
-            programs = sorted(programs, key=lambda k: k['acronym'])
-        learn_unit_year_dict['programs'] = programs
+            programs.append(_get_from_scores_sheet_cache(
+                _get_program_part_key(learning_unit_yr, list_enrollments),
+                lambda: _get_program_part(learning_unit_yr, list_enrollments, resolver, addresses_by_offer_year)
+            ))
+        learn_unit_year_dict['programs'] = sorted(programs, key=lambda k: k['acronym'])
         learning_unit_years.append(learn_unit_year_dict)
     learning_unit_years = sorted(learning_unit_years, key=lambda k: k['acronym'])
     data['learning_unit_years'] = learning_unit_years
     return data
 
 
+def _get_learning_unit_year_part(learning_unit_yr, number_session):
+    learn_unit_year_dict = {}
+    scores_responsible = attribution.find_responsible(learning_unit_yr.id)
+    scores_responsible_address = None
+    person = None
+    if scores_responsible:
+        person = scores_responsible.person
+        scores_responsible_address = person_address.get_by_label(scores_responsible.person,
+                                                                 PersonAddressType.PROFESSIONAL.value)
+
+    learn_unit_year_dict['academic_year'] = str(learning_unit_yr.academic_year)
+
+    learn_unit_year_dict['scores_responsible'] = {
+        'first_name': person.first_name if person and person.first_name else '',
+        'last_name': person.last_name if person and person.last_name else ''}
+
+    learn_unit_year_dict['scores_responsible']['address'] = {'location': scores_responsible_address.location
+                                                             if scores_responsible_address else '',
+                                                             'postal_code': scores_responsible_address.postal_code
+                                                             if scores_responsible_address else '',
+                                                             'city': scores_responsible_address.city
+                                                             if scores_responsible_address else ''}
+    learn_unit_year_dict['session_number'] = number_session
+    learn_unit_year_dict['acronym'] = learning_unit_yr.acronym
+    learn_unit_year_dict['title'] = learning_unit_yr.complete_title
+    learn_unit_year_dict['decimal_scores'] = learning_unit_yr.decimal_scores
+    return learn_unit_year_dict
+
+
+def _get_program_part(learning_unit_yr, list_enrollments, resolver, addresses_by_offer_year):
+    date_format = str(_('date_format'))
+    exam_enrollment = list_enrollments[0]
+    off_year = exam_enrollment.learning_unit_enrollment.offer_enrollment.offer_year
+    number_session = exam_enrollment.session_exam.number_session
+    deliberation_date = resolver.get_deliberation_date(number_session, off_year)
+    if deliberation_date:
+        deliberation_date = deliberation_date.strftime(date_format)
+    else:
+        deliberation_date = _('not_passed')
+
+    program = {'acronym': exam_enrollment.learning_unit_enrollment.offer_enrollment.offer_year.acronym,
+               'deliberation_date': deliberation_date,
+               'address': _get_serialized_address_once(off_year, addresses_by_offer_year)}
+    enrollments = []
+    for exam_enrol in list_enrollments:
+        student = exam_enrol.learning_unit_enrollment.student
+        score = ''
+        if exam_enrol.score_final is not None:
+            if learning_unit_yr.decimal_scores:
+                score = str(exam_enrol.score_final)
+            else:
+                score = str(int(exam_enrol.score_final))
+
+        # Compute deadline score encoding
+        deadline = resolver.get_deadline(exam_enrol)
+        if deadline:
+            deadline = deadline.strftime(date_format)
+
+        enrollments.append({
+            "registration_id": student.registration_id,
+            "last_name": student.person.last_name,
+            "first_name": student.person.first_name,
+            "score": score,
+            "justification": _(exam_enrol.justification_final) if exam_enrol.justification_final else '',
+            "deadline": deadline if deadline else ''
+        })
+    program['enrollments'] = enrollments
+    return program
+
+
+def _get_learning_unit_year_part_key(learning_unit_yr, number_session):
+    generation = get_generation(_get_learning_unit_year_namespace(learning_unit_yr.id))
+    if generation is None:
+        return None
+    return "_".join([PREFIX_SCORES_SHEET_PART_CACHE_KEY, 'learning_unit_year', str(learning_unit_yr.id),
+                     str(number_session), translation.get_language() or '', str(generation)])
+
+
+def _get_program_part_key(learning_unit_yr, list_enrollments):
+    """
+    The key contains the id and the last change of each exam enrollment, so that any encoded score
+    (or any enrollment added or removed) gives a new key.
+    """
+    exam_enrollment = list_enrollments[0]
+    off_year_id = exam_enrollment.learning_unit_enrollment.offer_enrollment.offer_year_id
+    generation = get_generation(_get_offer_year_namespace(off_year_id))
+    if generation is None:
+        return None
+    enrollments_changes = ";".join("{}:{}".format(enrollment.id, enrollment.changed.isoformat()
+                                                  if enrollment.changed else '')
+                                   for enrollment in sorted(list_enrollments, key=lambda e: e.id))
+    return "_".join([PREFIX_SCORES_SHEET_PART_CACHE_KEY, 'program', str(learning_unit_yr.id), str(off_year_id),
+                     str(exam_enrollment.session_exam.number_session), translation.get_language() or '',
+                     str(generation), hashlib.md5(enrollments_changes.encode()).hexdigest()])
+
+
+def _get_from_scores_sheet_cache(key, compute):
+    if key is None:
+        return compute()
+    try:
+        part = cache.get(key)
+    except Exception:
+        logger.exception('An error occurred with cache system')
+        return compute()
+    if part is None:
+        part = compute()
+        try:
+            cache.set(key, part, timeout=SCORES_SHEET_PART_CACHE_TIMEOUT)
+        except Exception:
+            logger.exception('An error occurred with cache system')
+    return part
+
+
+def invalidate_scores_sheets_of_offer_years(offer_year_ids):
+    for offer_year_id in set(offer_year_ids):
+        bump_generation(_get_offer_year_namespace(offer_year_id))
+
+
+def invalidate_scores_sheets_of_learning_unit_years(learning_unit_year_ids):
+    for learning_unit_year_id in set(learning_unit_year_ids):
+        bump_generation(_get_learning_unit_year_namespace(learning_unit_year_id))
+
+
+def _get_offer_year_namespace(offer_year_id):
+    return "scores_sheet_offer_year_{}".format(offer_year_id)
+
+
+def _get_learning_unit_year_namespace(learning_unit_year_id):
+    return "scores_sheet_learning_unit_year_{}".format(learning_unit_year_id)
+
+
+def _get_serialized_address_once(off_year, addresses_by_offer_year):
+    if off_year.id not in addresses_by_offer_year:
+        addresses_by_offer_year[off_year.id] = _get_serialized_address(off_year)
+    return addresses_by_offer_year[off_year.id]
+
+
 def _get_serialized_address(off_year):
     address = get_score_sheet_address(off_year)['address']
     country = address.get('country')
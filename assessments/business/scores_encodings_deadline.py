@@ -27,7 +27,8 @@ import datetime
 import logging
 from django.conf import settings
 
-from base.models import session_exam_calendar, offer_year_calendar
+from assessments.business import score_encoding_sheet
+from base.models import session_exam_calendar, offer_year_calendar, session_exam_deadline
 from base.models.enums import academic_calendar_type as ac_type
 from base.models.session_exam_deadline import SessionExamDeadline
 
@@ -35,10 +36,59 @@ from base.models.session_exam_deadline import SessionExamDeadline
 logger = logging.getLogger(settings.DEFAULT_LOGGER)
 
 
-def recompute_all_deadlines(academic_calendar):
-    if academic_calendar.reference == ac_type.SCORES_EXAM_SUBMISSION:
-        for off_year_cal in academic_calendar.offeryearcalendar_set.all():
-            compute_deadline(off_year_cal)
+def recompute_all_deadlines(academic_calendar, dry_run=False):
+    """
+    Recompute the deadlines of all the students impacted by a scores exam submission calendar.
+    The calendars and the session exam deadlines are loaded in one pass, the new deadlines are computed
+    in memory and only the changed ones are saved with bulk updates.
+    Return the number of deadlines changed (or which would be changed in dry run mode).
+    """
+    if academic_calendar.reference != ac_type.SCORES_EXAM_SUBMISSION:
+        return 0
+
+    number_session = session_exam_calendar.get_number_session_by_academic_calendar(academic_calendar)
+    if not number_session:
+        _log_missing_number_session(academic_calendar)
+        return 0
+
+    oycs_scores_exam_submission = list(academic_calendar.offeryearcalendar_set.select_related('offer_year'))
+    offer_year_ids = {oyc.offer_year_id for oyc in oycs_scores_exam_submission}
+    oycs_deliberation = _get_oycs_by_offer_year_and_education_group_year(
+        offer_year_calendar.search(offer_year_ids=offer_year_ids,
+                                   academic_calendar_reference=ac_type.DELIBERATION,
+                                   number_session=number_session)
+    )
+
+    end_dates_by_offer_year = {}
+    for oyc_scores_exam_submission in oycs_scores_exam_submission:
+        oyc_deliberation = oycs_deliberation.get((oyc_scores_exam_submission.offer_year_id,
+                                                  oyc_scores_exam_submission.education_group_year_id))
+        if not oyc_deliberation:
+            _log_missing_oyc(ac_type.DELIBERATION, oyc_scores_exam_submission.offer_year)
+        end_dates_by_offer_year[oyc_scores_exam_submission.offer_year_id] = (
+            academic_calendar.end_date,
+            _one_day_before_deliberation_date(oyc_deliberation),
+            _get_end_date_value(oyc_scores_exam_submission)
+        )
+
+    sessions_exam_deadlines_by_offer_year = {}
+    for sess_exam_deadline in session_exam_deadline.find_by_offer_years_and_nb_session(offer_year_ids,
+                                                                                       number_session):
+        sessions_exam_deadlines_by_offer_year.setdefault(sess_exam_deadline.offer_year_id, [])\
+                                             .append(sess_exam_deadline)
+
+    new_deadlines = []
+    offer_year_ids_changed = []
+    for offer_year_id, end_dates in end_dates_by_offer_year.items():
+        new_deadlines_of_offer_year = _get_new_deadlines(sessions_exam_deadlines_by_offer_year.get(offer_year_id, []),
+                                                         *end_dates)
+        if new_deadlines_of_offer_year:
+            new_deadlines.extend(new_deadlines_of_offer_year)
+            offer_year_ids_changed.append(offer_year_id)
+    nb_changed = _save_new_deadlines(new_deadlines, dry_run=dry_run)
+    if not dry_run:
+        score_encoding_sheet.invalidate_scores_sheets_of_offer_years(offer_year_ids_changed)
+    return nb_changed
 
 
 def compute_deadline_by_student(session_exam_deadline):
@@ -55,9 +105,9 @@ def compute_deadline_by_student(session_exam_deadline):
                                   session_exam_deadline.number_session))
 
 
-def compute_deadline(off_year_calendar, session_exam_deadlines=None):
+def compute_deadline(off_year_calendar, session_exam_deadlines=None, dry_run=False):
     if not _impact_scores_encodings_deadlines(off_year_calendar):
-        return
+        return 0
 
     oyc_deliberation = _find_by_reference(off_year_calendar, ac_type.DELIBERATION)
     oyc_scores_exam_submission = _find_by_reference(off_year_calendar, ac_type.SCORES_EXAM_SUBMISSION)
@@ -69,7 +119,12 @@ def compute_deadline(off_year_calendar, session_exam_deadlines=None):
     if session_exam_deadlines is None:
         session_exam_deadlines = _get_list_sessions_exam_deadlines(off_year_calendar.academic_calendar,
                                                                    off_year_calendar.offer_year)
-    _save_new_deadlines(session_exam_deadlines, end_date_academic, end_date_offer_year, tutor_submission_date)
+    new_deadlines = _get_new_deadlines(session_exam_deadlines, end_date_academic, end_date_offer_year,
+                                       tutor_submission_date)
+    nb_changed = _save_new_deadlines(new_deadlines, dry_run=dry_run)
+    if nb_changed and not dry_run:
+        score_encoding_sheet.invalidate_scores_sheets_of_offer_years([off_year_calendar.offer_year_id])
+    return nb_changed
 
 
 def _get_end_date_value(off_year_cal):
@@ -89,7 +144,8 @@ def _impact_scores_encodings_deadlines(oyc):
     return oyc.academic_calendar.reference in (ac_type.DELIBERATION, ac_type.SCORES_EXAM_SUBMISSION)
 
 
-def _save_new_deadlines(sessions_exam_deadlines, end_date_academic, end_date_offer_year, tutor_submission_date):
+def _get_new_deadlines(sessions_exam_deadlines, end_date_academic, end_date_offer_year, tutor_submission_date):
+    new_deadlines = []
     for sess_exam_deadline in sessions_exam_deadlines:
         end_date_student = _one_day_before(sess_exam_deadline.deliberation_date)
 
@@ -99,9 +155,20 @@ def _save_new_deadlines(sessions_exam_deadlines, end_date_academic, end_date_off
         new_deadline_tutor = _compute_delta_deadline_tutor(new_deadline, tutor_submission_date)
 
         if _is_deadline_changed(sess_exam_deadline, new_deadline, new_deadline_tutor):
-            sess_exam_deadline.deadline = new_deadline
-            sess_exam_deadline.deadline_tutor = new_deadline_tutor
-            sess_exam_deadline.save()
+            new_deadlines.append((sess_exam_deadline, new_deadline, new_deadline_tutor))
+    return new_deadlines
+
+
+def _save_new_deadlines(new_deadlines, dry_run=False):
+    if dry_run:
+        logger.info("{} session exam deadline(s) would be changed".format(len(new_deadlines)))
+        return len(new_deadlines)
+
+    for sess_exam_deadline, new_deadline, new_deadline_tutor in new_deadlines:
+        sess_exam_deadline.deadline = new_deadline
+        sess_exam_deadline.deadline_tutor = new_deadline_tutor
+    session_exam_deadline.bulk_update_deadlines([sess_exam_deadline for sess_exam_deadline, _, _ in new_deadlines])
+    return len(new_deadlines)
 
 
 def _is_deadline_changed(sess_exam_deadline, new_deadline, new_deadline_tutor):
@@ -114,16 +181,20 @@ def _find_by_reference(off_year_calendar, reference):
     else:
         result = _get_oyc_by_reference(off_year_calendar, reference)
     if not result:
-        msg = "No OfferYearCalendar '{}' found for offerYear = {}"
-        logger.warning(msg.format(ac_type.DELIBERATION, off_year_calendar.offer_year.acronym))
+        _log_missing_oyc(ac_type.DELIBERATION, off_year_calendar.offer_year)
     return result
 
 
+def _log_missing_oyc(reference, offer_year):
+    msg = "No OfferYearCalendar '{}' found for offerYear = {}"
+    logger.warning(msg.format(reference, offer_year.acronym))
+
+
 def _get_oyc_by_reference(off_year_calendar, reference):
     number_session = session_exam_calendar.get_number_session_by_academic_calendar(off_year_calendar.academic_calendar)
     if number_session:
         try:
-            return offer_year_calendar.search(education_group_year=off_year_calendar.education_group_year,
+            return offer_year_calendar.search(education_group_year_id=off_year_calendar.education_group_year_id,
                                               offer_year=off_year_calendar.offer_year,
                                               academic_calendar_reference=reference,
                                               number_session=number_session).get()
@@ -138,11 +209,19 @@ def _get_list_sessions_exam_deadlines(academic_calendar, offer_year):
         session_exam_deadlines = SessionExamDeadline.objects.filter(
             offer_enrollment__offer_year=offer_year, number_session=number_session)
     else:
-        msg = "No SessionExamCalendar (number session) found for academic calendar = {}"
-        logger.warning(msg.format(academic_calendar.title))
+        _log_missing_number_session(academic_calendar)
     return session_exam_deadlines
 
 
+def _log_missing_number_session(academic_calendar):
+    msg = "No SessionExamCalendar (number session) found for academic calendar = {}"
+    logger.warning(msg.format(academic_calendar.title))
+
+
+def _get_oycs_by_offer_year_and_education_group_year(offer_year_calendars):
+    return {(oyc.offer_year_id, oyc.education_group_year_id): oyc for oyc in offer_year_calendars}
+
+
 def _one_day_before_deliberation_date(oyc):
     return _one_day_before(oyc.end_date) if oyc and oyc.end_date else None
 
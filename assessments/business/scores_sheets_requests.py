@@ -0,0 +1,169 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pika
+import pika.exceptions
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+ACKNOWLEDGEMENT_INTERVAL = 0.5  # seconds
+RECONNECTION_DELAY = 5  # seconds
+CONNECTION_ERRORS = (pika.exceptions.AMQPConnectionError, pika.exceptions.ChannelClosed)
+
+
+class ScoresSheetsRequestsPool:
+    """
+    Process the requests of scores sheets coming from the portal with a bounded pool of workers.
+    At most max_workers + max_pending requests are accepted at the same time: beyond, submit() blocks until a
+    request is processed, so that the requests stay in the queue of the QueueServer instead of piling up in memory.
+    The requests for a tutor whose computation has not started yet are coalesced: the scores sheets are computed
+    once and the result is sent back for each request. A request arriving once the computation has started is
+    computed again, to not send back scores sheets older than the request.
+    :param compute: Function computing the scores sheets data of a tutor global id
+    :param respond: Function sending back the scores sheets data, called with the global id and the data
+    """
+    def __init__(self, compute, respond, max_workers, max_pending=None):
+        self.compute = compute
+        self.respond = respond
+        self.max_requests = max_workers + (max_workers if max_pending is None else max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._requests_slots = threading.BoundedSemaphore(self.max_requests)
+        self._futures_in_flight = {}
+        self._lock = threading.RLock()
+
+    def submit(self, global_id, on_done=None):
+        """
+        :param on_done: Function called with True once the response is sent, or with False if the request failed
+        """
+        self._requests_slots.acquire()
+        try:
+            with self._lock:
+                future = self._futures_in_flight.get(global_id)
+                if future is None or future.running() or future.done():
+                    future = self._executor.submit(self._compute, global_id)
+                    self._futures_in_flight[global_id] = future
+                    future.add_done_callback(lambda f: self._forget(global_id, f))
+        except Exception:
+            self._requests_slots.release()
+            raise
+        future.add_done_callback(lambda f: self._respond(global_id, f, on_done))
+        return future
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _compute(self, global_id):
+        # The workers are not request threads: the database connections are not closed by Django for them
+        close_old_connections()
+        try:
+            return self.compute(global_id)
+        finally:
+            close_old_connections()
+
+    def _forget(self, global_id, future):
+        with self._lock:
+            if self._futures_in_flight.get(global_id) is future:
+                del self._futures_in_flight[global_id]
+
+    def _respond(self, global_id, future, on_done):
+        try:
+            self.respond(global_id, future.result())
+            succeeded = True
+        except Exception:
+            logger.exception('Could not process the scores sheets request for global_id {}'.format(global_id))
+            succeeded = False
+        finally:
+            self._requests_slots.release()
+        if on_done:
+            on_done(succeeded)
+
+
+class ScoresSheetsRequestsConsumer(threading.Thread):
+    """
+    Consume the scores sheets requests of a queue and hand them to a ScoresSheetsRequestsPool.
+    A request is acknowledged only once its response is sent, so that the requests being processed are delivered
+    again if the process stops. A failed request is put back in the queue once, and dropped if it fails again.
+    A pika BlockingConnection is not thread-safe: the workers report the processed requests through a queue and
+    the acknowledgements are sent by the consumer thread.
+    """
+    def __init__(self, queue_name, pool, connection_parameters):
+        super().__init__(daemon=True)
+        self.queue_name = queue_name
+        self.pool = pool
+        self.connection_parameters = connection_parameters
+        self._processed_requests = queue.Queue()
+
+    def run(self):
+        while True:
+            try:
+                self._consume()
+            except CONNECTION_ERRORS:
+                logger.exception('Connection to the QueueServer lost while consuming {}, reconnecting...'
+                                 .format(self.queue_name))
+            time.sleep(RECONNECTION_DELAY)
+
+    def _consume(self):
+        connection = pika.BlockingConnection(self.connection_parameters)
+        try:
+            channel = connection.channel()
+            channel.queue_declare(queue=self.queue_name, durable=True)
+            channel.basic_qos(prefetch_count=self.pool.max_requests)
+            channel.basic_consume(self._on_message, queue=self.queue_name)
+            while channel.is_open:
+                connection.process_data_events(time_limit=ACKNOWLEDGEMENT_INTERVAL)
+                self._acknowledge_processed_requests(channel)
+        finally:
+            if connection.is_open:
+                connection.close()
+
+    def _on_message(self, channel, method, properties, body):
+        global_id = body.decode('utf-8') if isinstance(body, bytes) else body
+
+        def on_done(succeeded):
+            self._processed_requests.put((channel, method.delivery_tag, method.redelivered, succeeded))
+
+        self.pool.submit(global_id, on_done=on_done)
+
+    def _acknowledge_processed_requests(self, channel):
+        while True:
+            try:
+                request_channel, delivery_tag, redelivered, succeeded = self._processed_requests.get_nowait()
+            except queue.Empty:
+                return
+            if request_channel is not channel:
+                # Received on a lost connection: the QueueServer delivers the request again
+                continue
+            if succeeded:
+                channel.basic_ack(delivery_tag=delivery_tag)
+            else:
+                channel.basic_nack(delivery_tag=delivery_tag, requeue=not redelivered)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+from django.core.management.base import BaseCommand
+
+from assessments.business import scores_encodings_deadline
+from base.models.academic_calendar import AcademicCalendar
+
+
+class Command(BaseCommand):
+    help = 'Recompute the scores encodings deadlines of the students for the given academic calendars'
+
+    def add_arguments(self, parser):
+        parser.add_argument('academic_calendar_ids', nargs='+', type=int)
+        parser.add_argument('--dry-run', action='store_true', dest='dry_run', default=False,
+                            help='Only report how many deadlines would be changed')
+
+    def handle(self, *args, **options):
+        for academic_calendar in AcademicCalendar.objects.filter(pk__in=options['academic_calendar_ids']):
+            nb_changed = scores_encodings_deadline.recompute_all_deadlines(academic_calendar,
+                                                                           dry_run=options['dry_run'])
+            msg = "{} : {} deadline(s) {}"
+            self.stdout.write(msg.format(academic_calendar, nb_changed,
+                                         'would be changed' if options['dry_run'] else 'changed'))
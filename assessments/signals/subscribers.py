@@ -23,9 +23,16 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from assessments.business import scores_encodings_deadline
+from assessments.business import scores_encodings_deadline, score_encoding_sheet
+from assessments.models.score_sheet_address import ScoreSheetAddress
+from attribution.models import attribution
+from attribution.models.attribution import Attribution
+from base.models.offer_year_calendar import OfferYearCalendar
+from base.models.person_address import PersonAddress
+from base.models.session_exam_deadline import SessionExamDeadline
 from base.signals import publisher
 
 
@@ -42,3 +49,29 @@ def compute_student_score_encoding_deadline(sender, **kwargs):
 @receiver(publisher.compute_all_scores_encodings_deadlines)
 def compute_all_scores_encodings_deadlines(sender, **kwargs):
     scores_encodings_deadline.recompute_all_deadlines(kwargs['academic_calendar'])
+
+
+@receiver(post_save, sender=ScoreSheetAddress)
+@receiver(post_delete, sender=ScoreSheetAddress)
+@receiver(post_save, sender=OfferYearCalendar)
+@receiver(post_delete, sender=OfferYearCalendar)
+def invalidate_scores_sheets_of_offer_year(sender, instance, **kwargs):
+    score_encoding_sheet.invalidate_scores_sheets_of_offer_years([instance.offer_year_id])
+
+
+@receiver(post_save, sender=SessionExamDeadline)
+def invalidate_scores_sheets_of_session_exam_deadline(sender, instance, **kwargs):
+    score_encoding_sheet.invalidate_scores_sheets_of_offer_years([instance.offer_enrollment.offer_year_id])
+
+
+@receiver(post_save, sender=Attribution)
+@receiver(post_delete, sender=Attribution)
+def invalidate_scores_sheets_of_attribution(sender, instance, **kwargs):
+    score_encoding_sheet.invalidate_scores_sheets_of_learning_unit_years([instance.learning_unit_year_id])
+
+
+@receiver(post_save, sender=PersonAddress)
+@receiver(post_delete, sender=PersonAddress)
+def invalidate_scores_sheets_of_scores_responsible_address(sender, instance, **kwargs):
+    learning_unit_year_ids = attribution.find_learning_unit_year_ids_of_scores_responsible(instance.person_id)
+    score_encoding_sheet.invalidate_scores_sheets_of_learning_unit_years(learning_unit_year_ids)
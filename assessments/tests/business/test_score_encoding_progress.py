@@ -25,10 +25,12 @@
 ##############################################################################
 import datetime
 from random import randint
+from unittest import mock
 
 from django.test import TestCase
 
 from assessments.business import score_encoding_progress
+from base.models import exam_enrollment
 from base.models.enums import number_session, academic_calendar_type
 from base.tests.factories.person import PersonFactory
 from base.tests.models import test_exam_enrollment, test_offer_enrollment, test_learning_unit_enrollment
@@ -44,6 +46,7 @@ from base.tests.factories.offer_year_calendar import OfferYearCalendarFactory
 from base.tests.factories.student import StudentFactory
 from base.tests.factories.program_manager import ProgramManagerFactory
 from base.tests.factories.tutor import TutorFactory
+from base.tests.utils.shared_cache import override_shared_cache, override_local_cache
 
 
 class ScoreEncodingProgressTest(TestCase):
@@ -217,6 +220,47 @@ class ScoreEncodingProgressTest(TestCase):
         # CHIM1BA - LBIR1210 (10) + DIR1BA - LBIR1210(8)
         self.assertEqual(progress_list[0].total_exam_enrollments, 18)
 
+    @override_shared_cache()
+    def test_get_scores_encoding_progress_program_manager_kept_in_cache(self):
+        with mock.patch('base.models.exam_enrollment.get_progress_by_offer_years',
+                        wraps=exam_enrollment.get_progress_by_offer_years) as mock_get_progress:
+            for _ in range(2):
+                progress_list = score_encoding_progress.get_scores_encoding_progress(
+                    user=self.program_manager.person.user,
+                    offer_year_id=self.offer_year_2,
+                    number_session=number_session.ONE,
+                    academic_year=self.academic_year
+                )
+                self.assertEqual(progress_list[0].total_exam_enrollments, 8)
+            self.assertEqual(mock_get_progress.call_count, 1)
+
+    @override_local_cache()
+    def test_get_scores_encoding_progress_not_cached_without_shared_cache(self):
+        with mock.patch('base.models.exam_enrollment.get_progress_by_offer_years',
+                        wraps=exam_enrollment.get_progress_by_offer_years) as mock_get_progress:
+            for _ in range(2):
+                score_encoding_progress.get_scores_encoding_progress(
+                    user=self.program_manager.person.user,
+                    offer_year_id=self.offer_year_2,
+                    number_session=number_session.ONE,
+                    academic_year=self.academic_year
+                )
+            self.assertEqual(mock_get_progress.call_count, 2)
+
+    @override_shared_cache()
+    def test_invalidate_progress(self):
+        enrollments = list(exam_enrollment.find_for_score_encodings(number_session.ONE,
+                                                                    offer_year_id=self.offer_year_2.id,
+                                                                    academic_year=self.academic_year))
+        with mock.patch('base.models.exam_enrollment.get_progress_by_offer_years',
+                        wraps=exam_enrollment.get_progress_by_offer_years) as mock_get_progress:
+            score_encoding_progress.get_progress_rows_by_offer_years([self.offer_year_2.id], number_session.ONE,
+                                                                     self.academic_year)
+            score_encoding_progress.invalidate_progress(enrollments[:1])
+            score_encoding_progress.get_progress_rows_by_offer_years([self.offer_year_2.id], number_session.ONE,
+                                                                     self.academic_year)
+            self.assertEqual(mock_get_progress.call_count, 2)
+
     def _create_context_exam_enrollments(self, learning_unit_year, offer_year, nb_enrollment=10, nb_filled=None):
         counter_filled = nb_filled if (nb_filled and nb_filled <= nb_enrollment) else nb_enrollment
         session_exam = SessionExamFactory(number_session=number_session.ONE, learning_unit_year=learning_unit_year)
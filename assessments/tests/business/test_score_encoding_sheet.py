@@ -24,6 +24,7 @@
 #
 ##############################################################################
 import datetime
+from unittest import mock
 
 from django.test import TestCase
 from django.utils import timezone
@@ -32,6 +33,9 @@ from assessments.models.enums import score_sheet_address_choices
 from assessments.tests.factories.score_sheet_address import ScoreSheetAddressFactory
 from attribution.tests.factories.attribution import AttributionFactory
 from base.models.exam_enrollment import ExamEnrollment
+from base.models.person_address import PersonAddress
+from base.models.offer_enrollment import OfferEnrollment
+from base.models.tutor import Tutor
 
 from base.tests.factories.academic_year import AcademicYearFactory
 from base.tests.factories.education_group_year import EducationGroupYearFactory
@@ -48,6 +52,7 @@ from base.tests.factories.person_address import PersonAddressFactory
 from base.tests.factories.session_examen import SessionExamFactory
 from base.tests.factories.student import StudentFactory
 from base.tests.factories.tutor import TutorFactory
+from base.tests.utils.shared_cache import override_shared_cache
 from reference.tests.factories.country import CountryFactory
 
 
@@ -168,6 +173,68 @@ class ScoreSheetDataTest(TestCase):
         self.assertEqual(score_responsible['last_name'], "Durant")
         self.assertEqual(score_responsible['address']['city'], "Louvain-la-neuve")
 
+    @mock.patch('base.models.session_exam_calendar.find_deliberation_date', return_value=None)
+    def test_scores_sheet_data_resolve_address_and_deliberation_date_once_by_offer_year(self,
+                                                                                        mock_find_deliberation_date):
+        other_learning_unit_year = LearningUnitYearFactory(academic_year=self.academic_year, acronym="LBIR1200")
+        other_session_exam = SessionExamFactory(number_session=1, learning_unit_year=other_learning_unit_year)
+        for offer_enrollment in OfferEnrollment.objects.filter(offer_year=self.offer_year):
+            l_unit_enrollment = LearningUnitEnrollmentFactory(offer_enrollment=offer_enrollment,
+                                                              learning_unit_year=other_learning_unit_year)
+            ExamEnrollmentFactory(learning_unit_enrollment=l_unit_enrollment, session_exam=other_session_exam)
+
+        with mock.patch('assessments.business.score_encoding_sheet._get_serialized_address',
+                        wraps=score_encoding_sheet._get_serialized_address) as mock_get_serialized_address:
+            data_computed = score_encoding_sheet.scores_sheet_data(ExamEnrollment.objects.all())
+
+        self.assertEqual(len(data_computed['learning_unit_years']), 2)
+        self.assertEqual(mock_get_serialized_address.call_count, 1)
+        self.assertEqual(mock_find_deliberation_date.call_count, 1)
+
+    def test_get_scores_sheet_data_by_tutor_from_cache_until_a_score_changes(self):
+        tutor = Tutor.objects.get(person__last_name='Durant')
+        with mock.patch('assessments.business.score_encoding_sheet.scores_sheet_data',
+                        wraps=score_encoding_sheet.scores_sheet_data) as mock_scores_sheet_data:
+            data = score_encoding_sheet.get_scores_sheet_data_by_tutor(tutor, 1, self.academic_year)
+            self.assertEqual(len(data['learning_unit_years']), 1)
+            self.assertEqual(score_encoding_sheet.get_scores_sheet_data_by_tutor(tutor, 1, self.academic_year), data)
+            self.assertEqual(mock_scores_sheet_data.call_count, 1)
+
+            ExamEnrollment.objects.first().save()
+            score_encoding_sheet.get_scores_sheet_data_by_tutor(tutor, 1, self.academic_year)
+            self.assertEqual(mock_scores_sheet_data.call_count, 2)
+
+    @override_shared_cache()
+    def test_scores_sheet_data_parts_served_from_cache_until_a_change(self):
+        with mock.patch('assessments.business.score_encoding_sheet._get_program_part',
+                        wraps=score_encoding_sheet._get_program_part) as mock_get_program_part, \
+                mock.patch('assessments.business.score_encoding_sheet._get_learning_unit_year_part',
+                           wraps=score_encoding_sheet._get_learning_unit_year_part) as mock_get_learning_unit_part:
+            data = score_encoding_sheet.scores_sheet_data(ExamEnrollment.objects.all())
+            data_from_cache = score_encoding_sheet.scores_sheet_data(ExamEnrollment.objects.all())
+            self.assertEqual(data_from_cache['learning_unit_years'], data['learning_unit_years'])
+            self.assertEqual(mock_get_program_part.call_count, 1)
+            self.assertEqual(mock_get_learning_unit_part.call_count, 1)
+
+            ExamEnrollment.objects.first().save()
+            score_encoding_sheet.scores_sheet_data(ExamEnrollment.objects.all())
+            self.assertEqual(mock_get_program_part.call_count, 2)
+
+            ScoreSheetAddressFactory(offer_year=self.offer_year)
+            score_encoding_sheet.scores_sheet_data(ExamEnrollment.objects.all())
+            self.assertEqual(mock_get_program_part.call_count, 3)
+            self.assertEqual(mock_get_learning_unit_part.call_count, 1)
+
+    @override_shared_cache()
+    def test_scores_sheet_data_invalidated_when_scores_responsible_address_changes(self):
+        score_encoding_sheet.scores_sheet_data(ExamEnrollment.objects.all())
+        address = PersonAddress.objects.get(person__last_name='Durant', label='PROFESSIONAL')
+        address.city = 'Namur'
+        address.save()
+
+        data = score_encoding_sheet.scores_sheet_data(ExamEnrollment.objects.all())
+        self.assertEqual(data['learning_unit_years'][0]['scores_responsible']['address']['city'], 'Namur')
+
 
 def _create_attribution(learning_unit_year, person, is_score_responsible=False):
     # Create tutor
@@ -29,6 +29,7 @@ from django.test import TestCase
 from unittest import mock
 
 from assessments.business import scores_encodings_deadline
+from base.models.offer_year_calendar import OfferYearCalendar
 from base.models.session_exam_deadline import SessionExamDeadline
 from base.tests.factories.academic_calendar import AcademicCalendarFactory
 from base.tests.factories.academic_year import AcademicYearFactory
@@ -291,3 +292,68 @@ class ComputeScoresEncodingsDeadlinesTest(TestCase):
             academic_calendar=AcademicCalendarFactory(reference=academic_calendar_type.SCORES_EXAM_SUBMISSION)
         )
         self.assertTrue(mock_compute_deadline.called)
+
+    def _change_offer_year_deliberation_date_without_signal(self, new_end_date):
+        OfferYearCalendar.objects.filter(pk=self.offer_year_calendar_deliberation.pk).update(end_date=new_end_date)
+
+    def test_recompute_all_deadlines(self):
+        self._create_tutor_scores_submission_end_date(self.academic_calendar_deliberation.end_date)
+        new_offer_year_delibe_date = self.offer_year_calendar_deliberation.end_date - timedelta(days=5)
+        self._change_offer_year_deliberation_date_without_signal(new_offer_year_delibe_date)
+
+        nb_changed = scores_encodings_deadline.recompute_all_deadlines(self.ac_score_exam_submission)
+
+        self.assertEqual(nb_changed, 1)
+        self._assert_date_equal(self._get_persistent_session_exam_deadline().deadline,
+                                scores_encodings_deadline._one_day_before(new_offer_year_delibe_date))
+
+    def test_recompute_all_deadlines_dry_run(self):
+        self._create_tutor_scores_submission_end_date(self.academic_calendar_deliberation.end_date)
+        old_deadline = self._get_persistent_session_exam_deadline().deadline
+        new_offer_year_delibe_date = self.offer_year_calendar_deliberation.end_date - timedelta(days=5)
+        self._change_offer_year_deliberation_date_without_signal(new_offer_year_delibe_date)
+
+        nb_changed = scores_encodings_deadline.recompute_all_deadlines(self.ac_score_exam_submission, dry_run=True)
+
+        self.assertEqual(nb_changed, 1)
+        self._assert_date_equal(self._get_persistent_session_exam_deadline().deadline, old_deadline)
+
+    def test_recompute_all_deadlines_when_nothing_changed(self):
+        self._create_tutor_scores_submission_end_date(self.academic_calendar_deliberation.end_date)
+        self.assertEqual(scores_encodings_deadline.recompute_all_deadlines(self.ac_score_exam_submission), 0)
+
+    def test_recompute_all_deadlines_wrong_reference(self):
+        self.assertEqual(scores_encodings_deadline.recompute_all_deadlines(self.academic_calendar_deliberation), 0)
+
+    def _reset_session_exam_deadline_without_signal(self):
+        SessionExamDeadline.objects.filter(pk=self.sess_exam_dealine.pk).update(
+            deadline=self.sess_exam_dealine.deadline,
+            deadline_tutor=self.sess_exam_dealine.deadline_tutor
+        )
+
+    def test_recompute_all_deadlines_same_result_as_compute_deadline(self):
+        oyc_scores_exam_submission = self._create_tutor_scores_submission_end_date(
+            self.academic_calendar_deliberation.end_date
+        )
+        OfferYearCalendarFactory(
+            academic_calendar=self.academic_calendar_deliberation,
+            offer_year=self.off_year,
+            start_date=self.academic_calendar_deliberation.start_date,
+            end_date=self.academic_calendar_deliberation.end_date - timedelta(days=10),
+            education_group_year=EducationGroupYearFactory()
+        )
+        new_offer_year_delibe_date = self.offer_year_calendar_deliberation.end_date - timedelta(days=5)
+        self._change_offer_year_deliberation_date_without_signal(new_offer_year_delibe_date)
+
+        self._reset_session_exam_deadline_without_signal()
+        scores_encodings_deadline.recompute_all_deadlines(self.ac_score_exam_submission)
+        deadline_batch = self._get_persistent_session_exam_deadline()
+
+        self._reset_session_exam_deadline_without_signal()
+        scores_encodings_deadline.compute_deadline(OfferYearCalendar.objects.get(pk=oyc_scores_exam_submission.pk))
+        deadline_single = self._get_persistent_session_exam_deadline()
+
+        self._assert_date_equal(deadline_batch.deadline,
+                                scores_encodings_deadline._one_day_before(new_offer_year_delibe_date))
+        self._assert_date_equal(deadline_single.deadline, deadline_batch.deadline)
+        self.assertEqual(deadline_single.deadline_tutor, deadline_batch.deadline_tutor)
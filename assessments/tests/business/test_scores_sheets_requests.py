@@ -0,0 +1,169 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from assessments.business.scores_sheets_requests import ScoresSheetsRequestsPool, ScoresSheetsRequestsConsumer
+
+
+class ScoresSheetsRequestsPoolTest(SimpleTestCase):
+    def setUp(self):
+        self.computation_started = threading.Event()
+        self.computation_allowed = threading.Event()
+        self.compute = mock.Mock(side_effect=self._compute)
+        self.respond = mock.Mock()
+        self.pool = ScoresSheetsRequestsPool(self.compute, self.respond, max_workers=1, max_pending=4)
+
+    def tearDown(self):
+        self.computation_allowed.set()
+        self.pool.shutdown()
+
+    def _compute(self, global_id):
+        self.computation_started.set()
+        self.computation_allowed.wait(timeout=5)
+        return {'tutor_global_id': global_id}
+
+    def test_requests_waiting_for_same_tutor_are_coalesced(self):
+        self.pool.submit('00054321')
+        self.computation_started.wait(timeout=5)
+        futures = [self.pool.submit('00012345'), self.pool.submit('00012345')]
+        self.computation_allowed.set()
+        self.pool.shutdown()
+
+        self.assertIs(futures[0], futures[1])
+        self.assertEqual(self.compute.call_args_list, [mock.call('00054321'), mock.call('00012345')])
+        self.assertEqual(self.respond.call_count, 3)
+
+    def test_request_for_tutor_being_computed_is_computed_again(self):
+        first_future = self.pool.submit('00012345')
+        self.computation_started.wait(timeout=5)
+        second_future = self.pool.submit('00012345')
+        self.computation_allowed.set()
+        self.pool.shutdown()
+
+        self.assertIsNot(first_future, second_future)
+        self.assertEqual(self.compute.call_count, 2)
+        self.assertEqual(self.respond.call_count, 2)
+
+    def test_requests_for_different_tutors(self):
+        self.pool.submit('00012345')
+        self.pool.submit('00054321')
+        self.computation_allowed.set()
+        self.pool.shutdown()
+
+        self.assertEqual(self.compute.call_count, 2)
+        self.assertEqual(self.respond.call_count, 2)
+
+    def test_new_request_after_response_is_computed_again(self):
+        self.computation_allowed.set()
+        self.pool.submit('00012345').result()
+        self.pool.submit('00012345').result()
+        self.pool.shutdown()
+
+        self.assertEqual(self.compute.call_count, 2)
+
+    def test_on_done_called_once_response_sent(self):
+        on_done = mock.Mock()
+        self.computation_allowed.set()
+        self.pool.submit('00012345', on_done=on_done)
+        self.pool.shutdown()
+
+        self.respond.assert_called_once_with('00012345', {'tutor_global_id': '00012345'})
+        on_done.assert_called_once_with(True)
+
+    def test_on_done_called_when_response_failed(self):
+        on_done = mock.Mock()
+        self.respond.side_effect = RuntimeError
+        self.computation_allowed.set()
+        self.pool.submit('00012345', on_done=on_done)
+        self.pool.shutdown()
+
+        on_done.assert_called_once_with(False)
+
+    def test_submit_blocks_when_too_many_requests(self):
+        pool = ScoresSheetsRequestsPool(self.compute, self.respond, max_workers=1, max_pending=0)
+        pool.submit('00012345')
+        blocked_submission = threading.Thread(target=pool.submit, args=('00054321',))
+        blocked_submission.start()
+        blocked_submission.join(timeout=0.1)
+        self.assertTrue(blocked_submission.is_alive())
+
+        self.computation_allowed.set()
+        blocked_submission.join(timeout=5)
+        pool.shutdown()
+        self.assertFalse(blocked_submission.is_alive())
+        self.assertEqual(self.compute.call_count, 2)
+
+    @mock.patch('assessments.business.scores_sheets_requests.close_old_connections')
+    def test_database_connections_closed_by_workers(self, mock_close_old_connections):
+        self.computation_allowed.set()
+        self.pool.submit('00012345').result()
+
+        self.assertTrue(mock_close_old_connections.called)
+
+
+class ScoresSheetsRequestsConsumerTest(SimpleTestCase):
+    def setUp(self):
+        self.pool = mock.Mock()
+        self.succeeded = True
+        self.pool.submit.side_effect = lambda global_id, on_done: on_done(self.succeeded)
+        self.consumer = ScoresSheetsRequestsConsumer('scores_sheets_requests', self.pool, mock.Mock())
+        self.channel = mock.Mock()
+
+    def _receive_request(self, delivery_tag, redelivered=False):
+        method = mock.Mock(delivery_tag=delivery_tag, redelivered=redelivered)
+        self.consumer._on_message(self.channel, method, mock.Mock(), b'00012345')
+
+    def test_request_acknowledged_once_processed(self):
+        self.pool.submit.side_effect = None
+        self._receive_request(1)
+        self.consumer._acknowledge_processed_requests(self.channel)
+        self.assertFalse(self.channel.basic_ack.called)
+
+        (global_id,), kwargs = self.pool.submit.call_args
+        self.assertEqual(global_id, '00012345')
+        kwargs['on_done'](True)
+        self.consumer._acknowledge_processed_requests(self.channel)
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+
+    def test_failed_request_put_back_in_queue_once(self):
+        self.succeeded = False
+        self._receive_request(1)
+        self._receive_request(2, redelivered=True)
+        self.consumer._acknowledge_processed_requests(self.channel)
+
+        self.assertEqual(self.channel.basic_nack.call_args_list, [mock.call(delivery_tag=1, requeue=True),
+                                                                  mock.call(delivery_tag=2, requeue=False)])
+        self.assertFalse(self.channel.basic_ack.called)
+
+    def test_request_received_on_lost_connection_not_acknowledged(self):
+        self._receive_request(1)
+        new_channel = mock.Mock()
+        self.consumer._acknowledge_processed_requests(new_channel)
+
+        self.assertFalse(new_channel.basic_ack.called)
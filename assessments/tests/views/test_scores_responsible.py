@@ -129,7 +129,8 @@ class ScoresResponsibleViewTestCase(TestCase):
         entities_with_descendants = mdl_base.entity.find_descendants(entities)
         attributions_searched = attribution.search_scores_responsible(learning_unit_title=None,
                                                                       course_code=None,
-                                                                      entities=entities_with_descendants,
+                                                                      entity_ids=[entity.id for entity in
+                                                                                  entities_with_descendants],
                                                                       tutor=None,
                                                                       responsible=None)
         dictionary = get_attributions_list(attributions_searched, "-score_responsible")
@@ -33,7 +33,9 @@ from django.http import HttpResponseNotFound, Http404
 from django.test import TestCase, Client, TransactionTestCase
 from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
+from openpyxl import load_workbook
 
+from assessments.views import upload_xls_utils
 from base.models.exam_enrollment import ExamEnrollment
 from base.tests.factories.academic_calendar import AcademicCalendarFactory
 
@@ -299,4 +301,21 @@ class TestUploadXls(TestCase, MixinTestUploadScoresFile):
             self.assert_enrollments_equal(
                 self.exam_enrollments,
                 [("score_draft", 16), ("justification_draft", exam_enrollment_justification_type.ABSENCE_UNJUSTIFIED)]
-            )
\ No newline at end of file
+            )
+
+    def test_read_score_rows_only_once(self):
+        with open("assessments/tests/resources/correct_score_sheet.xlsx", 'rb') as score_sheet, \
+                mock.patch('assessments.views.upload_xls_utils._read_score_rows',
+                           wraps=upload_xls_utils._read_score_rows) as mock_read_score_rows:
+            self.client.post(self.url, {'file': score_sheet}, follow=True)
+            self.assertEqual(mock_read_score_rows.call_count, 1)
+
+            score_sheet.seek(0)
+            worksheet = load_workbook(score_sheet, read_only=True, data_only=True).active
+            score_rows = upload_xls_utils._read_score_rows(worksheet)
+
+        data_xls = upload_xls_utils._get_all_data(score_rows)
+        self.assertEqual([row_number for row_number, row in score_rows], [12, 13])
+        self.assertEqual(data_xls['learning_unit_acronyms'], {LEARNING_UNIT_ACRONYM})
+        self.assertEqual(data_xls['offer_acronyms'], {OFFER_ACRONYM})
+        self.assertEqual(data_xls['registration_ids'], {REGISTRATION_ID_1, REGISTRATION_ID_2})
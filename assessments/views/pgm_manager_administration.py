@@ -31,7 +31,6 @@ from rest_framework import serializers
 from rest_framework.renderers import JSONRenderer
 from django.contrib.auth.models import User
 from django.utils.translation import ugettext_lazy as _
-import json
 from base.models.entity_manager import is_entity_manager
 
 
@@ -111,11 +110,7 @@ def _filter_by_entity_offer_type(academic_yr, entity_list, pgm_offer_type):
 
 def get_managed_entities(entity_managed_list):
     if entity_managed_list:
-        structures = []
-        for entity_managed in entity_managed_list:
-            children_acronyms = find_values('acronym', json.dumps(entity_managed['root'].serializable_object()))
-            structures.extend(mdl.structure.find_by_acronyms(children_acronyms))
-        return sorted(structures, key=lambda a_structure: a_structure.acronym)
+        return list(mdl.structure.find_descendants([entity_managed['root'] for entity_managed in entity_managed_list]))
 
     return None
 
@@ -126,8 +121,7 @@ def get_entity_list(entity, entity_managed_structure):
         if entity_found:
             return [entity_found]
     else:
-        children_acronyms = find_values('acronym', json.dumps(entity_managed_structure.serializable_object()))
-        return mdl.structure.find_by_acronyms(children_acronyms)
+        return mdl.structure.find_descendants([entity_managed_structure])
 
     return None
 
@@ -209,9 +203,8 @@ def create_manager(request):
 def get_administrator_entities(a_user):
     structures = []
     for entity_managed in mdl.entity_manager.find_by_user(a_user):
-        children_acronyms = find_values('acronym', json.dumps(entity_managed.structure.serializable_object()))
         structures.append({'root': entity_managed.structure,
-                           'structures': mdl.structure.find_by_acronyms(children_acronyms)})
+                           'structures': mdl.structure.find_descendants([entity_managed.structure])})
     return structures
 
 
@@ -386,20 +379,6 @@ def _get_entity_program_managers(entity, academic_yr):
     return mdl.program_manager.find_by_management_entity(entities, academic_yr)
 
 
-def find_values(key_value, json_repr):
-    results = []
-
-    def _decode_dict(a_dict):
-        try:
-            results.append(a_dict[key_value])
-        except KeyError:
-            pass
-        return a_dict
-
-    json.loads(json_repr, object_hook=_decode_dict)  # return value ignored
-    return results
-
-
 def get_filter_selected_person(request):
     person_selected_id = get_filter_value(request, 'person')
     if person_selected_id:
@@ -27,6 +27,7 @@ import copy
 import logging
 import pika
 import pika.exceptions
+import threading
 import traceback
 
 from django.conf import settings
@@ -42,17 +43,22 @@ from psycopg2._psycopg import OperationalError as PsycopOperationalError, Interf
 import time
 
 from assessments.business import score_encoding_progress, score_encoding_list, score_encoding_export
-from assessments.business import score_encoding_sheet
+from assessments.business import score_encoding_sheet, scores_sheets_requests
 from attribution import models as mdl_attr
 from base import models as mdl
-from base.utils import send_mail
+from base.utils import send_mail, queue_publisher
 from base.views import layout
 from osis_common.document import paper_sheet
-from osis_common.queue.queue_sender import send_message
 
 logger = logging.getLogger(settings.DEFAULT_LOGGER)
 queue_exception_logger = logging.getLogger(settings.QUEUE_EXCEPTION_LOGGER)
 
+MAX_SCORES_SHEETS_RETRIES = 3
+SCORES_SHEETS_RETRY_DELAY = 0.5  # seconds, doubled after each retry
+
+_scores_sheets_requests_pool = None
+_scores_sheets_requests_pool_lock = threading.Lock()
+
 
 def _is_inside_scores_encodings_period(user):
     return mdl.session_exam_calendar.current_session_exam()
@@ -246,6 +252,7 @@ def online_encoding_submission(request, learning_unit_year_id):
     scores_list = score_encoding_list.get_scores_encoding_list(user=request.user,
                                                                learning_unit_year_id=learning_unit_year_id)
     submitted_enrollments = []
+    enrollments_to_save = []
     draft_scores_not_sumitted_yet = scores_list.enrollment_draft_not_submitted
     not_submitted_enrollments = set([ex for ex in scores_list.enrollments if not ex.is_final])
     for exam_enroll in draft_scores_not_sumitted_yet:
@@ -258,10 +265,9 @@ def online_encoding_submission(request, learning_unit_year_id):
                 exam_enroll.score_final = exam_enroll.score_draft
             if exam_enroll.justification_draft:
                 exam_enroll.justification_final = exam_enroll.justification_draft
-            exam_enroll.full_clean()
-            with transaction.atomic():
-                exam_enroll.save()
-                mdl.exam_enrollment.create_exam_enrollment_historic(request.user, exam_enroll)
+            exam_enroll.full_clean(exclude=score_encoding_list.EXCLUDED_FIELDS_FROM_VALIDATION)
+            enrollments_to_save.append(exam_enroll)
+    score_encoding_list.save_enrollments(enrollments_to_save, request.user, with_historic=True)
 
     # Send mail to all the teachers of the submitted learning unit on any submission
     all_encoded = len(not_submitted_enrollments) == 0
@@ -391,7 +397,7 @@ def export_xls(request, learning_unit_year_id):
                                                                learning_unit_year_id=learning_unit_year_id)
     scores_list = score_encoding_list.filter_without_closed_exam_enrollments(scores_list, is_program_manager)
     if scores_list.enrollments:
-        return score_encoding_export.export_xls(scores_list.enrollments)
+        return score_encoding_export.export_xls(scores_list.enrollments, resolver=scores_list.resolver)
     else:
         messages.add_message(request, messages.WARNING, _('no_student_to_encode_xls'))
         return HttpResponseRedirect(reverse('online_encoding', args=(learning_unit_year_id,)))
@@ -414,7 +420,8 @@ def notes_printing(request, learning_unit_year_id=None, tutor_id=None, offer_id=
         offer_year_id=offer_id
     )
     tutor = mdl.tutor.find_by_user(request.user) if not is_program_manager else None
-    sheet_data = score_encoding_sheet.scores_sheet_data(scores_list_encoded.enrollments, tutor=tutor)
+    sheet_data = score_encoding_sheet.scores_sheet_data(scores_list_encoded.enrollments, tutor=tutor,
+                                                        resolver=scores_list_encoded.resolver)
     return paper_sheet.print_notes(sheet_data)
 
 
@@ -615,46 +622,69 @@ def _get_score_encoding_list_with_only_enrollment_modified(request, learning_uni
 
 
 def get_json_data_scores_sheets(tutor_global_id):
-    try:
-        person = mdl.person.find_by_global_id(tutor_global_id)
-        tutor = mdl.tutor.find_by_person(person)
-        number_session = mdl.session_exam_calendar.find_session_exam_number()
-        academic_yr = mdl.academic_year.current_academic_year()
-
-        if tutor:
-            exam_enrollments = list(mdl.exam_enrollment.find_for_score_encodings(number_session,
-                                                                                 tutor=tutor,
-                                                                                 academic_year=academic_yr))
-            return score_encoding_sheet.scores_sheet_data(exam_enrollments, tutor=tutor)
-        else:
-
+    for attempt in range(MAX_SCORES_SHEETS_RETRIES + 1):
+        try:
+            person = mdl.person.find_by_global_id(tutor_global_id)
+            tutor = mdl.tutor.find_by_person(person)
+            number_session = mdl.session_exam_calendar.find_session_exam_number()
+            academic_yr = mdl.academic_year.current_academic_year()
+
+            if tutor:
+                return score_encoding_sheet.get_scores_sheet_data_by_tutor(tutor, number_session, academic_yr)
+            else:
+                return {}
+        except (PsycopOperationalError, PsycopInterfaceError, DjangoOperationalError, DjangoInterfaceError):
+            queue_exception_logger.error('Postgres Error during get_json_data_scores_sheets on global_id {} => '
+                                         'retry {}/{}'.format(tutor_global_id, attempt + 1,
+                                                              MAX_SCORES_SHEETS_RETRIES))
+            trace = traceback.format_exc()
+            queue_exception_logger.error(trace)
+        except Exception:
+            logger.warning('(Not PostgresError) during get_json_data_scores_sheets on global_id {}'
+                           .format(tutor_global_id))
+            trace = traceback.format_exc()
+            logger.error(trace)
             return {}
-    except (PsycopOperationalError, PsycopInterfaceError, DjangoOperationalError, DjangoInterfaceError):
-        queue_exception_logger.error('Postgres Error during get_json_data_scores_sheets on global_id {} => retried'.format(tutor_global_id))
-        trace = traceback.format_exc()
-        queue_exception_logger.error(trace)
-        return get_json_data_scores_sheets(tutor_global_id)
-    except Exception:
-        logger.warning('(Not PostgresError) during get_json_data_scores_sheets on global_id {}'.format(tutor_global_id))
-        trace = traceback.format_exc()
-        logger.error(trace)
-        return {}
-    finally:
-        close_old_connections()
+        finally:
+            close_old_connections()
+        if attempt < MAX_SCORES_SHEETS_RETRIES:
+            time.sleep(SCORES_SHEETS_RETRY_DELAY * 2 ** attempt)
+    return {}
 
 
 def send_json_scores_sheets_to_response_queue(global_id):
     data = get_json_data_scores_sheets(global_id)
-    credentials = pika.PlainCredentials(settings.QUEUES.get('QUEUE_USER'),
-                                        settings.QUEUES.get('QUEUE_PASSWORD'))
-    rabbit_settings = pika.ConnectionParameters(settings.QUEUES.get('QUEUE_URL'),
-                                                settings.QUEUES.get('QUEUE_PORT'),
-                                                settings.QUEUES.get('QUEUE_CONTEXT_ROOT'),
-                                                credentials)
     try:
-        connect = pika.BlockingConnection(rabbit_settings)
-        channel = connect.channel()
-        queue_name = settings.QUEUES.get('QUEUES_NAME').get('SCORE_ENCODING_PDF_RESPONSE')
-        send_message(queue_name, data, connect, channel)
+        _send_scores_sheets_to_response_queue(global_id, data)
     except (RuntimeError, pika.exceptions.ConnectionClosed, pika.exceptions.ChannelClosed, pika.exceptions.AMQPError):
         logger.exception('Could not send back scores_sheets json in response queue for global_id {}'.format(global_id))
+
+
+def start_scores_sheets_requests_consumer():
+    """
+    Start the consumer of the scores sheets requests of the portal: the requests are processed by the pool of
+    workers and acknowledged once their response is sent.
+    """
+    queue_name = settings.QUEUES.get('QUEUES_NAME').get('SCORE_ENCODING_PDF_REQUEST')
+    consumer = scores_sheets_requests.ScoresSheetsRequestsConsumer(queue_name,
+                                                                   _get_scores_sheets_requests_pool(),
+                                                                   queue_publisher.get_connection_parameters())
+    consumer.start()
+    return consumer
+
+
+def _get_scores_sheets_requests_pool():
+    global _scores_sheets_requests_pool
+    with _scores_sheets_requests_pool_lock:
+        if _scores_sheets_requests_pool is None:
+            _scores_sheets_requests_pool = scores_sheets_requests.ScoresSheetsRequestsPool(
+                compute=get_json_data_scores_sheets,
+                respond=_send_scores_sheets_to_response_queue,
+                max_workers=settings.SCORES_SHEETS_REQUESTS_WORKERS
+            )
+    return _scores_sheets_requests_pool
+
+
+def _send_scores_sheets_to_response_queue(global_id, data):
+    queue_name = settings.QUEUES.get('QUEUES_NAME').get('SCORE_ENCODING_PDF_RESPONSE')
+    queue_publisher.publish(queue_name, data)
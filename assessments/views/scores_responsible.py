@@ -31,7 +31,7 @@ from attribution.business.attribution import get_attributions_list
 from attribution.business.entity_manager import _append_entity_version
 from attribution.business.summary_responsible import get_attributions_data
 from base import models as mdl_base
-from base.models.entity_manager import is_entity_manager, find_entities_with_descendants_from_entity_managers
+from base.models.entity_manager import is_entity_manager, get_managed_entity_ids
 from base.views import layout
 
 
@@ -54,11 +54,10 @@ def scores_responsible_search(request):
     _append_entity_version(entities_manager, academic_year)
 
     if request.GET:
-        entities_with_descendants = find_entities_with_descendants_from_entity_managers(entities_manager)
         attributions = list(mdl_attr.attribution.search_scores_responsible(
             learning_unit_title=request.GET.get('learning_unit_title'),
             course_code=request.GET.get('course_code'),
-            entities=entities_with_descendants,
+            entity_ids=get_managed_entity_ids(request.user),
             tutor=request.GET.get('tutor'),
             responsible=request.GET.get('scores_responsible')
         ))
@@ -23,6 +23,7 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+import copy
 import decimal
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
@@ -83,49 +84,52 @@ def upload_scores_file(request, learning_unit_year_id=None):
     return HttpResponseRedirect(reverse('online_encoding', args=[learning_unit_year_id, ]))
 
 
-def _get_all_data(worksheet):
+def _read_score_rows(worksheet):
     """
+    Read the worksheet once and keep only the values of the lines which are examEnrollments.
     :param worksheet: The excel worksheet (containing examEnrollments/scores)
-    :return: All learn_unit_acronyms, offer_acronyms, registration_ids, session and academic_years
-             in all lines of the worksheet.
+    :return: A list of tuples (row number, row values)
     """
-    learn_unit_acronyms = []
-    offer_acronyms = []
-    registration_ids = []
-    sessions = []
-    academic_years = []
-
+    score_rows = []
     for count, row in enumerate(worksheet.rows):
-        if not _is_valid_registration_id(row):
+        row_values = tuple(cell.value for cell in row)
+        if not _is_valid_registration_id(row_values):
             # In case of blank line or line that is not a examEnrollment
             continue
-        session = row[col_session].value
+        score_rows.append((count + 1, row_values))
+    return score_rows
+
+
+def _get_all_data(score_rows):
+    """
+    :param score_rows: The lines of the worksheet which are examEnrollments (see _read_score_rows)
+    :return: All learn_unit_acronyms, offer_acronyms, registration_ids, session and academic_years
+             in all lines of the worksheet.
+    """
+    learn_unit_acronyms = set()
+    offer_acronyms = set()
+    registration_ids = set()
+    sessions = set()
+    academic_years = set()
+
+    for row_number, row in score_rows:
+        session = row[col_session]
         session = int(session) if isinstance(session, str) and session.isdigit() else session
-        if session and session not in sessions:
-            sessions.append(session)
-
-        try:
-            academic_year = None
-            if type(row[col_academic_year].value) is int:
-                academic_year = int(row[col_academic_year].value)
-            elif type(row[col_academic_year].value) is str:
-                academic_year = int(row[col_academic_year].value[:4])
-            if academic_year and academic_year not in academic_years:
-                academic_years.append(academic_year)
-        except (ValueError, TypeError):
-            pass
-
-        learn_unit_acronym = row[col_learning_unit].value
-        if learn_unit_acronym and learn_unit_acronym not in learn_unit_acronyms:
-            learn_unit_acronyms.append(learn_unit_acronym)
-
-        offer_acronym = row[col_offer].value
-        if offer_acronym and offer_acronym not in offer_acronyms:
-            offer_acronyms.append(offer_acronym)
-
-        registration_id = row[col_registration_id].value
-        if registration_id and registration_id not in registration_ids:
-            registration_ids.append(registration_id)
+        if session:
+            sessions.add(session)
+
+        academic_year = _extract_academic_year_from_row(row)
+        if academic_year:
+            academic_years.add(academic_year)
+
+        if row[col_learning_unit]:
+            learn_unit_acronyms.add(row[col_learning_unit])
+
+        if row[col_offer]:
+            offer_acronyms.add(row[col_offer])
+
+        if row[col_registration_id]:
+            registration_ids.add(row[col_registration_id])
 
     return {'learning_unit_acronyms': learn_unit_acronyms,
             'offer_acronyms': offer_acronyms,
@@ -134,6 +138,17 @@ def _get_all_data(worksheet):
             'academic_years': academic_years}
 
 
+def _extract_academic_year_from_row(row):
+    try:
+        if type(row[col_academic_year]) is int:
+            return int(row[col_academic_year])
+        elif type(row[col_academic_year]) is str:
+            return int(row[col_academic_year][:4])
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
 def __save_xls_scores(request, file_name, learning_unit_year_id):
     try:
         workbook = load_workbook(file_name, read_only=True, data_only=True)
@@ -141,11 +156,11 @@ def __save_xls_scores(request, file_name, learning_unit_year_id):
         messages.add_message(request, messages.ERROR, _('file_must_be_xlsx'))
         return False
     worksheet = workbook.active
-    new_scores_number = 0
     learning_unit_year = mdl.learning_unit_year.get_by_id(learning_unit_year_id)
     is_program_manager = mdl.program_manager.is_program_manager(request.user)
 
-    data_xls = _get_all_data(worksheet)
+    score_rows = _read_score_rows(worksheet)
+    data_xls = _get_all_data(score_rows)
 
     try:
         data_xls['session'] = _extract_session_number(data_xls)
@@ -168,28 +183,37 @@ def __save_xls_scores(request, file_name, learning_unit_year_id):
                                       in score_encoding_list.find_related_offer_years(score_list)}
     learn_unit_acronyms_managed_by_user = {learning_unit_year.acronym for learning_unit_year
                                             in score_encoding_list.find_related_learning_unit_years(score_list)}
-    registration_ids_managed_by_user = score_encoding_list.find_related_registration_ids(score_list)
+    emails_by_registration_id = _get_emails_by_registration_id(score_list.enrollments)
 
     enrollments_grouped = _group_exam_enrollments_by_registration_id_and_learning_unit_year(score_list.enrollments)
     errors_list = {}
-    # Iterates over the lines of the spreadsheet.
-    for count, row in enumerate(worksheet.rows):
-        if _row_can_be_ignored(row):
+    enrollments_encoded = []
+    row_numbers_encoded = []
+    for row_number, row in score_rows:
+        if _is_empty_row(row):
             continue
 
-        row_number = count + 1
-        try:
-            _check_intergity_data(row,
-                                  offer_acronyms_managed=offer_acronyms_managed_by_user,
-                                  learn_unit_acronyms_managed = learn_unit_acronyms_managed_by_user,
-                                  registration_ids_managed = registration_ids_managed_by_user,
-                                  learning_unit_year=learning_unit_year)
-            _check_consistency_data(row)
-            updated_row = _update_row(request.user, row, enrollments_grouped, is_program_manager)
-            if updated_row:
-                new_scores_number+=1
-        except Exception as e:
-            errors_list[row_number] = e
+        error = _check_intergity_data(row,
+                                      offer_acronyms_managed=offer_acronyms_managed_by_user,
+                                      learn_unit_acronyms_managed=learn_unit_acronyms_managed_by_user,
+                                      registration_ids_managed=emails_by_registration_id.keys(),
+                                      learning_unit_year=learning_unit_year) or \
+            _check_consistency_data(row, emails_by_registration_id)
+        if not error:
+            enrollment_encoded, error = _get_enrollment_encoded(row, enrollments_grouped, is_program_manager,
+                                                                score_list.resolver)
+            if enrollment_encoded:
+                enrollments_encoded.append(enrollment_encoded)
+                row_numbers_encoded.append(row_number)
+        if error:
+            errors_list[row_number] = error
+
+    updated_enrollments, errors_by_index = score_encoding_list.bulk_update_enrollments(
+        enrollments_encoded, request.user, is_program_manager, score_list.resolver
+    )
+    new_scores_number = len(updated_enrollments)
+    for index, error in errors_by_index.items():
+        errors_list[row_numbers_encoded[index]] = error
 
     _show_error_messages(request, errors_list)
 
@@ -208,7 +232,7 @@ def _extract_session_number(data_xls):
         raise UploadValueError('more_than_one_session_error', messages.ERROR)
     elif len(data_xls['sessions']) == 0:
         raise UploadValueError('missing_column_session', messages.ERROR)
-    return data_xls['sessions'][0] # Only one session
+    return next(iter(data_xls['sessions']))  # Only one session
 
 
 def _extract_academic_year(data_xls):
@@ -217,18 +241,18 @@ def _extract_academic_year(data_xls):
     elif len(data_xls['academic_years']) == 0:
         raise UploadValueError('no_valid_academic_year_error', messages.ERROR)
 
-    return data_xls['academic_years'][0]  # Only one academic year
+    return next(iter(data_xls['academic_years']))  # Only one academic year
 
 
 def _extract_registration_id(row):
     if _is_valid_registration_id(row):
-        xls_registration_id = str(row[col_registration_id].value)
+        xls_registration_id = str(row[col_registration_id])
         return xls_registration_id.zfill(REGISTRATION_ID_LENGTH)
     return None
 
 
 def _extract_email(row):
-    return str(row[col_email].value)
+    return str(row[col_email])
 
 
 def _group_exam_enrollments_by_registration_id_and_learning_unit_year(enrollments):
@@ -240,23 +264,25 @@ def _group_exam_enrollments_by_registration_id_and_learning_unit_year(enrollment
     return exam_enrollments_by_registration_id
 
 
-def _row_can_be_ignored(row):
-    return not _is_valid_registration_id(row) or _is_empty_row(row)
+def _get_emails_by_registration_id(enrollments):
+    return {enrollment.learning_unit_enrollment.student.registration_id:
+            enrollment.learning_unit_enrollment.student.person.email
+            for enrollment in enrollments}
 
 
 def _is_valid_registration_id(row):
-    registration_id_value = row[col_registration_id].value
+    registration_id_value = row[col_registration_id]
     return registration_id_value and str(registration_id_value).isdigit()
 
 
 def _is_empty_row(row):
-    return (row[col_score].value is None or row[col_score].value == '') and not row[col_justification].value
+    return (row[col_score] is None or row[col_score] == '') and not row[col_justification]
 
 
 def _check_intergity_data(row, **kwargs):
     xls_registration_id = _extract_registration_id(row)
-    xls_offer_year_acronym = row[col_offer].value
-    xls_learning_unit_acronym = row[col_learning_unit].value
+    xls_offer_year_acronym = row[col_offer]
+    xls_learning_unit_acronym = row[col_learning_unit]
     registration_ids_managed = kwargs.get('registration_ids_managed')
     learn_unit_acronyms_managed = kwargs.get('learn_unit_acronyms_managed')
     offer_acronyms_managed = kwargs.get('offer_acronyms_managed')
@@ -266,67 +292,70 @@ def _check_intergity_data(row, **kwargs):
         # In case the xls registration_id is not in the list, we check...
         if xls_learning_unit_acronym not in learn_unit_acronyms_managed:
             # ... if it is because the user doesn't have access to the learningUnit
-            raise UploadValueError("'%s' %s" % (xls_learning_unit_acronym, _('learning_unit_not_access_or_not_exist')),
-                                   messages.ERROR)
+            return UploadValueError("'%s' %s" % (xls_learning_unit_acronym, _('learning_unit_not_access_or_not_exist')),
+                                    messages.ERROR)
         elif learning_unit_year.acronym != xls_learning_unit_acronym:
             # ... if it is because the user has multiple learningUnit in his excel file
             # (the data from the DataBase are filtered by LearningUnitYear because excel file is build by learningUnit)
-            raise UploadValueError("%s" % _('more_than_one_learning_unit_error'), messages.ERROR)
+            return UploadValueError("%s" % _('more_than_one_learning_unit_error'), messages.ERROR)
         elif xls_offer_year_acronym not in offer_acronyms_managed:
             # ... if it is because the user haven't access rights to the offerYear
-            raise UploadValueError("'%s' %s" % (xls_offer_year_acronym, _('offer_year_not_access_or_not_exist')),
-                                   messages.ERROR)
+            return UploadValueError("'%s' %s" % (xls_offer_year_acronym, _('offer_year_not_access_or_not_exist')),
+                                    messages.ERROR)
         else:
             # ... if it's beacause the registration id doesn't exist
-            raise UploadValueError("%s" % _('registration_id_not_access_or_not_exist'), messages.ERROR)
+            return UploadValueError("%s" % _('registration_id_not_access_or_not_exist'), messages.ERROR)
+    return None
 
 
-def _check_consistency_data(row):
+def _check_consistency_data(row, emails_by_registration_id):
     xls_registration_id = _extract_registration_id(row)
     xls_email = _extract_email(row)
-    if not _registration_id_matches_email(xls_registration_id, xls_email):
-        raise UploadValueError("%s" % _('registration_id_does_not_match_email'), messages.ERROR)
-
-
-def _registration_id_matches_email(registration_id, email):
-    student_by_registration_id = mdl.student.find_by_registration_id(registration_id)
-    return str(student_by_registration_id.person.email).strip() == email.strip()
+    if str(emails_by_registration_id.get(xls_registration_id)).strip() != xls_email.strip():
+        return UploadValueError("%s" % _('registration_id_does_not_match_email'), messages.ERROR)
+    return None
 
 
-def _update_row(user, row, enrollments_managed_grouped, is_program_manager):
+def _get_enrollment_encoded(row, enrollments_managed_grouped, is_program_manager, resolver=None):
+    """
+    :return: A tuple (enrollment with the encoded values of the row or None if nothing must be saved, error or None)
+    """
     xls_registration_id = _extract_registration_id(row)
-    xls_learning_unit_acronym = row[col_learning_unit].value
-    xls_score = _clean_value(row[col_score].value)
-    xls_justification = _clean_value(row[col_justification].value)
+    xls_learning_unit_acronym = row[col_learning_unit]
+    xls_score = _clean_value(row[col_score])
+    xls_justification = _clean_value(row[col_justification])
 
     key = "{}_{}".format(xls_registration_id, xls_learning_unit_acronym)
     enrollments = enrollments_managed_grouped.get(key, [])
 
     if not enrollments:
-        raise ValueError("%s!" % _('enrollment_activity_not_exist') % (xls_learning_unit_acronym))
+        return None, ValueError("%s!" % _('enrollment_activity_not_exist') % (xls_learning_unit_acronym))
 
-    enrollment = enrollments[0]
+    # Several rows can target the same enrollment, each one is saved with its own encoded values
+    enrollment = copy.copy(enrollments[0])
 
-    if score_encoding_list.is_deadline_reached(enrollment, is_program_manager):
-        raise UploadValueError("%s" % _('deadline_reached'), messages.ERROR)
+    if score_encoding_list.is_deadline_reached(enrollment, is_program_manager, resolver):
+        return None, UploadValueError("%s" % _('deadline_reached'), messages.ERROR)
 
     if not is_program_manager and enrollment.is_final:
-        raise UploadValueError("%s" % _('score_already_submitted'), messages.WARNING)
+        return None, UploadValueError("%s" % _('score_already_submitted'), messages.WARNING)
 
     if (xls_score or xls_score == 0) and xls_justification:
-        raise UploadValueError("%s" % _('constraint_score_other_score'), messages.ERROR)
+        return None, UploadValueError("%s" % _('constraint_score_other_score'), messages.ERROR)
 
     if xls_justification and _is_informative_justification(enrollment, xls_justification, is_program_manager):
-       return False
+        return None, None
 
     enrollment.score_encoded = xls_score
     enrollment.justification_encoded = None
     if xls_justification:
-        enrollment.justification_encoded = _get_justification_from_aliases(enrollment, xls_justification)
-    return score_encoding_list.update_enrollment(
-        enrollment=enrollment,
-        user=user
-    )
+        justification = _get_justification_from_aliases(xls_justification)
+        if not justification:
+            return None, UploadValueError('%s' % _('justification_invalid_value'), messages.ERROR)
+        if _is_user_try_change_justified_to_unjustified_absence(enrollment, justification):
+            return None, UploadValueError('%s' % _('absence_justified_to_unjustified_invalid'), messages.ERROR)
+        enrollment.justification_encoded = justification
+    return enrollment, None
 
 
 def _clean_value(value):
@@ -346,21 +375,15 @@ def __warn_that_score_responsibles_must_submit_scores(request, learning_unit_yea
         messages.add_message(request, messages.SUCCESS, '%s' % _('scores_responsible_must_still_submit_scores'))
 
 
-def _get_justification_from_aliases(enrollment, justification_encoded):
+def _get_justification_from_aliases(justification_encoded):
     justification_encoded = justification_encoded.upper() if isinstance(justification_encoded, str) \
                             else justification_encoded
-    justification = AUTHORIZED_JUSTIFICATION_ALIASES.get(justification_encoded)
-    if justification:
-        _check_is_user_try_change_justified_to_unjustified_absence(enrollment, justification)
-        return justification
-    else:
-        raise UploadValueError('%s' % _('justification_invalid_value'), messages.ERROR)
+    return AUTHORIZED_JUSTIFICATION_ALIASES.get(justification_encoded)
 
 
-def _check_is_user_try_change_justified_to_unjustified_absence(enrollment, justification):
-    if justification == justification_types.ABSENCE_UNJUSTIFIED and \
-       enrollment.justification_final == justification_types.ABSENCE_JUSTIFIED:
-            raise UploadValueError('%s' % _('absence_justified_to_unjustified_invalid'), messages.ERROR)
+def _is_user_try_change_justified_to_unjustified_absence(enrollment, justification):
+    return justification == justification_types.ABSENCE_UNJUSTIFIED and \
+        enrollment.justification_final == justification_types.ABSENCE_JUSTIFIED
 
 
 def _show_error_messages(request, errors_list):
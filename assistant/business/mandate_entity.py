@@ -23,9 +23,17 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from collections import defaultdict
+
+from django.utils import timezone
+
+from assistant.models import mandate_entity
 from base.models import academic_year
 from base.models import entity_version
-from base.models.entity import find_versions_from_entites
+from base.models.enums import entity_type
+
+ENTITY_TYPES_ORDER = [entity_type.SECTOR, entity_type.FACULTY, entity_type.SCHOOL, entity_type.INSTITUTE,
+                      entity_type.POLE]
 
 
 def get_entities_for_mandate(mandate):
@@ -40,8 +48,46 @@ def get_entities_for_mandate(mandate):
     return entities
 
 
-def add_entities_version_to_mandates_list(context):
-    for mandate in context['object_list']:
-        entities_id = mandate.mandateentity_set.all().order_by('id').values_list('entity', flat=True)
-        mandate.entities = find_versions_from_entites(entities_id, None)
+def add_entities_version_to_mandates_list(context, date=None):
+    mandates = list(context['object_list'])
+    entities_by_mandate_id = get_entities_versions_by_mandate_id([mandate.id for mandate in mandates], date)
+    for mandate in mandates:
+        mandate.entities = entities_by_mandate_id.get(mandate.id, [])
     return context
+
+
+def get_entities_versions_by_mandate_id(mandate_ids, date=None):
+    """
+    Return, for each mandate, the versions of its entities valid at the given date, ordered by entity type.
+    The mandate entities and all the versions of their entities are fetched in two queries,
+    the date window is matched in memory.
+    """
+    if date is None:
+        date = timezone.now().date()
+    entity_ids_by_mandate_id = defaultdict(list)
+    for mandate_id, entity_id in mandate_entity.find_by_mandate_ids(mandate_ids)\
+                                               .values_list('assistant_mandate_id', 'entity_id'):
+        entity_ids_by_mandate_id[mandate_id].append(entity_id)
+
+    all_entity_ids = {entity_id for entity_ids in entity_ids_by_mandate_id.values() for entity_id in entity_ids}
+    versions_by_entity_id = defaultdict(list)
+    for version in entity_version.EntityVersion.objects.filter(entity_id__in=all_entity_ids):
+        if _is_valid_at(version, date):
+            versions_by_entity_id[version.entity_id].append(version)
+
+    entities_by_mandate_id = {}
+    for mandate_id, entity_ids in entity_ids_by_mandate_id.items():
+        versions = [version for entity_id in entity_ids for version in versions_by_entity_id[entity_id]]
+        entities_by_mandate_id[mandate_id] = sorted(versions, key=_get_entity_type_position)
+    return entities_by_mandate_id
+
+
+def _is_valid_at(version, date):
+    return version.start_date <= date and (version.end_date is None or version.end_date >= date)
+
+
+def _get_entity_type_position(version):
+    try:
+        return ENTITY_TYPES_ORDER.index(version.entity_type)
+    except ValueError:
+        return len(ENTITY_TYPES_ORDER)
@@ -0,0 +1,204 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import logging
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from itertools import repeat
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import translation
+from PyPDF2 import PdfFileReader, PdfFileWriter
+
+from assistant.models import assistant_mandate
+from assistant.utils import export_utils_pdf
+from base.utils.cache import cache
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+RUNNING = 'RUNNING'
+DONE = 'DONE'
+FAILED = 'FAILED'
+
+EXPORT_TIMEOUT = 60 * 60
+EXPORT_COMMAND = 'export_assistant_mandates_pdf'
+FRAGMENTS_DIRECTORY = 'fragments'
+PREFIX_CACHE_KEY = 'assistant_mandates_pdf_export'
+
+_export_executor = None
+_export_executor_lock = threading.Lock()
+
+
+def start_export(an_academic_year, language):
+    """
+    Start the PDF export of the mandates of the academic year in background, once the current transaction
+    is committed. Return False when an export of the same mandates is already running.
+    The lock and the state of the export are kept in the shared cache backend when it is configured, so that every
+    worker sees the same export.
+    """
+    if not cache.add(_get_cache_key('lock', an_academic_year.id, language), True, timeout=EXPORT_TIMEOUT):
+        return False
+    _set_state(an_academic_year.id, language, RUNNING)
+    transaction.on_commit(lambda: _get_export_executor().submit(run_export, an_academic_year.id, language))
+    return True
+
+
+def get_state(an_academic_year, language):
+    """
+    Return the state of the last export of the mandates of the academic year as a dict with a 'status' and,
+    once the export is DONE, the 'path' of the file.
+    """
+    state = cache.get(_get_cache_key('state', an_academic_year.id, language))
+    if state and state['status'] == RUNNING and \
+            cache.get(_get_cache_key('lock', an_academic_year.id, language)) is None:
+        # The export was interrupted without releasing its lock, which has expired since
+        return {'status': FAILED, 'path': None}
+    return state
+
+
+def run_export(academic_year_id, language):
+    """
+    Run the export with the management command, in its own process: the pool of processes rendering the mandates
+    must not be forked from a thread of the web server.
+    """
+    try:
+        subprocess.check_call([sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), EXPORT_COMMAND,
+                               str(academic_year_id), language],
+                              timeout=EXPORT_TIMEOUT)
+        _set_state(academic_year_id, language, DONE, get_export_path(academic_year_id, language))
+    except Exception:
+        logger.exception('Could not export the mandates of academic year {} in PDF'.format(academic_year_id))
+        _set_state(academic_year_id, language, FAILED)
+    finally:
+        cache.delete(_get_cache_key('lock', academic_year_id, language))
+
+
+def export_mandates(academic_year_id, language):
+    """
+    Build the PDF of the mandates of the academic year by merging one fragment by mandate.
+    A fragment is kept on disk under a name made of the mandate last modification, so only the mandates
+    changed since the previous export are rendered again, by a pool of processes.
+    """
+    mandates = assistant_mandate.find_by_academic_year_by_excluding_declined(academic_year_id)
+    fragments = [
+        (mandate_id, get_fragment_path(mandate_id, changed, language))
+        for mandate_id, changed in mandates.values_list('id', 'changed')
+    ]
+    missing_fragments = [(mandate_id, path) for mandate_id, path in fragments
+                         if not os.path.exists(path)]
+    if missing_fragments:
+        render_fragments(missing_fragments, language)
+
+    fragment_paths = [path for mandate_id, path in fragments]
+    path = get_export_path(academic_year_id, language)
+    merge_fragments(fragment_paths, path)
+    _remove_stale_fragments(fragment_paths)
+    return path
+
+
+def render_fragments(fragments, language):
+    os.makedirs(_get_fragments_directory(), exist_ok=True)
+    # The workers are forked from this process: they must open their own database connection.
+    connections.close_all()
+    mandate_ids, paths = zip(*fragments)
+    with ProcessPoolExecutor(max_workers=settings.ASSISTANT_MANDATES_PDF_WORKERS) as executor:
+        list(executor.map(render_fragment, mandate_ids, paths, repeat(language)))
+
+
+def render_fragment(mandate_id, path, language):
+    translation.activate(language)
+    mandate = assistant_mandate.AssistantMandate.objects\
+        .select_related('academic_year', 'assistant__person', 'assistant__supervisor')\
+        .get(pk=mandate_id)
+    _write_atomically(path, export_utils_pdf.build_mandate_pdf(mandate))
+    return path
+
+
+def merge_fragments(fragment_paths, path):
+    writer = PdfFileWriter()
+    for fragment_path in fragment_paths:
+        with open(fragment_path, 'rb') as fragment:
+            reader = PdfFileReader(BytesIO(fragment.read()))
+        for page_number in range(reader.getNumPages()):
+            writer.addPage(reader.getPage(page_number))
+    buffer = BytesIO()
+    writer.write(buffer)
+    _write_atomically(path, buffer.getvalue())
+
+
+def get_export_path(academic_year_id, language):
+    return os.path.join(settings.ASSISTANT_MANDATES_PDF_DIR,
+                        'assistants_mandates_{}_{}.pdf'.format(academic_year_id, language))
+
+
+def get_fragment_path(mandate_id, changed, language):
+    version = changed.strftime('%Y%m%d%H%M%S%f') if changed else '0'
+    return os.path.join(_get_fragments_directory(), '{}_{}_{}.pdf'.format(mandate_id, language, version))
+
+
+def _remove_stale_fragments(fragment_paths):
+    names = {os.path.basename(path) for path in fragment_paths}
+    prefixes = tuple(name.rsplit('_', 1)[0] + '_' for name in names)
+    if not prefixes:
+        return
+    for name in os.listdir(_get_fragments_directory()):
+        if name.startswith(prefixes) and name not in names:
+            os.remove(os.path.join(_get_fragments_directory(), name))
+
+
+def _write_atomically(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temporary_path, 'wb') as file:
+        file.write(data)
+    os.replace(temporary_path, path)
+
+
+def _get_fragments_directory():
+    return os.path.join(settings.ASSISTANT_MANDATES_PDF_DIR, FRAGMENTS_DIRECTORY)
+
+
+def _set_state(academic_year_id, language, status, path=None):
+    # A running export is not kept longer than its lock, in case the process running it is stopped
+    timeout = EXPORT_TIMEOUT if status == RUNNING else None
+    cache.set(_get_cache_key('state', academic_year_id, language), {'status': status, 'path': path},
+              timeout=timeout)
+
+
+def _get_cache_key(name, academic_year_id, language):
+    return '_'.join([PREFIX_CACHE_KEY, name, str(academic_year_id), language])
+
+
+def _get_export_executor():
+    global _export_executor
+    with _export_executor_lock:
+        if _export_executor is None:
+            _export_executor = ThreadPoolExecutor(max_workers=1)
+    return _export_executor
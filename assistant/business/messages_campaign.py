@@ -0,0 +1,144 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+from assistant.models import settings as assistant_settings
+from assistant.models.enums import reviewer_role
+from assistant.models.message import Message
+from osis_common.messaging import message_config, send_message as message_service
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+MESSAGES_BY_CHUNK = 50
+
+_campaign_executor = None
+_campaign_executor_lock = threading.Lock()
+
+
+def get_template_base_data(procedure_dates):
+    return {'start_date': procedure_dates.assistants_contract_end_starting_date,
+            'end_date': procedure_dates.assistants_contract_end_ending_date,
+            'roles': reviewer_role}
+
+
+def get_template_person_data(person, assistant=None, role=None, entity=None):
+    template_data = {'first_name': person.first_name, 'last_name': person.last_name, 'gender': person.gender}
+    if assistant:
+        template_data['assistant'] = assistant.person
+    if role:
+        template_data['role'] = role
+    if entity:
+        template_data['entity'] = entity
+    return template_data
+
+
+def create_recipient(person, html_template_ref, txt_template_ref, **kwargs):
+    return {
+        'receiver': message_config.create_receiver(person.id, person.email, person.language),
+        'html_template_ref': html_template_ref,
+        'txt_template_ref': txt_template_ref,
+        'template_data': get_template_person_data(person, **kwargs),
+    }
+
+
+def start_campaign(message, recipients):
+    """
+    Record the number of recipients on the message history and send the messages in background,
+    once the current transaction is committed, so that the manager does not wait for the whole campaign.
+    """
+    message.recipients_count = len(recipients)
+    message.save()
+    transaction.on_commit(lambda: _get_campaign_executor().submit(_send_campaign_in_background, message.id,
+                                                                  recipients))
+
+
+def send_campaign(message_id, recipients):
+    """
+    Send the messages of a campaign by chunks and record the progress on the message history.
+    The recipients sharing the same templates and template data are grouped in a single message content,
+    which is rendered once by language.
+    """
+    try:
+        template_base_data = get_template_base_data(assistant_settings.get_settings())
+        message_contents = build_message_contents(recipients, template_base_data)
+        for index in range(0, len(message_contents), MESSAGES_BY_CHUNK):
+            _send_chunk(message_id, message_contents[index:index + MESSAGES_BY_CHUNK])
+    except Exception:
+        logger.exception('Could not send the messages of the campaign {}'.format(message_id))
+
+
+def build_message_contents(recipients, template_base_data):
+    receivers_by_key = OrderedDict()
+    for recipient in recipients:
+        key = (recipient['html_template_ref'], recipient['txt_template_ref'],
+               tuple(sorted(recipient['template_data'].items())))
+        receivers_by_key.setdefault(key, []).append(recipient['receiver'])
+
+    message_contents = []
+    for (html_template_ref, txt_template_ref, template_data), receivers in receivers_by_key.items():
+        data = dict(template_base_data, **dict(template_data))
+        message_contents.append(message_config.create_message_content(html_template_ref, txt_template_ref, None,
+                                                                      receivers, data, None))
+    return message_contents
+
+
+def _send_chunk(message_id, message_contents):
+    sent_count = failed_count = 0
+    for message_content in message_contents:
+        receivers_count = len(message_content['receivers'])
+        try:
+            error = message_service.send_messages(message_content)
+        except Exception:
+            logger.exception('Could not send the message {}'.format(message_content['html_template_ref']))
+            error = True
+        if error:
+            failed_count += receivers_count
+        else:
+            sent_count += receivers_count
+    Message.objects.filter(pk=message_id).update(sent_count=F('sent_count') + sent_count,
+                                                 failed_count=F('failed_count') + failed_count)
+
+
+def _send_campaign_in_background(message_id, recipients):
+    try:
+        send_campaign(message_id, recipients)
+    finally:
+        connections.close_all()
+
+
+def _get_campaign_executor():
+    global _campaign_executor
+    with _campaign_executor_lock:
+        if _campaign_executor is None:
+            _campaign_executor = ThreadPoolExecutor(max_workers=1)
+    return _campaign_executor
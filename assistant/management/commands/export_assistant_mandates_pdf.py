@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+from django.core.management.base import BaseCommand
+
+from assistant.business import mandates_pdf_export
+
+
+class Command(BaseCommand):
+    help = 'Export in PDF the assistant mandates of the given academic year, in the given language'
+
+    def add_arguments(self, parser):
+        parser.add_argument('academic_year_id', type=int)
+        parser.add_argument('language')
+
+    def handle(self, *args, **options):
+        path = mandates_pdf_export.export_mandates(options['academic_year_id'], options['language'])
+        self.stdout.write("Mandates exported in {}".format(path))
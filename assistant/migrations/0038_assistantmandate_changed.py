@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistant', '0037_messages_templates_update'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assistantmandate',
+            name='changed',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistant', '0038_assistantmandate_changed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='recipients_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='sent_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='failed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -26,6 +26,7 @@
 from django.db import models
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib import admin
+from django.utils import timezone
 from assistant.models.enums import assistant_mandate_state, assistant_type, assistant_mandate_renewal
 from assistant.models.enums import assistant_mandate_appeal
 
@@ -88,6 +89,7 @@ class AssistantMandate(models.Model):
     contract_duration = models.CharField(max_length=30)
     contract_duration_fte = models.CharField(max_length=30)
     service_activities_remark = models.TextField(null=True, blank=True)
+    changed = models.DateTimeField(null=True, auto_now=True)
 
 
 def find_mandate_by_assistant_for_academic_year(assistant, this_academic_year):
@@ -115,6 +117,10 @@ def find_by_academic_year_by_excluding_declined(academic_year):
         order_by('assistant__person__last_name')
 
 
+def touch(mandates):
+    return mandates.update(changed=timezone.now())
+
+
 def find_before_year_for_assistant(year, assistant):
     return AssistantMandate.objects.filter(academic_year__year__lt=year).\
         filter(assistant=assistant).order_by('-academic_year')
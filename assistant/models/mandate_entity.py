@@ -57,5 +57,9 @@ def find_by_mandate_and_part_of_entity(mandate, entity):
     return MandateEntity.objects.filter(assistant_mandate=mandate, entity__entityversion__parent=entity)
 
 
+def find_by_mandate_ids(mandate_ids):
+    return MandateEntity.objects.filter(assistant_mandate_id__in=mandate_ids).order_by('id')
+
+
 def find_by_entity(entity):
     return MandateEntity.objects.filter(entity=entity)
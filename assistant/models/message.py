@@ -35,6 +35,9 @@ class Message(models.Model):
     academic_year = models.ForeignKey('base.AcademicYear')
     date = models.DateTimeField(default=timezone.now, null=True)
     type = models.CharField(max_length=20, choices=message_type.TYPES)
+    recipients_count = models.PositiveIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
     
     def __str__(self):
         return u"%s (%s : %s)" % self.sender.person, self.type, self.date
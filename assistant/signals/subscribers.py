@@ -0,0 +1,81 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from assistant.models import assistant_mandate
+from assistant.models.academic_assistant import AcademicAssistant
+from assistant.models.mandate_entity import MandateEntity
+from assistant.models.review import Review
+from assistant.models.tutoring_learning_unit_year import TutoringLearningUnitYear
+from base.models.entity_version import EntityVersion
+from base.models.learning_unit_year import LearningUnitYear
+from base.models.person import Person
+
+
+# The PDF export caches a rendering of each mandate keyed by its last modification,
+# so the mandate is touched whenever a related object printed in the export changes.
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=TutoringLearningUnitYear)
+@receiver(post_delete, sender=TutoringLearningUnitYear)
+def touch_mandate(sender, instance, **kwargs):
+    assistant_mandate.touch(assistant_mandate.AssistantMandate.objects.filter(pk=instance.mandate_id))
+
+
+@receiver(post_save, sender=MandateEntity)
+@receiver(post_delete, sender=MandateEntity)
+def touch_mandate_of_entity(sender, instance, **kwargs):
+    assistant_mandate.touch(assistant_mandate.AssistantMandate.objects.filter(pk=instance.assistant_mandate_id))
+
+
+@receiver(post_save, sender=AcademicAssistant)
+def touch_mandates_of_assistant(sender, instance, **kwargs):
+    assistant_mandate.touch(assistant_mandate.AssistantMandate.objects.filter(assistant=instance))
+
+
+@receiver(post_save, sender=Person)
+def touch_mandates_of_person(sender, instance, **kwargs):
+    assistant_mandate.touch(assistant_mandate.AssistantMandate.objects.filter(
+        Q(assistant__person=instance) | Q(assistant__supervisor=instance) | Q(review__reviewer__person=instance)
+    ))
+
+
+@receiver(post_save, sender=EntityVersion)
+@receiver(post_delete, sender=EntityVersion)
+def touch_mandates_of_entity_version(sender, instance, **kwargs):
+    assistant_mandate.touch(assistant_mandate.AssistantMandate.objects.filter(
+        mandateentity__entity=instance.entity_id
+    ))
+
+
+@receiver(post_save, sender=LearningUnitYear)
+def touch_mandates_of_learning_unit_year(sender, instance, **kwargs):
+    assistant_mandate.touch(assistant_mandate.AssistantMandate.objects.filter(
+        tutoringlearningunityear__learning_unit_year=instance
+    ))
@@ -23,13 +23,15 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+import datetime
+
 from django.test import TestCase
 
 from base.tests.factories.entity import EntityFactory
 from base.tests.factories.entity_version import EntityVersionFactory
 from base.models.enums import entity_type
 
-from assistant.business.mandate_entity import get_entities_for_mandate
+from assistant.business.mandate_entity import get_entities_for_mandate, get_entities_versions_by_mandate_id
 from assistant.tests.factories.assistant_mandate import AssistantMandateFactory
 from assistant.tests.factories.mandate_entity import MandateEntityFactory
 
@@ -60,3 +62,21 @@ class TestMandateEntity(TestCase):
             get_entities_for_mandate(self.assistant_mandate),
             [self.entity_version1, self.entity_version2, self.entity_version3]
         )
+
+    def test_get_entities_versions_by_mandate_id(self):
+        EntityVersionFactory(entity=self.entity2, entity_type=entity_type.FACULTY,
+                             start_date=datetime.date(2010, 1, 1), end_date=datetime.date(2014, 12, 31))
+        other_mandate = AssistantMandateFactory()
+        MandateEntityFactory(assistant_mandate=other_mandate, entity=self.entity4)
+
+        with self.assertNumQueries(2):
+            entities_by_mandate_id = get_entities_versions_by_mandate_id(
+                [self.assistant_mandate.id, other_mandate.id], datetime.date(2017, 1, 1))
+        self.assertEqual(entities_by_mandate_id[self.assistant_mandate.id],
+                         [self.entity_version1, self.entity_version2, self.entity_version3])
+        self.assertEqual(entities_by_mandate_id[other_mandate.id], [self.entity_version4])
+
+    def test_get_entities_versions_by_mandate_id_before_first_version(self):
+        entities_by_mandate_id = get_entities_versions_by_mandate_id([self.assistant_mandate.id],
+                                                                     datetime.date(2014, 1, 1))
+        self.assertEqual(entities_by_mandate_id[self.assistant_mandate.id], [])
@@ -0,0 +1,145 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import os
+import shutil
+import subprocess
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from base.tests.factories.academic_year import AcademicYearFactory
+from base.tests.factories.entity_version import EntityVersionFactory
+
+from assistant.business import mandates_pdf_export
+from assistant.models.enums import assistant_mandate_state
+from assistant.tests.factories.assistant_mandate import AssistantMandateFactory
+from assistant.tests.factories.mandate_entity import MandateEntityFactory
+from assistant.tests.factories.review import ReviewFactory
+from assistant.tests.factories.tutoring_learning_unit_year import TutoringLearningUnitYearFactory
+
+LANGUAGE = 'fr-be'
+
+
+def render_fragments_in_process(fragments, language):
+    for mandate_id, path in fragments:
+        mandates_pdf_export.render_fragment(mandate_id, path, language)
+
+
+def run_command_in_process(command, **kwargs):
+    # The command is run in the test database instead of a new process
+    call_command(*command[2:])
+
+
+class TestMandatesPdfExport(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        override = override_settings(ASSISTANT_MANDATES_PDF_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.academic_year = AcademicYearFactory()
+        self.mandate = AssistantMandateFactory(academic_year=self.academic_year)
+        self.other_mandate = AssistantMandateFactory(academic_year=self.academic_year)
+        AssistantMandateFactory(academic_year=self.academic_year, state=assistant_mandate_state.DECLINED)
+
+        patcher = mock.patch.object(mandates_pdf_export, 'render_fragments', side_effect=render_fragments_in_process)
+        self.mock_render_fragments = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_export_mandates(self):
+        path = mandates_pdf_export.export_mandates(self.academic_year.id, LANGUAGE)
+        with open(path, 'rb') as pdf:
+            self.assertTrue(pdf.read().startswith(b'%PDF'))
+        rendered_mandate_ids = [mandate_id for mandate_id, fragment_path in self.mock_render_fragments.call_args[0][0]]
+        self.assertCountEqual(rendered_mandate_ids, [self.mandate.id, self.other_mandate.id])
+
+    def test_export_mandates_renders_only_changed_mandates(self):
+        mandates_pdf_export.export_mandates(self.academic_year.id, LANGUAGE)
+        self.mock_render_fragments.reset_mock()
+
+        mandates_pdf_export.export_mandates(self.academic_year.id, LANGUAGE)
+        self.assertFalse(self.mock_render_fragments.called)
+
+        ReviewFactory(mandate=self.mandate)
+        mandates_pdf_export.export_mandates(self.academic_year.id, LANGUAGE)
+        rendered_mandate_ids = [mandate_id for mandate_id, fragment_path in self.mock_render_fragments.call_args[0][0]]
+        self.assertEqual(rendered_mandate_ids, [self.mandate.id])
+        self.assertEqual(len(os.listdir(mandates_pdf_export._get_fragments_directory())), 2)
+
+    def test_start_export_when_already_running(self):
+        self.assertTrue(mandates_pdf_export.start_export(self.academic_year, LANGUAGE))
+        self.assertFalse(mandates_pdf_export.start_export(self.academic_year, LANGUAGE))
+        self.assertEqual(mandates_pdf_export.get_state(self.academic_year, LANGUAGE)['status'],
+                         mandates_pdf_export.RUNNING)
+
+    def _assert_rendered_again_after(self, change):
+        mandates_pdf_export.export_mandates(self.academic_year.id, LANGUAGE)
+        self.mock_render_fragments.reset_mock()
+
+        change()
+        mandates_pdf_export.export_mandates(self.academic_year.id, LANGUAGE)
+        rendered_mandate_ids = [mandate_id for mandate_id, fragment_path in self.mock_render_fragments.call_args[0][0]]
+        self.assertEqual(rendered_mandate_ids, [self.mandate.id])
+
+    def test_export_mandates_renders_again_mandates_of_changed_person(self):
+        self._assert_rendered_again_after(self.mandate.assistant.person.save)
+
+    def test_export_mandates_renders_again_mandates_of_changed_entity_version(self):
+        entity_version = EntityVersionFactory()
+        MandateEntityFactory(assistant_mandate=self.mandate, entity=entity_version.entity)
+        self._assert_rendered_again_after(entity_version.save)
+
+    def test_export_mandates_renders_again_mandates_of_changed_learning_unit_year(self):
+        tutoring = TutoringLearningUnitYearFactory(mandate=self.mandate)
+        self._assert_rendered_again_after(tutoring.learning_unit_year.save)
+
+    @mock.patch('subprocess.check_call', side_effect=run_command_in_process)
+    def test_run_export(self, mock_check_call):
+        mandates_pdf_export.run_export(self.academic_year.id, LANGUAGE)
+        (command,), kwargs = mock_check_call.call_args
+        self.assertEqual(command[2:], [mandates_pdf_export.EXPORT_COMMAND, str(self.academic_year.id), LANGUAGE])
+        state = mandates_pdf_export.get_state(self.academic_year, LANGUAGE)
+        self.assertEqual(state['status'], mandates_pdf_export.DONE)
+        self.assertTrue(os.path.exists(state['path']))
+        self.assertTrue(mandates_pdf_export.start_export(self.academic_year, LANGUAGE))
+
+    @mock.patch('subprocess.check_call', side_effect=subprocess.CalledProcessError(1, 'manage.py'))
+    def test_run_export_failed(self, mock_check_call):
+        mandates_pdf_export.run_export(self.academic_year.id, LANGUAGE)
+        self.assertEqual(mandates_pdf_export.get_state(self.academic_year, LANGUAGE)['status'],
+                         mandates_pdf_export.FAILED)
+        self.assertTrue(mandates_pdf_export.start_export(self.academic_year, LANGUAGE))
+
+    def test_export_running_without_lock_is_failed(self):
+        mandates_pdf_export.start_export(self.academic_year, LANGUAGE)
+        mandates_pdf_export.cache.delete(mandates_pdf_export._get_cache_key('lock', self.academic_year.id, LANGUAGE))
+        self.assertEqual(mandates_pdf_export.get_state(self.academic_year, LANGUAGE)['status'],
+                         mandates_pdf_export.FAILED)
@@ -0,0 +1,79 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from unittest import mock
+
+from django.test import TestCase
+
+from base.models.enums import entity_type
+from base.tests.factories.academic_year import AcademicYearFactory
+from base.tests.factories.person import PersonFactory
+
+from assistant.business import messages_campaign
+from assistant.models.enums import message_type
+from assistant.models.message import Message
+from assistant.tests.factories.manager import ManagerFactory
+from assistant.tests.factories.settings import SettingsFactory
+
+HTML_TEMPLATE_REF = 'assistant_reviewers_startup_html'
+TXT_TEMPLATE_REF = 'assistant_reviewers_startup_txt'
+
+
+class TestMessagesCampaign(TestCase):
+
+    def setUp(self):
+        self.settings = SettingsFactory()
+        self.message = Message.objects.create(sender=ManagerFactory(), academic_year=AcademicYearFactory(),
+                                              type=message_type.TO_ALL_REVIEWERS)
+        self.person = PersonFactory(first_name='Jean', last_name='Dupont')
+        self.same_data_person = PersonFactory(first_name='Jean', last_name='Dupont', gender=self.person.gender)
+        self.other_person = PersonFactory(first_name='Marie', last_name='Martin')
+        self.recipients = [
+            messages_campaign.create_recipient(person, HTML_TEMPLATE_REF, TXT_TEMPLATE_REF, role='SUPERVISION',
+                                               entity=entity_type.FACULTY)
+            for person in [self.person, self.same_data_person, self.other_person]
+        ]
+
+    def test_build_message_contents_groups_recipients_with_same_data(self):
+        message_contents = messages_campaign.build_message_contents(
+            self.recipients, messages_campaign.get_template_base_data(self.settings))
+        self.assertEqual([len(message_content['receivers']) for message_content in message_contents], [2, 1])
+        self.assertEqual(message_contents[1]['template_base_data']['first_name'], 'Marie')
+        self.assertEqual(message_contents[1]['template_base_data']['role'], 'SUPERVISION')
+
+    def test_start_campaign_records_recipients_count(self):
+        messages_campaign.start_campaign(self.message, self.recipients)
+        self.message.refresh_from_db()
+        self.assertEqual(self.message.recipients_count, 3)
+        self.assertEqual(self.message.sent_count, 0)
+
+    @mock.patch('osis_common.messaging.send_message.send_messages')
+    def test_send_campaign_records_progress(self, mock_send_messages):
+        mock_send_messages.side_effect = [None, 'template_error']
+        messages_campaign.send_campaign(self.message.id, self.recipients)
+        self.message.refresh_from_db()
+        self.assertEqual(mock_send_messages.call_count, 2)
+        self.assertEqual(self.message.sent_count, 2)
+        self.assertEqual(self.message.failed_count, 1)
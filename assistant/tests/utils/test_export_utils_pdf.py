@@ -26,6 +26,7 @@
 import datetime
 from django.utils.translation import ugettext_lazy as _
 from django.test import TestCase, RequestFactory, Client
+from django.urls import reverse
 from reportlab.lib.enums import TA_LEFT
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import Paragraph
@@ -132,9 +133,22 @@ class ExportPdfTestCase(TestCase):
 
     def test_export_mandates(self):
         self.client.force_login(self.manager.person.user)
-        response = self.client.post('/assistants/manager/mandates/export_pdf/')
+        response = self.client.get(reverse('export_mandates_pdf'))
+        self.assertRedirects(response, reverse('export_mandates_pdf_status'))
+
+    def test_export_mandates_status(self):
+        self.client.force_login(self.manager.person.user)
+        response = self.client.get(reverse('export_mandates_pdf_status'))
         self.assertEqual(HTTP_OK, response.status_code)
 
+    def test_download_mandates_pdf_before_export(self):
+        self.client.force_login(self.manager.person.user)
+        response = self.client.get(reverse('download_mandates_pdf'))
+        self.assertRedirects(response, reverse('export_mandates_pdf_status'))
+
+    def test_build_mandate_pdf(self):
+        self.assertTrue(export_utils_pdf.build_mandate_pdf(self.mandate).startswith(b'%PDF'))
+
     def test_format_data(self):
         data = 'good example of data.'
         title = 'formations'
@@ -31,12 +31,15 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase
 
 from base.models import academic_year
-from base.models import entity
 from base.models.enums import entity_type
 from base.tests.factories.entity_version import EntityVersionFactory
 from base.tests.factories.academic_year import AcademicYearFactory
 from base.tests.factories.person import PersonFactory
 
+from assistant.models.academic_assistant import AcademicAssistant
+from assistant.models.assistant_mandate import AssistantMandate
+from assistant.models.enums import assistant_type, assistant_phd_inscription, assistant_mandate_renewal
+from assistant.models.enums import assistant_mandate_state
 from assistant.models.mandate_entity import find_by_mandate_and_entity
 from assistant.models.tutoring_learning_unit_year import find_by_mandate
 from assistant.tests.factories.academic_assistant import AcademicAssistantFactory
@@ -45,13 +48,8 @@ from assistant.tests.factories.manager import ManagerFactory
 from assistant.tests.factories.tutoring_learning_unit_year import TutoringLearningUnitYearFactory
 from assistant.utils.import_xls_file_data import check_date_format
 from assistant.utils.import_xls_file_data import check_file_format
-from assistant.utils.import_xls_file_data import create_academic_assistant_if_not_exists
-from assistant.utils.import_xls_file_data import create_assistant_mandate_if_not_exists
-from assistant.utils.import_xls_file_data import link_mandate_to_entity
+from assistant.utils.import_xls_file_data import import_mandates
 from assistant.utils.import_xls_file_data import read_xls_mandates
-from assistant.utils.import_xls_file_data import retrieve_learning_units_year_from_previous_mandate
-from assistant.utils.import_xls_file_data import search_entity_by_acronym_and_type
-from assistant.utils import import_xls_file_data
 from assistant.utils.import_xls_file_data import COLS_TITLES
 
 HTTP_OK = 200
@@ -153,87 +151,83 @@ class ExportImportXlsFile(TestCase):
         cols[1] = 'ANOTHER_BAD_TITLE'
         self.assertFalse(check_file_format(self.request, cols))
 
-    def test_create_academic_assistant_if_not_exists(self):
-        nbr_assistant_updated = import_xls_file_data.ASSISTANTS_UPDATED
-        nbr_assistant_imported = import_xls_file_data.ASSISTANTS_IMPORTED
-        nbr_persons_not_found = import_xls_file_data.PERSONS_NOT_FOUND
-        create_academic_assistant_if_not_exists(self.record1)
-        self.assertEqual(import_xls_file_data.ASSISTANTS_IMPORTED, nbr_assistant_imported)
-        self.assertEqual(nbr_assistant_updated + 1, import_xls_file_data.ASSISTANTS_UPDATED)
-        self.assertEqual(nbr_persons_not_found, import_xls_file_data.PERSONS_NOT_FOUND)
-        create_academic_assistant_if_not_exists(self.record2)
-        self.assertEqual(import_xls_file_data.ASSISTANTS_IMPORTED, nbr_assistant_imported + 1)
-        self.assertEqual(nbr_assistant_updated + 1, import_xls_file_data.ASSISTANTS_UPDATED)
-        self.assertEqual(nbr_persons_not_found, import_xls_file_data.PERSONS_NOT_FOUND)
-        create_academic_assistant_if_not_exists(self.record3)
-        self.assertEqual(import_xls_file_data.ASSISTANTS_IMPORTED, nbr_assistant_imported + 1)
-        self.assertEqual(nbr_assistant_updated + 1, import_xls_file_data.ASSISTANTS_UPDATED)
-        self.assertEqual(nbr_persons_not_found + 1, import_xls_file_data.PERSONS_NOT_FOUND)
-
-    def test_create_assistant_mandate_if_not_exists(self):
-        nbr_mandates_imported = import_xls_file_data.MANDATES_IMPORTED
-        nbr_mandates_updated = import_xls_file_data.MANDATES_UPDATED
-        create_assistant_mandate_if_not_exists(
-            self.record1, self.assistant1, check_date_format(self.record1.get('END_DATE')),
-            check_date_format(self.record1.get('END_DATE'))
-        )
-        self.assertEqual(import_xls_file_data.MANDATES_IMPORTED, nbr_mandates_imported + 1)
-        self.assertEqual(import_xls_file_data.MANDATES_UPDATED, nbr_mandates_updated)
-        create_assistant_mandate_if_not_exists(
-            self.record1, self.assistant1, check_date_format(self.record1.get('END_DATE')),
-            check_date_format(self.record1.get('END_DATE'))
-        )
-        self.assertEqual(import_xls_file_data.MANDATES_IMPORTED, nbr_mandates_imported + 1)
-        self.assertEqual(import_xls_file_data.MANDATES_UPDATED, nbr_mandates_updated + 1)
-        create_assistant_mandate_if_not_exists(
-            self.record2, self.assistant2, check_date_format(self.record2.get('END_DATE')),
-            check_date_format(self.record2.get('END_DATE'))
-        )
-        self.assertEqual(import_xls_file_data.MANDATES_IMPORTED, nbr_mandates_imported + 2)
-        self.assertEqual(import_xls_file_data.MANDATES_UPDATED, nbr_mandates_updated + 1)
-        create_assistant_mandate_if_not_exists(
-            self.record3, self.assistant3, check_date_format(self.record3.get('END_DATE')),
-            check_date_format(self.record3.get('END_DATE'))
-        )
-        self.assertEqual(import_xls_file_data.MANDATES_IMPORTED, nbr_mandates_imported + 3)
-        self.assertEqual(import_xls_file_data.MANDATES_UPDATED, nbr_mandates_updated + 1)
-
-    def test_retrieve_learning_units_year_from_previous_mandate(self):
-        self.assistant_mandate3 = AssistantMandateFactory(assistant=self.assistant2)
-        self.assistant_mandate2 = AssistantMandateFactory(
-            assistant=self.assistant1,
-            academic_year=self.previous_academic_year
-        )
-        self.tutoring_learning_unit_year1 = TutoringLearningUnitYearFactory(mandate=self.assistant_mandate2)
-        self.tutoring_learning_unit_year2 = TutoringLearningUnitYearFactory(mandate=self.assistant_mandate2)
-        self.assistant_mandate5 = AssistantMandateFactory(
-            assistant=self.assistant2
+    def test_import_mandates(self):
+        result = import_mandates([self.record1, self.record2, self.record3])
+        self.assertEqual(result.assistants_imported, 1)
+        self.assertEqual(result.assistants_updated, 1)
+        self.assertEqual(result.persons_not_found, 1)
+        self.assertEqual(result.mandates_imported, 2)
+        self.assertEqual(result.mandates_updated, 0)
+
+        new_assistant = AcademicAssistant.objects.get(person=self.person2)
+        self.assertEqual(new_assistant.inscription, assistant_phd_inscription.NO)
+        new_mandate = AssistantMandate.objects.get(assistant=new_assistant, sap_id=self.record2['SAP_ID'])
+        self.assertEqual(new_mandate.state, assistant_mandate_state.TO_DO)
+        self.assertEqual(new_mandate.renewal_type, assistant_mandate_renewal.EXCEPTIONAL)
+        self.assertEqual(new_mandate.assistant_type, assistant_type.TEACHING_ASSISTANT)
+        self.assertEqual(new_mandate.end_date, datetime.date(2017, 10, 3))
+
+    def test_import_mandates_twice(self):
+        import_mandates([self.record1])
+        result = import_mandates([self.record1])
+        self.assertEqual(result.assistants_imported, 0)
+        self.assertEqual(result.assistants_updated, 1)
+        self.assertEqual(result.mandates_imported, 0)
+        self.assertEqual(result.mandates_updated, 1)
+        self.assertEqual(
+            AssistantMandate.objects.filter(assistant=self.assistant1, sap_id=self.record1['SAP_ID']).count(), 1
         )
-        retrieve_learning_units_year_from_previous_mandate(self.assistant1, self.assistant_mandate1)
-        self.assertEqual(len(find_by_mandate(self.assistant_mandate1)), 2)
 
-        retrieve_learning_units_year_from_previous_mandate(self.assistant2, self.assistant_mandate5)
-        self.assertEqual(len(find_by_mandate(self.assistant_mandate5)), 0)
+    def test_import_mandates_with_same_mandate_twice_in_file(self):
+        result = import_mandates([self.record1, dict(self.record1, SCALE='502')])
+        self.assertEqual(result.mandates_imported, 1)
+        self.assertEqual(result.mandates_updated, 1)
+        mandate = AssistantMandate.objects.get(assistant=self.assistant1, sap_id=self.record1['SAP_ID'])
+        self.assertEqual(mandate.scale, '502')
 
-        retrieve_learning_units_year_from_previous_mandate(self.assistant2, self.assistant_mandate3)
-        self.assertEqual(len(find_by_mandate(self.assistant_mandate3)), 0)
+    def test_import_mandates_links_mandates_to_entities(self):
+        import_mandates([self.record1])
+        mandate = AssistantMandate.objects.get(assistant=self.assistant1, sap_id=self.record1['SAP_ID'])
+        self.assertTrue(find_by_mandate_and_entity(mandate, self.entity_version1.entity).exists())
 
-    def test_link_mandate_to_entity(self):
-        self.assertEqual(
-            link_mandate_to_entity(self.assistant_mandate1, self.entity_version1.entity),
-            find_by_mandate_and_entity(self.assistant_mandate1, self.entity_version1.entity)[0]
-        )
-        self.assertEqual(link_mandate_to_entity(self.assistant_mandate1), None)
-        self.assertEqual(
-            link_mandate_to_entity(self.assistant_mandate1, self.entity_version2.entity),
-            find_by_mandate_and_entity(self.assistant_mandate1, self.entity_version2.entity)[0]
-        )
+        import_mandates([dict(self.record1, SECTOR='SSH')])
+        self.assertFalse(find_by_mandate_and_entity(mandate, self.entity_version1.entity).exists())
+        self.assertTrue(find_by_mandate_and_entity(mandate, self.entity_version2.entity).exists())
+
+    def test_import_mandates_copies_learning_units_of_previous_mandate(self):
+        assistant = AcademicAssistantFactory(person=self.person2)
+        previous_mandate = AssistantMandateFactory(assistant=assistant, academic_year=self.previous_academic_year)
+        TutoringLearningUnitYearFactory(mandate=previous_mandate)
+        TutoringLearningUnitYearFactory(mandate=previous_mandate)
+
+        import_mandates([self.record2])
+        new_mandate = AssistantMandate.objects.get(assistant=assistant, sap_id=self.record2['SAP_ID'])
+        self.assertEqual(len(find_by_mandate(new_mandate)), 2)
+        self.assertEqual(len(find_by_mandate(previous_mandate)), 2)
+
+        import_mandates([self.record2])
+        self.assertEqual(len(find_by_mandate(new_mandate)), 2)
+
+    def test_import_mandates_touches_changed_mandates(self):
+        import_mandates([self.record1])
+        mandate = AssistantMandate.objects.get(assistant=self.assistant1, sap_id=self.record1['SAP_ID'])
+
+        import_mandates([self.record1])
+        self.assertEqual(AssistantMandate.objects.get(pk=mandate.pk).changed, mandate.changed)
+
+        import_mandates([dict(self.record1, END_DATE='03-10-2018')])
+        changed_mandate = AssistantMandate.objects.get(pk=mandate.pk)
+        self.assertGreater(changed_mandate.changed, mandate.changed)
+
+        import_mandates([dict(self.record1, END_DATE='03-10-2018', SECTOR='SSH')])
+        self.assertGreater(AssistantMandate.objects.get(pk=mandate.pk).changed, changed_mandate.changed)
+
+    def test_import_mandates_touches_mandates_of_teaching_assistants(self):
+        AcademicAssistant.objects.filter(pk=self.assistant1.pk).update(inscription=assistant_phd_inscription.YES)
+        AssistantMandate.objects.filter(pk=self.assistant_mandate1.pk).update(changed=None)
 
-    def test_search_entity_by_acronym_and_type(self):
-        self.assertIsInstance(search_entity_by_acronym_and_type('SST', entity_type.SECTOR), entity.Entity)
-        self.assertEqual(search_entity_by_acronym_and_type(None, entity_type.SECTOR), None)
-        self.assertEqual(search_entity_by_acronym_and_type(None, entity_type.SECTOR), None)
-        self.assertEqual(search_entity_by_acronym_and_type('SST', None), None)
+        import_mandates([dict(self.record1, ASSISTANT_TYPE_CODE='AS')])
+        self.assertIsNotNone(AssistantMandate.objects.get(pk=self.assistant_mandate1.pk).changed)
 
 
 class FakeMessages:
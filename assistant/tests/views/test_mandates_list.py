@@ -0,0 +1,119 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import datetime
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from base.models.enums import entity_type
+from base.tests.factories.academic_year import AcademicYearFactory
+from base.tests.factories.entity_version import EntityVersionFactory
+
+from assistant.tests.factories.assistant_mandate import AssistantMandateFactory
+from assistant.tests.factories.manager import ManagerFactory
+from assistant.tests.factories.mandate_entity import MandateEntityFactory
+from assistant.tests.factories.settings import SettingsFactory
+from assistant.views.mandates_list import MANDATES_BY_PAGE
+
+HTTP_OK = 200
+
+
+class MandatesListViewTestCase(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.settings = SettingsFactory()
+        today = datetime.date.today()
+        self.manager = ManagerFactory()
+        self.current_academic_year = AcademicYearFactory(start_date=today,
+                                                         end_date=today.replace(year=today.year + 1),
+                                                         year=today.year)
+        self.faculty_version = EntityVersionFactory(entity_type=entity_type.FACULTY)
+        self.mandates = [AssistantMandateFactory(academic_year=self.current_academic_year, sap_id=str(index))
+                         for index in range(3)]
+        for mandate in self.mandates:
+            MandateEntityFactory(assistant_mandate=mandate, entity=self.faculty_version.entity)
+        self.client.force_login(self.manager.person.user)
+
+    def test_mandates_list_with_entities(self):
+        response = self.client.get(reverse('mandates_list'), {'academic_year': self.current_academic_year.id})
+        self.assertEqual(response.status_code, HTTP_OK)
+        for mandate in response.context['object_list']:
+            self.assertEqual(mandate.entities, [self.faculty_version])
+
+    def test_mandates_list_ordered_by_sap_id_descending(self):
+        response = self.client.get(reverse('mandates_list'), {'academic_year': self.current_academic_year.id,
+                                                              'order_by': '-sap_id'})
+        self.assertEqual([mandate.sap_id for mandate in response.context['object_list']], ['2', '1', '0'])
+        self.assertEqual(response.context['order_by'], '-sap_id')
+
+    def test_mandates_list_with_unknown_ordering(self):
+        response = self.client.get(reverse('mandates_list'), {'academic_year': self.current_academic_year.id,
+                                                              'order_by': 'absences'})
+        self.assertEqual(response.context['order_by'], 'assistant')
+
+    def test_mandates_list_is_paginated(self):
+        for index in range(MANDATES_BY_PAGE):
+            AssistantMandateFactory(academic_year=self.current_academic_year)
+        response = self.client.get(reverse('mandates_list'), {'academic_year': self.current_academic_year.id})
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(len(response.context['object_list']), MANDATES_BY_PAGE)
+
+    def _create_mandate(self, sap_id, first_name, last_name):
+        mandate = AssistantMandateFactory(academic_year=self.current_academic_year, sap_id=sap_id)
+        mandate.assistant.person.first_name = first_name
+        mandate.assistant.person.last_name = last_name
+        mandate.assistant.person.save()
+        return mandate
+
+    def test_mandates_list_search_by_sap_id(self):
+        mandate = self._create_mandate('98765', 'Jean', 'Dupont')
+        response = self.client.get(reverse('mandates_list'), {'academic_year': self.current_academic_year.id,
+                                                              'q': '9876'})
+        self.assertEqual(list(response.context['object_list']), [mandate])
+        self.assertEqual(response.context['q'], '9876')
+
+    def test_mandates_list_search_by_name(self):
+        mandate = self._create_mandate('98765', 'Jean', 'Dupont')
+        self._create_mandate('98766', 'Jeanne', 'Durand')
+        response = self.client.get(reverse('mandates_list'), {'academic_year': self.current_academic_year.id,
+                                                              'q': ' dupont JEAN '})
+        self.assertEqual(list(response.context['object_list']), [mandate])
+
+    def test_mandates_list_search_kept_when_ordering(self):
+        self._create_mandate('98765', 'Jean', 'Dupont')
+        self._create_mandate('98766', 'Jeanne', 'Durand')
+        response = self.client.get(reverse('mandates_list'), {'academic_year': self.current_academic_year.id,
+                                                              'q': 'jean', 'order_by': '-sap_id'})
+        self.assertEqual([mandate.sap_id for mandate in response.context['object_list']], ['98766', '98765'])
+        self.assertContains(response, '?order_by=sap_id&q=jean')
+
+    def test_mandates_list_search_is_paginated(self):
+        for index in range(MANDATES_BY_PAGE + 1):
+            self._create_mandate('9{}'.format(index), 'Jean', 'Dupont')
+        response = self.client.get(reverse('mandates_list'), {'academic_year': self.current_academic_year.id,
+                                                              'q': 'dupont', 'page': 2})
+        self.assertEqual(len(response.context['object_list']), 1)
@@ -33,8 +33,8 @@ from assistant.views import mandates_list, reviewer_mandates_list, reviewer_revi
 from assistant.utils import get_persons
 from assistant.views import messages, phd_supervisor_assistants_list
 from assistant.views import assistant_mandate_reviews
-from assistant.views import manager_reviews_view
-from assistant.utils import send_email, import_xls_file_data, export_utils_pdf
+from assistant.views import manager_reviews_view, mandates_pdf_export
+from assistant.utils import send_email, import_xls_file_data
 
 urlpatterns = [
     url(r'^$', home.assistant_home, name='assistants_home'),
@@ -106,7 +106,11 @@ urlpatterns = [
             url(r'^load/$', mandate.load_mandates, name='load_mandates'),
             url(r'^upload/$', import_xls_file_data.upload_mandates_file, name='upload_mandates_file'),
             url(r'^export/$', mandate.export_mandates, name='export_mandates'),
-            url(r'^export_pdf/$', export_utils_pdf.export_mandates, name='export_mandates_pdf'),
+            url(r'^export_pdf/', include([
+                url(r'^$', mandates_pdf_export.export_mandates, name='export_mandates_pdf'),
+                url(r'^status/$', mandates_pdf_export.export_mandates_status, name='export_mandates_pdf_status'),
+                url(r'^download/$', mandates_pdf_export.download_mandates_pdf, name='download_mandates_pdf'),
+            ])),
         ])),
         url(r'^messages/', include([
             url(r'^history/$', messages.show_history, name='messages_history'),
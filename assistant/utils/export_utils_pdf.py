@@ -23,12 +23,8 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-import time
 import datetime
 from io import BytesIO
-from django.contrib.auth.decorators import user_passes_test
-from django.http import HttpResponse
-from django.db.models.query import QuerySet
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT
 from reportlab.platypus import SimpleDocTemplate, Paragraph, PageBreak, Table, TableStyle
@@ -42,9 +38,8 @@ from reportlab.graphics.charts.legends import Legend
 from django.utils.translation import ugettext_lazy as _
 from django.utils import timezone
 from base.models.entity import find_versions_from_entites
-from base.models import academic_year, entity_version
-from assistant.utils import manager_access
-from assistant.models import assistant_mandate, review, tutoring_learning_unit_year
+from base.models import entity_version
+from assistant.models import review, tutoring_learning_unit_year
 from assistant.models.enums import review_status, assistant_type
 
 PAGE_SIZE = A4
@@ -61,30 +56,27 @@ def add_header_footer(canvas, doc):
     canvas.restoreState()
 
 
-@user_passes_test(manager_access.user_is_manager, login_url='assistants_home')
-def export_mandates(mandates=None):
-    if not isinstance(mandates, QuerySet):
-        mandates = assistant_mandate.find_by_academic_year_by_excluding_declined(academic_year.current_academic_year())
-    filename = ('%s_%s.pdf' % (_('assistants_mandates'), time.strftime("%Y%m%d_%H%M")))
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="%s"' % filename
+def build_mandate_pdf(mandate):
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=PAGE_SIZE, rightMargin=MARGIN_SIZE, leftMargin=MARGIN_SIZE, topMargin=70,
                             bottomMargin=25)
+    doc.academic_year = mandate.academic_year
+    content = []
+    add_mandate_content(content, mandate, get_styles())
+    doc.build(content, onFirstPage=add_header_footer, onLaterPages=add_header_footer)
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
+
+
+def get_styles():
     styles = getSampleStyleSheet()
     styles.add(ParagraphStyle(name='Tiny', fontSize=6, font='Helvetica', leading=8, leftIndent=0, rightIndent=0,
                               firstLineIndent=0, alignment=TA_LEFT, spaceBefore=0, spaceAfter=0, splitLongWords=1,))
     styles.add(ParagraphStyle(name='StandardWithBorder', font='Helvetica', leading=18, leftIndent=10, rightIndent=10,
                               firstLineIndent=0, alignment=TA_JUSTIFY, spaceBefore=25, spaceAfter=5, splitLongWords=1,
                               borderColor='#000000', borderWidth=1, borderPadding=10,))
-    content = []
-    for mandate in mandates:
-        add_mandate_content(content, mandate, styles)
-    doc.build(content, onFirstPage=add_header_footer, onLaterPages=add_header_footer)
-    pdf = buffer.getvalue()
-    buffer.close()
-    response.write(pdf)
-    return response
+    return styles
 
 
 def add_mandate_content(content, mandate, styles):
@@ -156,7 +148,7 @@ def get_administrative_data(mandate):
 
 
 def get_entities(mandate):
-    start_date = academic_year.current_academic_year().start_date
+    start_date = mandate.academic_year.start_date
     entities_id = mandate.mandateentity_set.all().order_by('id').values_list('entity', flat=True)
     entities = find_versions_from_entites(entities_id, start_date)
     entities_data = ""
@@ -353,7 +345,7 @@ def add_data_and_titles_to_pie(pie, titles, data, title):
 
 def header_building(canvas, doc):
     canvas.line(doc.leftMargin, 790, doc.width+doc.leftMargin, 790)
-    canvas.drawString(80, 800, "%s %s" % (_('assistant_mandates_renewals'), academic_year.current_academic_year()))
+    canvas.drawString(80, 800, "%s %s" % (_('assistant_mandates_renewals'), doc.academic_year))
 
 
 def footer_building(canvas, doc, styles):
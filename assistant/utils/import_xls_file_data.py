@@ -23,32 +23,35 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+import copy
 import datetime
 import re
 
 from openpyxl import load_workbook
 
 from django.contrib.auth.decorators import user_passes_test
+from django.db import transaction
 from django.utils.translation import ugettext as _
 from django.views.decorators.http import require_http_methods
 
 from base import models as mdl
+from base.models.entity_version import EntityVersion
 from base.models.enums import entity_type
+from base.models.person import Person
 from base.views import layout
 from base.views.common import display_error_messages
 
-from assistant import models as assistant_mdl
 from assistant.forms import MandateFileForm
+from assistant.models import assistant_mandate
+from assistant.models.academic_assistant import AcademicAssistant
+from assistant.models.assistant_mandate import AssistantMandate
 from assistant.models.enums import assistant_type, assistant_phd_inscription, assistant_mandate_renewal
 from assistant.models.enums import assistant_mandate_state
+from assistant.models.mandate_entity import MandateEntity
+from assistant.models.tutoring_learning_unit_year import TutoringLearningUnitYear
 from assistant.utils import manager_access
 
 COLS_NUMBER = 23
-ASSISTANTS_IMPORTED = 0
-MANDATES_IMPORTED = 0
-ASSISTANTS_UPDATED = 0
-MANDATES_UPDATED = 0
-PERSONS_NOT_FOUND = 0
 COLS_TITLES = ['SECTOR', 'LOGISTICS_ENTITY', 'FACULTY', 'SCHOOL', 'INSTITUTE', 'POLE', 'SAP_ID', 'GLOBAL_ID',
                'LAST_NAME', 'FIRST_NAME', 'FULLTIME_EQUIVALENT', 'ENTRY_DATE', 'END_DATE', 'ASSISTANT_TYPE_CODE',
                'SCALE', 'CONTRACT_DURATION', 'CONTRACT_DURATION_FTE', 'RENEWAL_TYPE', 'ABSENCES', 'COMMENT',
@@ -57,18 +60,242 @@ ASSISTANT_TYPES_ALIASES = {
     'ST': assistant_type.ASSISTANT,
     'AS': assistant_type.TEACHING_ASSISTANT
 }
+ENTITY_COLS = [
+    ('SECTOR', entity_type.SECTOR),
+    ('LOGISTICS_ENTITY', entity_type.LOGISTICS_ENTITY),
+    ('FACULTY', entity_type.FACULTY),
+    ('SCHOOL', entity_type.SCHOOL),
+    ('INSTITUTE', entity_type.INSTITUTE),
+    ('POLE', entity_type.POLE),
+]
+
+MANDATE_IMPORTED_FIELDS = ['end_date', 'entry_date', 'fulltime_equivalent', 'sap_id', 'contract_duration',
+                           'contract_duration_fte', 'renewal_type', 'absences', 'comment', 'other_status',
+                           'assistant_type', 'scale']
+
+
+class ImportResult:
+    def __init__(self):
+        self.assistants_imported = 0
+        self.assistants_updated = 0
+        self.mandates_imported = 0
+        self.mandates_updated = 0
+        self.persons_not_found = 0
+
+
+class MandatesImporter:
+    """
+    Import the records of a mandates file in the current academic year.
+    The persons, assistants, mandates and entities needed by all the records are loaded once, then the changes are
+    written with bulk queries in a single transaction.
+    """
+    def __init__(self, records):
+        self.records = records
+        self.result = ImportResult()
+        self.academic_year = mdl.academic_year.current_academic_year()
+
+    @transaction.atomic
+    def run(self):
+        assistant_by_record = self._import_assistants()
+        mandate_by_record = self._import_mandates(assistant_by_record)
+        self._link_mandates_to_entities(mandate_by_record)
+        return self.result
+
+    def _import_assistants(self):
+        global_ids = {record.get('FGS') for record in self.records if record.get('FGS')}
+        person_by_global_id = {person.global_id: person for person in Person.objects.filter(global_id__in=global_ids)}
+        assistant_by_person_id = {
+            assistant.person_id: assistant
+            for assistant in AcademicAssistant.objects.filter(person__in=person_by_global_id.values())
+        }
+
+        assistant_by_record = []
+        new_assistants = []
+        teaching_assistant_ids = set()
+        for record in self.records:
+            person = person_by_global_id.get(record.get('FGS'))
+            if not person:
+                self.result.persons_not_found += 1
+                continue
+            assistant = assistant_by_person_id.get(person.id)
+            if assistant:
+                self.result.assistants_updated += 1
+            else:
+                assistant = AcademicAssistant(person=person)
+                assistant_by_person_id[person.id] = assistant
+                new_assistants.append(assistant)
+                self.result.assistants_imported += 1
+            if _get_assistant_type(record) == assistant_type.TEACHING_ASSISTANT:
+                assistant.inscription = assistant_phd_inscription.NO
+                if assistant.pk:
+                    teaching_assistant_ids.add(assistant.pk)
+            assistant_by_record.append((record, assistant))
+
+        AcademicAssistant.objects.bulk_create(new_assistants)
+        # The update() skips the signals: the mandates printed with the inscription are touched here
+        updated_assistant_ids = list(AcademicAssistant.objects.filter(pk__in=teaching_assistant_ids)
+                                     .exclude(inscription=assistant_phd_inscription.NO)
+                                     .values_list('pk', flat=True))
+        AcademicAssistant.objects.filter(pk__in=updated_assistant_ids)\
+            .update(inscription=assistant_phd_inscription.NO)
+        assistant_mandate.touch(AssistantMandate.objects.filter(assistant__in=updated_assistant_ids))
+        return assistant_by_record
+
+    def _import_mandates(self, assistant_by_record):
+        mandate_by_key = {}
+        for mandate in AssistantMandate.objects.filter(
+                academic_year=self.academic_year,
+                assistant__in=[assistant for record, assistant in assistant_by_record],
+                sap_id__in={record.get('SAP_ID') for record, assistant in assistant_by_record}).order_by('pk'):
+            mandate_by_key.setdefault((mandate.assistant_id, mandate.sap_id), mandate)
+
+        mandate_by_record = []
+        new_mandates = []
+        changed_mandates = set()
+        for record, assistant in assistant_by_record:
+            key = (assistant.pk, record.get('SAP_ID'))
+            mandate = mandate_by_key.get(key)
+            if mandate:
+                self.result.mandates_updated += 1
+            else:
+                mandate = AssistantMandate(assistant=assistant, academic_year=self.academic_year,
+                                           state=assistant_mandate_state.TO_DO)
+                mandate_by_key[key] = mandate
+                new_mandates.append(mandate)
+                self.result.mandates_imported += 1
+            if _update_mandate(mandate, record) and mandate.pk:
+                changed_mandates.add(mandate)
+            mandate_by_record.append((record, mandate))
+
+        AssistantMandate.objects.bulk_create(new_mandates)
+        for mandate in changed_mandates:
+            mandate.save(update_fields=MANDATE_IMPORTED_FIELDS + ['changed'])
+        self._copy_tutoring_learning_units_from_previous_mandates(new_mandates)
+        return mandate_by_record
+
+    def _copy_tutoring_learning_units_from_previous_mandates(self, new_mandates):
+        previous_mandate_by_assistant_id = {}
+        for mandate in AssistantMandate.objects.filter(assistant__in=[mandate.assistant for mandate in new_mandates],
+                                                       academic_year__year__lt=self.academic_year.year)\
+                .order_by('-academic_year__year'):
+            previous_mandate_by_assistant_id.setdefault(mandate.assistant_id, mandate)
+
+        tutoring_learning_units_by_mandate_id = {}
+        for tutoring_learning_unit in TutoringLearningUnitYear.objects.filter(
+                mandate__in=previous_mandate_by_assistant_id.values()):
+            tutoring_learning_units_by_mandate_id.setdefault(tutoring_learning_unit.mandate_id, [])\
+                .append(tutoring_learning_unit)
+
+        copies = []
+        for new_mandate in new_mandates:
+            previous_mandate = previous_mandate_by_assistant_id.get(new_mandate.assistant_id)
+            if not previous_mandate:
+                continue
+            for tutoring_learning_unit in tutoring_learning_units_by_mandate_id.get(previous_mandate.pk, []):
+                tutoring_learning_unit_copy = copy.copy(tutoring_learning_unit)
+                tutoring_learning_unit_copy.pk = None
+                tutoring_learning_unit_copy.mandate = new_mandate
+                copies.append(tutoring_learning_unit_copy)
+        TutoringLearningUnitYear.objects.bulk_create(copies)
+
+    def _link_mandates_to_entities(self, mandate_by_record):
+        entity_id_by_acronym_and_type = _get_entity_id_by_acronym_and_type()
+        entity_id_by_mandate_and_type = {}
+        for record, mandate in mandate_by_record:
+            for col, col_entity_type in ENTITY_COLS:
+                entity_id = entity_id_by_acronym_and_type.get((str(record.get(col)).upper(), col_entity_type))
+                if entity_id:
+                    entity_id_by_mandate_and_type[(mandate, col_entity_type)] = entity_id
+
+        existing_links = {}
+        for mandate_entity_id, mandate_id, entity_id, linked_entity_type in MandateEntity.objects.filter(
+                assistant_mandate__in={mandate for mandate, col_entity_type in entity_id_by_mandate_and_type})\
+                .values_list('id', 'assistant_mandate_id', 'entity_id', 'entity__entityversion__entity_type')\
+                .distinct():
+            existing_links.setdefault((mandate_id, linked_entity_type), set()).add((mandate_entity_id, entity_id))
+
+        mandate_entity_ids_to_delete = set()
+        mandate_entities_to_create = []
+        for (mandate, col_entity_type), entity_id in entity_id_by_mandate_and_type.items():
+            links = existing_links.get((mandate.pk, col_entity_type), set())
+            if {linked_entity_id for mandate_entity_id, linked_entity_id in links} == {entity_id}:
+                continue
+            mandate_entity_ids_to_delete |= {mandate_entity_id for mandate_entity_id, linked_entity_id in links}
+            mandate_entities_to_create.append(MandateEntity(assistant_mandate=mandate, entity_id=entity_id))
+
+        MandateEntity.objects.filter(pk__in=mandate_entity_ids_to_delete).delete()
+        MandateEntity.objects.bulk_create(mandate_entities_to_create)
+        # The bulk_create() skips the signals: the mandates whose entities changed are touched here
+        assistant_mandate.touch(AssistantMandate.objects.filter(
+            pk__in={mandate_entity.assistant_mandate.pk for mandate_entity in mandate_entities_to_create}
+        ))
+
+
+def _get_assistant_type(record):
+    return ASSISTANT_TYPES_ALIASES.get(record.get('ASSISTANT_TYPE_CODE'))
+
+
+def _get_mandate_values(record):
+    renewal_type = record.get('RENEWAL_TYPE').lower()
+    if renewal_type == 'exceptional' or renewal_type == 'exceptionnel':
+        renewal_type = assistant_mandate_renewal.EXCEPTIONAL
+    elif renewal_type == 'normal':
+        renewal_type = assistant_mandate_renewal.NORMAL
+    else:
+        renewal_type = assistant_mandate_renewal.SPECIAL
+    if _get_assistant_type(record) == assistant_type.TEACHING_ASSISTANT:
+        mandate_assistant_type = assistant_type.TEACHING_ASSISTANT
+    else:
+        mandate_assistant_type = assistant_type.ASSISTANT
+    return {
+        'end_date': check_date_format(record.get('END_DATE')),
+        'entry_date': check_date_format(record.get('ENTRY_DATE')),
+        'fulltime_equivalent': record.get('FULLTIME_EQUIVALENT'),
+        'sap_id': record.get('SAP_ID'),
+        'contract_duration': record.get('CONTRACT_DURATION'),
+        'contract_duration_fte': record.get('CONTRACT_DURATION_FTE'),
+        'renewal_type': renewal_type,
+        'absences': record.get('ABSENCES'),
+        'comment': record.get('COMMENT'),
+        'other_status': record.get('OTHER_STATUS'),
+        'assistant_type': mandate_assistant_type,
+        'scale': record.get('SCALE'),
+    }
+
+
+def _update_mandate(mandate, record):
+    changed = False
+    for field_name, value in _get_mandate_values(record).items():
+        value = AssistantMandate._meta.get_field(field_name).to_python(value)
+        if getattr(mandate, field_name) != value:
+            setattr(mandate, field_name, value)
+            changed = True
+    return changed
+
+
+def _get_entity_id_by_acronym_and_type():
+    entity_versions = EntityVersion.objects.filter(entity_type__in=[col_type for col, col_type in ENTITY_COLS])\
+        .order_by('start_date')\
+        .values_list('acronym', 'entity_type', 'entity_id')
+    # The most recent version of an acronym wins
+    return {(acronym.upper(), version_entity_type): entity_id
+            for acronym, version_entity_type, entity_id in entity_versions}
+
+
+def import_mandates(records):
+    return MandatesImporter(records).run()
 
 
 @require_http_methods(["POST"])
 @user_passes_test(manager_access.user_is_manager, login_url='assistants_home')
 def upload_mandates_file(request):
-    global ASSISTANTS_IMPORTED, ASSISTANTS_UPDATED, MANDATES_IMPORTED, MANDATES_UPDATED, PERSONS_NOT_FOUND
     form = MandateFileForm(request.POST, request.FILES)
+    result = ImportResult()
     if form.is_valid() and request.FILES['file']:
-        read_xls_mandates(request, request.FILES['file'])
+        result = read_xls_mandates(request, request.FILES['file']) or result
     else:
         display_error_messages(request, [error_msg for error_msgs in form.errors.values() for error_msg in error_msgs])
-    return show_import_result(request)
+    return show_import_result(request, result)
 
 
 @user_passes_test(manager_access.user_is_manager, login_url='assistants_home')
@@ -81,6 +308,7 @@ def read_xls_mandates(request, file_name):
     first_sheet = workbook.get_sheet_names()[0]
     worksheet = workbook.get_sheet_by_name(first_sheet)
     titles_row = []
+    records = []
     current_row = 1
     for row in worksheet.iter_rows():
         if current_row == 1:
@@ -94,52 +322,9 @@ def read_xls_mandates(request, file_name):
             if end_date is False or entry_date is False:
                 display_error_messages(request, _('date_format_error') + _('line_nbr') + str(current_row))
                 return False
-            assistant = create_academic_assistant_if_not_exists(current_record)
-            if assistant:
-                mandate = create_assistant_mandate_if_not_exists(current_record, assistant, entry_date, end_date)
-                sector = search_entity_by_acronym_and_type(
-                    current_record.get('SECTOR'),
-                    entity_type.SECTOR
-                )
-                if sector:
-                    link_mandate_to_entity(mandate, sector)
-                logistic_entity = search_entity_by_acronym_and_type(
-                    current_record.get('LOGISTICS_ENTITY'),
-                    entity_type.LOGISTICS_ENTITY
-                )
-                if logistic_entity:
-                    link_mandate_to_entity(mandate, logistic_entity)
-                faculty = search_entity_by_acronym_and_type(current_record.get('FACULTY'),
-                                                            entity_type.FACULTY)
-                if faculty:
-                    link_mandate_to_entity(mandate, faculty)
-                school = search_entity_by_acronym_and_type(
-                    current_record.get('SCHOOL'),
-                    entity_type.SCHOOL
-                )
-                if school:
-                    link_mandate_to_entity(mandate, school)
-
-                institute = search_entity_by_acronym_and_type(
-                    current_record.get('INSTITUTE'),
-                    entity_type.INSTITUTE)
-                if institute:
-                    link_mandate_to_entity(mandate, institute)
-                pole = search_entity_by_acronym_and_type(current_record.get('POLE'), entity_type.POLE)
-                if pole:
-                    link_mandate_to_entity(mandate, pole)
+            records.append(current_record)
         current_row += 1
-    return True
-
-
-def search_entity_by_acronym_and_type(acronym, type):
-    if not acronym:
-        return None
-    entities = mdl.entity_version.search(entity_type=type, acronym=acronym)
-    if len(entities) > 0:
-        return entities[0].entity
-    else:
-        return None
+    return import_mandates(records)
 
 
 def save_xls_rows_titles(current_row):
@@ -161,105 +346,12 @@ def xls_row_to_dict(row, titles):
     return record_to_import
 
 
-def create_academic_assistant_if_not_exists(record):
-    global ASSISTANTS_UPDATED, ASSISTANTS_IMPORTED, PERSONS_NOT_FOUND
-    person = mdl.person.find_by_global_id(record.get('FGS'))
-    if person:
-        assistant = assistant_mdl.academic_assistant.find_by_person(person)
-        if assistant:
-            ASSISTANTS_UPDATED += 1
-        else:
-            assistant = assistant_mdl.academic_assistant.AcademicAssistant()
-            ASSISTANTS_IMPORTED += 1
-            assistant.person = person
-        if ASSISTANT_TYPES_ALIASES.get(record.get('ASSISTANT_TYPE_CODE')) == assistant_type.TEACHING_ASSISTANT:
-            assistant.inscription = assistant_phd_inscription.NO
-        assistant.save()
-        return assistant
-    else:
-        PERSONS_NOT_FOUND += 1
-        return None
-
-
-def create_assistant_mandate_if_not_exists(record, assistant, entry_date, end_date):
-    global MANDATES_IMPORTED, MANDATES_UPDATED
-    new_mandate = False
-    current_academic_year = mdl.academic_year.current_academic_year()
-    mandates = assistant_mdl.assistant_mandate.find_mandate(assistant, current_academic_year, record.get('SAP_ID'))
-    if len(mandates) == 0:
-        mandate = assistant_mdl.assistant_mandate.AssistantMandate()
-        mandate.state = assistant_mandate_state.TO_DO
-        MANDATES_IMPORTED += 1
-        new_mandate = True
-    else:
-        mandate = mandates[0]
-        MANDATES_UPDATED += 1
-    mandate.assistant = assistant
-    mandate.academic_year = current_academic_year
-    mandate.end_date = end_date
-    mandate.entry_date = entry_date
-    mandate.fulltime_equivalent = record.get('FULLTIME_EQUIVALENT')
-    mandate.sap_id = record.get('SAP_ID')
-    mandate.contract_duration = record.get('CONTRACT_DURATION')
-    mandate.contract_duration_fte = record.get('CONTRACT_DURATION_FTE')
-    if record.get('RENEWAL_TYPE').lower() == 'exceptional' or record.get('RENEWAL_TYPE').lower() == 'exceptionnel':
-        mandate.renewal_type = assistant_mandate_renewal.EXCEPTIONAL
-    elif record.get('RENEWAL_TYPE').lower() == 'normal':
-        mandate.renewal_type = assistant_mandate_renewal.NORMAL
-    else:
-        mandate.renewal_type = assistant_mandate_renewal.SPECIAL
-    mandate.absences = record.get('ABSENCES')
-    mandate.comment = record.get('COMMENT')
-    mandate.other_status = record.get('OTHER_STATUS')
-    if ASSISTANT_TYPES_ALIASES.get(record.get('ASSISTANT_TYPE_CODE')) == assistant_type.TEACHING_ASSISTANT:
-        mandate.assistant_type = assistant_type.TEACHING_ASSISTANT
-    else:
-        mandate.assistant_type = assistant_type.ASSISTANT
-    mandate.scale = record.get('SCALE')
-    mandate.save()
-    if new_mandate:
-        retrieve_learning_units_year_from_previous_mandate(assistant, mandate)
-    return mandate
-
-
-def retrieve_learning_units_year_from_previous_mandate(assistant, new_mandate):
-    previous_mandates = assistant_mdl.assistant_mandate.find_before_year_for_assistant(
-        new_mandate.academic_year.year,
-        assistant
-    )
-    if previous_mandates:
-        previous_tutoring_learning_units_year = assistant_mdl.tutoring_learning_unit_year.find_by_mandate(
-            previous_mandates[0]
-        )
-        for previous_tutoring_learning_unit_year in previous_tutoring_learning_units_year:
-            previous_tutoring_learning_unit_year.pk = None
-            previous_tutoring_learning_unit_year.mandate = new_mandate
-            previous_tutoring_learning_unit_year.save()
-
-
-def link_mandate_to_entity(mandate, entity=None):
-    if entity:
-        type = mdl.entity_version.get_by_entity_and_date(entity, None)
-        mandate_entities = assistant_mdl.mandate_entity.find_by_mandate_and_type(mandate, type[0].entity_type)
-        if len(mandate_entities) > 0:
-            mandate_entity = mandate_entities[0]
-            mandate_entity.delete()
-        mandate_entity = assistant_mdl.mandate_entity.MandateEntity()
-        mandate_entity.assistant_mandate = mandate
-        mandate_entity.entity = entity
-        mandate_entity.save()
-        return mandate_entity
-    else:
-        return None
-
-
-def show_import_result(request):
-    global ASSISTANTS_IMPORTED, ASSISTANTS_UPDATED, MANDATES_IMPORTED, MANDATES_UPDATED, PERSONS_NOT_FOUND
-    return layout.render(request, "load_mandates.html", {'imported_assistants': ASSISTANTS_IMPORTED,
-                                                         'imported_mandates': MANDATES_IMPORTED,
-                                                         'updated_mandates': MANDATES_UPDATED,
-                                                         'updated_assistants': ASSISTANTS_UPDATED,
-                                                         'persons_not_found': PERSONS_NOT_FOUND})
+def show_import_result(request, result):
+    return layout.render(request, "load_mandates.html", {'imported_assistants': result.assistants_imported,
+                                                         'imported_mandates': result.mandates_imported,
+                                                         'updated_mandates': result.mandates_updated,
+                                                         'updated_assistants': result.assistants_updated,
+                                                         'persons_not_found': result.persons_not_found})
 
 
 def check_file_format(request, titles_rows):
@@ -28,17 +28,18 @@ from django.shortcuts import redirect
 from django.utils import timezone
 from base.models import academic_year,entity_version
 from osis_common.messaging import message_config, send_message as message_service
+from assistant.business import messages_campaign
 from assistant.models import assistant_mandate, settings, manager, reviewer
 from assistant.models.enums import message_type, assistant_mandate_renewal
 from assistant.models.message import Message
-from assistant.models.enums import reviewer_role
 from assistant.utils import manager_access
 
 
 @user_passes_test(manager_access.user_is_manager, login_url='assistants_home')
 def send_message_to_assistants(request):
     mandates_for_current_academic_year = assistant_mandate.find_by_academic_year(
-        academic_year.current_academic_year())
+        academic_year.current_academic_year()).select_related('assistant__person')
+    recipients = []
     for mandate in mandates_for_current_academic_year:
         if mandate.renewal_type == assistant_mandate_renewal.NORMAL:
             html_template_ref = 'assistant_assistants_startup_normal_renewal_html'
@@ -46,8 +47,10 @@ def send_message_to_assistants(request):
         else:
             html_template_ref = 'assistant_assistants_startup_except_renewal_html'
             txt_template_ref = 'assistant_assistants_startup_except_renewal_txt'
-        send_message(mandate.assistant.person, html_template_ref, txt_template_ref)
-    save_message_history(request, message_type.TO_ALL_ASSISTANTS)
+        recipients.append(messages_campaign.create_recipient(mandate.assistant.person, html_template_ref,
+                                                             txt_template_ref))
+    message = save_message_history(request, message_type.TO_ALL_ASSISTANTS)
+    messages_campaign.start_campaign(message, recipients)
     return redirect('messages_history')
 
 
@@ -55,10 +58,11 @@ def send_message_to_assistants(request):
 def send_message_to_deans(request):
     html_template_ref = 'assistant_deans_startup__html'
     txt_template_ref = 'assistant_deans_startup_txt'
-    all_deans = reviewer.find_by_role('SUPERVISION')
-    for dean in all_deans:
-        send_message(dean.person, html_template_ref, txt_template_ref)
-    save_message_history(request, message_type.TO_ALL_DEANS)
+    all_deans = reviewer.find_by_role('SUPERVISION').select_related('person')
+    recipients = [messages_campaign.create_recipient(dean.person, html_template_ref, txt_template_ref)
+                  for dean in all_deans]
+    message = save_message_history(request, message_type.TO_ALL_DEANS)
+    messages_campaign.start_campaign(message, recipients)
     return redirect('messages_history')
 
 
@@ -66,38 +70,35 @@ def send_message_to_deans(request):
 def send_message_to_reviewers(request):
     html_template_ref = 'assistant_reviewers_startup_html'
     txt_template_ref = 'assistant_reviewers_startup_txt'
-    reviewers = reviewer.find_reviewers()
-    for rev in reviewers:
-        send_message(rev.person, html_template_ref, txt_template_ref, role=rev.role,
-                     entity=entity_version.get_last_version(rev.entity).acronym)
-    save_message_history(request, message_type.TO_ALL_REVIEWERS)
+    reviewers = reviewer.find_reviewers().select_related('person')
+    last_version_by_entity_id = entity_version.find_last_versions_by_entity_id(
+        {rev.entity_id for rev in reviewers})
+    recipients = [messages_campaign.create_recipient(rev.person, html_template_ref, txt_template_ref, role=rev.role,
+                                                     entity=_get_acronym(last_version_by_entity_id.get(rev.entity_id)))
+                  for rev in reviewers]
+    message = save_message_history(request, message_type.TO_ALL_REVIEWERS)
+    messages_campaign.start_campaign(message, recipients)
     return redirect('messages_history')
 
 
+def _get_acronym(version):
+    return version.acronym if version else None
+
+
 @user_passes_test(manager_access.user_is_manager, login_url='assistants_home')
 def save_message_history(request, type):
-    message = Message.objects.create(sender=manager.Manager.objects.get(person=request.user.person),
-                                     date=timezone.now(),
-                                     type=type,
-                                     academic_year=academic_year.current_academic_year())
-    message.save()
+    return Message.objects.create(sender=manager.Manager.objects.get(person=request.user.person),
+                                  date=timezone.now(),
+                                  type=type,
+                                  academic_year=academic_year.current_academic_year())
 
 
 def send_message(person, html_template_ref, txt_template_ref, assistant=None, role=None, entity=None):
-    procedure_dates = settings.get_settings()
     receivers = [message_config.create_receiver(person.id, person.email,
                                                 person.language)]
-    template_base_data = {'start_date': procedure_dates.assistants_contract_end_starting_date,
-                          'end_date': procedure_dates.assistants_contract_end_ending_date,
-                          'first_name': person.first_name, 'last_name': person.last_name,
-                          'roles': reviewer_role,
-                          'gender': person.gender}
-    if assistant:
-        template_base_data['assistant'] = assistant.person
-    if role:
-        template_base_data['role'] = role
-    if entity:
-        template_base_data['entity'] = entity
+    template_base_data = messages_campaign.get_template_base_data(settings.get_settings())
+    template_base_data.update(messages_campaign.get_template_person_data(person, assistant=assistant, role=role,
+                                                                         entity=entity))
     subject_data = None
     table = None
     message_content = message_config.create_message_content(html_template_ref, txt_template_ref, table,
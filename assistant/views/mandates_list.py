@@ -24,23 +24,50 @@
 #
 ##############################################################################
 from django.core.urlresolvers import reverse
+from django.db.models import Q
 from django.views.generic import ListView
 from django.views.generic.edit import FormMixin
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 
-import base.models.entity
 from base.models import academic_year
 
+from assistant.business.mandate_entity import add_entities_version_to_mandates_list
 from assistant.forms import MandatesArchivesForm
 from assistant.models import assistant_mandate
 from assistant.utils import manager_access
 from assistant.models.enums import assistant_mandate_state, review_advice_choices, review_status
 
+MANDATES_BY_PAGE = 50
+DEFAULT_ORDERING = 'assistant'
+SORTABLE_COLUMNS = [
+    ('sap_id', 'matricule'),
+    ('assistant', 'assistant'),
+    (None, 'entities'),
+    ('assistant_type', 'assistant_type'),
+    ('state', 'renewal_short_name'),
+    ('inscription', 'doctorate'),
+    ('contract_duration', 'mandate'),
+    ('contract_duration_fte', 'fulltime_equivalent'),
+    ('fulltime_equivalent', 'percentage_equivalent_full_time'),
+    (None, 'reviews'),
+]
+ORDERING_FIELDS = {
+    'sap_id': ('sap_id',),
+    'assistant': ('assistant__person__last_name', 'assistant__person__first_name'),
+    'assistant_type': ('assistant_type',),
+    'state': ('state',),
+    'inscription': ('assistant__inscription',),
+    'contract_duration': ('contract_duration',),
+    'contract_duration_fte': ('contract_duration_fte',),
+    'fulltime_equivalent': ('fulltime_equivalent',),
+}
+
 
 class MandatesListView(LoginRequiredMixin, UserPassesTestMixin, ListView, FormMixin):
     context_object_name = 'mandates_list'
     template_name = 'mandates_list.html'
     form_class = MandatesArchivesForm
+    paginate_by = MANDATES_BY_PAGE
 
     def test_func(self):
         return manager_access.user_is_manager(self.request.user)
@@ -67,8 +94,33 @@ class MandatesListView(LoginRequiredMixin, UserPassesTestMixin, ListView, FormMi
                 'selected_academic_year'] = selected_academic_year.id
             queryset = assistant_mandate.AssistantMandate.objects.filter(
                 academic_year=selected_academic_year)
+        queryset = self.filter_by_search_terms(queryset)
+        return queryset.select_related('assistant__person', 'assistant__supervisor')\
+                       .prefetch_related('review_set__reviewer__person')\
+                       .order_by(*self.get_ordering_fields())
+
+    def get_search_terms(self):
+        return self.request.GET.get('q', '').strip()
+
+    def filter_by_search_terms(self, queryset):
+        # Each word must be found in the name or the SAP id of the assistant, e.g. 'dupont jean'
+        for word in self.get_search_terms().split():
+            queryset = queryset.filter(Q(sap_id__icontains=word) |
+                                       Q(assistant__person__first_name__icontains=word) |
+                                       Q(assistant__person__last_name__icontains=word))
         return queryset
 
+    def get_ordering(self):
+        ordering = self.request.GET.get('order_by', DEFAULT_ORDERING)
+        if ordering.lstrip('-') not in ORDERING_FIELDS:
+            return DEFAULT_ORDERING
+        return ordering
+
+    def get_ordering_fields(self):
+        ordering = self.get_ordering()
+        prefix = '-' if ordering.startswith('-') else ''
+        return [prefix + field for field in ORDERING_FIELDS[ordering.lstrip('-')]] + ['id']
+
     def get_context_data(self, **kwargs):
         context = super(MandatesListView, self).get_context_data(**kwargs)
         context['year'] = academic_year.find_academic_year_by_id(
@@ -76,12 +128,12 @@ class MandatesListView(LoginRequiredMixin, UserPassesTestMixin, ListView, FormMi
         context['assistant_mandate_state'] = assistant_mandate_state
         context['review_advice_choices'] = review_advice_choices
         context['review_status'] = review_status
+        context['order_by'] = self.get_ordering()
+        context['q'] = self.get_search_terms()
+        context['sortable_columns'] = SORTABLE_COLUMNS
         start_date = academic_year.find_academic_year_by_id(int(self.request.session.get(
             'selected_academic_year'))).start_date
-        for mandate in context['object_list']:
-            entities_id = mandate.mandateentity_set.all().order_by('id').values_list('entity', flat=True)
-            mandate.entities = base.models.entity.find_versions_from_entites(entities_id, start_date)
-        return context
+        return add_entities_version_to_mandates_list(context, start_date)
 
     def get_initial(self):
         if self.request.session.get('selected_academic_year'):
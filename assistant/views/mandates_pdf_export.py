@@ -0,0 +1,66 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import os
+import time
+
+from django.contrib.auth.decorators import user_passes_test
+from django.http import FileResponse
+from django.shortcuts import redirect
+from django.utils import translation
+from django.utils.translation import ugettext as _
+
+from base.models import academic_year
+from base.views import layout
+from assistant.business import mandates_pdf_export
+from assistant.utils import manager_access
+
+
+@user_passes_test(manager_access.user_is_manager, login_url='assistants_home')
+def export_mandates(request):
+    mandates_pdf_export.start_export(academic_year.current_academic_year(), translation.get_language())
+    return redirect('export_mandates_pdf_status')
+
+
+@user_passes_test(manager_access.user_is_manager, login_url='assistants_home')
+def export_mandates_status(request):
+    state = mandates_pdf_export.get_state(academic_year.current_academic_year(), translation.get_language())
+    return layout.render(request, 'mandates_pdf_export.html', {
+        'status': state['status'] if state else None,
+        'running': mandates_pdf_export.RUNNING,
+        'done': mandates_pdf_export.DONE,
+        'failed': mandates_pdf_export.FAILED,
+    })
+
+
+@user_passes_test(manager_access.user_is_manager, login_url='assistants_home')
+def download_mandates_pdf(request):
+    state = mandates_pdf_export.get_state(academic_year.current_academic_year(), translation.get_language())
+    if not state or state['status'] != mandates_pdf_export.DONE or not os.path.exists(state['path']):
+        return redirect('export_mandates_pdf_status')
+    response = FileResponse(open(state['path'], 'rb'), content_type='application/pdf')
+    filename = '%s_%s.pdf' % (_('assistants_mandates'), time.strftime("%Y%m%d_%H%M"))
+    response['Content-Disposition'] = 'attachment; filename="%s"' % filename
+    return response
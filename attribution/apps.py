@@ -28,3 +28,8 @@ from django.apps import AppConfig
 
 class AttributionConfig(AppConfig):
     name = 'attribution'
+
+    def ready(self):
+        from attribution.signals import subscribers
+        # if django.core.exceptions.AppRegistryNotReady: Apps aren't loaded yet.
+        # ===> This exception says that there is an error in the implementation of method ready(self) !!
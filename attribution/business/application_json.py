@@ -29,32 +29,55 @@ import pika.exceptions
 from decimal import Decimal
 
 from attribution import models as mdl_attribution
+from attribution.business import portal_publication
+from base import models as mdl_base
 from django.conf import settings
-from osis_common.queue import queue_sender
+from django.utils import timezone
 
 
 logger = logging.getLogger(settings.DEFAULT_LOGGER)
 
 
-def publish_to_portal(global_ids=None):
-    tutor_application_list = _compute_list(global_ids)
+def publish_to_portal(global_ids=None, full=False):
+    """
+    Publish the tutor applications to the portal.
+    When no global ids are given, only the tutors whose applications changed since the last publication are
+    published, unless a full publication is asked or the last publication is unknown.
+    """
     queue_name = settings.QUEUES.get('QUEUES_NAME', {}).get('APPLICATION_OSIS_PORTAL')
-    if queue_name:
-        try:
-            queue_sender.send_message(queue_name, tutor_application_list)
-        except (RuntimeError, pika.exceptions.ConnectionClosed, pika.exceptions.ChannelClosed,
-                 pika.exceptions.AMQPError):
-            logger.exception('Could not recompute attributions for portal...')
-            return False
-        return True
-    else:
+    if not queue_name:
         logger.exception('Could not recompute attributions for portal because not queue name ATTRIBUTION_RESPONSE')
         return False
 
+    publication_datetime = timezone.now()
+    publish_all_changes = global_ids is None
+    if publish_all_changes and not full:
+        last_publication_datetime = portal_publication.get_last_publication_datetime(queue_name)
+        if last_publication_datetime:
+            global_ids = _find_global_ids_changed_since(last_publication_datetime)
+
+    tutor_application_list = _compute_list(global_ids)
+    try:
+        portal_publication.send_by_chunks(queue_name, tutor_application_list)
+    except (RuntimeError, pika.exceptions.ConnectionClosed, pika.exceptions.ChannelClosed,
+            pika.exceptions.AMQPError):
+        logger.exception('Could not recompute attributions for portal...')
+        return False
+
+    if publish_all_changes:
+        portal_publication.set_last_publication_datetime(queue_name, publication_datetime)
+    return True
+
+
+def _find_global_ids_changed_since(a_datetime):
+    global_ids = set(mdl_attribution.tutor_application.find_tutor_global_ids_changed_since(a_datetime))
+    global_ids.update(mdl_base.tutor.find_global_ids_changed_since(a_datetime))
+    return [global_id for global_id in global_ids if global_id]
+
 
 def _compute_list(global_ids=None):
     tutor_application_list = _get_all_tutor_application(global_ids)
-    tutor_application_list = _group_tutor_application_by_global_id(tutor_application_list)
+    tutor_application_list = _group_tutor_application_by_global_id(tutor_application_list, global_ids)
     return list(tutor_application_list.values())
 
 
@@ -67,8 +90,10 @@ def _get_all_tutor_application(global_ids):
              .exclude(tutor__person__global_id="")
 
 
-def _group_tutor_application_by_global_id(tutor_application_list):
-    tutor_applications_grouped = {}
+def _group_tutor_application_by_global_id(tutor_application_list, global_ids=None):
+    # The tutors without any application left are published too, to clear their applications on the portal
+    tutor_applications_grouped = {global_id: {'global_id': global_id, 'tutor_applications': []}
+                                  for global_id in global_ids} if global_ids is not None else {}
     for tutor_application in tutor_application_list:
         key = tutor_application.tutor.person.global_id
         tutor_applications_grouped.setdefault(key, {'global_id': key,
@@ -23,6 +23,8 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from django.db.models import F
+
 from attribution.models import attribution_charge_new
 from base.models import learning_unit_component
 
@@ -37,6 +39,19 @@ def find_attribution_charge_new_by_learning_unit_year(learning_unit_year):
     return create_attributions_dictionary(attribution_charges)
 
 
+def find_attribution_charge_new_by_learning_unit_years(learning_unit_years):
+    attribution_charges = attribution_charge_new.AttributionChargeNew.objects\
+        .filter(learning_component_year__learningunitcomponent__learning_unit_year__in=learning_unit_years)\
+        .annotate(learning_unit_year_id=F('learning_component_year__learningunitcomponent__learning_unit_year'))\
+        .select_related('learning_component_year', 'attribution__tutor__person')
+    attribution_charges_by_learning_unit_year = {}
+    for attribution_charge in attribution_charges:
+        attribution_charges_by_learning_unit_year.setdefault(attribution_charge.learning_unit_year_id, [])\
+            .append(attribution_charge)
+    return {learning_unit_year_id: create_attributions_dictionary(charges)
+            for learning_unit_year_id, charges in attribution_charges_by_learning_unit_year.items()}
+
+
 def create_attributions_dictionary(attribution_charges):
     attributions = {}
     for attribution_charge in attribution_charges:
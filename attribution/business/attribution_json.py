@@ -32,31 +32,50 @@ from django.conf import settings
 from django.db.models import Prefetch
 from django.utils import timezone
 
-from osis_common.queue import queue_sender
-
 from attribution import models as mdl_attribution
+from attribution.business import portal_publication
 from base import models as mdl_base
 
 
 logger = logging.getLogger(settings.DEFAULT_LOGGER)
 
 
-def publish_to_portal(global_ids=None):
-    attribution_list = _compute_list(global_ids)
+def publish_to_portal(global_ids=None, full=False):
+    """
+    Publish the attributions of the tutors to the portal.
+    When no global ids are given, only the tutors whose attributions or learning units changed since the last
+    publication are published, unless a full publication is asked or the last publication is unknown.
+    """
     queue_name = settings.QUEUES.get('QUEUES_NAME', {}).get('ATTRIBUTION_RESPONSE')
-
-    if queue_name:
-        try:
-            queue_sender.send_message(queue_name, attribution_list)
-        except (RuntimeError, pika.exceptions.ConnectionClosed, pika.exceptions.ChannelClosed,
-                 pika.exceptions.AMQPError):
-            logger.exception('Could not recompute attributions for portal...')
-            return False
-        return True
-    else:
+    if not queue_name:
         logger.exception('Could not recompute attributions for portal because not queue name ATTRIBUTION_RESPONSE')
         return False
 
+    publication_datetime = timezone.now()
+    publish_all_changes = global_ids is None
+    if publish_all_changes and not full:
+        last_publication_datetime = portal_publication.get_last_publication_datetime(queue_name)
+        if last_publication_datetime:
+            global_ids = _find_global_ids_changed_since(last_publication_datetime)
+
+    attribution_list = _compute_list(global_ids)
+    try:
+        portal_publication.send_by_chunks(queue_name, attribution_list)
+    except (RuntimeError, pika.exceptions.ConnectionClosed, pika.exceptions.ChannelClosed,
+            pika.exceptions.AMQPError):
+        logger.exception('Could not recompute attributions for portal...')
+        return False
+
+    if publish_all_changes:
+        portal_publication.set_last_publication_datetime(queue_name, publication_datetime)
+    return True
+
+
+def _find_global_ids_changed_since(a_datetime):
+    global_ids = set(mdl_attribution.attribution_new.find_tutor_global_ids_changed_since(a_datetime))
+    global_ids.update(mdl_base.tutor.find_global_ids_changed_since(a_datetime))
+    return [global_id for global_id in global_ids if global_id]
+
 
 def _compute_list(global_ids=None):
     attribution_list = _get_all_attributions_with_charges(global_ids)
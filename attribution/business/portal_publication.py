@@ -0,0 +1,76 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import datetime
+import logging
+
+from django.conf import settings
+from django.utils import dateparse
+
+from base.utils import queue_publisher
+from base.utils.cache import cache
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+PREFIX_LAST_PUBLICATION_KEY = 'portal_last_publication'
+MAX_TUTORS_BY_MESSAGE = 200
+# The 'changed' field is set when a row is saved, not when its transaction is committed. The changes saved before
+# a publication but committed after it must be caught by the next publication.
+PUBLICATION_SAFETY_OVERLAP = datetime.timedelta(minutes=5)
+
+
+def get_last_publication_datetime(queue_name):
+    """
+    Return the datetime of the last complete publication on the queue, or None when it is unknown
+    (first publication or cache unavailable), in which case everything must be published again.
+    """
+    try:
+        last_publication = cache.get(_get_last_publication_key(queue_name))
+    except Exception:
+        logger.exception('An error occurred with cache system')
+        return None
+    return dateparse.parse_datetime(last_publication) if last_publication else None
+
+
+def set_last_publication_datetime(queue_name, publication_datetime):
+    """
+    Keep the datetime from which the next publication must look for changes: the datetime of the publication
+    minus a safety overlap, so that the changes which were not committed yet are published next time.
+    """
+    last_publication_datetime = publication_datetime - PUBLICATION_SAFETY_OVERLAP
+    try:
+        cache.set(_get_last_publication_key(queue_name), last_publication_datetime.isoformat(), timeout=None)
+    except Exception:
+        logger.exception('An error occurred with cache system')
+
+
+def _get_last_publication_key(queue_name):
+    return "_".join([PREFIX_LAST_PUBLICATION_KEY, queue_name])
+
+
+def send_by_chunks(queue_name, tutors_list, chunk_size=MAX_TUTORS_BY_MESSAGE):
+    chunks = [tutors_list[index:index + chunk_size] for index in range(0, len(tutors_list), chunk_size)]
+    if chunks:
+        queue_publisher.publish_many(queue_name, chunks)
@@ -28,7 +28,7 @@ from django.core.exceptions import PermissionDenied, ObjectDoesNotExist
 from attribution import models as mdl_attr
 from attribution.models.attribution import search_by_learning_unit_this_year
 from base import models as mdl_base
-from base.models.entity_manager import find_entities_with_descendants_from_entity_managers
+from base.models.entity_manager import get_managed_entity_ids
 
 
 def get_learning_unit_year_managed_by_user_from_id(user, learning_unit_year_id):
@@ -39,23 +39,21 @@ def get_learning_unit_year_managed_by_user_from_id(user, learning_unit_year_id):
 
 
 def _is_user_manager_of_entity_allocation_of_learning_unit_year(user, a_learning_unit_year):
-    entities_manager = mdl_base.entity_manager.find_by_user(user)
-    entities_with_descendants = find_entities_with_descendants_from_entity_managers(entities_manager)
-    return a_learning_unit_year.allocation_entity in entities_with_descendants
+    allocation_entity = a_learning_unit_year.allocation_entity
+    return allocation_entity is not None and allocation_entity.id in get_managed_entity_ids(user)
 
 
 def search_attributions(**criteria):
-    entities_manager = criteria["entities_manager"]
+    user = criteria["user"]
     course_code = criteria["course_code"]
     learning_unit_title = criteria["learning_unit_title"]
     tutor = criteria["tutor"]
     responsible = criteria["summary_responsible"]
 
-    entities_with_descendants = find_entities_with_descendants_from_entity_managers(entities_manager)
     learning_unit_year_attributions_queryset = search_by_learning_unit_this_year(course_code, learning_unit_title)
 
     attributions = list(mdl_attr.attribution.filter_attributions(
-        attributions_queryset=learning_unit_year_attributions_queryset, entities=entities_with_descendants,
+        attributions_queryset=learning_unit_year_attributions_queryset, entity_ids=get_managed_entity_ids(user),
         tutor=tutor, responsible=responsible))
     return attributions
 
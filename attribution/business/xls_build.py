@@ -29,29 +29,33 @@ from django.utils.translation import ugettext_lazy as _
 from osis_common.document import xls_build
 from attribution.business import attribution_charge_new
 from base.business.learning_unit import extract_xls_data_from_learning_unit, LEARNING_UNIT_TITLES, get_name_or_username
+from base.utils import streaming_xls
 
 WORKSHEET_TITLE = 'learning_units'
 XLS_FILENAME = 'learning_units_and_attributions_filename'
 XLS_DESCRIPTION = "attribution_list"
+LEARNING_UNITS_BY_BATCH = 500
 
 ATTRIBUTION_TITLES = [str(_('tutor')), str(_('function')), str(_('substitute')), str(_('LECTURING')),
                       str(_('PRACTICAL_EXERCISES')), str(_('start_year')), str(_('duration'))]
 
 
 def prepare_xls_content(found_learning_units):
-    res = []
-    for learning_unit_yr in found_learning_units:
-        for key, value in learning_unit_yr.attribution_charge_news.items():
-            line_by_attribution = extract_xls_data_from_learning_unit(learning_unit_yr)
-            line_by_attribution.append(value.get('person'))
-            line_by_attribution.append(xls_build.translate(value.get('function')))
-            line_by_attribution.append(value.get('substitute'))
-            line_by_attribution.append(value.get('LECTURING'))
-            line_by_attribution.append(value.get('PRACTICAL_EXERCISES'))
-            line_by_attribution.append(value.get('start_year'))
-            line_by_attribution.append(value.get('duration'))
-            res.append(line_by_attribution)
-    return res
+    return [line for learning_unit_yr in found_learning_units
+            for line in _extract_xls_lines_by_attribution(learning_unit_yr)]
+
+
+def _extract_xls_lines_by_attribution(learning_unit_yr):
+    for key, value in learning_unit_yr.attribution_charge_news.items():
+        line_by_attribution = extract_xls_data_from_learning_unit(learning_unit_yr)
+        line_by_attribution.append(value.get('person'))
+        line_by_attribution.append(xls_build.translate(value.get('function')))
+        line_by_attribution.append(value.get('substitute'))
+        line_by_attribution.append(value.get('LECTURING'))
+        line_by_attribution.append(value.get('PRACTICAL_EXERCISES'))
+        line_by_attribution.append(value.get('start_year'))
+        line_by_attribution.append(value.get('duration'))
+        yield line_by_attribution
 
 
 def prepare_xls_parameters_list(user, working_sheets_data):
@@ -74,9 +78,16 @@ def _prepare_titles():
 
 
 def create_xls_attribution(user, found_learning_units, filters):
-    for learning_unit_yr in found_learning_units:
-        learning_unit_yr.attribution_charge_news = attribution_charge_new\
-            .find_attribution_charge_new_by_learning_unit_year(learning_unit_year=learning_unit_yr)
+    working_sheets_data = (line for learning_unit_yr in _with_attribution_charge_news(found_learning_units)
+                           for line in _extract_xls_lines_by_attribution(learning_unit_yr))
+    return streaming_xls.generate_streaming_xls(prepare_xls_parameters_list(user, working_sheets_data), filters)
+
 
-    working_sheets_data = prepare_xls_content(found_learning_units)
-    return xls_build.generate_xls(prepare_xls_parameters_list(user, working_sheets_data), filters)
+def _with_attribution_charge_news(learning_unit_years):
+    for learning_unit_years_batch in streaming_xls.iterate(learning_unit_years, batch_size=LEARNING_UNITS_BY_BATCH):
+        attribution_charge_news_by_learning_unit_year = attribution_charge_new\
+            .find_attribution_charge_new_by_learning_unit_years(learning_unit_years_batch)
+        for learning_unit_yr in learning_unit_years_batch:
+            learning_unit_yr.attribution_charge_news = \
+                attribution_charge_news_by_learning_unit_year.get(learning_unit_yr.id, {})
+            yield learning_unit_yr
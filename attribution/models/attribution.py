@@ -111,6 +111,11 @@ def find_responsible(a_learning_unit_year):
     return None
 
 
+def find_learning_unit_year_ids_of_scores_responsible(a_person_id):
+    return Attribution.objects.filter(tutor__person_id=a_person_id, score_responsible=True)\
+                              .values_list('learning_unit_year_id', flat=True)
+
+
 def is_score_responsible(user, learning_unit_year):
     return Attribution.objects.filter(learning_unit_year=learning_unit_year,
                                       score_responsible=True,
@@ -118,7 +123,7 @@ def is_score_responsible(user, learning_unit_year):
                               .count() > 0
 
 
-def search_scores_responsible(learning_unit_title, course_code, entities, tutor, responsible):
+def search_scores_responsible(learning_unit_title, course_code, entity_ids, tutor, responsible):
     queryset = search_by_learning_unit_this_year(course_code, learning_unit_title)
     if tutor and responsible:
         queryset = queryset \
@@ -133,8 +138,8 @@ def search_scores_responsible(learning_unit_title, course_code, entities, tutor,
         if responsible:
             queryset = queryset \
                 .filter(score_responsible=True, tutor__person__in=person.find_by_firstname_or_lastname(responsible))
-    if entities:
-        queryset = filter_by_entities(queryset, entities)
+    if entity_ids:
+        queryset = filter_by_entity_ids(queryset, entity_ids)
 
     queryset = _prefetch_entity_version(queryset)
 
@@ -142,15 +147,15 @@ def search_scores_responsible(learning_unit_title, course_code, entities, tutor,
                    .distinct("learning_unit_year")
 
 
-def filter_attributions(attributions_queryset, entities, tutor, responsible):
+def filter_attributions(attributions_queryset, entity_ids, tutor, responsible):
     queryset = attributions_queryset
     if tutor:
         queryset = _filter_by_tutor(queryset, tutor)
     if responsible:
         queryset = queryset \
             .filter(summary_responsible=True, tutor__person__in=person.find_by_firstname_or_lastname(responsible))
-    if entities:
-        queryset = filter_by_entities(queryset, entities)
+    if entity_ids:
+        queryset = filter_by_entity_ids(queryset, entity_ids)
 
     queryset = _prefetch_entity_version(queryset)
 
@@ -166,10 +171,9 @@ def search_by_learning_unit_this_year(code, specific_title):
     return queryset
 
 
-def filter_by_entities(queryset, entities):
-    entities_ids = [entity.id for entity in entities]
+def filter_by_entity_ids(queryset, entity_ids):
     l_container_year_ids = entity_container_year.search(link_type=entity_container_year_link_type.ALLOCATION_ENTITY,
-                                                        entity_id=entities_ids) \
+                                                        entity_id=list(entity_ids)) \
         .values_list('learning_container_year_id', flat=True)
     queryset = queryset.filter(learning_unit_year__learning_container_year__id__in=l_container_year_ids)
     return queryset
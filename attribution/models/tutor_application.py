@@ -24,6 +24,7 @@
 #
 ##############################################################################
 from django.db import models
+from django.db.models import Q
 from django.contrib import admin
 from django.utils.translation import ugettext_lazy as _
 
@@ -79,3 +80,10 @@ def search(*args, **kwargs):
         else:
             qs = qs.filter(tutor__person__global_id=kwargs['global_id'])
     return qs.select_related('tutor__person', 'learning_container_year')
+
+
+def find_tutor_global_ids_changed_since(a_datetime):
+    return TutorApplication.objects.filter(Q(changed__gte=a_datetime) |
+                                           Q(learning_container_year__changed__gte=a_datetime))\
+                                   .values_list('tutor__person__global_id', flat=True)\
+                                   .distinct()
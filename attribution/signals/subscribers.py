@@ -0,0 +1,65 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from attribution.models.attribution_charge_new import AttributionChargeNew
+from attribution.models.attribution_new import AttributionNew
+from attribution.models.tutor_application import TutorApplication
+from base.models.learning_component_year import LearningComponentYear
+from base.models.learning_container_year import LearningContainerYear
+from base.models.learning_unit_component import LearningUnitComponent
+from base.models.learning_unit_year import LearningUnitYear
+from base.models.tutor import Tutor
+
+
+# The portal publication only sends the tutors changed since the last publication (see attribution_json and
+# application_json). Changes which are not visible in the 'changed' field of the attributions and applications
+# (or of their learning units) are reported on the 'changed' field of their parent, without calling save() to not
+# fire any other signal.
+
+@receiver(post_save, sender=AttributionChargeNew)
+@receiver(post_delete, sender=AttributionChargeNew)
+def touch_attribution(sender, instance, **kwargs):
+    AttributionNew.objects.filter(pk=instance.attribution_id).update(changed=timezone.now())
+
+
+@receiver(post_delete, sender=AttributionNew)
+@receiver(post_delete, sender=TutorApplication)
+def touch_tutor(sender, instance, **kwargs):
+    Tutor.objects.filter(pk=instance.tutor_id).update(changed=timezone.now())
+
+
+@receiver(post_delete, sender=LearningUnitYear)
+@receiver(post_delete, sender=LearningComponentYear)
+def touch_learning_container_year(sender, instance, **kwargs):
+    LearningContainerYear.objects.filter(pk=instance.learning_container_year_id).update(changed=timezone.now())
+
+
+@receiver(post_delete, sender=LearningUnitComponent)
+def touch_learning_component_year(sender, instance, **kwargs):
+    LearningComponentYear.objects.filter(pk=instance.learning_component_year_id).update(changed=timezone.now())
@@ -23,17 +23,18 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-from datetime import date
+from datetime import date, timedelta
 from unittest import mock
 from django.test import TestCase
 from django.test.utils import override_settings
 
-from attribution.business import application_json
+from attribution.business import application_json, portal_publication
 from attribution.tests.factories.tutor_application import TutorApplicationFactory
 from base.tests.factories.academic_year import AcademicYearFactory
 from base.tests.factories.learning_container_year import LearningContainerYearFactory
 from base.tests.factories.person import PersonFactory
 from base.tests.factories.tutor import TutorFactory
+from base.utils.cache import cache
 
 
 class AttributionJsonTest(TestCase):
@@ -51,7 +52,7 @@ class AttributionJsonTest(TestCase):
         self.tutor_application_3 = TutorApplicationFactory(tutor=self.tutor_3,
                                                            learning_container_year=self.l_container_1)
 
-    @mock.patch('osis_common.queue.queue_sender.send_message')
+    @mock.patch('base.utils.queue_publisher.publish_many')
     @override_settings(QUEUES={'QUEUES_NAME':{'APPLICATION_OSIS_PORTAL': 'dummy'}})
     def test_build_attributions_json(self, mock_send_message):
         application_list = application_json._compute_list()
@@ -85,3 +86,79 @@ class AttributionJsonTest(TestCase):
         self.assertEqual(len(all_tutor_applications), 1)
         tutor_applications_grouped = application_json._group_tutor_application_by_global_id(all_tutor_applications)
         self.assertEqual(len(tutor_applications_grouped["00012345"]["tutor_applications"]), 1)
+
+
+@override_settings(QUEUES={'QUEUES_NAME': {'APPLICATION_OSIS_PORTAL': 'dummy'}})
+@mock.patch('attribution.business.portal_publication.PUBLICATION_SAFETY_OVERLAP', timedelta(0))
+class ApplicationJsonIncrementalPublicationTest(TestCase):
+    def setUp(self):
+        cache.delete(portal_publication._get_last_publication_key('dummy'))
+        self.l_container = LearningContainerYearFactory()
+        self.tutor_1 = TutorFactory(person=PersonFactory(global_id='00012345'))
+        self.tutor_2 = TutorFactory(person=PersonFactory(global_id='00054321'))
+        self.tutor_application_1 = TutorApplicationFactory(tutor=self.tutor_1,
+                                                           learning_container_year=self.l_container)
+        self.tutor_application_2 = TutorApplicationFactory(tutor=self.tutor_2,
+                                                           learning_container_year=self.l_container)
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_publish_only_tutors_changed_since_last_publication(self, mock_publish_many):
+        self.assertTrue(application_json.publish_to_portal())
+        (queue_name, [application_list]), kwargs = mock_publish_many.call_args
+        self.assertCountEqual([tutor['global_id'] for tutor in application_list], ['00012345', '00054321'])
+
+        self.tutor_application_2.remark = 'Changed'
+        self.tutor_application_2.save()
+        self.assertTrue(application_json.publish_to_portal())
+        (queue_name, [application_list]), kwargs = mock_publish_many.call_args
+        self.assertEqual([tutor['global_id'] for tutor in application_list], ['00054321'])
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_publish_tutors_of_changed_learning_container_year(self, mock_publish_many):
+        TutorApplicationFactory(tutor=TutorFactory(person=PersonFactory(global_id='07777777')),
+                                learning_container_year=LearningContainerYearFactory())
+        application_json.publish_to_portal()
+
+        self.l_container.acronym = 'LBIR1211'
+        self.l_container.save()
+        application_json.publish_to_portal()
+        (queue_name, [application_list]), kwargs = mock_publish_many.call_args
+        self.assertCountEqual([tutor['global_id'] for tutor in application_list], ['00012345', '00054321'])
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_publish_tutor_with_deleted_application(self, mock_publish_many):
+        application_json.publish_to_portal()
+        self.tutor_application_1.delete()
+
+        application_json.publish_to_portal()
+        (queue_name, [application_list]), kwargs = mock_publish_many.call_args
+        self.assertEqual(application_list, [{'global_id': '00012345', 'tutor_applications': []}])
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_nothing_to_publish(self, mock_publish_many):
+        application_json.publish_to_portal()
+        mock_publish_many.reset_mock()
+        application_json.publish_to_portal()
+        self.assertFalse(mock_publish_many.called)
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_changes_published_again_during_safety_overlap(self, mock_publish_many):
+        application_json.publish_to_portal()
+        with mock.patch('attribution.business.portal_publication.PUBLICATION_SAFETY_OVERLAP', timedelta(minutes=5)):
+            application_json.publish_to_portal()
+            mock_publish_many.reset_mock()
+            application_json.publish_to_portal()
+        (queue_name, [application_list]), kwargs = mock_publish_many.call_args
+        self.assertEqual(len(application_list), 2)
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_full_publication(self, mock_publish_many):
+        application_json.publish_to_portal()
+        application_json.publish_to_portal(full=True)
+        (queue_name, [application_list]), kwargs = mock_publish_many.call_args
+        self.assertEqual(len(application_list), 2)
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_send_by_chunks(self, mock_publish_many):
+        portal_publication.send_by_chunks('dummy', list(range(5)), chunk_size=2)
+        mock_publish_many.assert_called_once_with('dummy', [[0, 1], [2, 3], [4]])
@@ -27,7 +27,8 @@
 from django.test import TestCase
 from django.utils import timezone
 
-from attribution.business.attribution_charge_new import find_attribution_charge_new_by_learning_unit_year
+from attribution.business.attribution_charge_new import find_attribution_charge_new_by_learning_unit_year, \
+    find_attribution_charge_new_by_learning_unit_years
 from attribution.models.attribution_charge_new import AttributionChargeNew
 from attribution.tests.factories.attribution_charge_new import AttributionChargeNewFactory
 from base.models.enums import learning_unit_year_subtypes
@@ -50,4 +51,17 @@ class TestAttributionChargeNew(TestCase):
         result = find_attribution_charge_new_by_learning_unit_year(self.l_unit_1)
         self.assertEqual(len(result), 5)
 
+    def test_find_attribution_charge_new_by_learning_unit_years(self):
+        l_unit_2 = LearningUnitYearFactory(academic_year=self.academic_year)
+        l_unit_without_attribution = LearningUnitYearFactory(academic_year=self.academic_year)
+        component = LearningUnitComponentFactory(learning_unit_year=l_unit_2)
+        AttributionChargeNewFactory(learning_component_year=component.learning_component_year)
 
+        with self.assertNumQueries(1):
+            result = find_attribution_charge_new_by_learning_unit_years(
+                [self.l_unit_1, l_unit_2, l_unit_without_attribution]
+            )
+        self.assertEqual(len(result[self.l_unit_1.id]), 5)
+        self.assertEqual(len(result[l_unit_2.id]), 1)
+        self.assertNotIn(l_unit_without_attribution.id, result)
+        self.assertEqual(result[self.l_unit_1.id], find_attribution_charge_new_by_learning_unit_year(self.l_unit_1))
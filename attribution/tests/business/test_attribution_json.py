@@ -23,14 +23,18 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-from datetime import date
+from datetime import date, timedelta
+from unittest import mock
 
 from decimal import Decimal
 from django.test import TestCase
+from django.test.utils import override_settings
 
 from base.models.enums import learning_component_year_type, learning_unit_year_subtypes
+from base.models.learning_unit_component import LearningUnitComponent
+from base.models.learning_unit_year import LearningUnitYear
 
-from attribution.business import attribution_json
+from attribution.business import attribution_json, portal_publication
 from attribution.models.enums import function
 from attribution.tests.factories.attribution import AttributionNewFactory
 from attribution.tests.factories.attribution_charge_new import AttributionChargeNewFactory
@@ -41,6 +45,7 @@ from base.tests.factories.learning_unit_component import LearningUnitComponentFa
 from base.tests.factories.learning_unit_year import LearningUnitYearFactory
 from base.tests.factories.person import PersonFactory
 from base.tests.factories.tutor import TutorFactory
+from base.utils.cache import cache
 
 
 class AttributionJsonTest(TestCase):
@@ -149,6 +154,96 @@ class AttributionJsonTest(TestCase):
         self.assertFalse(attribution_data['attributions'])
 
 
+@override_settings(QUEUES={'QUEUES_NAME': {'ATTRIBUTION_RESPONSE': 'dummy'}})
+@mock.patch('attribution.business.portal_publication.PUBLICATION_SAFETY_OVERLAP', timedelta(0))
+class AttributionJsonIncrementalPublicationTest(TestCase):
+    def setUp(self):
+        cache.delete(portal_publication._get_last_publication_key('dummy'))
+        self.academic_year = AcademicYearFactory(year=date.today().year, start_date=date.today())
+        self.l_container = LearningContainerYearFactory(academic_year=self.academic_year, acronym="LBIR1210",
+                                                        in_charge=True)
+        _create_learning_unit_year_with_components(academic_year=self.academic_year, l_container=self.l_container,
+                                                   acronym="LBIR1210", subtype=learning_unit_year_subtypes.FULL)
+        self.tutor_1 = TutorFactory(person=PersonFactory(global_id='00012345'))
+        self.tutor_2 = TutorFactory(person=PersonFactory(global_id='08923545'))
+        self.attribution_1 = AttributionNewFactory(learning_container_year=self.l_container, tutor=self.tutor_1,
+                                                   function=function.HOLDER)
+        self.attribution_2 = AttributionNewFactory(learning_container_year=self.l_container, tutor=self.tutor_2,
+                                                   function=function.CO_HOLDER)
+        _create_attribution_charge(self.academic_year, self.attribution_1, "LBIR1210", Decimal(15.5))
+        _create_attribution_charge(self.academic_year, self.attribution_2, "LBIR1210", Decimal(7.5))
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_publish_only_tutors_changed_since_last_publication(self, mock_publish_many):
+        self.assertTrue(attribution_json.publish_to_portal())
+        (queue_name, [attribution_list]), kwargs = mock_publish_many.call_args
+        self.assertCountEqual([tutor['global_id'] for tutor in attribution_list], ['00012345', '08923545'])
+
+        _create_attribution_charge(self.academic_year, self.attribution_2, "LBIR1210", volume_tp=Decimal(5))
+        self.assertTrue(attribution_json.publish_to_portal())
+        (queue_name, [attribution_list]), kwargs = mock_publish_many.call_args
+        self.assertEqual([tutor['global_id'] for tutor in attribution_list], ['08923545'])
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_publish_tutors_of_changed_learning_unit_year(self, mock_publish_many):
+        other_container = LearningContainerYearFactory(academic_year=self.academic_year, acronym="LBIR1211",
+                                                       in_charge=True)
+        AttributionNewFactory(learning_container_year=other_container,
+                              tutor=TutorFactory(person=PersonFactory(global_id='07777777')))
+        attribution_json.publish_to_portal()
+
+        l_unit_year = LearningUnitYear.objects.get(learning_container_year=self.l_container)
+        l_unit_year.specific_title = 'Changed'
+        l_unit_year.save()
+        attribution_json.publish_to_portal()
+        (queue_name, [attribution_list]), kwargs = mock_publish_many.call_args
+        self.assertCountEqual([tutor['global_id'] for tutor in attribution_list], ['00012345', '08923545'])
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_publish_tutors_of_deleted_learning_unit_component(self, mock_publish_many):
+        attribution_json.publish_to_portal()
+        LearningUnitComponent.objects.filter(learning_unit_year__learning_container_year=self.l_container).delete()
+
+        attribution_json.publish_to_portal()
+        (queue_name, [attribution_list]), kwargs = mock_publish_many.call_args
+        self.assertCountEqual([tutor['global_id'] for tutor in attribution_list], ['00012345', '08923545'])
+        self.assertFalse(any(tutor['attributions'] for tutor in attribution_list))
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_publish_tutor_with_deleted_attribution(self, mock_publish_many):
+        attribution_json.publish_to_portal()
+        self.attribution_1.delete()
+
+        attribution_json.publish_to_portal()
+        (queue_name, [attribution_list]), kwargs = mock_publish_many.call_args
+        self.assertEqual([tutor['global_id'] for tutor in attribution_list], ['00012345'])
+        self.assertEqual(attribution_list[0]['attributions'], [])
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_nothing_to_publish(self, mock_publish_many):
+        attribution_json.publish_to_portal()
+        mock_publish_many.reset_mock()
+        attribution_json.publish_to_portal()
+        self.assertFalse(mock_publish_many.called)
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_changes_published_again_during_safety_overlap(self, mock_publish_many):
+        attribution_json.publish_to_portal()
+        with mock.patch('attribution.business.portal_publication.PUBLICATION_SAFETY_OVERLAP', timedelta(minutes=5)):
+            attribution_json.publish_to_portal()
+            mock_publish_many.reset_mock()
+            attribution_json.publish_to_portal()
+        (queue_name, [attribution_list]), kwargs = mock_publish_many.call_args
+        self.assertEqual(len(attribution_list), 2)
+
+    @mock.patch('base.utils.queue_publisher.publish_many')
+    def test_full_publication(self, mock_publish_many):
+        attribution_json.publish_to_portal()
+        attribution_json.publish_to_portal(full=True)
+        (queue_name, [attribution_list]), kwargs = mock_publish_many.call_args
+        self.assertEqual(len(attribution_list), 2)
+
+
 def _create_learning_unit_year_with_components(academic_year, l_container, acronym, subtype):
     l_unit_year = LearningUnitYearFactory(academic_year=academic_year, learning_container_year=l_container,
                                           acronym=acronym, subtype=subtype)
@@ -165,8 +260,6 @@ def _create_learning_unit_year_with_components(academic_year, l_container, acron
 
 
 def _create_attribution_charge(academic_year, attribution, l_acronym, volume_cm=None, volume_tp=None):
-    from base.models.learning_unit_component import LearningUnitComponent
-
     if volume_cm is not None:
         l_unit_component = LearningUnitComponent.objects.filter(
             learning_unit_year__acronym=l_acronym,
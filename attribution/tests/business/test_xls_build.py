@@ -29,13 +29,11 @@ from unittest import mock
 from django.test import TestCase
 from django.utils.translation import ugettext_lazy as _
 
-from base.models.enums import entity_container_year_link_type
 from base.tests.factories.learning_unit_component import LearningUnitComponentFactory
 from attribution.business import xls_build as xls_build_attribution
 from attribution.tests.factories.attribution_charge_new import AttributionChargeNewFactory
 from attribution.business import attribution_charge_new
 from base.tests.factories.business.learning_units import GenerateContainer
-from base.tests.factories.entity_version import EntityVersionFactory
 from base.business.learning_unit import LEARNING_UNIT_TITLES
 from base.tests.factories.user import UserFactory
 from osis_common.document import xls_build
@@ -50,10 +48,8 @@ class TestXlsBuild(TestCase):
         generator_container = GenerateContainer(datetime.date.today().year-2, datetime.date.today().year)
         self.learning_unit_yr_1 = generator_container.generated_container_years[0].learning_unit_year_full
 
-        self.learning_unit_yr_1.entities = {
-            entity_container_year_link_type.REQUIREMENT_ENTITY: EntityVersionFactory(acronym=ACRONYM_REQUIREMENT),
-            entity_container_year_link_type.ALLOCATION_ENTITY: EntityVersionFactory(acronym=ACRONYM_ALLOCATION)
-        }
+        self.learning_unit_yr_1.requirement_entity_acronym = ACRONYM_REQUIREMENT
+        self.learning_unit_yr_1.allocation_entity_acronym = ACRONYM_ALLOCATION
 
         component_1 = LearningUnitComponentFactory(learning_unit_year=self.learning_unit_yr_1)
         self.attribution_1 = AttributionChargeNewFactory(learning_component_year=component_1.learning_component_year)
@@ -74,20 +70,20 @@ class TestXlsBuild(TestCase):
         self.assertCountEqual(xls_build_attribution._prepare_titles(),
                               LEARNING_UNIT_TITLES + xls_build_attribution.ATTRIBUTION_TITLES)
 
-    @mock.patch("osis_common.document.xls_build.generate_xls")
+    @mock.patch("base.utils.streaming_xls.generate_streaming_xls")
     def test_generate_xls_data_with_no_data(self, mock_generate_xls):
         xls_build_attribution.create_xls_attribution(self.user, [], None)
         expected_argument = _generate_xls_build_parameter([], self.user)
-        mock_generate_xls.assert_called_with(expected_argument, None)
+        self.assertEqual(_get_called_parameters(mock_generate_xls), (expected_argument, None))
 
-    @mock.patch("osis_common.document.xls_build.generate_xls")
+    @mock.patch("base.utils.streaming_xls.generate_streaming_xls")
     def test_generate_xls_data_with_a_learning_unit(self, mock_generate_xls):
         xls_build_attribution.create_xls_attribution(self.user, [self.learning_unit_yr_1], None)
         an_attribution = self.learning_unit_yr_1.attribution_charge_news.get(self.attribution_1.attribution.id)
         xls_data = [self.get_xls_data(an_attribution, self.learning_unit_yr_1)]
 
         expected_argument = _generate_xls_build_parameter(xls_data, self.user)
-        mock_generate_xls.assert_called_with(expected_argument, None)
+        self.assertEqual(_get_called_parameters(mock_generate_xls), (expected_argument, None))
 
     def get_xls_data(self, an_attribution, learning_unit_yr):
         return [learning_unit_yr.academic_year.name,
@@ -120,3 +116,10 @@ def _generate_xls_build_parameter(xls_data, user):
             xls_build.WORKSHEET_TITLE_KEY: _(xls_build_attribution.WORKSHEET_TITLE),
         }]
     }
+
+
+def _get_called_parameters(mock_generate_xls):
+    parameters, filters = mock_generate_xls.call_args[0]
+    for worksheet_data in parameters[xls_build.WORKSHEETS_DATA]:
+        worksheet_data[xls_build.CONTENT_KEY] = list(worksheet_data[xls_build.CONTENT_KEY])
+    return parameters, filters
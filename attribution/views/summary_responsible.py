@@ -51,7 +51,7 @@ def search(request):
         summary_responsible = request.GET.get('summary_responsible')
         course_code = request.GET.get('course_code')
         learning_unit_title = request.GET.get('learning_unit_title')
-        attributions = search_attributions(entities_manager=entities_manager, tutor=tutor,
+        attributions = search_attributions(user=request.user, tutor=tutor,
                                            summary_responsible=summary_responsible,
                                            course_code=course_code,
                                            learning_unit_title=learning_unit_title)
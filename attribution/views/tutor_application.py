@@ -33,6 +33,7 @@ from attribution.business import application_json
 
 class RecomputePortalSerializer(serializers.Serializer):
     global_ids = serializers.ListField(child=serializers.CharField(), required=False)
+    full = serializers.BooleanField(required=False)
 
 
 @api_view(['POST'])
@@ -40,6 +41,6 @@ def recompute_portal(request):
     serializer = RecomputePortalSerializer(data=request.POST)
     if serializer.is_valid():
         global_ids = serializer.data['global_ids'] if serializer.data['global_ids'] else None
-        if application_json.publish_to_portal(global_ids):
+        if application_json.publish_to_portal(global_ids, full=serializer.data.get('full', False)):
             return Response(status=status.HTTP_202_ACCEPTED)
     return Response(status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -201,6 +201,14 @@ LOGO_OSIS_URL = os.environ.get('LOGO_OSIS_URL', '')
 # They are used to ensure the migration of Data between Osis and other application (ex : Osis <> Osis-Portal)
 # See in settings.dev.example to configure the queues
 QUEUES = {}
+# Number of scores sheets requests of the portal processed concurrently
+SCORES_SHEETS_REQUESTS_WORKERS = int(os.environ.get('SCORES_SHEETS_REQUESTS_WORKERS', 4))
+# Directory of the PDF export of the assistant mandates and of the cached rendering of each mandate.
+# It contains personal data and must not be served: keep it out of MEDIA_ROOT
+ASSISTANT_MANDATES_PDF_DIR = os.environ.get('ASSISTANT_MANDATES_PDF_DIR',
+                                            os.path.join(BASE_DIR, 'private', 'assistant_mandates_pdf'))
+# Number of processes rendering the mandates of the PDF export of the assistant mandates
+ASSISTANT_MANDATES_PDF_WORKERS = int(os.environ.get('ASSISTANT_MANDATES_PDF_WORKERS', 4))
 
 # Additionnal Locale Path
 # Add local path in your environment settings (ex: dev.py)
@@ -340,6 +348,16 @@ REST_FRAMEWORK = {
 # ESB Configuration
 ESB_AUTHORIZATION = os.environ.get('ESB_AUTHORIZATION')
 ESB_STUDENT_API = os.environ.get('ESB_STUDENT_API')
+# Directory of the cached student photos fetched from the ESB. It must not be served, so keep it out of MEDIA_ROOT
+STUDENT_PHOTO_CACHE_DIR = os.environ.get('STUDENT_PHOTO_CACHE_DIR', os.path.join(BASE_DIR, 'private', 'student_photos'))
+# Maximum number of student photos kept in the cache directory, the least recently checked ones are removed first
+STUDENT_PHOTO_CACHE_MAX_FILES = int(os.environ.get('STUDENT_PHOTO_CACHE_MAX_FILES', 10000))
+# Number of seconds a cached student photo is served before being revalidated against the ESB
+STUDENT_PHOTO_MAX_AGE = int(os.environ.get('STUDENT_PHOTO_MAX_AGE', 86400))
+# Number of seconds to wait for the ESB when fetching a student photo
+STUDENT_PHOTO_TIMEOUT = float(os.environ.get('STUDENT_PHOTO_TIMEOUT', 3))
+# Number of connections to the ESB kept open to fetch the student photos
+STUDENT_PHOTO_POOL_SIZE = int(os.environ.get('STUDENT_PHOTO_POOL_SIZE', 10))
 
 RELEASE_TAG = os.environ.get('RELEASE_TAG')
 
@@ -72,9 +72,5 @@ if hasattr(settings, 'QUEUES') and settings.QUEUES:
     # Queue in which are sent scores sheets json data
     # This queue is used only if assessments module is installed
     if 'assessments' in settings.INSTALLED_APPS:
-        from assessments.views.score_encoding import send_json_scores_sheets_to_response_queue
-        try:
-            queue_listener.SynchronousConsumerThread(settings.QUEUES.get('QUEUES_NAME').get('SCORE_ENCODING_PDF_REQUEST'),
-                                                     send_json_scores_sheets_to_response_queue).start()
-        except (ConnectionClosed, ChannelClosed, AMQPConnectionError, ConnectionError) as e:
-            LOGGER.exception("Couldn't connect to the QueueServer")
+        from assessments.views.score_encoding import start_scores_sheets_requests_consumer
+        start_scores_sheets_requests_consumer()
@@ -38,6 +38,7 @@ from base.models.academic_year import find_academic_year_by_year
 from base.models.entity_component_year import EntityComponentYear
 from base.models.enums import entity_container_year_link_type, academic_calendar_type
 from base.models.enums import learning_container_year_types
+from base.utils import streaming_xls
 from cms import models as mdl_cms
 from cms.enums import entity_name
 from cms.enums.entity_name import LEARNING_UNIT_YEAR
@@ -181,8 +182,8 @@ def extract_xls_data_from_learning_unit(learning_unit_yr):
         # FIXME Condition to remove when the LearningUnitYear.learning_continer_year_id will be null=false
         if learning_unit_yr.learning_container_year else "",
         xls_build.translate(learning_unit_yr.subtype),
-        get_entity_acronym(learning_unit_yr.entities.get('REQUIREMENT_ENTITY')),
-        get_entity_acronym(learning_unit_yr.entities.get('ALLOCATION_ENTITY')),
+        learning_unit_yr.requirement_entity_acronym,
+        learning_unit_yr.allocation_entity_acronym,
         learning_unit_yr.credits, xls_build.translate(learning_unit_yr.status)
     ]
 
@@ -209,8 +210,9 @@ def get_entity_acronym(an_entity):
 
 
 def create_xls(user, found_learning_units, filters):
-    working_sheets_data = prepare_xls_content(found_learning_units)
-    return xls_build.generate_xls(prepare_xls_parameters_list(user, working_sheets_data), filters)
+    working_sheets_data = (extract_xls_data_from_learning_unit(learning_unit_yr)
+                           for learning_unit_yr in streaming_xls.iterate(found_learning_units))
+    return streaming_xls.generate_streaming_xls(prepare_xls_parameters_list(user, working_sheets_data), filters)
 
 
 def is_summary_submission_opened():
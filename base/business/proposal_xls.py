@@ -28,6 +28,7 @@ from django.utils.translation import ugettext_lazy as _
 
 from osis_common.document import xls_build
 from base.business.learning_unit import get_name_or_username, get_entity_acronym
+from base.utils import streaming_xls
 
 WORKSHEET_TITLE = 'Proposals'
 XLS_FILENAME = 'Proposals'
@@ -71,9 +72,9 @@ def prepare_xls_parameters_list(user, working_sheets_data):
 
 
 def create_xls(user, proposals, filters):
-    working_sheets_data = prepare_xls_content(proposals)
-    return xls_build.generate_xls(prepare_xls_parameters_list(user, working_sheets_data), filters)
+    working_sheets_data = (extract_xls_data_from_proposal(proposal) for proposal in streaming_xls.iterate(proposals))
+    return streaming_xls.generate_streaming_xls(prepare_xls_parameters_list(user, working_sheets_data), filters)
 
 
 def create_xls_proposal(user, proposals, filters):
-    return xls_build.generate_xls(prepare_xls_parameters_list(user, prepare_xls_content(proposals)), filters)
+    return create_xls(user, proposals, filters)
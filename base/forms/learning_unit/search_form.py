@@ -28,19 +28,18 @@ import itertools
 
 from django import forms
 from django.core.exceptions import ValidationError
-from django.db.models import OuterRef, Subquery
+from django.db.models import OuterRef, Subquery, Case, When, Value, F, IntegerField, CharField
 from django.utils.translation import ugettext_lazy as _
 
 from base import models as mdl
-from base.business.entity import get_entities_ids, get_entity_container_list, build_entity_container_prefetch
-from base.business.entity_version import SERVICE_COURSE
-from base.business.learning_unit_year_with_context import append_latest_entities
-from base.forms.common import get_clean_data, treat_empty_or_str_none_as_none, TooManyResultsException
+from base.business.entity import get_entities_ids, get_entity_container_list
+from base.forms.common import get_clean_data, treat_empty_or_str_none_as_none
 from base.forms.utils.uppercase import convert_to_uppercase
 from base.models import learning_unit_year, group_element_year
 from base.models.academic_year import AcademicYear, current_academic_year
 from base.models.entity_container_year import EntityContainerYear
-from base.models.entity_version import EntityVersion, build_current_entity_version_structure_in_memory
+from base.models.entity_version import EntityVersion, build_current_entity_version_structure_in_memory, \
+    get_organogram_index
 from base.models.enums import entity_container_year_link_type, learning_container_year_types, \
     learning_unit_year_subtypes, active_status, entity_type
 from base.models.learning_unit_year import convert_status_bool
@@ -172,10 +171,7 @@ class LearningUnitYearForm(SearchForm):
         return get_clean_data(self.cleaned_data)
 
     def get_activity_learning_units(self):
-        if self.service_course_search:
-            return self._get_service_course_learning_units()
-        else:
-            return self.get_learning_units()
+        return self.get_learning_units()
 
     def get_learning_units(self, service_course_search=None, requirement_entities=None, luy_status=None):
         service_course_search = service_course_search or self.service_course_search
@@ -188,36 +184,20 @@ class LearningUnitYearForm(SearchForm):
         # TODO Use a queryset instead !!
         clean_data['learning_container_year_id'] = get_filter_learning_container_ids(clean_data)
 
-        if not service_course_search \
-                and clean_data \
-                and mdl.learning_unit_year.count_search_results(**clean_data) > SearchForm.MAX_RECORDS:
-            raise TooManyResultsException
+        learning_units = annotate_entities(mdl.learning_unit_year.search(**clean_data)) \
+            .select_related('academic_year', 'learning_container_year', 'learning_container_year__academic_year')
 
-        learning_units = mdl.learning_unit_year.search(**clean_data) \
-            .select_related('academic_year', 'learning_container_year', 'learning_container_year__academic_year') \
-            .prefetch_related(build_entity_container_prefetch()) \
-            .order_by('academic_year__year', 'acronym')
+        if service_course_search:
+            learning_units = filter_service_course_learning_unit_year(learning_units)
 
         if self.borrowed_course_search:
             learning_units = self._filter_borrowed_learning_units(learning_units)
 
-        # FIXME We must keep a queryset
-        return [append_latest_entities(learning_unit, service_course_search) for learning_unit in learning_units]
+        return learning_units.order_by('academic_year__year', 'acronym')
 
     def _set_status(self, luy_status):
         return convert_status_bool(luy_status) if luy_status else self.cleaned_data['status']
 
-    def _get_service_course_learning_units(self):
-        service_courses = []
-
-        for learning_unit in self.get_learning_units(True):
-            if not learning_unit.entities.get(SERVICE_COURSE):
-                continue
-
-            service_courses.append(learning_unit)
-
-        return service_courses
-
     def _filter_borrowed_learning_units(self, learning_units):
         try:
             faculty_borrowing_id = EntityVersion.objects.current(self.cleaned_data["academic_year_id"].start_date).\
@@ -256,6 +236,61 @@ def _get_common_entities(entities_id_list_allocation, entities_id_list_requireme
     return list(set(entities_id_list_allocation).intersection(set(entities_id_list_requirement)))
 
 
+def annotate_entities(learning_unit_year_qs):
+    """
+    Annotate the learning unit years with the id and the acronym of the latest version of their requirement and
+    allocation entities.
+    """
+    annotations = {}
+    for link_type, prefix in ((entity_container_year_link_type.REQUIREMENT_ENTITY, 'requirement'),
+                              (entity_container_year_link_type.ALLOCATION_ENTITY, 'allocation')):
+        entity_container_years = EntityContainerYear.objects.filter(
+            learning_container_year=OuterRef('learning_container_year'),
+            type=link_type
+        )
+        entity_versions = EntityVersion.objects.filter(
+            entity__entitycontaineryear__learning_container_year=OuterRef('learning_container_year'),
+            entity__entitycontaineryear__type=link_type
+        ).order_by('-start_date')
+        annotations['{}_entity_id'.format(prefix)] = Subquery(entity_container_years.values('entity')[:1],
+                                                              output_field=IntegerField())
+        annotations['{}_entity_acronym'.format(prefix)] = Subquery(entity_versions.values('acronym')[:1],
+                                                                   output_field=CharField())
+    return learning_unit_year_qs.annotate(**annotations)
+
+
+def filter_service_course_learning_unit_year(learning_unit_year_qs):
+    """
+    Keep the learning unit years (annotated by annotate_entities) whose requirement and allocation entities belong
+    to two different faculties at the start of their academic year.
+    """
+    academic_year_ids = learning_unit_year_qs.order_by().values_list('academic_year', flat=True).distinct()
+    requirement_faculty_cases = []
+    allocation_faculty_cases = []
+    for academic_yr in AcademicYear.objects.filter(pk__in=list(academic_year_ids)):
+        entity_ids_by_faculty_id = get_organogram_index(academic_yr.start_date).get_entity_ids_by_faculty_id()
+        for faculty_id, entity_ids in entity_ids_by_faculty_id.items():
+            requirement_faculty_cases.append(
+                When(academic_year=academic_yr, requirement_entity_id__in=entity_ids, then=Value(faculty_id))
+            )
+            allocation_faculty_cases.append(
+                When(academic_year=academic_yr, allocation_entity_id__in=entity_ids, then=Value(faculty_id))
+            )
+
+    if not requirement_faculty_cases:
+        return learning_unit_year_qs.none()
+
+    return learning_unit_year_qs.annotate(
+        requirement_faculty_id=Case(*requirement_faculty_cases, default=None, output_field=IntegerField()),
+        allocation_faculty_id=Case(*allocation_faculty_cases, default=None, output_field=IntegerField())
+    ).filter(
+        requirement_faculty_id__isnull=False,
+        allocation_faculty_id__isnull=False
+    ).exclude(
+        requirement_faculty_id=F('allocation_faculty_id')
+    )
+
+
 def filter_is_borrowed_learning_unit_year(learning_unit_year_qs, date, faculty_borrowing=None):
     entities = build_current_entity_version_structure_in_memory(date)
     entities_borrowing_allowed = []
@@ -265,12 +300,17 @@ def filter_is_borrowed_learning_unit_year(learning_unit_year_qs, date, faculty_b
         entities_borrowing_allowed = [entity_version.entity.id for entity_version in entities_borrowing_allowed]
     entities_faculty = compute_faculty_for_entities(entities)
     map_luy_entity = map_learning_unit_year_with_requirement_entity(learning_unit_year_qs)
+    # Only the ids and the academic years are needed to walk up the formations
+    learning_unit_years = list(learning_unit_year_qs.select_related(None).only('id', 'academic_year'))
     map_luy_education_group_entities = \
-        map_learning_unit_year_with_entities_of_education_groups(learning_unit_year_qs)
-
-    return filter(lambda luy: __is_borrowed_learning_unit(luy, entities_faculty, map_luy_entity,
-                                                          map_luy_education_group_entities, entities_borrowing_allowed),
-                  learning_unit_year_qs)
+        map_learning_unit_year_with_entities_of_education_groups(learning_unit_years)
+
+    borrowed_learning_unit_year_ids = [
+        luy.id for luy in learning_unit_years
+        if __is_borrowed_learning_unit(luy, entities_faculty, map_luy_entity, map_luy_education_group_entities,
+                                       entities_borrowing_allowed)
+    ]
+    return learning_unit_year_qs.filter(pk__in=borrowed_learning_unit_year_ids)
 
 
 def compute_faculty_for_entities(entities):
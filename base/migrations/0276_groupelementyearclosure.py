@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# The walk of the tree is copied from base.models.group_element_year_closure as it was when this migration was
+# written, the migration must not depend on code which can change afterwards.
+def compute_depths(ancestor_ids, find_children):
+    depths = {}
+    ancestors_by_node = {ancestor_id: {ancestor_id} for ancestor_id in ancestor_ids}
+    depth = 0
+    while ancestors_by_node:
+        depth += 1
+        next_ancestors_by_node = {}
+        for parent_id, child_branch_id, child_leaf_id in find_children(list(ancestors_by_node)):
+            for ancestor_id in ancestors_by_node[parent_id]:
+                key = (ancestor_id, child_branch_id, child_leaf_id)
+                if key in depths:
+                    continue
+                depths[key] = depth
+                if child_branch_id:
+                    next_ancestors_by_node.setdefault(child_branch_id, set()).add(ancestor_id)
+        ancestors_by_node = next_ancestors_by_node
+    return depths
+
+
+def build_closure(apps, schema_editor):
+    GroupElementYear = apps.get_model('base', 'GroupElementYear')
+    EducationGroupYear = apps.get_model('base', 'EducationGroupYear')
+    GroupElementYearClosure = apps.get_model('base', 'GroupElementYearClosure')
+
+    children_by_parent = {}
+    elements = GroupElementYear.objects.filter(parent__isnull=False)\
+        .exclude(child_branch__isnull=True, child_leaf__isnull=True)\
+        .values_list('parent_id', 'child_branch_id', 'child_leaf_id')
+    for element in elements:
+        children_by_parent.setdefault(element[0], []).append(element)
+
+    def find_children(parent_ids):
+        for parent_id in parent_ids:
+            yield from children_by_parent.get(parent_id, [])
+
+    academic_year_ids = dict(EducationGroupYear.objects.filter(pk__in=children_by_parent.keys())
+                             .values_list('pk', 'academic_year_id'))
+    depths = compute_depths(children_by_parent.keys(), find_children)
+    GroupElementYearClosure.objects.bulk_create(
+        [GroupElementYearClosure(academic_year_id=academic_year_ids[ancestor_id], ancestor_id=ancestor_id,
+                                 child_branch_id=child_branch_id, child_leaf_id=child_leaf_id, depth=depth)
+         for (ancestor_id, child_branch_id, child_leaf_id), depth in depths.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0275_auto_20180529_1456'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupElementYearClosure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                                    to='base.AcademicYear')),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                               to='base.EducationGroupYear')),
+                ('child_branch', models.ForeignKey(blank=True, null=True,
+                                                   on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                                   to='base.EducationGroupYear')),
+                ('child_leaf', models.ForeignKey(blank=True, null=True,
+                                                 on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                                 to='base.LearningUnitYear')),
+            ],
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# The walk of the tree is copied from base.models.structure_closure as it was when this migration was written,
+# the migration must not depend on code which can change afterwards.
+def compute_depths(parent_id_by_id):
+    depths = {}
+    for structure_id in parent_id_by_id:
+        ancestor_id, depth = structure_id, 0
+        while ancestor_id is not None and (ancestor_id, structure_id) not in depths:
+            depths[(ancestor_id, structure_id)] = depth
+            ancestor_id, depth = parent_id_by_id.get(ancestor_id), depth + 1
+    return depths
+
+
+def build_closure(apps, schema_editor):
+    Structure = apps.get_model('base', 'Structure')
+    StructureClosure = apps.get_model('base', 'StructureClosure')
+
+    parent_id_by_id = dict(Structure.objects.values_list('pk', 'part_of_id'))
+    depths = compute_depths(parent_id_by_id)
+    StructureClosure.objects.bulk_create(
+        [StructureClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+         for (ancestor_id, descendant_id), depth in depths.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0276_groupelementyearclosure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StructureClosure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                               to='base.Structure')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                                 to='base.Structure')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='structureclosure',
+            unique_together=set([('ancestor', 'descendant')]),
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
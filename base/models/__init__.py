@@ -44,6 +44,7 @@ from base.models import external_learning_unit_year
 from base.models import external_offer
 from base.models import external_learning_unit_year
 from base.models import group_element_year
+from base.models import group_element_year_closure
 from base.models import learning_achievement
 from base.models import learning_class_year
 from base.models import learning_component_year
@@ -75,6 +76,7 @@ from base.models import session_exam_calendar
 from base.models import session_exam_deadline
 from base.models import structure
 from base.models import structure_address
+from base.models import structure_closure
 from base.models import student
 from base.models import synchronization
 from base.models import tutor
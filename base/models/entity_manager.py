@@ -25,10 +25,18 @@
 ##############################################################################
 from django.db import models
 from django.db.models import Prefetch
+from django.utils import timezone
 
 from base.models import entity_version
+from base.utils.cache import GenerationalCache
 from osis_common.models.serializable_model import SerializableModel, SerializableModelAdmin
 
+ENTITY_MANAGER_CACHE_NAMESPACE = 'entity_manager_managed_entities'
+ENTITY_MANAGER_CACHE_MAX_AGE = 60
+
+entity_manager_cache = GenerationalCache(ENTITY_MANAGER_CACHE_NAMESPACE, maxsize=1024,
+                                         max_age=ENTITY_MANAGER_CACHE_MAX_AGE)
+
 
 class EntityManagerAdmin(SerializableModelAdmin):
     list_display = ('person', 'structure', 'entity')
@@ -65,12 +73,24 @@ def is_entity_manager(user):
     return EntityManager.objects.filter(person__user=user).count() > 0
 
 
-def find_entities_with_descendants_from_entity_managers(entities_manager):
-    entities_with_descendants = []
-    entities_by_id = entity_version.build_current_entity_version_structure_in_memory()
-    for entity_manager in entities_manager:
-        entities_with_descendants.append(entity_manager.entity)
-        entities_with_descendants += [
-            ent_version.entity for ent_version in entities_by_id[entity_manager.entity_id].get('all_children')
-        ]
-    return entities_with_descendants
+def get_managed_entity_ids(user):
+    """
+    Return the ids of the entities managed by the user, with all their descendants in the current entity tree.
+    The result is kept in a process-local cache until an EntityManager or an EntityVersion changes (at most a minute).
+    """
+    today = timezone.localdate()
+    return entity_manager_cache.get_or_compute((user.pk, today), lambda: _compute_managed_entity_ids(user, today))
+
+
+def invalidate_managed_entity_ids():
+    entity_manager_cache.invalidate()
+
+
+def _compute_managed_entity_ids(user, date):
+    organogram = entity_version.get_organogram_index(date)
+    entity_ids = set()
+    for entity_id in EntityManager.objects.filter(person__user=user, entity__isnull=False)\
+                                          .values_list('entity_id', flat=True):
+        entity_ids.add(entity_id)
+        entity_ids |= {ent_version.entity_id for ent_version in organogram.get_descendants(entity_id)}
+    return frozenset(entity_ids)
@@ -33,9 +33,15 @@ from django.utils.functional import cached_property
 from base.models.enums import entity_type
 from base.models.enums.entity_type import MAIN_ENTITY_TYPE
 from base.models.enums.organization_type import MAIN
+from base.utils.cache import GenerationalCache
 from osis_common.models.serializable_model import SerializableModel, SerializableModelAdmin
 from osis_common.utils.datetime import get_tzinfo
 
+ORGANOGRAM_CACHE_NAMESPACE = 'entity_version_organogram'
+ORGANOGRAM_CACHE_MAX_AGE = 600
+
+organogram_cache = GenerationalCache(ORGANOGRAM_CACHE_NAMESPACE, max_age=ORGANOGRAM_CACHE_MAX_AGE)
+
 
 class EntityVersionAdmin(SerializableModelAdmin):
     list_display = ('id', 'entity', 'acronym', 'parent', 'title', 'entity_type', 'start_date', 'end_date',)
@@ -134,7 +140,7 @@ class EntityVersion(SerializableModel):
         return direct_children
 
     def count_direct_children(self, date=None):
-        return self.find_direct_children(date).count()
+        return len(self.find_direct_children(date))
 
     @cached_property
     def descendants(self):
@@ -142,16 +148,16 @@ class EntityVersion(SerializableModel):
 
     @cached_property
     def children(self):
-        return self._direct_children()
+        date = _get_reference_date(None)
+        if not self.__contains_given_date(date):
+            return []
+        return get_organogram_index(date).get_direct_children(self.entity_id)
 
     def find_descendants(self, date=None):
-        descendants = []
-        direct_children = self.find_direct_children(date)
-        if len(direct_children) > 0:
-            descendants.extend(direct_children)
-            for child in direct_children:
-                descendants.extend(child.find_descendants(date))
-
+        date = _get_reference_date(date)
+        if not self.__contains_given_date(date):
+            return []
+        descendants = get_organogram_index(date).get_descendants(self.entity_id)
         return sorted(descendants, key=lambda an_entity: an_entity.acronym)
 
     def find_faculty_version(self, academic_yr):
@@ -161,39 +167,21 @@ class EntityVersion(SerializableModel):
         elif self.entity_type == entity_type.SECTOR:
             return None
         else:
-            parent_entity_version = self._find_latest_version_by_parent(academic_yr.start_date)
-            if parent_entity_version:
-                return parent_entity_version.find_faculty_version(academic_yr)
-
-    def _find_latest_version_by_parent(self, start_date):
-        if not self.parent:
-            return None
-
-        # if a prefetch exist on the parent
-        entity_versions = getattr(self.parent, 'entity_versions', None)
-        if not entity_versions:
-            return find_latest_version_by_entity(self.parent, start_date)
-
-        for entity_version in entity_versions:
-            if entity_version.__contains_given_date(start_date):
-                return entity_version
+            return get_organogram_index(academic_yr.start_date).get_faculty_version(self.parent_id)
 
     def get_parent_version(self, date=None):
-        if date is None:
-            date = timezone.now().date()
-
+        date = _get_reference_date(date)
         if self.__contains_given_date(date):
-            qs = EntityVersion.objects.current(date).entity(self.parent)
-            try:
-                return qs.get()
-            except EntityVersion.DoesNotExist:
-                return None
+            return get_organogram_index(date).get_version(self.parent_id)
 
     def __contains_given_date(self, date):
-        if self.start_date and self.end_date:
-            return self.start_date <= date <= self.end_date
-        elif self.start_date and not self.end_date:
-            return self.start_date <= date
+        date = _get_reference_date(date)
+        start_date = _to_date(self.start_date)
+        end_date = _to_date(self.end_date)
+        if start_date and end_date:
+            return start_date <= date <= end_date
+        elif start_date and not end_date:
+            return start_date <= date
         else:
             return False
 
@@ -237,6 +225,11 @@ def get_last_version(entity, date=None):
     return qs.latest('start_date')
 
 
+def find_last_versions_by_entity_id(entity_ids, date=None):
+    versions = EntityVersion.objects.current(date).filter(entity_id__in=entity_ids).order_by('start_date')
+    return {version.entity_id: version for version in versions}
+
+
 def get_last_version_by_entity_id(entity_id):
     now = datetime.datetime.now(get_tzinfo())
     return EntityVersion.objects.current(now).filter(entity__id=entity_id).latest('start_date')
@@ -348,23 +341,88 @@ def find_all_current_entities_version():
 
 
 def build_current_entity_version_structure_in_memory(date=None):
-    if date:
-        all_current_entities_version = find_latest_version(date=date)
-    else:
-        all_current_entities_version = find_all_current_entities_version()
-    entity_version_by_entity_id = _build_entity_version_by_entity_id(all_current_entities_version)
-    direct_children_by_entity_version_id = _build_direct_children_by_entity_version_id(entity_version_by_entity_id)
-    all_children_by_entity_version_id = _build_all_children_by_entity_version_id(direct_children_by_entity_version_id)
-
-    entity_versions = {}
-    for entity_version in all_current_entities_version:
-        entity_versions[entity_version.entity_id] = {
-            'entity_version_parent': entity_version_by_entity_id.get(entity_version.parent_id),
-            'direct_children': direct_children_by_entity_version_id.get(entity_version.id, []),
-            'all_children': all_children_by_entity_version_id.get(entity_version.id, []),
-            'entity_version': entity_version
-        }
-    return entity_versions
+    return get_organogram_index(date).structure
+
+
+class OrganogramIndex:
+    """In-memory tree of the entity versions valid at a reference date."""
+
+    def __init__(self, date):
+        self.date = date
+        all_current_entities_version = list(find_latest_version(date=date))
+        self.entity_version_by_entity_id = _build_entity_version_by_entity_id(all_current_entities_version)
+        direct_children_by_entity_version_id = _build_direct_children_by_entity_version_id(
+            self.entity_version_by_entity_id
+        )
+        all_children_by_entity_version_id = _build_all_children_by_entity_version_id(
+            direct_children_by_entity_version_id
+        )
+
+        self.structure = {}
+        for entity_version in all_current_entities_version:
+            self.structure[entity_version.entity_id] = {
+                'entity_version_parent': self.entity_version_by_entity_id.get(entity_version.parent_id),
+                'direct_children': direct_children_by_entity_version_id.get(entity_version.id, []),
+                'all_children': all_children_by_entity_version_id.get(entity_version.id, []),
+                'entity_version': entity_version
+            }
+
+    def get_version(self, entity_id):
+        return self.entity_version_by_entity_id.get(entity_id)
+
+    def get_parent_version(self, entity_id):
+        entity_data = self.structure.get(entity_id)
+        return entity_data['entity_version_parent'] if entity_data else None
+
+    def get_direct_children(self, entity_id):
+        entity_data = self.structure.get(entity_id)
+        return list(entity_data['direct_children']) if entity_data else []
+
+    def get_descendants(self, entity_id):
+        entity_data = self.structure.get(entity_id)
+        return list(entity_data['all_children']) if entity_data else []
+
+    def get_faculty_version(self, entity_id):
+        visited_entity_ids = set()
+        entity_version = self.get_version(entity_id)
+        while entity_version and entity_version.entity_id not in visited_entity_ids:
+            if entity_version.entity_type == entity_type.FACULTY:
+                return entity_version
+            # There is no faculty above the sector
+            elif entity_version.entity_type == entity_type.SECTOR:
+                return None
+            visited_entity_ids.add(entity_version.entity_id)
+            entity_version = self.get_version(entity_version.parent_id)
+        return None
+
+    def get_entity_ids_by_faculty_id(self):
+        entity_ids_by_faculty_id = {}
+        for entity_id in self.structure:
+            faculty_version = self.get_faculty_version(entity_id)
+            if faculty_version:
+                entity_ids_by_faculty_id.setdefault(faculty_version.entity_id, []).append(entity_id)
+        return entity_ids_by_faculty_id
+
+
+def get_organogram_index(date=None):
+    date = _get_reference_date(date)
+    return organogram_cache.get_or_compute(date, lambda: OrganogramIndex(date))
+
+
+def invalidate_organogram_index():
+    organogram_cache.invalidate()
+
+
+def _get_reference_date(date):
+    return _to_date(date) or datetime.datetime.now(get_tzinfo()).date()
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
 
 
 def _build_entity_version_by_entity_id(versions):
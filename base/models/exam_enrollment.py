@@ -23,11 +23,13 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from collections import OrderedDict
 from decimal import *
 
 from django.db import models
 from django.db.models import When, Case, Q, Sum, Count, IntegerField, F
 from django.db.models.functions import Concat
+from django.utils import timezone
 from django.utils.translation import ugettext as _
 
 from django.core.validators import MaxValueValidator, MinValueValidator
@@ -42,6 +44,9 @@ from base.models.osis_model_admin import OsisModelAdmin
 
 JUSTIFICATION_ABSENT_FOR_TUTOR = _('absent')
 
+SCORE_AND_JUSTIFICATION_FIELDS = ('score_draft', 'justification_draft', 'score_reencoded', 'justification_reencoded',
+                                  'score_final', 'justification_final')
+
 
 class ExamEnrollmentAdmin(OsisModelAdmin):
     list_display = ('student', 'enrollment_state', 'session_exam', 'score_draft', 'justification_draft', 'score_final',
@@ -257,6 +262,42 @@ def create_exam_enrollment_historic(user, enrollment):
     exam_enrollment_history.save()
 
 
+def bulk_create_exam_enrollment_historic(user, enrollments):
+    a_person = person.find_by_user(user)
+    ExamEnrollmentHistory.objects.bulk_create([
+        ExamEnrollmentHistory(exam_enrollment=enrollment,
+                              score_final=enrollment.score_final,
+                              justification_final=enrollment.justification_final,
+                              person=a_person)
+        for enrollment in enrollments
+    ])
+
+
+def bulk_update_scores_and_justifications(enrollments):
+    """
+    Save the scores and justifications of the enrollments with one UPDATE statement
+    by distinct set of values instead of one save() by enrollment.
+    When the same enrollment is given several times, the last one wins.
+    """
+    values_by_enrollment_id = OrderedDict()
+    for enrollment in enrollments:
+        if not enrollment.justification_valid():
+            raise JustificationValueException
+        values_by_enrollment_id[enrollment.pk] = tuple(getattr(enrollment, field_name)
+                                                       for field_name in SCORE_AND_JUSTIFICATION_FIELDS)
+
+    enrollment_ids_by_values = OrderedDict()
+    for enrollment_id, values in values_by_enrollment_id.items():
+        enrollment_ids_by_values.setdefault(values, []).append(enrollment_id)
+
+    now = timezone.now()
+    for values, enrollment_ids in enrollment_ids_by_values.items():
+        ExamEnrollment.objects.filter(pk__in=enrollment_ids)\
+                              .update(changed=now, **dict(zip(SCORE_AND_JUSTIFICATION_FIELDS, values)))
+    for enrollment in enrollments:
+        enrollment.changed = now
+
+
 def get_progress(session_exm_list, learning_unt):
     tot_progress = 0
     tot_enrollments = 0
@@ -302,6 +343,18 @@ def get_progress_by_learning_unit_years_and_offer_years(user,
                                         academic_year=academic_year,
                                         with_session_exam_deadline=False)
 
+    return _annotate_progress(queryset)
+
+
+def get_progress_by_offer_years(session_exam_number, academic_year, offer_year_ids):
+    queryset = find_for_score_encodings(session_exam_number=session_exam_number,
+                                        offers_year=offer_year_ids,
+                                        academic_year=academic_year,
+                                        with_session_exam_deadline=False)
+    return _annotate_progress(queryset)
+
+
+def _annotate_progress(queryset):
     return queryset.values('session_exam','learning_unit_enrollment__learning_unit_year',
                            'learning_unit_enrollment__offer_enrollment__offer_year')\
         .annotate(total_exam_enrollments=Count('id'),
@@ -31,7 +31,7 @@ from django.db import models
 from django.contrib import admin
 from base.models.enums import sessions_derogation
 from base.models.enums import education_group_categories
-from base.models import education_group_type, education_group_year
+from base.models import education_group_type, education_group_year, group_element_year_closure
 from django.db.models import Q
 
 
@@ -87,6 +87,27 @@ def find_by_parent(an_education_group_year):
     return GroupElementYear.objects.filter(parent=an_education_group_year)
 
 
+def refresh_closure(education_group_year_ids):
+    """
+    Rebuild the closure rows of the education group years and of all their ancestors after a change of their elements.
+    """
+    education_group_year_ids = {egy_id for egy_id in education_group_year_ids if egy_id}
+    if not education_group_year_ids:
+        return
+    ancestor_ids = education_group_year_ids | \
+        group_element_year_closure.find_ancestor_ids(child_branch_ids=education_group_year_ids)
+    depths = group_element_year_closure.compute_depths(ancestor_ids, _find_children)
+    academic_year_ids = dict(EducationGroupYear.objects.filter(pk__in=ancestor_ids)
+                             .values_list('pk', 'academic_year_id'))
+    group_element_year_closure.replace_rows(ancestor_ids, depths, academic_year_ids)
+
+
+def _find_children(parent_ids):
+    return GroupElementYear.objects.filter(parent__in=parent_ids)\
+        .filter(Q(child_leaf__isnull=False) | Q(child_branch__isnull=False))\
+        .values_list('parent_id', 'child_branch_id', 'child_leaf_id')
+
+
 def find_learning_unit_formations(objects, parents_as_instances=False):
     root_ids_by_object_id = {}
     if objects:
@@ -127,8 +148,8 @@ def _raise_if_incorrect_instance(objects):
 
 def _find_related_formations(objects, filters):
     _raise_if_incorrect_instance(objects)
-    academic_year = _extract_common_academic_year(objects)
-    parents_by_id = _build_parent_list_by_education_group_year_id(academic_year, filters=filters)
+    _extract_common_academic_year(objects)
+    parents_by_id = _build_parent_list_by_child_key(objects, filters=filters)
     if isinstance(objects[0], LearningUnitYear):
         return {obj.id: _find_elements(parents_by_id, filters, child_leaf_id=obj.id) for obj in objects}
     else:
@@ -142,15 +163,23 @@ def _extract_common_academic_year(objects):
     return objects[0].academic_year
 
 
-def _build_parent_list_by_education_group_year_id(academic_year, filters=None):
+def _build_parent_list_by_child_key(objects, filters=None):
+    """
+    Load only the elements above the objects: the ones of the objects and of their ancestors (found in the closure).
+    """
     columns_needed_for_filters = filters.keys() if filters else []
-    group_elements = list(search(academic_year=academic_year)
-                          .filter(parent__isnull=False)
-                          .filter(Q(child_leaf__isnull=False) | Q(child_branch__isnull=False))
-                          .select_related('education_group_year__education_group_type')
-                          .values('parent', 'child_branch', 'child_leaf', *columns_needed_for_filters))
+    object_ids = [obj.id for obj in objects]
+    if isinstance(objects[0], LearningUnitYear):
+        ancestor_ids = group_element_year_closure.find_ancestor_ids(child_leaf_ids=object_ids)
+        objects_filter = Q(child_leaf__in=object_ids)
+    else:
+        ancestor_ids = group_element_year_closure.find_ancestor_ids(child_branch_ids=object_ids)
+        objects_filter = Q(child_branch__in=object_ids)
+
+    group_elements = GroupElementYear.objects.filter(parent__isnull=False)\
+        .filter(objects_filter | Q(child_branch__in=ancestor_ids))\
+        .values('parent', 'child_branch', 'child_leaf', *columns_needed_for_filters)
     result = {}
-    # TODO :: uses .annotate() on queryset to make the below expected result
     for group_element_year in group_elements:
         key = _build_child_key(child_branch=group_element_year['child_branch'],
                                child_leaf=group_element_year['child_leaf'])
@@ -0,0 +1,99 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.db import models, transaction
+
+CLOSURE_ROWS_BY_BATCH = 1000
+
+
+class GroupElementYearClosure(models.Model):
+    """
+    Transitive closure of the GroupElementYear tree: one row by education group year and element (education group
+    year or learning unit year) it contains, directly or not. The depth is the length of the shortest path.
+    """
+    academic_year = models.ForeignKey('AcademicYear', related_name='+')
+    ancestor = models.ForeignKey('EducationGroupYear', related_name='+')
+    child_branch = models.ForeignKey('EducationGroupYear', related_name='+', blank=True, null=True)
+    child_leaf = models.ForeignKey('LearningUnitYear', related_name='+', blank=True, null=True)
+    depth = models.PositiveIntegerField()
+
+
+def find_ancestor_ids(child_leaf_ids=None, child_branch_ids=None):
+    queryset = GroupElementYearClosure.objects.all()
+    if child_leaf_ids is not None:
+        queryset = queryset.filter(child_leaf__in=child_leaf_ids)
+    if child_branch_ids is not None:
+        queryset = queryset.filter(child_branch__in=child_branch_ids)
+    return set(queryset.values_list('ancestor_id', flat=True))
+
+
+def find_learning_unit_year_ids(education_group_year):
+    return set(GroupElementYearClosure.objects.filter(ancestor=education_group_year, child_leaf__isnull=False)
+               .values_list('child_leaf_id', flat=True))
+
+
+def find_education_group_year_ids(learning_unit_year):
+    return set(GroupElementYearClosure.objects.filter(child_leaf=learning_unit_year)
+               .values_list('ancestor_id', flat=True))
+
+
+def compute_depths(ancestor_ids, find_children):
+    """
+    Walk down the tree from the ancestors, level by level, and return the depth of each of their elements:
+    {(ancestor_id, child_branch_id, child_leaf_id): depth}
+    find_children(parent_ids) returns the (parent_id, child_branch_id, child_leaf_id) of the elements of the parents.
+    """
+    depths = {}
+    ancestors_by_node = {ancestor_id: {ancestor_id} for ancestor_id in ancestor_ids}
+    depth = 0
+    while ancestors_by_node:
+        depth += 1
+        next_ancestors_by_node = {}
+        for parent_id, child_branch_id, child_leaf_id in find_children(list(ancestors_by_node)):
+            for ancestor_id in ancestors_by_node[parent_id]:
+                key = (ancestor_id, child_branch_id, child_leaf_id)
+                # Breadth-first: the first path found is the shortest one, and cycles are not walked again
+                if key in depths:
+                    continue
+                depths[key] = depth
+                if child_branch_id:
+                    next_ancestors_by_node.setdefault(child_branch_id, set()).add(ancestor_id)
+        ancestors_by_node = next_ancestors_by_node
+    return depths
+
+
+def build_rows(model, depths, academic_year_ids):
+    return [
+        model(academic_year_id=academic_year_ids[ancestor_id], ancestor_id=ancestor_id,
+              child_branch_id=child_branch_id, child_leaf_id=child_leaf_id, depth=depth)
+        for (ancestor_id, child_branch_id, child_leaf_id), depth in depths.items()
+    ]
+
+
+@transaction.atomic
+def replace_rows(ancestor_ids, depths, academic_year_ids):
+    GroupElementYearClosure.objects.filter(ancestor__in=ancestor_ids).delete()
+    GroupElementYearClosure.objects.bulk_create(build_rows(GroupElementYearClosure, depths, academic_year_ids),
+                                                batch_size=CLOSURE_ROWS_BY_BATCH)
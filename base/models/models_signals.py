@@ -23,8 +23,9 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-from django.contrib.auth.models import Group
-from django.db.models.signals import post_save, post_delete
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed, pre_save
 from django.dispatch import receiver, Signal
 from base import models as mdl
 from osis_common.models.serializable_model import SerializableModel
@@ -159,3 +160,62 @@ def remove_from_pgm_managers_group(sender, instance, **kwargs):
     if instance.person.user and not mdl.program_manager.find_by_user(instance.person.user):
         pgm_managers_group = Group.objects.get(name='program_managers')
         instance.person.user.groups.remove(pgm_managers_group)
+
+
+@receiver(post_save, sender=mdl.entity_version.EntityVersion)
+@receiver(post_delete, sender=mdl.entity_version.EntityVersion)
+def invalidate_organogram_index(sender, instance, **kwargs):
+    mdl.entity_version.invalidate_organogram_index()
+    mdl.person_entity.invalidate_attached_entity_ids()
+    mdl.entity_manager.invalidate_managed_entity_ids()
+    # Other workers may have rebuilt the index before the transaction was committed
+    transaction.on_commit(mdl.entity_version.invalidate_organogram_index)
+    transaction.on_commit(mdl.person_entity.invalidate_attached_entity_ids)
+    transaction.on_commit(mdl.entity_manager.invalidate_managed_entity_ids)
+
+
+@receiver(post_save, sender=mdl.entity_manager.EntityManager)
+@receiver(post_delete, sender=mdl.entity_manager.EntityManager)
+def invalidate_managed_entity_ids(sender, instance, **kwargs):
+    mdl.entity_manager.invalidate_managed_entity_ids()
+    transaction.on_commit(mdl.entity_manager.invalidate_managed_entity_ids)
+
+
+@receiver(post_save, sender=mdl.person_entity.PersonEntity)
+@receiver(post_delete, sender=mdl.person_entity.PersonEntity)
+def invalidate_attached_entity_ids(sender, instance, **kwargs):
+    mdl.person_entity.invalidate_attached_entity_ids()
+    transaction.on_commit(mdl.person_entity.invalidate_attached_entity_ids)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(post_delete, sender=Group)
+def invalidate_group_names(sender, **kwargs):
+    mdl.person.invalidate_group_names()
+    transaction.on_commit(mdl.person.invalidate_group_names)
+
+
+@receiver(pre_save, sender=mdl.group_element_year.GroupElementYear)
+def keep_previous_group_element_year_parent(sender, instance, **kwargs):
+    # The elements of the previous parent change as well when a GroupElementYear is moved
+    instance.previous_parent_id = mdl.group_element_year.GroupElementYear.objects.filter(pk=instance.pk)\
+        .values_list('parent_id', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=mdl.group_element_year.GroupElementYear)
+@receiver(post_delete, sender=mdl.group_element_year.GroupElementYear)
+def refresh_group_element_year_closure(sender, instance, **kwargs):
+    mdl.group_element_year.refresh_closure({instance.parent_id, getattr(instance, 'previous_parent_id', None)})
+
+
+@receiver(pre_save, sender=mdl.structure.Structure)
+def keep_previous_structure_parent(sender, instance, **kwargs):
+    instance.previous_part_of_id = mdl.structure.Structure.objects.filter(pk=instance.pk)\
+        .values_list('part_of_id', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=mdl.structure.Structure)
+def refresh_structure_closure(sender, instance, created, **kwargs):
+    # The rows of a deleted structure are removed in cascade, only a new or moved structure needs a refresh
+    if created or instance.part_of_id != getattr(instance, 'previous_part_of_id', None):
+        mdl.structure_closure.move_subtree(instance.pk, instance.part_of_id)
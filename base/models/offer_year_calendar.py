@@ -130,4 +130,7 @@ def search(**kwargs):
     if 'offer_year' in kwargs:
         queryset = queryset.filter(offer_year=kwargs['offer_year'])
 
+    if 'offer_year_ids' in kwargs:
+        queryset = queryset.filter(offer_year__in=kwargs['offer_year_ids'])
+
     return queryset
@@ -38,11 +38,17 @@ from base.business.learning_units.perms import is_person_linked_to_entity_in_cha
 from base.models.entity_version import find_main_entities_version
 from base.models.enums import person_source_type
 from base.models.utils.person_entity_filter import filter_by_attached_entities
+from base.utils.cache import GenerationalCache
 from osis_common.models.serializable_model import SerializableModel, SerializableModelAdmin
 
 CENTRAL_MANAGER_GROUP = "central_managers"
 FACULTY_MANAGER_GROUP = "faculty_managers"
 
+USER_GROUPS_CACHE_NAMESPACE = 'user_group_names'
+USER_GROUPS_CACHE_MAX_AGE = 60
+
+user_groups_cache = GenerationalCache(USER_GROUPS_CACHE_NAMESPACE, maxsize=1024, max_age=USER_GROUPS_CACHE_MAX_AGE)
+
 
 class PersonAdmin(SerializableModelAdmin):
     list_display = ('get_first_name', 'middle_name', 'last_name', 'username', 'email', 'gender', 'global_id',
@@ -103,10 +109,10 @@ class Person(SerializableModel):
             return "-"
 
     def is_central_manager(self):
-        return self.user.groups.filter(name=CENTRAL_MANAGER_GROUP).exists()
+        return CENTRAL_MANAGER_GROUP in get_group_names(self.user)
 
     def is_faculty_manager(self):
-        return self.user.groups.filter(name=FACULTY_MANAGER_GROUP).exists()
+        return FACULTY_MANAGER_GROUP in get_group_names(self.user)
 
     def __str__(self):
         first_name = ""
@@ -148,6 +154,18 @@ def find_by_user(user):
     return person
 
 
+def get_group_names(user):
+    """
+    Return the names of the groups of the user, kept in a process-local cache until the groups of any user change
+    (at most a minute).
+    """
+    return user_groups_cache.get_or_compute(user.pk, lambda: frozenset(user.groups.values_list('name', flat=True)))
+
+
+def invalidate_group_names():
+    user_groups_cache.invalidate()
+
+
 def get_user_interface_language(user):
     user_language = settings.LANGUAGE_CODE
     person = find_by_user(user)
@@ -26,9 +26,16 @@
 from django.db import models
 
 from base.models import entity_version
-from base.models.entity import Entity
 from base.models.entity_version import EntityVersion
 from base.models.osis_model_admin import OsisModelAdmin
+from base.utils.cache import GenerationalCache
+
+PERSON_ENTITY_CACHE_NAMESPACE = 'person_entity_attached_entities'
+CHILDREN_BY_ENTITY_KEY = 'children_by_entity'
+PERSON_ENTITY_CACHE_MAX_AGE = 60
+
+person_entity_cache = GenerationalCache(PERSON_ENTITY_CACHE_NAMESPACE, maxsize=1024,
+                                        max_age=PERSON_ENTITY_CACHE_MAX_AGE)
 
 
 class PersonEntityAdmin(OsisModelAdmin):
@@ -74,23 +81,45 @@ def find_entities_by_person(person):
 
 
 def is_attached_entities(person, entity_queryset):
-    admissible_entities = list(entity_queryset.values_list('pk', flat=True))
-
-    qs = PersonEntity.objects.filter(person=person)
-    if qs.filter(entity__in=admissible_entities).exists():
-        return True
-    elif qs.filter(entity__in=_entity_ancestors(entity_queryset), with_child=True).exists():
-        return True
-    else:
-        return False
-
-
-def _entity_ancestors(entity_list):
-    ancestors = list(EntityVersion.objects.filter(entity__in=entity_list).exclude(parent__isnull=True)
-                     .values_list('parent', flat=True))
-
-    parents = Entity.objects.filter(pk__in=ancestors)
-    if parents.exists():
-        ancestors.extend(_entity_ancestors(parents))
-
-    return ancestors or []
+    admissible_entity_ids = entity_queryset.values_list('pk', flat=True)
+    return not get_attached_entity_ids(person).isdisjoint(admissible_entity_ids)
+
+
+def get_attached_entity_ids(person):
+    """
+    Return the ids of the entities the person is attached to, including all the descendants (in any version of the
+    entity tree) of the entities attached with child. The result is kept in a process-local cache until a PersonEntity
+    or an EntityVersion changes (at most a minute).
+    """
+    return person_entity_cache.get_or_compute(person.pk, lambda: _compute_attached_entity_ids(person))
+
+
+def invalidate_attached_entity_ids():
+    person_entity_cache.invalidate()
+
+
+def _compute_attached_entity_ids(person):
+    entity_ids = set()
+    entity_ids_with_child = []
+    for entity_id, with_child in PersonEntity.objects.filter(person=person).values_list('entity_id', 'with_child'):
+        entity_ids.add(entity_id)
+        if with_child:
+            entity_ids_with_child.append(entity_id)
+
+    if entity_ids_with_child:
+        children_by_entity_id = person_entity_cache.get_or_compute(CHILDREN_BY_ENTITY_KEY,
+                                                                   _compute_children_by_entity_id)
+        while entity_ids_with_child:
+            children = children_by_entity_id.get(entity_ids_with_child.pop(), set()) - entity_ids
+            entity_ids |= children
+            entity_ids_with_child.extend(children)
+    return frozenset(entity_ids)
+
+
+def _compute_children_by_entity_id():
+    children_by_entity_id = {}
+    for entity_id, parent_id in EntityVersion.objects.exclude(parent__isnull=True)\
+                                                     .values_list('entity_id', 'parent_id')\
+                                                     .distinct():
+        children_by_entity_id.setdefault(parent_id, set()).add(entity_id)
+    return children_by_entity_id
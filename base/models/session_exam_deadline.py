@@ -24,8 +24,11 @@
 #
 ##############################################################################
 import datetime
+from collections import OrderedDict
+
 from django.db import models
 from django.contrib import admin
+from django.utils import timezone
 from base.models.enums import number_session
 from base.signals.publisher import compute_student_score_encoding_deadline
 from base.models.osis_model_admin import OsisModelAdmin
@@ -88,4 +91,29 @@ def get_by_offer_enrollment_nb_session(offer_enrollment, nb_session):
         return SessionExamDeadline.objects.get(offer_enrollment=offer_enrollment.id,
                                                number_session=nb_session)
     except SessionExamDeadline.DoesNotExist:
-        return None
\ No newline at end of file
+        return None
+
+
+def find_by_offer_years_and_nb_session(offer_year_ids, nb_session):
+    return SessionExamDeadline.objects.filter(offer_enrollment__offer_year__in=offer_year_ids,
+                                              number_session=nb_session)\
+                                      .annotate(offer_year_id=models.F('offer_enrollment__offer_year_id'))
+
+
+def bulk_update_deadlines(session_exam_deadlines):
+    """
+    Save the deadline and deadline_tutor of the session exam deadlines with one UPDATE statement
+    by distinct couple of values instead of one save() by session exam deadline.
+    The deliberation date is left untouched, so no deadline needs to be recomputed afterwards.
+    """
+    ids_by_values = OrderedDict()
+    for sess_exam_deadline in session_exam_deadlines:
+        values = (sess_exam_deadline.deadline, sess_exam_deadline.deadline_tutor)
+        ids_by_values.setdefault(values, []).append(sess_exam_deadline.pk)
+
+    now = timezone.now()
+    for (deadline, deadline_tutor), ids in ids_by_values.items():
+        SessionExamDeadline.objects.filter(pk__in=ids)\
+                                   .update(deadline=deadline, deadline_tutor=deadline_tutor, changed=now)
+    for sess_exam_deadline in session_exam_deadlines:
+        sess_exam_deadline.changed = now
@@ -30,6 +30,7 @@ from django.contrib import admin
 
 from base.models.academic_year import current_academic_years
 from base.models.enums import structure_type
+from base.models import structure_closure
 from base.models.osis_model_admin import OsisModelAdmin
 
 
@@ -135,6 +136,13 @@ def find_by_acronyms(acronym_list):
     return Structure.objects.filter(acronym__in=acronym_list).order_by("acronym")
 
 
+def find_descendants(structures):
+    """
+    Return the structures and all their descendants, read from the structure closure in a single query.
+    """
+    return Structure.objects.filter(pk__in=structure_closure.find_descendant_ids(structures)).order_by('acronym')
+
+
 def find_all_structure_parents(entities_manager):
     structures_list = list()
     for entity_manager in entities_manager:
@@ -0,0 +1,89 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.db import models, transaction
+
+CLOSURE_ROWS_BY_BATCH = 1000
+
+
+class StructureClosure(models.Model):
+    """
+    Transitive closure of the Structure tree: one row by structure and each of its ancestors, the structure itself
+    included at depth 0.
+    """
+    ancestor = models.ForeignKey('Structure', related_name='+')
+    descendant = models.ForeignKey('Structure', related_name='+')
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('ancestor', 'descendant')
+
+
+def find_descendant_ids(ancestors):
+    return StructureClosure.objects.filter(ancestor__in=ancestors).values('descendant_id')
+
+
+def compute_depths(parent_id_by_id):
+    """
+    Return the depth of each structure below each of its ancestors: {(ancestor_id, descendant_id): depth}
+    parent_id_by_id maps each structure id to the id of its parent, or None for a root.
+    """
+    depths = {}
+    for structure_id in parent_id_by_id:
+        ancestor_id, depth = structure_id, 0
+        while ancestor_id is not None and (ancestor_id, structure_id) not in depths:
+            depths[(ancestor_id, structure_id)] = depth
+            ancestor_id, depth = parent_id_by_id.get(ancestor_id), depth + 1
+    return depths
+
+
+def build_rows(model, depths):
+    return [model(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+            for (ancestor_id, descendant_id), depth in depths.items()]
+
+
+@transaction.atomic
+def move_subtree(structure_id, parent_id):
+    """
+    Attach the structure and all its descendants to their new parent: the rows linking the subtree to its
+    previous ancestors are replaced by rows linking it to the ancestors of the parent.
+    """
+    subtree_depths = dict(StructureClosure.objects.filter(ancestor_id=structure_id)
+                          .values_list('descendant_id', 'depth'))
+    new_rows = []
+    if not subtree_depths:
+        subtree_depths = {structure_id: 0}
+        new_rows.append(StructureClosure(ancestor_id=structure_id, descendant_id=structure_id, depth=0))
+
+    ancestor_depths = dict(StructureClosure.objects.filter(descendant_id=parent_id)
+                           .values_list('ancestor_id', 'depth')) if parent_id else {}
+    StructureClosure.objects.filter(descendant_id__in=subtree_depths)\
+                            .exclude(ancestor_id__in=subtree_depths).delete()
+    new_rows.extend(
+        StructureClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=ancestor_depth + 1 + depth)
+        for ancestor_id, ancestor_depth in ancestor_depths.items() if ancestor_id not in subtree_depths
+        for descendant_id, depth in subtree_depths.items()
+    )
+    StructureClosure.objects.bulk_create(new_rows, batch_size=CLOSURE_ROWS_BY_BATCH)
@@ -85,6 +85,10 @@ def find_by_id(tutor_id):
         return None
 
 
+def find_global_ids_changed_since(a_datetime):
+    return Tutor.objects.filter(changed__gte=a_datetime).values_list('person__global_id', flat=True)
+
+
 # To refactor because it is not in the right place.
 def find_by_learning_unit(learning_unit_year):
     """
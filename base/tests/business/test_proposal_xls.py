@@ -89,20 +89,20 @@ class TestProposalXls(TestCase):
                 self.l_unit_yr_1.entities.get('ALLOCATION_ENTITY').acronym,
                 self.proposal_1.date.strftime('%d-%m-%Y')]
 
-    @mock.patch("osis_common.document.xls_build.generate_xls")
+    @mock.patch("base.utils.streaming_xls.generate_streaming_xls")
     def test_generate_xls_data_with_no_data(self, mock_generate_xls):
         proposal_xls.create_xls(self.user, [], None)
         expected_argument = _generate_xls_build_parameter([], self.user)
-        mock_generate_xls.assert_called_with(expected_argument, None)
+        self.assertEqual(_get_called_parameters(mock_generate_xls), (expected_argument, None))
 
-    @mock.patch("osis_common.document.xls_build.generate_xls")
+    @mock.patch("base.utils.streaming_xls.generate_streaming_xls")
     def test_generate_xls_data_with_a_learning_unit(self, mock_generate_xls):
         proposal_xls.create_xls(self.user, [self.proposal_1], None)
 
         xls_data = [self._get_xls_data()]
 
         expected_argument = _generate_xls_build_parameter(xls_data, self.user)
-        mock_generate_xls.assert_called_with(expected_argument, None)
+        self.assertEqual(_get_called_parameters(mock_generate_xls), (expected_argument, None))
 
 
 def _generate_xls_build_parameter(xls_data, user):
@@ -116,3 +116,10 @@ def _generate_xls_build_parameter(xls_data, user):
             xls_build.WORKSHEET_TITLE_KEY: _(WORKSHEET_TITLE),
         }]
     }
+
+
+def _get_called_parameters(mock_generate_xls):
+    parameters, filters = mock_generate_xls.call_args[0]
+    for worksheet_data in parameters[xls_build.WORKSHEETS_DATA]:
+        worksheet_data[xls_build.CONTENT_KEY] = list(worksheet_data[xls_build.CONTENT_KEY])
+    return parameters, filters
@@ -23,14 +23,13 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from django.db.models import QuerySet
 from django.test import TestCase
 from django.utils import timezone
-from unittest.mock import patch
 
 from attribution.tests.factories.attribution import AttributionNewFactory
 from attribution.tests.factories.attribution_charge_new import AttributionChargeNewFactory
 from base.business.learning_unit_year_with_context import is_service_course
-from base.forms.common import TooManyResultsException
 from base.tests.factories.academic_year import AcademicYearFactory
 from base.tests.factories.learning_unit_component import LearningUnitComponentFactory
 from base.tests.factories.learning_unit_year import LearningUnitYearFactory
@@ -41,7 +40,6 @@ from base.models.enums import entity_container_year_link_type, entity_type
 from reference.tests.factories.country import CountryFactory
 from base.tests.factories.tutor import TutorFactory
 from base.forms.learning_unit import search_form
-from base.forms.learning_unit.search_form import SearchForm
 
 
 class TestLearningUnitForm(TestCase):
@@ -187,22 +185,27 @@ class TestLearningUnitForm(TestCase):
             "acronym": "LDROI1001"
         }
 
-    @patch("base.models.learning_unit_year.count_search_results")
-    def test_case_maximum_results_reached(self, mock_count):
-        mock_count.return_value = SearchForm.MAX_RECORDS + 1
+    def test_get_activity_learning_units_is_lazy(self):
         form = search_form.LearningUnitYearForm(data=self.get_valid_data())
-        form.is_valid()
+        self.assertTrue(form.is_valid())
+        self.assertIsInstance(form.get_activity_learning_units(), QuerySet)
 
-        with self.assertRaises(TooManyResultsException):
-            form.get_activity_learning_units()
+    def test_get_activity_learning_units_annotated_with_entities(self):
+        form = search_form.LearningUnitYearForm({"acronym": self.list_learning_unit_year[0].acronym})
+        self.assertTrue(form.is_valid())
+        learning_unit = form.get_activity_learning_units().get()
+        self.assertEqual(learning_unit.requirement_entity_id, self.list_entity_version[0].entity_id)
+        self.assertEqual(learning_unit.requirement_entity_acronym, self.list_entity_version[0].acronym)
+        self.assertEqual(learning_unit.allocation_entity_id, self.list_entity_version[1].entity_id)
+        self.assertEqual(learning_unit.allocation_entity_acronym, self.list_entity_version[1].acronym)
 
     def test_get_service_courses_by_empty_requirement_and_allocation_entity(self):
         form_data = {}
 
         form = search_form.LearningUnitYearForm(form_data, service_course_search=True)
         self.assertTrue(form.is_valid())
-        self.assertEqual(form.get_activity_learning_units(), [self.list_learning_unit_year[0],
-                                                              self.list_learning_unit_year[1]])
+        self.assertEqual(list(form.get_activity_learning_units()), [self.list_learning_unit_year[0],
+                                                                    self.list_learning_unit_year[1]])
 
     def test_get_service_courses_by_allocation_acronym(self):
         form_data = {
@@ -211,7 +214,7 @@ class TestLearningUnitForm(TestCase):
 
         form = search_form.LearningUnitYearForm(form_data, service_course_search=True)
         self.assertTrue(form.is_valid())
-        self.assertEqual(form.get_activity_learning_units(), [self.list_learning_unit_year[0]])
+        self.assertEqual(list(form.get_activity_learning_units()), [self.list_learning_unit_year[0]])
 
     def test_get_service_courses_by_allocation_acronym_with_no_faculty_as_parent(self):
         form_data = {
@@ -221,7 +224,7 @@ class TestLearningUnitForm(TestCase):
 
         form = search_form.LearningUnitYearForm(form_data, service_course_search=True)
         self.assertTrue(form.is_valid())
-        self.assertEqual(form.get_activity_learning_units(), [])
+        self.assertEqual(list(form.get_activity_learning_units()), [])
 
     def test_get_service_courses_by_requirement_acronym(self):
         form_data = {
@@ -230,7 +233,7 @@ class TestLearningUnitForm(TestCase):
 
         form = search_form.LearningUnitYearForm(form_data, service_course_search=True)
         self.assertTrue(form.is_valid())
-        self.assertEqual(form.get_activity_learning_units(), [self.list_learning_unit_year[0]])
+        self.assertEqual(list(form.get_activity_learning_units()), [self.list_learning_unit_year[0]])
 
     def test_get_service_courses_by_requirement_and_allocation_acronym(self):
         form_data = {
@@ -250,7 +253,7 @@ class TestLearningUnitForm(TestCase):
 
         form = search_form.LearningUnitYearForm(form_data, service_course_search=True)
         self.assertTrue(form.is_valid())
-        self.assertEqual(form.get_activity_learning_units(), [])
+        self.assertEqual(list(form.get_activity_learning_units()), [])
 
     def test_search_learning_units_by_tutor(self):
         form_data = {
@@ -259,4 +262,4 @@ class TestLearningUnitForm(TestCase):
 
         form = search_form.LearningUnitYearForm(form_data)
         self.assertTrue(form.is_valid())
-        self.assertEqual(form.get_activity_learning_units(), [self.list_learning_unit_year[0]])
+        self.assertEqual(list(form.get_activity_learning_units()), [self.list_learning_unit_year[0]])
@@ -27,8 +27,10 @@
 from django.test import TestCase
 from base.models import entity_manager
 from base.tests.factories.entity_manager import EntityManagerFactory
+from base.tests.factories.entity_version import EntityVersionFactory
 from base.tests.factories.structure import StructureFactory
 from base.tests.factories.person import PersonFactory
+from base.tests.utils.shared_cache import override_shared_cache
 from django.contrib.auth.models import User, Permission
 
 
@@ -49,6 +51,26 @@ class EntityManagerTest(TestCase):
         EntityManagerFactory(person=a_person)
         self.assertTrue(entity_manager.is_entity_manager(self.user))
 
+    def test_get_managed_entity_ids_with_descendants(self):
+        a_person = PersonFactory(user=self.user)
+        faculty_version = EntityVersionFactory(parent=None)
+        school_version = EntityVersionFactory(parent=faculty_version.entity)
+        EntityVersionFactory()
+        EntityManagerFactory(person=a_person, entity=faculty_version.entity)
+        self.assertSetEqual(set(entity_manager.get_managed_entity_ids(self.user)),
+                            {faculty_version.entity.id, school_version.entity.id})
+
+    @override_shared_cache()
+    def test_get_managed_entity_ids_invalidated_when_entity_manager_changes(self):
+        a_person = PersonFactory(user=self.user)
+        self.assertFalse(entity_manager.get_managed_entity_ids(self.user))
+
+        an_entity_manager = EntityManagerFactory(person=a_person, entity=EntityVersionFactory(parent=None).entity)
+        self.assertSetEqual(set(entity_manager.get_managed_entity_ids(self.user)), {an_entity_manager.entity.id})
+
+        an_entity_manager.delete()
+        self.assertFalse(entity_manager.get_managed_entity_ids(self.user))
+
 
 def add_permission(user, codename):
     perm = get_permission(codename)
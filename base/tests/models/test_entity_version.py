@@ -41,6 +41,7 @@ from base.tests.factories.learning_unit_year import LearningUnitYearFactory
 from base.tests.factories.organization import OrganizationFactory
 from base.tests.factories.person import PersonFactory
 from base.tests.factories.person_entity import PersonEntityFactory
+from base.tests.utils.shared_cache import override_shared_cache
 from osis_common.utils.datetime import get_tzinfo
 from reference.tests.factories.country import CountryFactory
 
@@ -347,6 +348,7 @@ class EntityVersionTest(TestCase):
         self.assertEqual(entity_list[0], entity_version_attached)
 
 
+@override_shared_cache()
 class EntityVersionLoadInMemoryTest(TestCase):
     def setUp(self):
         self.country = CountryFactory()
@@ -495,6 +497,45 @@ class EntityVersionLoadInMemoryTest(TestCase):
         self.assertEqual(len(result.keys()), len(all_current_entities_version))
         self.assertEqual(result[self.MATH.entity.id]['all_children'], [])
 
+    def test_organogram_index_get_parent_version(self):
+        organogram_index = entity_version.get_organogram_index()
+        self.assertEqual(organogram_index.get_parent_version(self.MATH.entity_id), self.SC)
+        self.assertIsNone(organogram_index.get_parent_version(self.root.entity_id))
+
+    def test_organogram_index_get_direct_children(self):
+        organogram_index = entity_version.get_organogram_index()
+        self.assertCountEqual(organogram_index.get_direct_children(self.root.entity_id), [self.SC, self.LOCI])
+        self.assertEqual(organogram_index.get_direct_children(self.MATH.entity_id), [])
+
+    def test_organogram_index_get_descendants(self):
+        organogram_index = entity_version.get_organogram_index()
+        self.assertCountEqual(organogram_index.get_descendants(self.LOCI.entity_id), [self.URBA, self.BARC])
+        self.assertCountEqual(self.root.find_descendants(),
+                              [self.SC, self.LOCI, self.MATH, self.PHYS, self.URBA, self.BARC])
+
+    def test_organogram_index_get_faculty_version(self):
+        organogram_index = entity_version.get_organogram_index()
+        self.assertEqual(organogram_index.get_faculty_version(self.URBA.entity_id), self.LOCI)
+        self.assertIsNone(organogram_index.get_faculty_version(self.root.entity_id))
+
+    def test_organogram_index_is_reused_for_same_date(self):
+        entity_version.get_organogram_index()
+        with self.assertNumQueries(0):
+            self.MATH.get_parent_version()
+            self.root.find_descendants()
+
+    def test_organogram_index_is_invalidated_when_entity_version_changes(self):
+        self.assertCountEqual(self.SC.find_descendants(), [self.MATH, self.PHYS])
+        new_school = EntityVersionFactory(
+            entity=EntityFactory(country=self.country, organization=self.organization),
+            acronym="CHIM",
+            entity_type=entity_version.entity_type.SCHOOL,
+            parent=self.SC.entity,
+            start_date=self.MATH.start_date,
+            end_date=None
+        )
+        self.assertCountEqual(self.SC.find_descendants(), [self.MATH, self.PHYS, new_school])
+
 
 class TestFindLastEntityVersionByLearningUnitYearId(TestCase):
     def test_when_entity_version(self):
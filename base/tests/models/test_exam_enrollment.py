@@ -24,8 +24,11 @@
 #
 ##############################################################################
 import datetime
+from decimal import Decimal
+
 from base.models import exam_enrollment, exceptions
 from base.tests.factories.learning_unit_year import LearningUnitYearFactory
+from base.tests.factories.person import PersonFactory
 from base.tests.models import test_student, test_offer_enrollment, test_learning_unit_enrollment, \
                               test_session_exam, test_academic_year, test_offer_year, test_learning_unit_year
 from base.tests.factories.session_exam_deadline import SessionExamDeadlineFactory
@@ -137,3 +140,33 @@ class ExamEnrollmentTest(TestCase):
         self.assertCountEqual(exam_enrollment.find_by_student(None), [])
         self.exam_enrollment.save()
         self.assertCountEqual(exam_enrollment.find_by_student(self.student), [self.exam_enrollment])
+
+    def test_bulk_update_scores_and_justifications(self):
+        self.exam_enrollment.save()
+        other_exam_enrollment = create_exam_enrollment_with_student(2, '87654321', self.offer_year,
+                                                                    self.learn_unit_year)
+        self.exam_enrollment.score_draft = 15
+        other_exam_enrollment.justification_draft = 'ABSENCE_UNJUSTIFIED'
+
+        exam_enrollment.bulk_update_scores_and_justifications([self.exam_enrollment, other_exam_enrollment])
+
+        self.exam_enrollment.refresh_from_db()
+        other_exam_enrollment.refresh_from_db()
+        self.assertEqual(self.exam_enrollment.score_draft, 15)
+        self.assertEqual(other_exam_enrollment.justification_draft, 'ABSENCE_UNJUSTIFIED')
+        self.assertIsNone(other_exam_enrollment.score_draft)
+
+    def test_bulk_update_scores_and_justifications_with_invalid_justification(self):
+        self.exam_enrollment.save()
+        self.exam_enrollment.justification_final = 'invalid_justification'
+        with self.assertRaises(exceptions.JustificationValueException):
+            exam_enrollment.bulk_update_scores_and_justifications([self.exam_enrollment])
+
+    def test_bulk_create_exam_enrollment_historic(self):
+        self.exam_enrollment.save()
+        a_person = PersonFactory()
+        exam_enrollment.bulk_create_exam_enrollment_historic(a_person.user, [self.exam_enrollment])
+
+        history = exam_enrollment.ExamEnrollmentHistory.objects.get(exam_enrollment=self.exam_enrollment)
+        self.assertEqual(history.person, a_person)
+        self.assertEqual(history.score_final, Decimal('12.60'))
@@ -54,8 +54,8 @@ class GroupElementYearTest(TestCase):
         self.assertCountEqual(group_element_year.find_by_parent(education_group_year_parent), [group_element_year_1, group_element_year_2])
 
 
-class TestFindBuildParentListByEducationGroupYearId(TestCase):
-    """Unit tests for _build_parent_list_by_education_group_year_id() function"""
+class TestBuildParentListByChildKey(TestCase):
+    """Unit tests for _build_parent_list_by_child_key() function"""
     def setUp(self):
         current_academic_year = create_current_academic_year()
         root_group_type = EducationGroupTypeFactory(name='Bachelor', category=education_group_categories.TRAINING)
@@ -73,7 +73,7 @@ class TestFindBuildParentListByEducationGroupYearId(TestCase):
         filters = {
             'parent__education_group_type__category': [education_group_categories.TRAINING]
         }
-        result = group_element_year._build_parent_list_by_education_group_year_id(self.child_leaf.academic_year, filters=filters)
+        result = group_element_year._build_parent_list_by_child_key([self.child_leaf], filters=filters)
 
         expected_result = {
             'child_branch_{}'.format(self.child_branch.id): [{
@@ -93,7 +93,7 @@ class TestFindBuildParentListByEducationGroupYearId(TestCase):
         self.assertDictEqual(result, expected_result)
 
     def test_without_filters(self):
-        result = group_element_year._build_parent_list_by_education_group_year_id(self.child_leaf.academic_year)
+        result = group_element_year._build_parent_list_by_child_key([self.child_leaf])
         expected_result = {
             'child_branch_{}'.format(self.child_branch.id): [{
                 'parent': self.root.id,
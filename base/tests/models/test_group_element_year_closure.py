@@ -0,0 +1,89 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.test import TestCase
+
+from base.models import group_element_year_closure
+from base.models.group_element_year_closure import GroupElementYearClosure
+from base.tests.factories.academic_year import create_current_academic_year
+from base.tests.factories.education_group_year import EducationGroupYearFactory
+from base.tests.factories.group_element_year import GroupElementYearFactory
+from base.tests.factories.learning_unit_year import LearningUnitYearFactory
+
+
+class TestGroupElementYearClosure(TestCase):
+    def setUp(self):
+        self.academic_year = create_current_academic_year()
+        self.root = EducationGroupYearFactory(academic_year=self.academic_year)
+        self.branch = EducationGroupYearFactory(academic_year=self.academic_year)
+        self.learning_unit_year = LearningUnitYearFactory(academic_year=self.academic_year)
+        GroupElementYearFactory(parent=self.root, child_branch=self.branch)
+        self.leaf_element = GroupElementYearFactory(parent=self.branch, child_branch=None,
+                                                    child_leaf=self.learning_unit_year)
+
+    def test_closure_built_on_save(self):
+        rows = GroupElementYearClosure.objects.filter(child_leaf=self.learning_unit_year)
+        self.assertCountEqual(
+            rows.values_list('ancestor_id', 'depth', 'academic_year_id'),
+            [(self.root.id, 2, self.academic_year.id), (self.branch.id, 1, self.academic_year.id)]
+        )
+        self.assertEqual(group_element_year_closure.find_ancestor_ids(child_branch_ids=[self.branch.id]),
+                         {self.root.id})
+
+    def test_find_learning_unit_year_ids(self):
+        self.assertEqual(group_element_year_closure.find_learning_unit_year_ids(self.root),
+                         {self.learning_unit_year.id})
+
+    def test_find_education_group_year_ids(self):
+        self.assertEqual(group_element_year_closure.find_education_group_year_ids(self.learning_unit_year),
+                         {self.root.id, self.branch.id})
+
+    def test_shortest_depth_kept(self):
+        GroupElementYearFactory(parent=self.root, child_branch=None, child_leaf=self.learning_unit_year)
+        self.assertEqual(
+            GroupElementYearClosure.objects.get(ancestor=self.root, child_leaf=self.learning_unit_year).depth, 1
+        )
+
+    def test_closure_refreshed_when_element_moved(self):
+        other_parent = EducationGroupYearFactory(academic_year=self.academic_year)
+        self.leaf_element.parent = other_parent
+        self.leaf_element.save()
+        self.assertEqual(group_element_year_closure.find_education_group_year_ids(self.learning_unit_year),
+                         {other_parent.id})
+
+    def test_closure_refreshed_when_element_deleted(self):
+        self.leaf_element.delete()
+        self.assertEqual(group_element_year_closure.find_learning_unit_year_ids(self.root), set())
+        self.assertEqual(group_element_year_closure.find_ancestor_ids(child_branch_ids=[self.branch.id]),
+                         {self.root.id})
+
+    def test_compute_depths_stops_on_cycle(self):
+        children = {1: [(1, 2, None)], 2: [(2, 1, None)]}
+
+        def find_children(parent_ids):
+            return [child for parent_id in parent_ids for child in children.get(parent_id, [])]
+
+        self.assertEqual(group_element_year_closure.compute_depths([1], find_children),
+                         {(1, 2, None): 1, (1, 1, None): 2})
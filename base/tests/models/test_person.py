@@ -38,6 +38,7 @@ from base.models.person import CENTRAL_MANAGER_GROUP, FACULTY_MANAGER_GROUP, get
     change_language
 from base.tests.factories.person import PersonFactory, generate_person_email, PersonWithoutUserFactory
 from base.tests.factories import user
+from base.tests.utils.shared_cache import override_shared_cache
 
 
 def create_person(first_name, last_name, email=None):
@@ -149,6 +150,7 @@ class PersonTest(PersonTestCase):
         a_person.birth_date = datetime.datetime.now() - datetime.timedelta(days=((30*365)-5))
         self.assertEqual(person.calculate_age(a_person), 29)
 
+    @override_shared_cache()
     def test_is_central_manager(self):
         a_person = PersonFactory()
         self.assertFalse(a_person.is_central_manager())
@@ -156,6 +158,7 @@ class PersonTest(PersonTestCase):
         a_person.user.groups.add(Group.objects.get(name=CENTRAL_MANAGER_GROUP))
         self.assertTrue(a_person.is_central_manager())
 
+    @override_shared_cache()
     def test_is_faculty_manager(self):
         a_person = PersonFactory()
         self.assertFalse(a_person.is_faculty_manager())
@@ -163,6 +166,16 @@ class PersonTest(PersonTestCase):
         a_person.user.groups.add(Group.objects.get(name=FACULTY_MANAGER_GROUP))
         self.assertTrue(a_person.is_faculty_manager())
 
+    @override_shared_cache()
+    def test_is_faculty_manager_after_group_removed(self):
+        a_person = PersonFactory()
+        faculty_managers = Group.objects.get(name=FACULTY_MANAGER_GROUP)
+        a_person.user.groups.add(faculty_managers)
+        self.assertTrue(a_person.is_faculty_manager())
+
+        faculty_managers.user_set.remove(a_person.user)
+        self.assertFalse(a_person.is_faculty_manager())
+
     def test_show_username_from_person_with_user(self):
         self.assertEqual(self.person_with_user.username(), "user_with_person")
 
@@ -30,6 +30,7 @@ from django.db import IntegrityError
 from django.test import TestCase
 
 from base.models import person_entity
+from base.models.entity import Entity
 from base.models.person_entity import PersonEntity
 from base.models.utils import person_entity_filter
 from base.tests.factories.entity import EntityFactory
@@ -37,6 +38,7 @@ from base.tests.factories.entity_version import EntityVersionFactory
 from base.tests.factories.organization import OrganizationFactory
 from base.tests.factories.person import PersonFactory
 from base.tests.factories.person_entity import PersonEntityFactory
+from base.tests.utils.shared_cache import override_shared_cache
 
 
 class PersonEntityTest(TestCase):
@@ -98,6 +100,38 @@ class PersonEntityTest(TestCase):
         list_filtered = list(person_entity_filter.filter_by_attached_entities(person_2, queryset))
         self.assertEqual(len(list_filtered), 1)
 
+    def test_get_attached_entity_ids_with_child(self):
+        person = PersonFactory()
+        PersonEntityFactory(person=person, entity=self.sst_entity, with_child=True)
+        PersonEntityFactory(person=person, entity=self.ssh_entity, with_child=False)
+        self.assertSetEqual(set(person_entity.get_attached_entity_ids(person)),
+                            {self.sst_entity.id, self.agro_entity.id, self.chim_entity.id, self.ssh_entity.id})
+
+    @override_shared_cache()
+    def test_get_attached_entity_ids_invalidated_when_person_entity_changes(self):
+        person = PersonFactory()
+        self.assertFalse(person_entity.get_attached_entity_ids(person))
+
+        PersonEntityFactory(person=person, entity=self.sss_entity, with_child=True)
+        self.assertSetEqual(set(person_entity.get_attached_entity_ids(person)),
+                            {self.sss_entity.id, self.fasb_entity.id})
+
+    @override_shared_cache()
+    def test_get_attached_entity_ids_invalidated_when_entity_version_changes(self):
+        person = PersonFactory()
+        PersonEntityFactory(person=person, entity=self.ssh_entity, with_child=True)
+        self.assertSetEqual(set(person_entity.get_attached_entity_ids(person)),
+                            {self.ssh_entity.id, self.fial_entity.id})
+
+        new_entity = _create_entity_and_version_related_to(self.organization, "LSM", self.fial_entity)
+        self.assertIn(new_entity.id, person_entity.get_attached_entity_ids(person))
+
+    def test_is_attached_entities(self):
+        person = PersonFactory()
+        PersonEntityFactory(person=person, entity=self.sst_entity, with_child=True)
+        self.assertTrue(person_entity.is_attached_entities(person, Entity.objects.filter(pk=self.agro_entity.pk)))
+        self.assertFalse(person_entity.is_attached_entities(person, Entity.objects.filter(pk=self.root_entity.pk)))
+
     def test_filter_by_attached_entities_not_defined_model(self):
         person_2 = PersonFactory()
         queryset = User.objects.all()
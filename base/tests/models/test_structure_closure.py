@@ -0,0 +1,65 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.test import TestCase
+
+from base.models import structure, structure_closure
+from base.models.structure_closure import StructureClosure
+from base.tests.factories.structure import StructureFactory
+
+
+class TestStructureClosure(TestCase):
+    def setUp(self):
+        self.root = StructureFactory(acronym='SST')
+        self.faculty = StructureFactory(acronym='EPL', part_of=self.root)
+        self.school = StructureFactory(acronym='ELEC', part_of=self.faculty)
+        self.other_root = StructureFactory(acronym='SSH')
+
+    def test_closure_built_on_save(self):
+        self.assertCountEqual(
+            StructureClosure.objects.filter(descendant=self.school).values_list('ancestor_id', 'depth'),
+            [(self.school.id, 0), (self.faculty.id, 1), (self.root.id, 2)]
+        )
+
+    def test_find_descendants(self):
+        self.assertEqual(list(structure.find_descendants([self.faculty])), [self.school, self.faculty])
+        self.assertEqual(list(structure.find_descendants([self.root, self.other_root])),
+                         [self.school, self.faculty, self.other_root, self.root])
+
+    def test_closure_refreshed_when_subtree_moves(self):
+        self.faculty.part_of = self.other_root
+        self.faculty.save()
+        self.assertCountEqual(structure.find_descendants([self.root]), [self.root])
+        self.assertCountEqual(structure.find_descendants([self.other_root]),
+                              [self.other_root, self.faculty, self.school])
+        self.assertEqual(StructureClosure.objects.get(ancestor=self.other_root, descendant=self.school).depth, 2)
+
+    def test_closure_removed_with_structure(self):
+        self.school.delete()
+        self.assertFalse(StructureClosure.objects.filter(descendant_id=self.school.id).exists())
+
+    def test_compute_depths(self):
+        self.assertEqual(structure_closure.compute_depths({1: None, 2: 1, 3: 2}),
+                         {(1, 1): 0, (2, 2): 0, (1, 2): 1, (3, 3): 0, (2, 3): 1, (1, 3): 2})
@@ -0,0 +1,138 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import collections
+import json
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from base.models.education_group_year import EducationGroupYear
+from base.tests.factories.academic_year import AcademicYearFactory
+from base.tests.factories.education_group_year import EducationGroupYearFactory
+from cms.models.text_label import TextLabel
+from cms.models.translated_text import TranslatedText
+from cms.models.translated_text_label import TranslatedTextLabel
+from scripts import load_offers
+
+Context = collections.namedtuple('Context', 'entity language')
+
+
+class ResolveOffersTest(TestCase):
+    def setUp(self):
+        self.academic_year = AcademicYearFactory(year=2017)
+        self.education_group_year = EducationGroupYearFactory(academic_year=self.academic_year,
+                                                              acronym='DROI1BA', partial_acronym='LDROI100B')
+
+    def test_offer_found_by_acronym(self):
+        offer = {'year': 2017, 'type': 'offer', 'acronym': 'droi1ba', 'info': {}}
+        self.assertEqual(load_offers.resolve_offers([offer]), [(self.education_group_year.id, offer)])
+
+    def test_group_found_by_partial_acronym(self):
+        group = {'year': 2017, 'type': 'group', 'acronym': 'ldroi100b', 'info': {}}
+        self.assertEqual(load_offers.resolve_offers([group]), [(self.education_group_year.id, group)])
+
+    def test_offers_not_importable_ignored(self):
+        offers = [
+            {'year': 2017, 'type': 'offer', 'acronym': 'UNKNOWN', 'info': {}},
+            {'year': 2016, 'type': 'offer', 'acronym': 'DROI1BA', 'info': {}},
+            {'year': 2017, 'type': 'offer', 'acronym': 'DROI1BA'},
+            {'year': 2017, 'type': 'unknown', 'acronym': 'DROI1BA', 'info': {}},
+        ]
+        self.assertEqual(load_offers.resolve_offers(offers), [])
+
+    def test_common_created_once_when_not_found(self):
+        commons = [{'year': 2017, 'type': 'common', 'acronym': 'common-2m', 'info': {}} for _ in range(2)]
+
+        resolved_offers = load_offers.resolve_offers(commons)
+
+        created_education_group_year = EducationGroupYear.objects.get(acronym='common-2m')
+        self.assertEqual(resolved_offers, [(created_education_group_year.id, common) for common in commons])
+
+
+class DiffTranslatedTextsTest(SimpleTestCase):
+    def setUp(self):
+        self.context = Context(entity='offer_year', language='fr-be')
+
+    def test_diff_translated_texts(self):
+        existing = {
+            (1, 10): TranslatedText(id=100, reference=1, text_label_id=10, text='Old text'),
+            (2, 10): TranslatedText(id=200, reference=2, text_label_id=10, text='Unchanged text'),
+        }
+        wanted = collections.OrderedDict([
+            ((1, 10), 'New text'),
+            ((2, 10), 'Unchanged text'),
+            ((3, 10), 'Created text'),
+        ])
+
+        to_create, to_update = load_offers.diff_translated_texts(self.context, wanted, existing)
+
+        self.assertEqual(to_update, [(100, 'New text')])
+        self.assertEqual(len(to_create), 1)
+        self.assertEqual((to_create[0].entity, to_create[0].language, to_create[0].reference,
+                          to_create[0].text_label_id, to_create[0].text),
+                         ('offer_year', 'fr-be', 3, 10, 'Created text'))
+
+    def test_nothing_wanted(self):
+        existing = {(1, 10): TranslatedText(id=100, reference=1, text_label_id=10, text='Old text')}
+        self.assertEqual(load_offers.diff_translated_texts(self.context, {}, existing), ([], []))
+
+
+@mock.patch('builtins.print')
+class RunTest(TestCase):
+    def setUp(self):
+        academic_year = AcademicYearFactory(year=2017)
+        self.education_group_year = EducationGroupYearFactory(academic_year=academic_year, acronym='DROI1BA')
+        offers = [
+            {'year': 2017, 'type': 'offer', 'acronym': 'DROI1BA', 'info': {'pedagogie': ' Pedagogy '}},
+            {'year': 2017, 'type': 'common', 'acronym': 'common-2m', 'info': {'structure': 'Structure'}},
+        ]
+        self.offers_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json')
+        json.dump(offers, self.offers_file)
+        self.offers_file.flush()
+
+    def tearDown(self):
+        self.offers_file.close()
+
+    def test_run(self, mock_print):
+        load_offers.run(self.offers_file.name, 'fr-be')
+
+        translated_text = TranslatedText.objects.get(reference=self.education_group_year.id)
+        self.assertEqual((translated_text.entity, translated_text.language, translated_text.text),
+                         ('offer_year', 'fr-be', 'Pedagogy'))
+        self.assertTrue(EducationGroupYear.objects.filter(acronym='common-2m').exists())
+
+    def test_dry_run_leaves_database_unchanged(self, mock_print):
+        counts_before = self._count_records()
+
+        load_offers.run(self.offers_file.name, 'fr-be', 'dry-run')
+
+        self.assertEqual(self._count_records(), counts_before)
+
+    @staticmethod
+    def _count_records():
+        return [model.objects.count() for model in (EducationGroupYear, TextLabel, TranslatedTextLabel,
+                                                    TranslatedText)]
@@ -0,0 +1,104 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+PHOTO_CONTENT = b'an image'
+PHOTO_ETAG = '"photo-v1"'
+PHOTO_LAST_MODIFIED = 'Mon, 01 Jan 2018 00:00:00 GMT'
+
+
+class EsbStub:
+    """
+    Local HTTP server replacing the ESB in tests. It serves the photo metadata of the students in `photos`
+    (registration id -> photo content) and honours the conditional requests on the photos.
+    """
+
+    def __init__(self, photos=None):
+        self.photos = photos or {}
+        self.metadata_status = 200
+        self.requests = []
+        self.server = HTTPServer(('127.0.0.1', 0), self._get_handler_class())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self.server.server_port)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get_handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                stub.requests.append(self.path)
+                parts = self.path.strip('/').split('/')
+                if len(parts) == 2 and parts[1] == 'photo':
+                    self._send_metadata(parts[0])
+                elif len(parts) == 2 and parts[0] == 'photos' and parts[1] in stub.photos:
+                    self._send_photo(stub.photos[parts[1]])
+                else:
+                    self._send(404)
+
+            def _send_metadata(self, registration_id):
+                if stub.metadata_status != 200:
+                    self._send(stub.metadata_status)
+                    return
+                photo_url = None
+                if registration_id in stub.photos:
+                    photo_url = '{}/photos/{}'.format(stub.url, registration_id)
+                self._send(200, json.dumps({'photo_url': photo_url}).encode(), 'application/json')
+
+            def _send_photo(self, content):
+                if self.headers.get('If-None-Match') == PHOTO_ETAG:
+                    self._send(304)
+                else:
+                    self._send(200, content, 'image/jpeg', {'ETag': PHOTO_ETAG,
+                                                            'Last-Modified': PHOTO_LAST_MODIFIED})
+
+            def _send(self, status, body=b'', content_type=None, headers=None):
+                self.send_response(status)
+                if content_type:
+                    self.send_header('Content-Type', content_type)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,68 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from base.tests.utils.shared_cache import override_shared_cache, override_local_cache
+from base.utils.cache import GenerationalCache
+
+
+class GenerationalCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.compute = mock.Mock(return_value='value')
+
+    @override_shared_cache()
+    def test_value_kept_until_invalidation(self):
+        generational_cache = GenerationalCache('test_value_kept_until_invalidation')
+        for _ in range(2):
+            self.assertEqual(generational_cache.get_or_compute('key', self.compute), 'value')
+        self.assertEqual(self.compute.call_count, 1)
+
+        GenerationalCache('test_value_kept_until_invalidation').invalidate()
+        generational_cache.get_or_compute('key', self.compute)
+        self.assertEqual(self.compute.call_count, 2)
+
+    @override_shared_cache()
+    @mock.patch('time.monotonic')
+    def test_value_recomputed_after_max_age(self, mock_monotonic):
+        generational_cache = GenerationalCache('test_value_recomputed_after_max_age', max_age=60)
+        mock_monotonic.return_value = 1000
+        generational_cache.get_or_compute('key', self.compute)
+        mock_monotonic.return_value = 1060
+        generational_cache.get_or_compute('key', self.compute)
+        self.assertEqual(self.compute.call_count, 1)
+
+        mock_monotonic.return_value = 1061
+        generational_cache.get_or_compute('key', self.compute)
+        self.assertEqual(self.compute.call_count, 2)
+
+    @override_local_cache()
+    def test_value_not_cached_without_shared_cache(self):
+        generational_cache = GenerationalCache('test_value_not_cached_without_shared_cache')
+        for _ in range(2):
+            generational_cache.get_or_compute('key', self.compute)
+        self.assertEqual(self.compute.call_count, 2)
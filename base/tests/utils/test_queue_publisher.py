@@ -0,0 +1,65 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from unittest import mock
+
+import pika.exceptions
+from django.test import SimpleTestCase
+
+from base.utils import queue_publisher
+
+
+@mock.patch('base.utils.queue_publisher.get_connection_parameters')
+@mock.patch('pika.BlockingConnection')
+class QueuePublisherTest(SimpleTestCase):
+    def setUp(self):
+        self.publisher = queue_publisher.QueuePublisher(pool_size=1)
+
+    def test_connection_reused_between_publications(self, mock_blocking_connection, mock_parameters):
+        self.publisher.publish('queue', {'key': 'value'})
+        self.publisher.publish_many('queue', [{'key': 'value'}, {'key': 'other value'}])
+
+        self.assertEqual(mock_blocking_connection.call_count, 1)
+        channel = mock_blocking_connection.return_value.channel.return_value
+        self.assertEqual(channel.basic_publish.call_count, 3)
+        channel.confirm_delivery.assert_called_once_with()
+        channel.queue_declare.assert_called_once_with(queue='queue', durable=True)
+
+    def test_reconnect_when_connection_lost(self, mock_blocking_connection, mock_parameters):
+        channel = mock_blocking_connection.return_value.channel.return_value
+        channel.basic_publish.side_effect = [pika.exceptions.ConnectionClosed(), True]
+
+        self.publisher.publish('queue', {'key': 'value'})
+
+        self.assertEqual(mock_blocking_connection.call_count, 2)
+        self.assertEqual(channel.basic_publish.call_count, 2)
+
+    def test_message_not_confirmed(self, mock_blocking_connection, mock_parameters):
+        channel = mock_blocking_connection.return_value.channel.return_value
+        channel.basic_publish.return_value = False
+
+        with self.assertRaises(pika.exceptions.AMQPError):
+            self.publisher.publish('queue', {'key': 'value'})
+        mock_blocking_connection.return_value.close.assert_called_once_with()
@@ -0,0 +1,109 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import io
+from collections import OrderedDict
+
+from django.test import SimpleTestCase, TestCase
+from openpyxl import load_workbook
+
+from base.models.academic_year import AcademicYear
+from base.tests.factories.academic_year import AcademicYearFactory
+from base.utils import streaming_xls
+from osis_common.document import xls_build
+
+
+class TestGenerateStreamingXls(SimpleTestCase):
+    def setUp(self):
+        self.rows_consumed = []
+
+    def _rows(self):
+        for index in range(3):
+            self.rows_consumed.append(index)
+            yield ['LBIR100{}'.format(index), index]
+
+    def _get_parameters(self):
+        return {
+            xls_build.LIST_DESCRIPTION_KEY: 'Learning units',
+            xls_build.FILENAME_KEY: 'learning units',
+            xls_build.USER_KEY: 'dupont',
+            xls_build.WORKSHEETS_DATA: [{
+                xls_build.CONTENT_KEY: self._rows(),
+                xls_build.HEADER_TITLES_KEY: ['code', 'credits'],
+                xls_build.WORKSHEET_TITLE_KEY: 'learning_units',
+            }]
+        }
+
+    def test_rows_consumed_while_writing(self):
+        streaming_xls.generate_streaming_xls(self._get_parameters())
+        self.assertEqual(self.rows_consumed, [0, 1, 2])
+
+    def test_streamed_workbook(self):
+        response = streaming_xls.generate_streaming_xls(self._get_parameters(),
+                                                        OrderedDict([('acronym', 'LBIR')]))
+
+        self.assertEqual(response['Content-Type'], streaming_xls.CONTENT_TYPE_XLS)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="learning_units.xlsx"')
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = [[cell.value for cell in row] for row in workbook['learning_units'].rows]
+        self.assertEqual(rows, [['code', 'credits'], ['LBIR1000', 0], ['LBIR1001', 1], ['LBIR1002', 2]])
+        filters_rows = [[cell.value for cell in row] for row in workbook.worksheets[1].rows]
+        self.assertEqual(filters_rows, [['acronym', 'LBIR']])
+
+
+class TestToCellValue(SimpleTestCase):
+    def test_illegal_characters_removed(self):
+        self.assertEqual(streaming_xls._to_cell_value('Copied\x0b text\x1f'), 'Copied text')
+
+    def test_other_values_kept(self):
+        self.assertEqual(streaming_xls._to_cell_value(5), 5)
+        self.assertIsNone(streaming_xls._to_cell_value(None))
+
+
+class TestIterate(SimpleTestCase):
+    def test_iterate_by_batch(self):
+        self.assertEqual(list(streaming_xls.iterate(range(5), batch_size=2)), [[0, 1], [2, 3], [4]])
+
+    def test_iterate_without_batch(self):
+        self.assertEqual(list(streaming_xls.iterate([1, 2])), [1, 2])
+
+
+class TestIterateQueryset(TestCase):
+    def setUp(self):
+        AcademicYearFactory(year=2016)
+        AcademicYearFactory(year=2017)
+
+    def test_queryset_not_evaluated(self):
+        self.assertEqual(len(list(streaming_xls.iterate(AcademicYear.objects.all()))), 2)
+
+    def test_queryset_already_evaluated_not_fetched_again(self):
+        academic_years = AcademicYear.objects.all()
+        for academic_year in academic_years:
+            academic_year.computed_value = academic_year.year
+
+        with self.assertNumQueries(0):
+            iterated_academic_years = list(streaming_xls.iterate(academic_years))
+        self.assertEqual([academic_year.computed_value for academic_year in iterated_academic_years],
+                         [academic_year.year for academic_year in academic_years])
@@ -0,0 +1,145 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from base.tests.utils.esb_stub import EsbStub, PHOTO_CONTENT, PHOTO_ETAG, PHOTO_LAST_MODIFIED
+from base.utils import student_photo
+
+
+class StudentPhotoTest(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.esb = EsbStub(photos={'12345678': PHOTO_CONTENT})
+        self.esb.__enter__()
+        self.addCleanup(self.esb.__exit__)
+        settings_override = override_settings(ESB_STUDENT_API=self.esb.url, STUDENT_PHOTO_CACHE_DIR=self.cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        student_photo.clear_memory_cache()
+        self.addCleanup(student_photo.clear_memory_cache)
+
+    def test_get_photo(self):
+        photo = student_photo.get_photo('12345678')
+
+        self.assertEqual(photo.content, PHOTO_CONTENT)
+        self.assertEqual(photo.content_type, 'image/jpeg')
+        self.assertEqual(photo.etag, PHOTO_ETAG)
+        self.assertEqual(photo.last_modified, PHOTO_LAST_MODIFIED)
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, '12345678')))
+
+    def test_get_photo_without_photo(self):
+        self.assertIsNone(student_photo.get_photo('87654321'))
+
+    def test_fresh_photo_served_from_cache(self):
+        student_photo.get_photo('12345678')
+        self.esb.requests.clear()
+
+        photo = student_photo.get_photo('12345678')
+
+        self.assertEqual(photo.content, PHOTO_CONTENT)
+        self.assertEqual(self.esb.requests, [])
+
+    def test_photo_served_from_disk_cache(self):
+        student_photo.get_photo('12345678')
+        student_photo.clear_memory_cache()
+        self.esb.requests.clear()
+
+        photo = student_photo.get_photo('12345678')
+
+        self.assertEqual(photo.content, PHOTO_CONTENT)
+        self.assertEqual(self.esb.requests, [])
+
+    def test_stale_photo_revalidated(self):
+        first_photo = student_photo.get_photo('12345678')
+        self.esb.requests.clear()
+
+        with mock.patch('time.time', return_value=time.time() + 86401):
+            photo = student_photo.get_photo('12345678')
+
+        self.assertEqual(photo.content, PHOTO_CONTENT)
+        self.assertGreater(photo.checked_at, first_photo.checked_at)
+        self.assertEqual(self.esb.requests, ['/12345678/photo', '/photos/12345678'])
+
+    def test_stale_photo_served_when_esb_unreachable(self):
+        student_photo.get_photo('12345678')
+
+        with override_settings(ESB_STUDENT_API='http://127.0.0.1:1'), \
+                mock.patch('time.time', return_value=time.time() + 86401):
+            photo = student_photo.get_photo('12345678')
+
+        self.assertEqual(photo.content, PHOTO_CONTENT)
+
+    def test_stale_photo_served_when_esb_metadata_unavailable(self):
+        student_photo.get_photo('12345678')
+        self.esb.metadata_status = 503
+
+        with mock.patch('time.time', return_value=time.time() + 86401):
+            photo = student_photo.get_photo('12345678')
+
+        self.assertEqual(photo.content, PHOTO_CONTENT)
+
+    def test_no_photo_when_esb_metadata_not_found(self):
+        student_photo.get_photo('12345678')
+        self.esb.metadata_status = 404
+
+        with mock.patch('time.time', return_value=time.time() + 86401):
+            photo = student_photo.get_photo('12345678')
+
+        self.assertIsNone(photo)
+
+    def test_prune_disk_cache(self):
+        self.esb.photos.update({'11111111': PHOTO_CONTENT, '22222222': PHOTO_CONTENT})
+        for registration_id in ['11111111', '12345678', '22222222']:
+            student_photo.get_photo(registration_id)
+        os.utime(os.path.join(self.cache_dir, '11111111'), (0, 0))
+
+        with override_settings(STUDENT_PHOTO_CACHE_MAX_FILES=2):
+            student_photo.prune_disk_cache()
+
+        self.assertCountEqual(os.listdir(self.cache_dir),
+                              ['12345678', '12345678.json', '22222222', '22222222.json'])
+
+    def test_disk_cache_pruned_after_writes(self):
+        with mock.patch('base.utils.student_photo.DISK_CACHE_PRUNE_INTERVAL', 1), \
+                mock.patch('base.utils.student_photo.prune_disk_cache') as mock_prune_disk_cache:
+            student_photo.get_photo('12345678')
+
+        self.assertTrue(mock_prune_disk_cache.called)
+
+    def test_prefetch_photos(self):
+        with mock.patch('base.utils.student_photo.get_photo') as mock_get_photo:
+            student_photo.prefetch_photos(['12345678', '87654321'])
+            student_photo._get_prefetch_executor().shutdown(wait=True)
+            student_photo._prefetch_executor = None
+
+        self.assertCountEqual([call[0][0] for call in mock_get_photo.call_args_list], ['12345678', '87654321'])
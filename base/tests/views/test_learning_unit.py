@@ -43,7 +43,7 @@ from django.utils.translation import ugettext_lazy as _
 import base.business.learning_unit
 from base.business import learning_unit as learning_unit_business
 from base.forms.learning_unit.learning_unit_create import LearningUnitModelForm
-from base.forms.learning_unit.search_form import LearningUnitYearForm, SearchForm
+from base.forms.learning_unit.search_form import LearningUnitYearForm
 from base.forms.learning_unit_pedagogy import LearningUnitPedagogyForm, SummaryModelForm
 from base.forms.learning_unit_specifications import LearningUnitSpecificationsForm, LearningUnitSpecificationsEditForm
 from base.models import learning_unit_component
@@ -1191,12 +1191,29 @@ class LearningUnitViewTestCase(TestCase):
             'PLANNED_CLASSES_{}_{}'.format(learning_unit_year.id, learning_component_year.id): [2]
         }
 
-    @mock.patch("base.models.learning_unit_year.count_search_results")
-    def test_error_message_case_too_many_results_to_show(self, mock_count):
-        mock_count.return_value = SearchForm.MAX_RECORDS + 1
-        response = self.client.get(reverse('learning_units'), {'academic_year_id': self.academic_year_1.id})
-        messages = list(response.context['messages'])
-        self.assertEqual(messages[0].message, _('too_many_results'))
+    @mock.patch("base.views.learning_units.search.LEARNING_UNITS_BY_PAGE", 1)
+    def test_learning_units_search_paginated(self):
+        LearningUnitYearFactory(academic_year=self.academic_year_1)
+        LearningUnitYearFactory(academic_year=self.academic_year_1)
+        response = self.client.get(reverse('learning_units'), {'academic_year_id': self.academic_year_1.id,
+                                                               'page': 2})
+        self.assertEqual(response.context['learning_units'].number, 2)
+        self.assertEqual(len(response.context['learning_units']), 1)
+
+    def test_learning_units_search_not_evaluated_before_xls(self):
+        LearningUnitYearFactory(academic_year=self.academic_year_1)
+        with mock.patch('base.views.learning_units.search.create_xls',
+                        return_value=HttpResponse()) as mock_create_xls:
+            self.client.get(reverse('learning_units'), {'academic_year_id': self.academic_year_1.id,
+                                                        'xls_status': 'xls'})
+        user, found_learning_units, filters = mock_create_xls.call_args[0]
+        self.assertIsNone(found_learning_units._result_cache)
+
+    def test_learning_units_search_no_result(self):
+        response = self.client.get(reverse('learning_units'), {'academic_year_id': self.academic_year_1.id,
+                                                               'acronym': 'NOTHING'})
+        self.assertEqual(response.context['learning_units'], [])
+        self.assertIn(_('no_result'), [str(message) for message in response.context['messages']])
 
     def test_get_username_with_no_person(self):
         a_username = 'dupontm'
@@ -1473,13 +1490,13 @@ class TestCreateXls(TestCase):
 
         self.user = UserFactory()
 
-    @mock.patch("osis_common.document.xls_build.generate_xls")
+    @mock.patch("base.utils.streaming_xls.generate_streaming_xls")
     def test_generate_xls_data_with_no_data(self, mock_generate_xls):
         learning_unit_business.create_xls(self.user, [], None)
         expected_argument = _generate_xls_build_parameter([], self.user)
-        mock_generate_xls.assert_called_with(expected_argument, None)
+        self.assertEqual(_get_called_parameters(mock_generate_xls), (expected_argument, None))
 
-    @mock.patch("osis_common.document.xls_build.generate_xls")
+    @mock.patch("base.utils.streaming_xls.generate_streaming_xls")
     def test_generate_xls_data_with_a_learning_unit(self, mock_generate_xls):
         a_form = LearningUnitYearForm({"acronym": self.learning_unit_year.acronym}, service_course_search=False)
         self.assertTrue(a_form.is_valid())
@@ -1491,7 +1508,7 @@ class TestCreateXls(TestCase):
                      xls_build.translate(self.learning_unit_year.subtype), None, None, self.learning_unit_year.credits,
                      xls_build.translate(self.learning_unit_year.status)]]
         expected_argument = _generate_xls_build_parameter(xls_data, self.user)
-        mock_generate_xls.assert_called_with(expected_argument, None)
+        self.assertEqual(_get_called_parameters(mock_generate_xls), (expected_argument, None))
 
 
 def _generate_xls_build_parameter(xls_data, user):
@@ -1515,6 +1532,13 @@ def _generate_xls_build_parameter(xls_data, user):
     }
 
 
+def _get_called_parameters(mock_generate_xls):
+    parameters, filters = mock_generate_xls.call_args[0]
+    for worksheet_data in parameters[xls_build.WORKSHEETS_DATA]:
+        worksheet_data[xls_build.CONTENT_KEY] = list(worksheet_data[xls_build.CONTENT_KEY])
+    return parameters, filters
+
+
 class TestLearningUnitComponents(TestCase):
     def setUp(self):
         self.academic_years = GenerateAcademicYear(start_year=2010, end_year=2020).academic_years
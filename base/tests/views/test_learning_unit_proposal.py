@@ -24,6 +24,7 @@
 #
 ##############################################################################
 import datetime
+import io
 from unittest import mock
 
 from django.contrib import messages
@@ -36,6 +37,7 @@ from django.db import IntegrityError, transaction
 from django.http import HttpResponseNotFound, HttpResponse, HttpResponseForbidden
 from django.test import TestCase, RequestFactory
 from django.utils.translation import ugettext_lazy as _
+from openpyxl import load_workbook
 from waffle.testutils import override_flag
 
 from attribution.tests.factories.attribution_charge_new import AttributionChargeNewFactory
@@ -73,6 +75,7 @@ from base.tests.factories.person_entity import PersonEntityFactory
 from base.tests.factories.proposal_learning_unit import ProposalLearningUnitFactory
 from base.tests.factories.tutor import TutorFactory
 from base.tests.factories.user import UserFactory
+from base.utils import streaming_xls
 from base.views.learning_unit import learning_unit_identification
 from base.views.learning_units.proposal.update import update_learning_unit_proposal, \
     learning_unit_modification_proposal, \
@@ -518,6 +521,19 @@ class TestLearningUnitProposalSearch(TestCase):
         proposals = response.context['proposals']
         self.assertEqual(len(proposals), 1)
 
+    def test_learning_units_proposal_search_xls(self):
+        url = reverse(learning_units_proposal_search)
+        response = self.client.get(url, data={'acronym': self.proposals[0].learning_unit_year.acronym,
+                                              'xls_status': 'xls'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], streaming_xls.CONTENT_TYPE_XLS)
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook.worksheets[0].rows)
+        self.assertEqual(len(rows), len(self.proposals) + 1)
+        self.assertCountEqual([row[1].value for row in rows[1:]],
+                              [proposal.learning_unit_year.acronym for proposal in self.proposals])
+
     def test_has_mininum_of_one_criteria(self):
         form = LearningUnitProposalForm({"non_existing_field": 'nothing_interestings'})
         self.assertFalse(form.is_valid(), form.errors)
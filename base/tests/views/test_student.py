@@ -23,17 +23,19 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+import shutil
+import tempfile
 from unittest import mock
-from unittest.mock import Mock
 
 from django.contrib.auth.models import Permission
 from django.core.urlresolvers import reverse
-from django.test import TestCase, RequestFactory
-from requests.exceptions import RequestException
+from django.test import TestCase, RequestFactory, override_settings
 
 from base.tests.factories.student import StudentFactory
 from base.tests.factories.person import PersonFactory
 from base.tests.factories.program_manager import ProgramManagerFactory
+from base.tests.utils.esb_stub import EsbStub, PHOTO_CONTENT, PHOTO_ETAG
+from base.utils import student_photo
 
 
 class StudentViewTestCase(TestCase):
@@ -45,6 +47,13 @@ class StudentViewTestCase(TestCase):
         permission = Permission.objects.get(name='Can access student')
         user.user_permissions.add(permission)
         self.students_db = [StudentFactory() for i in range(10)]
+        self.photo_cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.photo_cache_dir)
+        settings_override = override_settings(STUDENT_PHOTO_CACHE_DIR=self.photo_cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        student_photo.clear_memory_cache()
+        self.addCleanup(student_photo.clear_memory_cache)
 
     @mock.patch('base.views.layout.render')
     def test_students(self,  mock_render):
@@ -137,8 +146,8 @@ class StudentViewTestCase(TestCase):
         self.assertEqual(template, 'student/student.html')
         self.assertEqual(context['student'], student)
 
-    @mock.patch('requests.get', side_effect=RequestException)
-    def test_student_picture_unknown(self, mock_request_get):
+    @override_settings(ESB_STUDENT_API='http://127.0.0.1:1')
+    def test_student_picture_unknown(self):
         student_m = StudentFactory(person=PersonFactory(last_name='Durant', first_name='Thomas', gender='M'))
         student_f = StudentFactory(person=PersonFactory(last_name='Durant', first_name='Alice', gender='F'))
 
@@ -149,34 +158,49 @@ class StudentViewTestCase(TestCase):
         request.user = self.program_manager_1.person.user
         response = student_picture(request, student_m.id)
 
-        self.assertTrue(mock_request_get.called)
         self.assertEqual(response.url, staticfiles_storage.url('img/men_unknown.png'))
 
         request = RequestFactory().get(reverse(student_picture, args=[student_f.id]))
         request.user = self.program_manager_1.person.user
         response = student_picture(request, student_f.id)
 
-        self.assertTrue(mock_request_get.called)
         self.assertEqual(response.url, staticfiles_storage.url('img/women_unknown.png'))
 
-    @mock.patch('requests.get')
-    def test_student_picture(self, mock_request_get):
+    def test_student_picture(self):
         student_m = StudentFactory(person=PersonFactory(last_name='Durant', first_name='Thomas', gender='M'))
 
         from base.views.student import student_picture
 
-        mock_response = Mock()
-        mock_response.json.return_value = {'photo_url': 'awesome/photo.png'}
-        mock_response.content = b"an image"
-        mock_response.status_code = 200
-        mock_request_get.return_value = mock_response
+        esb_stub = EsbStub(photos={student_m.registration_id: PHOTO_CONTENT})
+        with esb_stub as esb, override_settings(ESB_STUDENT_API=esb.url):
+            request = RequestFactory().get(reverse(student_picture, args=[student_m.id]))
+            request.user = self.program_manager_1.person.user
+            response = student_picture(request, student_m.id)
 
-        request = RequestFactory().get(reverse(student_picture, args=[student_m.id]))
-        request.user = self.program_manager_1.person.user
-        response = student_picture(request, student_m.id)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, PHOTO_CONTENT)
+            self.assertEqual(response['ETag'], PHOTO_ETAG)
+            self.assertIn('private', response['Cache-Control'])
+
+            request = RequestFactory().get(reverse(student_picture, args=[student_m.id]), HTTP_IF_NONE_MATCH=PHOTO_ETAG)
+            request.user = self.program_manager_1.person.user
+            response = student_picture(request, student_m.id)
+
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(len(esb.requests), 2)
+
+    def test_student_picture_without_photo(self):
+        student_m = StudentFactory(person=PersonFactory(last_name='Durant', first_name='Thomas', gender='M'))
+
+        from base.views.student import student_picture
+        from django.contrib.staticfiles.storage import staticfiles_storage
+
+        with EsbStub() as esb, override_settings(ESB_STUDENT_API=esb.url):
+            request = RequestFactory().get(reverse(student_picture, args=[student_m.id]))
+            request.user = self.program_manager_1.person.user
+            response = student_picture(request, student_m.id)
 
-        self.assertTrue(mock_request_get.called)
-        self.assertEqual(response.content, b'an image')
+        self.assertEqual(response.url, staticfiles_storage.url('img/men_unknown.png'))
 
     def test_student_picture_for_non_existent_student(self):
         non_existent_student_id = 666
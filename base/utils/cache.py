@@ -1,4 +1,7 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
 
 from django.conf import settings
 from django.core.cache import caches, InvalidCacheBackendError
@@ -6,6 +9,7 @@ from functools import wraps
 
 CACHE_FILTER_TIMEOUT = None
 PREFIX_CACHE_KEY = 'cache_filter'
+PREFIX_GENERATION_KEY = 'cache_generation'
 
 logger = logging.getLogger(settings.DEFAULT_LOGGER)
 try:
@@ -53,3 +57,103 @@ def _get_filter_key(request):
     user = request.user
     path = request.path
     return "_".join([PREFIX_CACHE_KEY, str(user.id), path])
+
+
+def get_shared_cache():
+    """
+    Return the cache backend shared by all the workers, or None when it is not configured
+    (the default cache backend is local to each process).
+    """
+    try:
+        return caches["redis"]
+    except InvalidCacheBackendError:
+        return None
+
+
+def get_generation(namespace):
+    """
+    Return the current generation of a namespace. The generation is shared by all the workers through the shared
+    cache backend, so that bumping it invalidates every process-local copy of the data of the namespace.
+    Return None when there is no shared cache backend or when it is unavailable: the data must then not be cached,
+    because its invalidation would not reach the other workers.
+    """
+    shared_cache = get_shared_cache()
+    if shared_cache is None:
+        return None
+    key = _get_generation_key(namespace)
+    try:
+        generation = shared_cache.get(key)
+        if generation is None:
+            shared_cache.add(key, 0, timeout=None)
+            generation = shared_cache.get(key, 0)
+        return generation
+    except Exception:
+        logger.exception('An error occurred with cache system')
+        return None
+
+
+def bump_generation(namespace):
+    shared_cache = get_shared_cache()
+    if shared_cache is None:
+        return
+    key = _get_generation_key(namespace)
+    try:
+        shared_cache.incr(key)
+    except ValueError:
+        shared_cache.set(key, 1, timeout=None)
+    except Exception:
+        logger.exception('An error occurred with cache system')
+
+
+def _get_generation_key(namespace):
+    return "_".join([PREFIX_GENERATION_KEY, namespace])
+
+
+class GenerationalCache:
+    """
+    Process-local cache for data which cannot be serialized in the shared cache backend (model instances, trees...).
+    All the values are discarded as soon as the generation of the namespace is bumped by any worker.
+    A value is also recomputed after max_age seconds, in case an invalidation has been missed
+    (change made outside of the ORM, shared cache backend temporarily unavailable...).
+    """
+
+    def __init__(self, namespace, maxsize=32, max_age=None):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._generation = None
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        generation = get_generation(self.namespace)
+        if generation is None:
+            return compute()
+
+        with self._lock:
+            if generation != self._generation:
+                self._values.clear()
+                self._generation = generation
+            elif key in self._values:
+                value, computed_at = self._values[key]
+                if not self._is_expired(computed_at):
+                    self._values.move_to_end(key)
+                    return value
+                del self._values[key]
+
+        computed_at = time.monotonic()
+        value = compute()
+        with self._lock:
+            if generation == self._generation:
+                self._values[key] = (value, computed_at)
+                while len(self._values) > self.maxsize:
+                    self._values.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        bump_generation(self.namespace)
+        with self._lock:
+            self._values.clear()
+
+    def _is_expired(self, computed_at):
+        return self.max_age is not None and time.monotonic() - computed_at > self.max_age
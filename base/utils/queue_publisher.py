@@ -0,0 +1,160 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+
+"""
+Long-lived publisher of the messages sent to the queues of the QueueServer (RabbitMQ)
+"""
+import json
+import logging
+import queue
+import threading
+
+import pika
+import pika.exceptions
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+POOL_SIZE = 4
+CONNECTION_ERRORS = (pika.exceptions.AMQPConnectionError, pika.exceptions.ChannelClosed)
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+class QueuePublisher:
+    """
+    Publish messages through a pool of open connections, instead of opening a new connection by message.
+    A pika BlockingConnection is not thread-safe, so each pooled connection is used by one thread at a time.
+    The messages are persistent and, with the publisher confirms, a message is only considered sent once the
+    QueueServer acknowledged it.
+    A connection closed by the QueueServer (restart, missed heartbeats...) is replaced and the publication retried
+    once.
+    """
+    def __init__(self, pool_size=POOL_SIZE, confirm_delivery=True):
+        self.confirm_delivery = confirm_delivery
+        self._idle_connections = queue.LifoQueue(maxsize=pool_size)
+
+    def publish(self, queue_name, message):
+        self.publish_many(queue_name, [message])
+
+    def publish_many(self, queue_name, messages):
+        pooled_connection = self._acquire()
+        try:
+            try:
+                pooled_connection.publish_many(queue_name, messages)
+            except CONNECTION_ERRORS:
+                logger.warning('Connection to the QueueServer lost, reconnecting...')
+                pooled_connection.close()
+                pooled_connection = _PooledConnection(self.confirm_delivery)
+                pooled_connection.publish_many(queue_name, messages)
+        except Exception:
+            pooled_connection.close()
+            raise
+        self._release(pooled_connection)
+
+    def close(self):
+        while True:
+            try:
+                self._idle_connections.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _acquire(self):
+        while True:
+            try:
+                pooled_connection = self._idle_connections.get_nowait()
+            except queue.Empty:
+                return _PooledConnection(self.confirm_delivery)
+            if pooled_connection.is_open:
+                return pooled_connection
+
+    def _release(self, pooled_connection):
+        try:
+            self._idle_connections.put_nowait(pooled_connection)
+        except queue.Full:
+            pooled_connection.close()
+
+
+class _PooledConnection:
+    def __init__(self, confirm_delivery):
+        self.connection = pika.BlockingConnection(get_connection_parameters())
+        self.channel = self.connection.channel()
+        if confirm_delivery:
+            self.channel.confirm_delivery()
+        self.confirm_delivery = confirm_delivery
+        self.declared_queues = set()
+
+    @property
+    def is_open(self):
+        return self.connection.is_open and self.channel.is_open
+
+    def publish_many(self, queue_name, messages):
+        if queue_name not in self.declared_queues:
+            self.channel.queue_declare(queue=queue_name, durable=True)
+            self.declared_queues.add(queue_name)
+        for message in messages:
+            delivered = self.channel.basic_publish(exchange='',
+                                                   routing_key=queue_name,
+                                                   body=json.dumps(message, cls=DjangoJSONEncoder),
+                                                   properties=pika.BasicProperties(content_type='application/json',
+                                                                                   delivery_mode=2))
+            if self.confirm_delivery and delivered is False:
+                raise pika.exceptions.AMQPError('Message not confirmed by the QueueServer on {}'.format(queue_name))
+
+    def close(self):
+        try:
+            if self.connection.is_open:
+                self.connection.close()
+        except pika.exceptions.AMQPError:
+            logger.exception('Could not close the connection to the QueueServer')
+
+
+def get_connection_parameters():
+    credentials = pika.PlainCredentials(settings.QUEUES.get('QUEUE_USER'),
+                                        settings.QUEUES.get('QUEUE_PASSWORD'))
+    return pika.ConnectionParameters(settings.QUEUES.get('QUEUE_URL'),
+                                     settings.QUEUES.get('QUEUE_PORT'),
+                                     settings.QUEUES.get('QUEUE_CONTEXT_ROOT'),
+                                     credentials)
+
+
+def get_publisher():
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = QueuePublisher()
+    return _publisher
+
+
+def publish(queue_name, message):
+    get_publisher().publish(queue_name, message)
+
+
+def publish_many(queue_name, messages):
+    get_publisher().publish_many(queue_name, messages)
@@ -0,0 +1,122 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+
+"""
+Generation of xls files too large to be built in memory.
+The rows are written one by one in write-only worksheets, the workbook is saved in a temporary file and this file is
+streamed to the HTTP response by chunks.
+"""
+import datetime
+import decimal
+import itertools
+import tempfile
+from wsgiref.util import FileWrapper
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils.translation import ugettext_lazy as _
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from osis_common.document import xls_build
+
+CONTENT_TYPE_XLS = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CHUNK_SIZE = 64 * 1024
+MAX_WORKSHEET_TITLE_LENGTH = 31
+CELL_VALUE_TYPES = (str, int, float, decimal.Decimal, datetime.date, datetime.time, datetime.timedelta)
+FILTERS_WORKSHEET_TITLE = 'filters'
+
+
+def generate_streaming_xls(list_parameters, filters=None):
+    """
+    Take the same parameters as osis_common.document.xls_build.generate_xls(), but the content of each worksheet can
+    be any iterable (generator, queryset iterator...) : it is consumed only while the file is written.
+    """
+    workbook = Workbook(write_only=True)
+    workbook.properties.creator = str(list_parameters.get(xls_build.USER_KEY) or '')
+    workbook.properties.description = str(list_parameters.get(xls_build.LIST_DESCRIPTION_KEY) or '')
+
+    for worksheet_data in list_parameters.get(xls_build.WORKSHEETS_DATA, []):
+        _write_worksheet(workbook,
+                         worksheet_data.get(xls_build.WORKSHEET_TITLE_KEY),
+                         worksheet_data.get(xls_build.HEADER_TITLES_KEY),
+                         worksheet_data.get(xls_build.CONTENT_KEY) or [])
+    if filters:
+        _write_worksheet(workbook, _(FILTERS_WORKSHEET_TITLE), None, filters.items())
+
+    return _build_streaming_response(workbook, list_parameters.get(xls_build.FILENAME_KEY))
+
+
+def iterate(objects, batch_size=None):
+    """
+    Iterate over the objects without keeping them all in memory when they come from a queryset.
+    A queryset already evaluated is not fetched again: its objects may have been completed since (prefetches,
+    computed attributes...).
+    If a batch_size is given, yield lists of at most batch_size objects.
+    """
+    if isinstance(objects, QuerySet) and objects._result_cache is None:
+        iterator = objects.iterator()
+    else:
+        iterator = iter(objects)
+    if not batch_size:
+        return iterator
+    return iter(lambda: list(itertools.islice(iterator, batch_size)), [])
+
+
+def _write_worksheet(workbook, title, header_titles, rows):
+    worksheet = workbook.create_sheet(title=str(title)[:MAX_WORKSHEET_TITLE_LENGTH] if title else None)
+    if header_titles:
+        worksheet.append(_to_cell_values(header_titles))
+    for row in rows:
+        worksheet.append(_to_cell_values(row))
+
+
+def _to_cell_values(row):
+    return [_to_cell_value(value) for value in row]
+
+
+def _to_cell_value(value):
+    # Lazy translations, model instances... are written as text
+    if value is None or isinstance(value, CELL_VALUE_TYPES):
+        return _remove_illegal_characters(value)
+    return _remove_illegal_characters(str(value))
+
+
+def _remove_illegal_characters(value):
+    # Control characters copied from other documents make openpyxl raise IllegalCharacterError
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    return value
+
+
+def _build_streaming_response(workbook, filename):
+    xls_file = tempfile.TemporaryFile()
+    workbook.save(xls_file)
+    xls_file.seek(0)
+
+    response = StreamingHttpResponse(FileWrapper(xls_file, CHUNK_SIZE), content_type=CONTENT_TYPE_XLS)
+    response['Content-Disposition'] = 'attachment; filename="{}.xlsx"'.format(str(filename).replace(' ', '_'))
+    return response
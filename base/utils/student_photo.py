@@ -0,0 +1,265 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+"""
+Proxy of the student photos served by the ESB
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+DEFAULT_CONTENT_TYPE = 'image/jpeg'
+MEMORY_CACHE_SIZE = 256
+DISK_CACHE_PRUNE_INTERVAL = 100
+PREFETCH_WORKERS = 4
+
+Photo = namedtuple('Photo', ['content', 'content_type', 'etag', 'last_modified', 'checked_at'])
+
+_session = None
+_session_lock = threading.Lock()
+_memory_cache = OrderedDict()
+_memory_cache_lock = threading.RLock()
+_disk_cache_writes = 0
+_disk_cache_lock = threading.Lock()
+_prefetch_executor = None
+_prefetch_in_flight = set()
+_prefetch_lock = threading.Lock()
+
+
+def get_photo(registration_id):
+    """
+    Return the photo of the student, or None when the ESB has no photo for this registration id.
+    A cached photo is served as is during STUDENT_PHOTO_MAX_AGE seconds, then revalidated against the ESB with its
+    ETag and Last-Modified date. The cached photo is still served when the ESB cannot be reached.
+    """
+    photo = _get_cached_photo(registration_id)
+    if photo and not is_stale(photo):
+        return photo
+    try:
+        fetched_photo = _fetch_photo(registration_id, photo)
+    except (RequestException, ValueError) as e:
+        logger.warning('Could not fetch the photo of the student {}: {}'.format(registration_id, e))
+        return photo
+    if fetched_photo and fetched_photo is not photo:
+        _store_photo(registration_id, fetched_photo)
+    return fetched_photo
+
+
+def prefetch_photos(registration_ids):
+    """
+    Fetch in background the photos of the students not cached yet, so that the pages showing them are served from
+    the cache. Return immediately.
+    """
+    if not settings.ESB_STUDENT_API:
+        return
+    for registration_id in registration_ids:
+        photo = _get_cached_photo(registration_id)
+        if photo and not is_stale(photo):
+            continue
+        with _prefetch_lock:
+            if registration_id in _prefetch_in_flight:
+                continue
+            _prefetch_in_flight.add(registration_id)
+        _get_prefetch_executor().submit(_prefetch_photo, registration_id)
+
+
+def is_stale(photo):
+    return time.time() - photo.checked_at > settings.STUDENT_PHOTO_MAX_AGE
+
+
+def clear_memory_cache():
+    with _memory_cache_lock:
+        _memory_cache.clear()
+
+
+def _fetch_photo(registration_id, cached_photo):
+    session = _get_session()
+    response = session.get("{url}/{registration_id}/photo".format(url=settings.ESB_STUDENT_API,
+                                                                  registration_id=registration_id),
+                           headers={"Authorization": settings.ESB_AUTHORIZATION},
+                           timeout=settings.STUDENT_PHOTO_TIMEOUT)
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        return cached_photo
+    photo_url = response.json().get('photo_url')
+    if not photo_url:
+        return None
+
+    headers = {}
+    if cached_photo and cached_photo.etag:
+        headers['If-None-Match'] = cached_photo.etag
+    if cached_photo and cached_photo.last_modified:
+        headers['If-Modified-Since'] = cached_photo.last_modified
+    response = session.get(photo_url, headers=headers, timeout=settings.STUDENT_PHOTO_TIMEOUT)
+    if response.status_code == 304 and cached_photo:
+        return cached_photo._replace(checked_at=time.time())
+    if response.status_code == 200:
+        return Photo(content=response.content,
+                     content_type=response.headers.get('Content-Type', DEFAULT_CONTENT_TYPE),
+                     etag=response.headers.get('ETag'),
+                     last_modified=response.headers.get('Last-Modified'),
+                     checked_at=time.time())
+    if response.status_code == 404:
+        return None
+    return cached_photo
+
+
+def _prefetch_photo(registration_id):
+    try:
+        get_photo(registration_id)
+    except Exception:
+        logger.exception('Could not prefetch the photo of the student {}'.format(registration_id))
+    finally:
+        with _prefetch_lock:
+            _prefetch_in_flight.discard(registration_id)
+
+
+def _get_cached_photo(registration_id):
+    with _memory_cache_lock:
+        photo = _memory_cache.get(registration_id)
+        if photo:
+            _memory_cache.move_to_end(registration_id)
+            return photo
+    photo = _read_photo(registration_id)
+    if photo:
+        _remember_photo(registration_id, photo)
+    return photo
+
+
+def _store_photo(registration_id, photo):
+    _remember_photo(registration_id, photo)
+    try:
+        _write_photo(registration_id, photo)
+    except OSError:
+        logger.exception('Could not write the photo of the student {} in cache'.format(registration_id))
+        return
+    if _should_prune_disk_cache():
+        try:
+            prune_disk_cache()
+        except OSError:
+            logger.exception('Could not prune the cache of the student photos')
+
+
+def _remember_photo(registration_id, photo):
+    with _memory_cache_lock:
+        _memory_cache[registration_id] = photo
+        _memory_cache.move_to_end(registration_id)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _read_photo(registration_id):
+    content_path, metadata_path = _get_paths(registration_id)
+    try:
+        with open(metadata_path) as metadata_file:
+            metadata = json.load(metadata_file)
+        with open(content_path, 'rb') as content_file:
+            return Photo(content=content_file.read(), **metadata)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _write_photo(registration_id, photo):
+    content_path, metadata_path = _get_paths(registration_id)
+    os.makedirs(settings.STUDENT_PHOTO_CACHE_DIR, mode=0o700, exist_ok=True)
+    metadata = photo._asdict()
+    del metadata['content']
+    _write_atomically(content_path, photo.content)
+    _write_atomically(metadata_path, json.dumps(metadata).encode())
+
+
+def prune_disk_cache():
+    """
+    Remove the least recently checked photos from the disk cache so that it keeps at most
+    STUDENT_PHOTO_CACHE_MAX_FILES photos.
+    """
+    content_paths = []
+    for name in os.listdir(settings.STUDENT_PHOTO_CACHE_DIR):
+        path = os.path.join(settings.STUDENT_PHOTO_CACHE_DIR, name)
+        if '.' not in name and os.path.isfile(path):
+            content_paths.append((os.path.getmtime(path), path))
+    excess = len(content_paths) - settings.STUDENT_PHOTO_CACHE_MAX_FILES
+    if excess <= 0:
+        return
+    for _, content_path in sorted(content_paths)[:excess]:
+        for path in (content_path, content_path + '.json'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _should_prune_disk_cache():
+    global _disk_cache_writes
+    with _disk_cache_lock:
+        _disk_cache_writes += 1
+        if _disk_cache_writes < DISK_CACHE_PRUNE_INTERVAL:
+            return False
+        _disk_cache_writes = 0
+        return True
+
+
+def _write_atomically(path, data):
+    temporary_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+    with open(temporary_path, 'wb') as file:
+        file.write(data)
+    os.replace(temporary_path, path)
+
+
+def _get_paths(registration_id):
+    path = os.path.join(settings.STUDENT_PHOTO_CACHE_DIR, os.path.basename(str(registration_id)))
+    return path, path + '.json'
+
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=settings.STUDENT_PHOTO_POOL_SIZE,
+                                  pool_maxsize=settings.STUDENT_PHOTO_POOL_SIZE)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+    return _session
+
+
+def _get_prefetch_executor():
+    global _prefetch_executor
+    with _prefetch_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+    return _prefetch_executor
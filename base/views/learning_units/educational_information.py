@@ -30,16 +30,16 @@ from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
 
+from base.business.entity import build_entity_container_prefetch
 from base.business.learning_unit import get_learning_units_and_summary_status
+from base.business.learning_unit_year_with_context import append_latest_entities
 from base.business.learning_units.educational_information import get_responsible_and_learning_unit_yr_list
-from base.forms.common import TooManyResultsException
 from base.forms.learning_unit.educational_information.mail_reminder import MailReminderRow, MailReminderFormset
 from base.forms.learning_unit.search_form import LearningUnitYearForm
 from base.models.person import Person, find_by_user
 from base.utils.send_mail import send_mail_for_educational_information_update
 from base.views import layout
 from base.views.common import check_if_display_message
-from base.views.common import display_error_messages
 from base.views.learning_units.search import SUMMARY_LIST
 
 SUCCESS_MESSAGE = _('success_mail_reminder')
@@ -70,16 +70,15 @@ def learning_units_summary_list(request):
 
     search_form = LearningUnitYearForm(request.GET or None)
 
-    try:
-        if search_form.is_valid():
-            learning_units_found_search = search_form.get_learning_units(
-                requirement_entities=a_user_person.find_main_entities_version,
-                luy_status=True
-            )
-            learning_units_found = get_learning_units_and_summary_status(learning_units_found_search)
-            check_if_display_message(request, learning_units_found_search)
-    except TooManyResultsException:
-        display_error_messages(request, 'too_many_results')
+    if search_form.is_valid():
+        learning_units_found_search = search_form.get_learning_units(
+            requirement_entities=a_user_person.find_main_entities_version,
+            luy_status=True
+        ).prefetch_related(build_entity_container_prefetch())
+        learning_units_found = get_learning_units_and_summary_status(
+            [append_latest_entities(learning_unit) for learning_unit in learning_units_found_search]
+        )
+        check_if_display_message(request, learning_units_found_search)
 
     responsible_and_learning_unit_yr_list = get_responsible_and_learning_unit_yr_list(learning_units_found)
 
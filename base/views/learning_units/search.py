@@ -26,9 +26,9 @@
 import collections
 import itertools
 
-from django.contrib import messages
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.messages import WARNING
+from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
@@ -45,7 +45,8 @@ from base.models.enums import learning_container_year_types, learning_unit_year_
 from base.models.person import Person, find_by_user
 from base.models.proposal_learning_unit import ProposalLearningUnit
 from base.views import layout
-from base.views.common import check_if_display_message, display_error_messages, display_messages_by_level
+from base.views.common import check_if_display_message, display_error_messages, display_messages_by_level, \
+    display_warning_messages
 from base.business import learning_unit_proposal as proposal_business
 
 SIMPLE_SEARCH = 1
@@ -54,6 +55,8 @@ PROPOSAL_SEARCH = 3
 SUMMARY_LIST = 4
 BORROWED_COURSE = 5
 
+LEARNING_UNITS_BY_PAGE = 100
+
 ACTION_BACK_TO_INITIAL = "back_to_initial"
 ACTION_CONSOLIDATE = "consolidate"
 ACTION_FORCE_STATE = "force_state"
@@ -66,18 +69,21 @@ def learning_units_search(request, search_type):
     form = LearningUnitYearForm(request.GET or None, service_course_search=service_course_search,
                                 borrowed_course_search=borrowed_course_search)
     found_learning_units = []
-    try:
-        if form.is_valid():
-            found_learning_units = form.get_activity_learning_units()
-            check_if_display_message(request, found_learning_units)
-    except TooManyResultsException:
-        messages.add_message(request, messages.ERROR, _('too_many_results'))
+    if form.is_valid():
+        found_learning_units = form.get_activity_learning_units()
 
+    # The queryset must not be evaluated before the exports, which stream it
     if request.GET.get('xls_status') == "xls":
         return create_xls(request.user, found_learning_units, _get_filter(form, search_type))
     if request.GET.get('xls_status') == "xls_attribution":
         return create_xls_attribution(request.user, found_learning_units, _get_filter(form, search_type))
 
+    if form.is_valid():
+        found_learning_units = _paginate(found_learning_units, request.GET.get('page'))
+        if not found_learning_units.paginator.count:
+            found_learning_units = []
+            display_warning_messages(request, 'no_result')
+
     a_person = find_by_user(request.user)
     context = {'form': form, 'academic_years': get_last_academic_years(),
                'container_types': learning_container_year_types.LEARNING_CONTAINER_YEAR_TYPES,
@@ -166,6 +172,16 @@ def apply_action_on_proposals(proposals, author, post_data, research_criteria):
     return messages_by_level
 
 
+def _paginate(learning_units, page):
+    paginator = Paginator(learning_units, LEARNING_UNITS_BY_PAGE)
+    try:
+        return paginator.page(page)
+    except PageNotAnInteger:
+        return paginator.page(1)
+    except EmptyPage:
+        return paginator.page(paginator.num_pages)
+
+
 def _get_filter(form, search_type):
     criterias = itertools.chain([(_('search_type'), _get_search_type_label(search_type))], form.get_research_criteria())
     return collections.OrderedDict(criterias)
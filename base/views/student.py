@@ -23,19 +23,20 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-import requests
-
+from django.conf import settings
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.http import Http404
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseNotModified
 from django.shortcuts import redirect
-from requests.exceptions import RequestException
+from django.utils.cache import patch_cache_control
 
-from backoffice.settings.base import ESB_STUDENT_API, ESB_AUTHORIZATION
 from base import models as mdl
+from base.utils import student_photo
 from . import layout
 
+PREFETCHED_PHOTOS_BY_SEARCH = 20
+
 
 @login_required
 @permission_required('base.can_access_student', raise_exception=True)
@@ -55,6 +56,9 @@ def student_search(request):
     else:
         name = request.GET.get('name')
         students_list = mdl.student.search(name)
+    if students_list:
+        student_photo.prefetch_photos([student.registration_id
+                                       for student in students_list[:PREFETCHED_PHOTOS_BY_SEARCH]])
     return layout.render(request, "student/students.html", {'students': students_list,
                                                             'registration_id': registration_id,
                                                             'name': name})
@@ -75,23 +79,21 @@ def student_read(request, student_id):
 @permission_required('base.can_access_student', raise_exception=True)
 def student_picture(request, student_id):
     student = mdl.student.find_by_id(student_id)
-    if student:
-        try:
-            url = "{url}/{registration_id}/photo".format(url=ESB_STUDENT_API, registration_id=student.registration_id)
-            response = requests.get(url, headers={"Authorization": ESB_AUTHORIZATION})
-            result = response.json()
-            if response.status_code == 200 and result.get('photo_url'):
-                return _get_image(result.get('photo_url'), student)
-        except (RequestException, ValueError):
-            return _default_image(student)
-    raise Http404()
-
-
-def _get_image(url, student):
-    response = requests.get(url)
-    if response.status_code == 200:
-        return HttpResponse(response.content, content_type="image/jpeg")
-    return _default_image(student)
+    if not student:
+        raise Http404()
+    photo = student_photo.get_photo(student.registration_id)
+    if not photo:
+        return _default_image(student)
+    if photo.etag and request.META.get('HTTP_IF_NONE_MATCH') == photo.etag:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(photo.content, content_type=photo.content_type)
+    if photo.etag:
+        response['ETag'] = photo.etag
+    if photo.last_modified:
+        response['Last-Modified'] = photo.last_modified
+    patch_cache_control(response, private=True, max_age=settings.STUDENT_PHOTO_MAX_AGE)
+    return response
 
 
 def _default_image(student):
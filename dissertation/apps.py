@@ -28,3 +28,8 @@ from django.apps import AppConfig
 
 class DissertationConfig(AppConfig):
     name = 'dissertation'
+
+    def ready(self):
+        from dissertation.signals import subscribers
+        # if django.core.exceptions.AppRegistryNotReady: Apps aren't loaded yet.
+        # ===> This exception says that there is an error in the implementation of method ready(self) !!
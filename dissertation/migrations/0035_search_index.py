@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import collections
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import TextField, Value
+
+
+# The search text is matched with icontains, which compares UPPER(search_text)
+TRIGRAM_INDEX_SQL = 'CREATE INDEX {name} ON {table} USING gin (UPPER("search_text"::text) gin_trgm_ops)'
+DROP_INDEX_SQL = 'DROP INDEX IF EXISTS {name}'
+
+
+# The indexing is copied from dissertation.models.search_index as it was when this migration was written, the
+# migration must not depend on code which can change afterwards.
+def update_search_index(queryset, index_model, related_field, title_fields, text_fields):
+    titles = collections.defaultdict(collections.OrderedDict)
+    texts = collections.defaultdict(collections.OrderedDict)
+    for row in queryset.order_by().values_list('pk', *(title_fields + text_fields)):
+        pk, values = row[0], row[1:]
+        titles[pk].update((value, None) for value in values[:len(title_fields)] if value)
+        texts[pk].update((value, None) for value in values[len(title_fields):] if value)
+
+    for pk in titles:
+        title = ' '.join(titles[pk])
+        text = ' '.join(texts[pk])
+        index_model.objects.update_or_create(
+            defaults={
+                'search_text': '\n'.join((title, text)),
+                'search_vector': weighted_vector(title, 'A') + weighted_vector(text, 'B'),
+            },
+            **{related_field + '_id': pk}
+        )
+
+
+def weighted_vector(text, weight):
+    return SearchVector(Value(text, output_field=TextField()), weight=weight, config='simple')
+
+
+def build_search_index(apps, schema_editor):
+    update_search_index(
+        apps.get_model('dissertation', 'Dissertation').objects.all(),
+        apps.get_model('dissertation', 'DissertationSearchIndex'),
+        'dissertation',
+        ('title', 'proposition_dissertation__title'),
+        ('description', 'status',
+         'author__person__first_name', 'author__person__middle_name', 'author__person__last_name',
+         'proposition_dissertation__author__person__first_name',
+         'proposition_dissertation__author__person__middle_name',
+         'proposition_dissertation__author__person__last_name',
+         'offer_year_start__acronym'),
+    )
+    update_search_index(
+        apps.get_model('dissertation', 'PropositionDissertation').objects.all(),
+        apps.get_model('dissertation', 'PropositionDissertationSearchIndex'),
+        'proposition_dissertation',
+        ('title',),
+        ('description',
+         'author__person__first_name', 'author__person__middle_name', 'author__person__last_name',
+         'propositionoffer__offer_proposition__acronym'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dissertation', '0034_offerproposition_global_email_to_commission'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='DissertationSearchIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('search_text', models.TextField(default='')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('dissertation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE,
+                                                      related_name='search_index',
+                                                      to='dissertation.Dissertation')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PropositionDissertationSearchIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('search_text', models.TextField(default='')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('proposition_dissertation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE,
+                                                                  related_name='search_index',
+                                                                  to='dissertation.PropositionDissertation')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='dissertationsearchindex',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'],
+                                                           name='dissert_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propositiondissertationsearchindex',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'],
+                                                           name='dissert_prop_search_vector_idx'),
+        ),
+        migrations.RunSQL(
+            TRIGRAM_INDEX_SQL.format(name='dissert_search_text_trgm_idx',
+                                     table='dissertation_dissertationsearchindex'),
+            DROP_INDEX_SQL.format(name='dissert_search_text_trgm_idx'),
+        ),
+        migrations.RunSQL(
+            TRIGRAM_INDEX_SQL.format(name='dissert_prop_search_text_trgm_idx',
+                                     table='dissertation_propositiondissertationsearchindex'),
+            DROP_INDEX_SQL.format(name='dissert_prop_search_text_trgm_idx'),
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
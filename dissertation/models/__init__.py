@@ -36,4 +36,5 @@ from dissertation.models import proposition_dissertation
 from dissertation.models import proposition_document_file
 from dissertation.models import proposition_offer
 from dissertation.models import proposition_role
+from dissertation.models import search_index
 from dissertation.models import offer_proposition_group
\ No newline at end of file
@@ -65,67 +65,31 @@ class Adviser(SerializableModel):
 
     @property
     def get_stat_dissertation_role(self):
-        list_stat = [0] * 5
-        # list_stat[0]= count dissertation_role active of adviser
-        # list_stat[1]= count dissertation_role Promoteur active of adviser
-        # list_stat[2]= count dissertation_role coPromoteur active of adviser
-        # list_stat[3]= count dissertation_role reader active of adviser
-        # list_stat[4]= count dissertation_role need request active of adviser
-        list_stat[0] = 0
-        list_stat[1] = 0
-        list_stat[2] = 0
-        list_stat[3] = 0
-        list_stat[4] = 0
-
-        queryset = dissertation_role.DissertationRole.objects.all().filter(Q(adviser=self))
-        list_stat[0] = queryset.filter(dissertation__active=True) \
-            .count()
-
-        list_stat[1] = queryset.filter(status='PROMOTEUR') \
-            .filter(Q(dissertation__active=True)) \
-            .exclude(Q(dissertation__status='DRAFT') |
-                     Q(dissertation__status='ENDED') |
-                     Q(dissertation__status='DEFENDED')) \
-            .count()
-
-        list_stat[4] = queryset.filter(status='PROMOTEUR') \
-            .filter(dissertation__status='DIR_SUBMIT') \
-            .filter(dissertation__active=True) \
-            .count()
-
-        advisers_copro = queryset.filter(status='CO_PROMOTEUR') \
-            .filter(dissertation__active=True) \
-            .exclude(Q(dissertation__status='DRAFT') |
-                     Q(dissertation__status='ENDED') |
-                     Q(dissertation__status='DEFENDED'))
-
-        list_stat[2] = advisers_copro.count()
-        tab_offer_count_copro = dissertation_role.get_tab_count_role_by_offer(advisers_copro)
-
-        advisers_reader = queryset.filter(Q(adviser=self) &
-                                          Q(status='READER') &
-                                          Q(dissertation__active=True)) \
-            .exclude(Q(dissertation__status='DRAFT') |
-                     Q(dissertation__status='ENDED') |
-                     Q(dissertation__status='DEFENDED'))
-
-        list_stat[3] = advisers_reader.count()
-        tab_offer_count_read = dissertation_role.get_tab_count_role_by_offer(advisers_reader)
-
-        advisers_pro = queryset.filter(status='PROMOTEUR') \
-            .filter(Q(dissertation__active=True)) \
-            .exclude(Q(dissertation__status='DRAFT') |
-                     Q(dissertation__status='ENDED') |
-                     Q(dissertation__status='DEFENDED'))
-
-        tab_offer_count_pro = dissertation_role.get_tab_count_role_by_offer(advisers_pro)
-
-        return list_stat, tab_offer_count_read, tab_offer_count_copro, tab_offer_count_pro
+        return get_stats_dissertation_role([self])[self.pk]
 
     class Meta:
         ordering = ["person__last_name", "person__middle_name", "person__first_name"]
 
 
+def get_stats_dissertation_role(advisers):
+    """
+    Compute the dissertation role statistics of the advisers in a constant number of queries:
+    {adviser_id: (list_stat, tab_offer_count_read, tab_offer_count_copro, tab_offer_count_pro)}
+    list_stat[0]= count dissertation_role active of adviser
+    list_stat[1]= count dissertation_role Promoteur active of adviser
+    list_stat[2]= count dissertation_role coPromoteur active of adviser
+    list_stat[3]= count dissertation_role reader active of adviser
+    list_stat[4]= count dissertation_role need request active of adviser
+    """
+    counts = dissertation_role.count_roles_by_adviser(advisers)
+    offer_counts = dissertation_role.count_roles_by_adviser_and_offer(advisers)
+    return {adv.pk: (counts[adv.pk],
+                     offer_counts[adv.pk]['READER'],
+                     offer_counts[adv.pk]['CO_PROMOTEUR'],
+                     offer_counts[adv.pk]['PROMOTEUR'])
+            for adv in advisers}
+
+
 def search_by_person(a_person):
     try:
         adviser = Adviser.objects.get(person=a_person)
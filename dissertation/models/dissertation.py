@@ -28,12 +28,12 @@
 from django.core.exceptions import ObjectDoesNotExist
 from osis_common.models.serializable_model import SerializableModel, SerializableModelAdmin
 from django.db import models
-from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
 from base.models import offer_year, student, academic_year
 from . import proposition_dissertation
 from . import offer_proposition
 from . import dissertation_location
+from . import search_index
 from dissertation.utils import emails_dissert
 
 
@@ -141,20 +141,8 @@ class Dissertation(SerializableModel):
 def search(terms=None, active=True):
     queryset = Dissertation.objects.all()
     if terms:
-        queryset = queryset.filter(
-            Q(author__person__first_name__icontains=terms) |
-            Q(author__person__middle_name__icontains=terms) |
-            Q(author__person__last_name__icontains=terms) |
-            Q(description__icontains=terms) |
-            Q(proposition_dissertation__title__icontains=terms) |
-            Q(proposition_dissertation__author__person__first_name__icontains=terms) |
-            Q(proposition_dissertation__author__person__middle_name__icontains=terms) |
-            Q(proposition_dissertation__author__person__last_name__icontains=terms) |
-            Q(status__icontains=terms) |
-            Q(title__icontains=terms) |
-            Q(offer_year_start__acronym__icontains=terms)
-        )
-    queryset = queryset.filter(active=active).exclude(status='ENDED').distinct()
+        queryset = search_index.search(queryset, terms)
+    queryset = queryset.filter(active=active).exclude(status='ENDED')
     return queryset
 
 
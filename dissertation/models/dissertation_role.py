@@ -23,12 +23,18 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+import collections
+
 from django.core.exceptions import ObjectDoesNotExist
 from osis_common.models.serializable_model import SerializableModel, SerializableModelAdmin
 from django.db import models
-from django.db.models import Q
+from django.db.models import Case, Count, IntegerField, Q, Sum, When
+from base.models.offer import Offer
 from .enums import status_types
 
+STATS_ROLES = ('PROMOTEUR', 'CO_PROMOTEUR', 'READER')
+STATS_EXCLUDED_DISSERTATION_STATUS = ('DRAFT', 'ENDED', 'DEFENDED')
+
 
 class DissertationRoleAdmin(SerializableModelAdmin):
     list_display = ('adviser', 'status', 'dissertation', 'author', 'dissertation_status')
@@ -121,6 +127,16 @@ def search_by_dissertation(dissertation):
     return DissertationRole.objects.filter(dissertation=dissertation).order_by('status')
 
 
+def find_by_dissertations(dissertations):
+    roles_by_dissertation = collections.defaultdict(list)
+    roles = DissertationRole.objects.filter(dissertation__in=dissertations)\
+                                    .select_related('adviser__person')\
+                                    .order_by('status')
+    for role in roles:
+        roles_by_dissertation[role.dissertation_id].append(role)
+    return roles_by_dissertation
+
+
 def search_by_dissertation_and_role(dissertation, role):
     return search_by_dissertation(dissertation).filter(status=role)
 
@@ -188,6 +204,55 @@ def get_copromoteur_by_dissertation(dissert):
         return 'none'
 
 
+def _count_if(condition):
+    return Sum(Case(When(condition, then=1), default=0, output_field=IntegerField()))
+
+
+def count_roles_by_adviser(advisers):
+    """
+    Count in one query, for each adviser, its roles in active dissertations:
+    [all roles, promoter, co-promoter and reader roles in dissertations in progress,
+    promoter roles in dissertations submitted to the director]
+    """
+    in_progress = ~Q(dissertation__status__in=STATS_EXCLUDED_DISSERTATION_STATUS)
+    records = DissertationRole.objects.filter(adviser__in=advisers, dissertation__active=True)\
+        .order_by()\
+        .values('adviser_id')\
+        .annotate(total=Count('id'),
+                  promoter=_count_if(Q(status='PROMOTEUR') & in_progress),
+                  co_promoter=_count_if(Q(status='CO_PROMOTEUR') & in_progress),
+                  reader=_count_if(Q(status='READER') & in_progress),
+                  request=_count_if(Q(status='PROMOTEUR', dissertation__status='DIR_SUBMIT')))
+
+    counts = collections.defaultdict(lambda: [0] * 5)
+    for record in records:
+        counts[record['adviser_id']] = [record['total'], record['promoter'], record['co_promoter'],
+                                        record['reader'], record['request']]
+    return counts
+
+
+def count_roles_by_adviser_and_offer(advisers):
+    """
+    Count in one query the promoter, co-promoter and reader roles of each adviser in the active dissertations
+    in progress, by offer: {adviser_id: {role: {offer: count}}}
+    """
+    records = DissertationRole.objects.filter(adviser__in=advisers,
+                                              status__in=STATS_ROLES,
+                                              dissertation__active=True)\
+        .exclude(dissertation__status__in=STATS_EXCLUDED_DISSERTATION_STATUS)\
+        .order_by()\
+        .values('adviser_id', 'status', 'dissertation__offer_year_start__offer_id')\
+        .annotate(count=Count('id'))
+    records = list(records)
+    offers = Offer.objects.in_bulk({record['dissertation__offer_year_start__offer_id'] for record in records})
+
+    counts = collections.defaultdict(lambda: {role: {} for role in STATS_ROLES})
+    for record in records:
+        offer = offers[record['dissertation__offer_year_start__offer_id']]
+        counts[record['adviser_id']][record['status']][offer] = record['count']
+    return counts
+
+
 def get_tab_count_role_by_offer(list_roles):
     tab = {}
     for role in list_roles:
@@ -24,6 +24,7 @@
 #
 ##############################################################################
 from dissertation.models import proposition_offer
+from dissertation.models import search_index
 from django.core.exceptions import ObjectDoesNotExist
 from osis_common.models.serializable_model import SerializableModel, SerializableModelAdmin
 from django.db import models
@@ -103,14 +104,7 @@ class PropositionDissertation(SerializableModel):
 def search(terms, active=None, visibility=None, connected_adviser=None, offers=None):
     queryset = PropositionDissertation.objects.all()
     if terms:
-        queryset = queryset.filter(
-            Q(title__icontains=terms) |
-            Q(description__icontains=terms) |
-            Q(author__person__first_name__icontains=terms) |
-            Q(author__person__middle_name__icontains=terms) |
-            Q(author__person__last_name__icontains=terms) |
-            Q(propositionoffer__offer_proposition__acronym__icontains=terms)
-        )
+        queryset = search_index.search(queryset, terms)
 
     if active:
         queryset = queryset.filter(active=active)
@@ -126,7 +120,7 @@ def search(terms, active=None, visibility=None, connected_adviser=None, offers=N
     elif visibility:
         queryset = queryset.filter(visibility=visibility)
 
-    return queryset.distinct()
+    return queryset
 
 
 def search_by_offer(offers):
@@ -0,0 +1,122 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import collections
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
+from django.db import models
+from django.db.models import F, Q, TextField, Value
+
+SEARCH_CONFIG = 'simple'
+
+DISSERTATION_TITLE_FIELDS = ('title', 'proposition_dissertation__title')
+DISSERTATION_TEXT_FIELDS = ('description', 'status',
+                            'author__person__first_name', 'author__person__middle_name',
+                            'author__person__last_name',
+                            'proposition_dissertation__author__person__first_name',
+                            'proposition_dissertation__author__person__middle_name',
+                            'proposition_dissertation__author__person__last_name',
+                            'offer_year_start__acronym')
+
+PROPOSITION_DISSERTATION_TITLE_FIELDS = ('title',)
+PROPOSITION_DISSERTATION_TEXT_FIELDS = ('description',
+                                        'author__person__first_name', 'author__person__middle_name',
+                                        'author__person__last_name',
+                                        'propositionoffer__offer_proposition__acronym')
+
+
+class SearchIndex(models.Model):
+    search_text = models.TextField(default='')
+    search_vector = SearchVectorField(null=True)
+
+    class Meta:
+        abstract = True
+
+
+class DissertationSearchIndex(SearchIndex):
+    dissertation = models.OneToOneField('Dissertation', on_delete=models.CASCADE, related_name='search_index')
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='dissert_search_vector_idx')]
+
+
+class PropositionDissertationSearchIndex(SearchIndex):
+    proposition_dissertation = models.OneToOneField('PropositionDissertation', on_delete=models.CASCADE,
+                                                    related_name='search_index')
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='dissert_prop_search_vector_idx')]
+
+
+def index_dissertations(queryset):
+    update_search_index(queryset, DissertationSearchIndex, 'dissertation',
+                        DISSERTATION_TITLE_FIELDS, DISSERTATION_TEXT_FIELDS)
+
+
+def index_proposition_dissertations(queryset):
+    update_search_index(queryset, PropositionDissertationSearchIndex, 'proposition_dissertation',
+                        PROPOSITION_DISSERTATION_TITLE_FIELDS, PROPOSITION_DISSERTATION_TEXT_FIELDS)
+
+
+def update_search_index(queryset, index_model, related_field, title_fields, text_fields):
+    """
+    Rebuild the search index rows of the objects of the queryset.
+    The titles get the highest weight in the ranking, the other fields are only matched.
+    """
+    titles = collections.defaultdict(collections.OrderedDict)
+    texts = collections.defaultdict(collections.OrderedDict)
+    for row in queryset.order_by().values_list('pk', *(title_fields + text_fields)):
+        pk, values = row[0], row[1:]
+        titles[pk].update((value, None) for value in values[:len(title_fields)] if value)
+        texts[pk].update((value, None) for value in values[len(title_fields):] if value)
+
+    for pk in titles:
+        title = ' '.join(titles[pk])
+        text = ' '.join(texts[pk])
+        index_model.objects.update_or_create(
+            defaults={
+                'search_text': '\n'.join((title, text)),
+                'search_vector': _weighted_vector(title, 'A') + _weighted_vector(text, 'B'),
+            },
+            **{related_field + '_id': pk}
+        )
+
+
+def _weighted_vector(text, weight):
+    return SearchVector(Value(text, output_field=TextField()), weight=weight, config=SEARCH_CONFIG)
+
+
+def search(queryset, terms):
+    """
+    Filter the queryset on the words of the terms or, as the former search did, on any substring of
+    the indexed fields (served by the trigram index), and rank the results.
+    """
+    query = SearchQuery(terms, config=SEARCH_CONFIG)
+    return queryset.filter(
+        Q(search_index__search_vector=query) | Q(search_index__search_text__icontains=terms)
+    ).annotate(
+        rank=SearchRank(F('search_index__search_vector'), query)
+    ).order_by('-rank', *queryset.model._meta.ordering)
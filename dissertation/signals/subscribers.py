@@ -0,0 +1,82 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from base.models.offer_year import OfferYear
+from base.models.person import Person
+from dissertation.models import search_index
+from dissertation.models.dissertation import Dissertation
+from dissertation.models.offer_proposition import OfferProposition
+from dissertation.models.proposition_dissertation import PropositionDissertation
+from dissertation.models.proposition_offer import PropositionOffer
+
+PERSON_INDEXED_FIELDS = {'first_name', 'middle_name', 'last_name'}
+
+
+# The search index holds fields of related models (author names, offer acronyms, proposition title),
+# so it is rebuilt for the dissertations and propositions concerned whenever one of them is saved.
+
+@receiver(post_save, sender=Dissertation)
+def index_dissertation(sender, instance, **kwargs):
+    search_index.index_dissertations(Dissertation.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=PropositionDissertation)
+def index_proposition_dissertation(sender, instance, **kwargs):
+    search_index.index_proposition_dissertations(PropositionDissertation.objects.filter(pk=instance.pk))
+    search_index.index_dissertations(Dissertation.objects.filter(proposition_dissertation=instance))
+
+
+@receiver(post_save, sender=PropositionOffer)
+@receiver(post_delete, sender=PropositionOffer)
+def index_proposition_offer(sender, instance, **kwargs):
+    search_index.index_proposition_dissertations(
+        PropositionDissertation.objects.filter(pk=instance.proposition_dissertation_id)
+    )
+
+
+@receiver(post_save, sender=OfferProposition)
+def index_offer_proposition(sender, instance, **kwargs):
+    search_index.index_proposition_dissertations(
+        PropositionDissertation.objects.filter(propositionoffer__offer_proposition=instance)
+    )
+
+
+@receiver(post_save, sender=OfferYear)
+def index_offer_year(sender, instance, **kwargs):
+    search_index.index_dissertations(Dissertation.objects.filter(offer_year_start=instance))
+
+
+@receiver(post_save, sender=Person)
+def index_person(sender, instance, update_fields=None, **kwargs):
+    if update_fields and PERSON_INDEXED_FIELDS.isdisjoint(update_fields):
+        return
+    search_index.index_dissertations(
+        Dissertation.objects.filter(author__person=instance) |
+        Dissertation.objects.filter(proposition_dissertation__author__person=instance)
+    )
+    search_index.index_proposition_dissertations(PropositionDissertation.objects.filter(author__person=instance))
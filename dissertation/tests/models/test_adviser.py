@@ -144,3 +144,15 @@ class UtilsTestCase(TestCase):
         self.assertEqual(tab_offer_count_read[self.offer1], 1)
         self.assertEqual(tab_offer_count_copro, {})
 
+    def test_get_stats_dissertation_role_in_constant_queries(self):
+        advisers = [self.teacher, self.teacher2, self.teacher3, self.teacher4]
+        with self.assertNumQueries(3):
+            stats = adviser.get_stats_dissertation_role(advisers)
+
+        self.assertEqual(stats[self.teacher.pk][0], [1, 1, 0, 0, 1])
+        self.assertEqual(stats[self.teacher.pk][3], {self.offer1: 1})
+        self.assertEqual(stats[self.teacher2.pk][0], [1, 0, 1, 0, 0])
+        self.assertEqual(stats[self.teacher2.pk][2], {self.offer1: 1})
+        self.assertEqual(stats[self.teacher3.pk][0], [1, 0, 0, 1, 0])
+        self.assertEqual(stats[self.teacher3.pk][1], {self.offer1: 1})
+        self.assertEqual(stats[self.teacher4.pk], ([0, 0, 0, 0, 0], {}, {}, {}))
@@ -0,0 +1,78 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2018 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.test import TestCase
+
+from base.tests.factories.person import PersonFactory
+from dissertation.models import dissertation, proposition_dissertation
+from dissertation.models.search_index import DissertationSearchIndex
+from dissertation.tests.factories.adviser import AdviserTeacherFactory
+from dissertation.tests.factories.dissertation import DissertationFactory
+from dissertation.tests.factories.offer_proposition import OfferPropositionFactory
+from dissertation.tests.factories.proposition_dissertation import PropositionDissertationFactory
+from dissertation.tests.factories.proposition_offer import PropositionOfferFactory
+
+
+class TestSearchIndex(TestCase):
+    def setUp(self):
+        self.teacher = AdviserTeacherFactory(person=PersonFactory(first_name='Charles', last_name='Darwin'))
+        self.proposition = PropositionDissertationFactory(author=self.teacher, title='Origin of species',
+                                                          description='Natural selection')
+        self.dissertation = DissertationFactory(proposition_dissertation=self.proposition, status='DRAFT',
+                                                title='Finches of the Galapagos', description='Beaks')
+
+    def test_index_created_on_save(self):
+        index = DissertationSearchIndex.objects.get(dissertation=self.dissertation)
+        self.assertIn('Finches of the Galapagos', index.search_text)
+        self.assertIn('Darwin', index.search_text)
+        self.assertIsNotNone(index.search_vector)
+
+    def test_search_dissertation_by_word(self):
+        self.assertEqual(list(dissertation.search(terms='galapagos finches')), [self.dissertation])
+
+    def test_search_dissertation_by_substring(self):
+        self.assertEqual(list(dissertation.search(terms='alapag')), [self.dissertation])
+        self.assertEqual(list(dissertation.search(terms='no result search')), [])
+
+    def test_search_dissertation_ranks_titles_first(self):
+        other = DissertationFactory(status='DRAFT', title='Beaks', description='Galapagos')
+        self.assertEqual(list(dissertation.search(terms='galapagos')), [self.dissertation, other])
+
+    def test_dissertation_index_follows_proposition(self):
+        self.proposition.title = 'Descent of man'
+        self.proposition.save()
+        self.assertEqual(list(dissertation.search(terms='descent')), [self.dissertation])
+
+    def test_dissertation_index_follows_person(self):
+        person = self.teacher.person
+        person.last_name = 'Wallace'
+        person.save()
+        self.assertEqual(list(dissertation.search(terms='wallace')), [self.dissertation])
+        self.assertEqual(list(proposition_dissertation.search('wallace')), [self.proposition])
+
+    def test_search_proposition_by_offer_acronym(self):
+        PropositionOfferFactory(proposition_dissertation=self.proposition,
+                                offer_proposition=OfferPropositionFactory(acronym='BIOL2M'))
+        self.assertEqual(list(proposition_dissertation.search('biol2m')), [self.proposition])
@@ -24,6 +24,7 @@
 #
 ##############################################################################
 
+import io
 import json
 from django.test import TestCase
 from django.core.urlresolvers import reverse
@@ -44,6 +45,7 @@ from dissertation.models import adviser
 from dissertation.models import dissertation_role
 from dissertation.tests.models.test_faculty_adviser import create_faculty_adviser
 from dissertation.views.dissertation import adviser_can_manage
+from openpyxl import load_workbook
 
 ERROR_405_BAD_REQUEST = 405
 ERROR_404_PAGE_NO_FOUND = 404
@@ -153,6 +155,20 @@ class DissertationViewTestCase(TestCase):
         response = self.client.get(url, data={"search": "no result search"})
         self.assertEqual(response.status_code, HTTP_OK)
 
+    def test_export_dissertations_for_manager(self):
+        self.dissertation_1.description = 'Copied\x0b from a document'
+        self.dissertation_1.save()
+        self.client.force_login(self.manager.person.user)
+        url = reverse('manager_dissertations_search')
+        response = self.client.get(url, data={"search": "Dissertation 2017", "bt_xlsx": ""})
+        self.assertEqual(response.status_code, HTTP_OK)
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = [[cell.value for cell in row] for row in workbook['dissertations'].rows]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][2:4], ['Dissertation 2017', 'COM_SUBMIT'])
+        self.assertEqual(rows[1][6:8], ['PROMOTEUR', str(self.teacher2)])
+        self.assertEqual(rows[1][-1], 'Copied from a document')
+
     def test_search_dissertations_for_manager_2(self):
         self.client.force_login(self.manager.person.user)
         url = reverse('manager_dissertations_search')
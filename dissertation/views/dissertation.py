@@ -40,15 +40,32 @@ from dissertation.models import adviser, dissertation, dissertation_document_fil
     dissertation_update, faculty_adviser, offer_proposition, proposition_dissertation, proposition_role
 from dissertation.forms import ManagerDissertationForm, ManagerDissertationEditForm, ManagerDissertationRoleForm, \
     ManagerDissertationUpdateForm, AdviserForm
-from openpyxl.writer.excel import save_virtual_workbook
-from openpyxl import Workbook
-from openpyxl.utils.exceptions import IllegalCharacterError
+from base.utils import streaming_xls
+from osis_common.document import xls_build
 
 ERROR_405_BAD_REQUEST = 405
 ERROR_404_PAGE_NO_FOUND = 404
 HTTP_OK = 200
 ERROR_403_NOT_FORBIDDEN = 403
 
+DISSERTATIONS_BY_BATCH = 500
+XLS_HEADER_TITLES = ['Creation_date',
+                     'Student',
+                     'Title',
+                     'Status',
+                     'Year + Program Start',
+                     'Defend Year',
+                     'Role 1',
+                     'Teacher 1',
+                     'Role 2',
+                     'Teacher 2',
+                     'Role 3',
+                     'Teacher 3',
+                     'Role 4',
+                     'Teacher 4',
+                     'Description'
+                     ]
+
 
 def _role_can_be_deleted(dissert, dissert_role):
     promotors_count = dissertation_role.count_by_status_dissertation('PROMOTEUR', dissert)
@@ -368,58 +385,45 @@ def manager_dissertations_new(request):
                           'defend_periode_choices': dissertation.DEFEND_PERIODE_CHOICES})
 
 
-def generate_xls(disserts):
-    workbook = Workbook(encoding='utf-8')
-    worksheet1 = workbook.active
-    worksheet1.title = "dissertations"
-    worksheet1.append(['Creation_date',
-                       'Student',
-                       'Title',
-                       'Status',
-                       'Year + Program Start',
-                       'Defend Year',
-                       'Role 1',
-                       'Teacher 1',
-                       'Role 2',
-                       'Teacher 2',
-                       'Role 3',
-                       'Teacher 3',
-                       'Role 4',
-                       'Teacher 4',
-                       'Description'
-                       ])
-    for dissert in disserts:
-        try:
-            line = construct_line(dissert, include_description=True)
-            worksheet1.append(line)
-        except IllegalCharacterError:
-            line = construct_line(dissert, include_description=False)
-            worksheet1.append(line)
-
-    return save_virtual_workbook(workbook)
-
-
-def construct_line(dissert, include_description=True):
+def generate_xls(disserts, filename):
+    return streaming_xls.generate_streaming_xls({
+        xls_build.FILENAME_KEY: filename,
+        xls_build.WORKSHEETS_DATA: [{
+            xls_build.WORKSHEET_TITLE_KEY: 'dissertations',
+            xls_build.HEADER_TITLES_KEY: XLS_HEADER_TITLES,
+            xls_build.CONTENT_KEY: _get_xls_lines(disserts),
+        }]
+    })
+
+
+def _get_xls_lines(disserts):
+    disserts = disserts.select_related('author__person', 'offer_year_start__academic_year')
+    for batch in streaming_xls.iterate(disserts, batch_size=DISSERTATIONS_BY_BATCH):
+        roles_by_dissertation = dissertation_role.find_by_dissertations(batch)
+        for dissert in batch:
+            yield construct_line(dissert, roles_by_dissertation[dissert.pk])
+
+
+def construct_line(dissert, roles):
     defend_year = dissert.defend_year if dissert.defend_year else '---'
-    description = dissert.description.encode('utf8', 'ignore') if dissert.description and include_description else '---'
-    title = dissert.title.encode('utf8', 'ignore')
+    description = dissert.description if dissert.description else '---'
 
     line = [dissert.creation_date,
             str(dissert.author),
-            title,
+            dissert.title,
             dissert.status,
             str(dissert.offer_year_start),
             defend_year
             ]
 
-    line += get_ordered_roles(dissert)
+    line += get_ordered_roles(roles)
     line += [description]
     return line
 
 
-def get_ordered_roles(dissert):
+def get_ordered_roles(dissert_roles):
     roles = []
-    for role in dissertation_role.search_by_dissertation(dissert):
+    for role in dissert_roles:
         if role.status == 'PROMOTEUR':
             roles.insert(0, str(role.adviser))
             roles.insert(0, str(role.status))
@@ -462,11 +466,7 @@ def manager_dissertations_search(request):
     academic_year_10y = academic_year.find_academic_years(end_date,start_date)
 
     if 'bt_xlsx' in request.GET:
-        xls = generate_xls(disserts)
-        filename = 'dissertations_{}.xlsx'.format(time.strftime("%Y-%m-%d_%H:%M"))
-        response = HttpResponse(xls, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = "%s%s" % ("attachment; filename=", filename)
-        return response
+        return generate_xls(disserts, 'dissertations_{}'.format(time.strftime("%Y-%m-%d_%H:%M")))
 
     else:
         return layout.render(request, "manager_dissertations_list.html",
@@ -37,6 +37,27 @@ from base.views import layout
 from base.models.enums import person_source_type
 
 
+def _get_stats_context(adv):
+    list_stat, tab_offer_count_read, tab_offer_count_copro, tab_offer_count_pro = \
+        adviser.get_stats_dissertation_role([adv])[adv.pk]
+    return {'adviser': adv,
+            'count_advisers_copro': list_stat[2],
+            'count_advisers_pro': list_stat[1],
+            'count_advisers_reader': list_stat[3],
+            'count_advisers_pro_request': list_stat[4],
+            'tab_offer_count_pro': tab_offer_count_pro,
+            'tab_offer_count_read': tab_offer_count_read,
+            'tab_offer_count_copro': tab_offer_count_copro}
+
+
+def _with_stat_dissertation_role(advisers):
+    advisers = list(advisers)
+    counts = dissertation_role.count_roles_by_adviser(advisers)
+    for adv in advisers:
+        adv.stat_dissertation_role = counts[adv.pk]
+    return advisers
+
+
 ###########################
 #      TEACHER VIEWS      #
 ###########################
@@ -59,28 +80,7 @@ def informations_detail_stats(request):
     person = mdl.person.find_by_user(request.user)
     adv = adviser.search_by_person(person)
 
-    advisers_pro = dissertation_role.search_by_adviser_and_role_stats(adv, 'PROMOTEUR')
-    count_advisers_pro = dissertation_role.count_by_adviser_and_role_stats(adv, 'PROMOTEUR')
-    count_advisers_pro_request = dissertation_role.count_by_adviser(adv, 'PROMOTEUR', 'DIR_SUBMIT')
-    tab_offer_count_pro = dissertation_role.get_tab_count_role_by_offer(advisers_pro)
-
-    advisers_copro = dissertation_role.search_by_adviser_and_role_stats(adv, 'CO_PROMOTEUR')
-    count_advisers_copro = dissertation_role.count_by_adviser_and_role_stats(adv, 'CO_PROMOTEUR')
-    tab_offer_count_copro = dissertation_role.get_tab_count_role_by_offer(advisers_copro)
-
-    advisers_reader = dissertation_role.search_by_adviser_and_role_stats(adv, 'READER')
-    count_advisers_reader = dissertation_role.count_by_adviser_and_role_stats(adv, 'READER')
-    tab_offer_count_read = dissertation_role.get_tab_count_role_by_offer(advisers_reader)
-
-    return layout.render(request, 'informations_detail_stats.html',
-                         {'adviser': adv,
-                          'count_advisers_copro': count_advisers_copro,
-                          'count_advisers_pro': count_advisers_pro,
-                          'count_advisers_reader': count_advisers_reader,
-                          'count_advisers_pro_request': count_advisers_pro_request,
-                          'tab_offer_count_pro': tab_offer_count_pro,
-                          'tab_offer_count_read': tab_offer_count_read,
-                          'tab_offer_count_copro': tab_offer_count_copro})
+    return layout.render(request, 'informations_detail_stats.html', _get_stats_context(adv))
 
 
 @login_required
@@ -169,7 +169,7 @@ def informations_add(request):
 @login_required
 @user_passes_test(adviser.is_manager)
 def manager_informations(request):
-    advisers = adviser.list_teachers()
+    advisers = _with_stat_dissertation_role(adviser.list_teachers())
     return layout.render(request, 'manager_informations_list.html', {'advisers': advisers})
 
 
@@ -297,7 +297,7 @@ def manager_informations_edit(request, pk):
 @login_required
 @user_passes_test(adviser.is_manager)
 def manager_informations_search(request):
-    advisers = search_adviser(terms=request.GET['search'])
+    advisers = _with_stat_dissertation_role(search_adviser(terms=request.GET['search']))
     return layout.render(request, "manager_informations_list.html", {'advisers': advisers})
 
 
@@ -354,25 +354,4 @@ def manager_informations_detail_stats(request, pk):
     adv = adviser.get_by_id(pk)
     if adv is None:
         return redirect('manager_informations')
-    advisers_pro = dissertation_role.search_by_adviser_and_role_stats(adv, 'PROMOTEUR')
-    count_advisers_pro = dissertation_role.count_by_adviser_and_role_stats(adv, 'PROMOTEUR')
-    count_advisers_pro_request = dissertation_role.count_by_adviser(adv, 'PROMOTEUR', 'DIR_SUBMIT')
-    tab_offer_count_pro = dissertation_role.get_tab_count_role_by_offer(advisers_pro)
-
-    advisers_copro = dissertation_role.search_by_adviser_and_role_stats(adv, 'CO_PROMOTEUR')
-    count_advisers_copro = dissertation_role.count_by_adviser_and_role_stats(adv, 'CO_PROMOTEUR')
-    tab_offer_count_copro = dissertation_role.get_tab_count_role_by_offer(advisers_copro)
-
-    advisers_reader = dissertation_role.search_by_adviser_and_role_stats(adv, 'READER')
-    count_advisers_reader = dissertation_role.count_by_adviser_and_role_stats(adv, 'READER')
-    tab_offer_count_read = dissertation_role.get_tab_count_role_by_offer(advisers_reader)
-
-    return layout.render(request, 'manager_informations_detail_stats.html',
-                         {'adviser': adv,
-                          'count_advisers_copro': count_advisers_copro,
-                          'count_advisers_pro': count_advisers_pro,
-                          'count_advisers_reader': count_advisers_reader,
-                          'count_advisers_pro_request': count_advisers_pro_request,
-                          'tab_offer_count_pro': tab_offer_count_pro,
-                          'tab_offer_count_read': tab_offer_count_read,
-                          'tab_offer_count_copro': tab_offer_count_copro})
+    return layout.render(request, 'manager_informations_detail_stats.html', _get_stats_context(adv))
@@ -7,6 +7,10 @@ from itertools import chain
 
 import sys
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Q, TextField, Value, When
+from django.db.models.functions import Upper
+from django.utils import timezone
 from lxml.builder import E
 
 import prettyprinter
@@ -20,6 +24,16 @@ from cms.models.text_label import TextLabel
 from cms.models.translated_text import TranslatedText
 from cms.models.translated_text_label import TranslatedTextLabel
 
+BATCH_SIZE = 500
+
+DRY_RUN_ARGS = ('dry-run', '--dry-run')
+
+LOOKUP_FIELD_BY_TYPE = {
+    'group': 'partial_acronym',
+    'common': 'acronym',
+    'offer': 'acronym',
+}
+
 
 def new_div(html_content, class_name):
     """
@@ -252,68 +266,147 @@ def convert_to_html(item, label, value):
     return value.strip()
 
 
-def import_offer_and_items(item, education_group_year, mapping_label_text_label, context):
-    for label, value in item['info'].items():
-        value = convert_to_html(item, label, value)
-
-        if not value:
-            continue
-
-        translated_text, created = TranslatedText.objects.get_or_create(
-            entity=context.entity,
-            reference=education_group_year.id,
-            text_label=mapping_label_text_label[label],
-            language=context.language,
-            defaults={
-                'text': value
-            }
-        )
-
-        if not created:
-            translated_text.text = value
-            translated_text.save()
+def get_education_group_year_key(item):
+    return item['year'], LOOKUP_FIELD_BY_TYPE[item['type']], item['acronym'].upper()
 
 
-def find_education_group_year_for_group(item):
-    qs = EducationGroupYear.objects.filter(
-        academic_year__year=item['year'],
-        partial_acronym__iexact=item['acronym']
+def find_education_group_years(items):
+    """
+    Récupère en une seule requête les EducationGroupYear de tous les items.
+    Le dictionnaire retourné est indexé par (année, champ de recherche, acronyme en majuscules)
+    et contient l'id du premier EducationGroupYear trouvé.
+    """
+    keys = {get_education_group_year_key(item) for item in items}
+    if not keys:
+        return {}
+
+    years = {year for year, field, acronym in keys}
+    acronyms = {acronym for year, field, acronym in keys if field == 'acronym'}
+    partial_acronyms = {acronym for year, field, acronym in keys if field == 'partial_acronym'}
+
+    records = EducationGroupYear.objects.annotate(
+        upper_acronym=Upper('acronym'),
+        upper_partial_acronym=Upper('partial_acronym'),
+    ).filter(
+        Q(upper_acronym__in=acronyms) | Q(upper_partial_acronym__in=partial_acronyms),
+        academic_year__year__in=years,
+    ).order_by('id').values_list('id', 'academic_year__year', 'upper_acronym', 'upper_partial_acronym')
+
+    education_group_years = {}
+    for egy_id, year, acronym, partial_acronym in records:
+        education_group_years.setdefault((year, 'acronym', acronym), egy_id)
+        if partial_acronym:
+            education_group_years.setdefault((year, 'partial_acronym', partial_acronym), egy_id)
+    return education_group_years
+
+
+def create_education_group_year_for_common(item):
+    academic_year = AcademicYear.objects.get(year=item['year'])
+    education_group_year = EducationGroupYearFactory(
+        acronym=item['acronym'],
+        academic_year=academic_year
     )
+    return education_group_year.id
 
-    if not qs.exists():
-        return
 
-    return qs.first()
+def resolve_offers(offers):
+    """
+    Associe chaque offre importable à la référence de son EducationGroupYear.
+    Les offres de type 'common' sans EducationGroupYear sont créées, les autres sont ignorées.
+    """
+    offers = [offer for offer in offers if 'info' in offer and offer.get('type') in LOOKUP_FIELD_BY_TYPE]
+    education_group_years = find_education_group_years(offers)
 
+    resolved = []
+    for offer in offers:
+        key = get_education_group_year_key(offer)
+        reference = education_group_years.get(key)
+        if reference is None and offer['type'] == 'common':
+            reference = education_group_years[key] = create_education_group_year_for_common(offer)
+        if reference is not None:
+            resolved.append((reference, offer))
+    return resolved
 
-def find_education_group_year_for_offer(item):
-    qs = EducationGroupYear.objects.filter(
-        academic_year__year=item['year'],
-        acronym__iexact=item['acronym']
-    )
 
-    if not qs.exists():
-        return
+def chunks(records, size=BATCH_SIZE):
+    for index in range(0, len(records), size):
+        yield records[index:index + size]
 
-    return qs.first()
 
+def find_existing_translated_texts(context, references, text_labels):
+    """
+    Charge les TranslatedText existants, indexés par (référence, id du label).
+    En cas de doublon, le premier créé est conservé comme le ferait get_or_create.
+    """
+    existing = {}
+    for batch in chunks(sorted(references)):
+        records = TranslatedText.objects.filter(
+            entity=context.entity,
+            language=context.language,
+            reference__in=batch,
+            text_label__in=text_labels,
+        ).order_by('id').only('id', 'reference', 'text_label_id', 'text')
 
-def find_education_group_year_for_common(item):
-    records = EducationGroupYear.objects.filter(
-        academic_year__year=item['year'],
-        acronym__iexact=item['acronym']
-    )
+        for translated_text in records:
+            existing.setdefault((translated_text.reference, translated_text.text_label_id), translated_text)
+    return existing
 
-    if not records:
-        academic_year = AcademicYear.objects.get(year=item['year'])
-        education_group_year = EducationGroupYearFactory(
-            acronym=item['acronym'],
-            academic_year=academic_year
-        )
-    else:
-        education_group_year = records.first()
 
-    return education_group_year
+def get_wanted_texts(resolved_offers, mapping_label_text_label):
+    """
+    Calcule le texte attendu pour chaque (référence, id du label), la dernière valeur rencontrée l'emporte.
+    """
+    wanted = collections.OrderedDict()
+    for reference, item in resolved_offers:
+        for label, value in item['info'].items():
+            value = convert_to_html(item, label, value)
+
+            if not value:
+                continue
+
+            wanted[(reference, mapping_label_text_label[label].id)] = value
+    return wanted
+
+
+def diff_translated_texts(context, wanted, existing):
+    to_create, to_update = [], []
+    for (reference, text_label_id), value in wanted.items():
+        translated_text = existing.get((reference, text_label_id))
+        if translated_text is None:
+            to_create.append(TranslatedText(
+                entity=context.entity,
+                reference=reference,
+                text_label_id=text_label_id,
+                language=context.language,
+                text=value,
+            ))
+        elif translated_text.text != value:
+            to_update.append((translated_text.id, value))
+    return to_create, to_update
+
+
+def report_progress(action, done, total):
+    print('{0}: {1}/{2}'.format(action, done, total))
+
+
+def insert_translated_texts(to_create):
+    done = 0
+    for batch in chunks(to_create):
+        TranslatedText.objects.bulk_create(batch)
+        done += len(batch)
+        report_progress('Inserted', done, len(to_create))
+
+
+def update_translated_texts(to_update):
+    done = 0
+    now = timezone.now()
+    for batch in chunks(to_update):
+        TranslatedText.objects.filter(pk__in=[pk for pk, value in batch]).update(
+            text=Case(*[When(pk=pk, then=Value(value)) for pk, value in batch], output_field=TextField()),
+            changed=now,
+        )
+        done += len(batch)
+        report_progress('Updated', done, len(to_update))
 
 
 LABEL_TEXTUALS = [
@@ -341,7 +434,7 @@ def find_translated_label(language, label):
         return label.title()
 
 
-def run(filename, language='fr-be'):
+def run(filename, *args):
     """
     Import the json file,
 
@@ -350,7 +443,15 @@ def run(filename, language='fr-be'):
     * offer
     * common
     * group
+
+    The optional arguments are the language (default: fr-be) and the dry-run flag,
+    which does the whole import and reports it but rolls back the transaction:
+    ./manage.py runscript load_offers --script-args offers.json fr-be dry-run
     """
+    dry_run = any(arg in DRY_RUN_ARGS for arg in args)
+    languages = [arg for arg in args if arg not in DRY_RUN_ARGS]
+    language = languages[0] if languages else 'fr-be'
+
     path = check_parameters(filename, language)
 
     entity = 'offer_year'
@@ -362,9 +463,14 @@ def run(filename, language='fr-be'):
     Context = collections.namedtuple('Context', 'entity language')
     context = Context(entity=entity, language=language)
 
-    mapping_label_text_label = get_mapping_label_texts(context, labels)
+    with transaction.atomic():
+        mapping_label_text_label = get_mapping_label_texts(context, labels)
 
-    create_offers(context, items, mapping_label_text_label)
+        create_offers(context, items, mapping_label_text_label)
+
+        if dry_run:
+            print('Dry run: rolling back')
+            transaction.set_rollback(True)
 
 
 def check_parameters(filename, language):
@@ -395,25 +501,19 @@ def get_mapping_label_texts(context, labels):
 
 
 def create_offers(context, offers, mapping_label_text_label):
-    for offer in offers:
-        import_offer(context, offer, mapping_label_text_label)
-
-
-def import_offer(context, offer, mapping_label_text_label):
-    if 'info' not in offer:
-        return None
-
-    function = {
-        'group': find_education_group_year_for_group,
-        'common': find_education_group_year_for_common,
-        'offer': find_education_group_year_for_offer,
-    }.get(offer['type'])
-
-    if not function:
-        return None
-
-    egy = function(offer)
-    if not egy:
-        return None
+    resolved_offers = resolve_offers(offers)
+    print('Offers found: {0}/{1}'.format(len(resolved_offers), len(offers)))
+
+    wanted = get_wanted_texts(resolved_offers, mapping_label_text_label)
+    existing = find_existing_translated_texts(
+        context,
+        {reference for reference, offer in resolved_offers},
+        mapping_label_text_label.values()
+    )
+    to_create, to_update = diff_translated_texts(context, wanted, existing)
+    print('Texts to insert: {0}, to update: {1}, unchanged: {2}'.format(
+        len(to_create), len(to_update), len(wanted) - len(to_create) - len(to_update)
+    ))
 
-    import_offer_and_items(offer, egy, mapping_label_text_label, context)
+    insert_translated_texts(to_create)
+    update_translated_texts(to_update)